@@ -0,0 +1,130 @@
+"""
+Star-guiding frame cost at each decode scale: JPEG decode + star detection.
+
+A synthetic night-sky JPEG (sky gradient, read noise, hot pixels, one
+Gaussian star at a sub-pixel position) is decoded the way FrameSource
+does it (IMREAD_REDUCED_GRAYSCALE_N + rotate) and searched with
+StarFollower._find_star at that scale.  For scale > 1 the "refine" row
+adds what an escalation costs: a full decode plus the ROI centroid.
+
+Per scale it reports decode, detect and total time and the centroid
+error in full-frame pixels, coarse and refined.
+
+Run:
+    python Benchmarks/bench_decode_scale.py [--count 50] [--size 1920x1080] [--json out.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+import cv2
+import numpy as np
+
+# Allow importing from the Classes/ directory regardless of cwd.
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from Classes.FrameSource import DECODE_SCALES, FrameSource, to_full
+from Classes.StarFollower import StarFollower
+
+
+def _summary(samples_s: list[float]) -> dict:
+    ms = sorted(s * 1000 for s in samples_s)
+    return {
+        'count':   len(ms),
+        'mean_ms': round(statistics.fmean(ms), 4),
+        'p50_ms':  round(ms[len(ms) // 2], 4),
+        'p99_ms':  round(ms[min(len(ms) - 1, int(len(ms) * 0.99))], 4),
+    }
+
+
+def sky_jpeg(width, height, star, rng, quality=85) -> bytes:
+    """A JPEG that decodes (after FrameSource's 180° rotation) to a sky with a star at *star*."""
+    ys, xs = np.mgrid[0:height, 0:width].astype(np.float32)
+    sky = 18 + 10 * xs / width + 6 * ys / height
+    sky += rng.normal(0, 2.5, sky.shape).astype(np.float32)
+    sx, sy = star
+    sky += 200 * np.exp(-((xs - sx) ** 2 + (ys - sy) ** 2) / (2 * 1.3 ** 2))
+    hot = rng.integers(0, [width, height], size=(40, 2))
+    sky[hot[:, 1], hot[:, 0]] = 255
+    image = np.clip(sky, 0, 255).astype(np.uint8)
+    ok, encoded = cv2.imencode('.jpg', cv2.rotate(image, cv2.ROTATE_180),
+                               [cv2.IMWRITE_JPEG_QUALITY, quality])
+    assert ok
+    return encoded.tobytes()
+
+
+def bench_scale(frames, scale, follower) -> dict:
+    decode, detect, refine = [], [], []
+    errors, refined_errors = [], []
+    for jpeg, (sx, sy) in frames:
+        t0 = time.perf_counter()
+        image = FrameSource._scaled(jpeg, scale)
+        t1 = time.perf_counter()
+        star = follower._find_star(image, scale)
+        t2 = time.perf_counter()
+        decode.append(t1 - t0)
+        detect.append(t2 - t1)
+        if star is None:
+            continue
+        cx, cy = to_full(*star, scale)
+        errors.append(float(np.hypot(cx - sx, cy - sy)))
+        if scale > 1:
+            t3 = time.perf_counter()
+            full = FrameSource._scaled(jpeg, 1)
+            rx, ry = follower._refine(full, (cx, cy), 2 * scale + 6)
+            refine.append(time.perf_counter() - t3)
+            refined_errors.append(float(np.hypot(rx - sx, ry - sy)))
+    total = [a + b for a, b in zip(decode, detect)]
+    result = {
+        'scale':      scale,
+        'found':      len(errors),
+        'decode':     _summary(decode),
+        'detect':     _summary(detect),
+        'total':      _summary(total),
+        'error_px':   round(statistics.fmean(errors), 3) if errors else None,
+        'max_error_px': round(max(errors), 3) if errors else None,
+    }
+    if refine:
+        result['refine'] = _summary(refine)
+        result['refined_error_px'] = round(statistics.fmean(refined_errors), 3)
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=50, help="frames per scale")
+    parser.add_argument("--size", default="1920x1080", help="frame size WxH")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    rng = np.random.default_rng(args.seed)
+    stars = rng.uniform([50, 50], [width - 50, height - 50], size=(min(args.count, 10), 2))
+    frames = [(sky_jpeg(width, height, tuple(star), rng), tuple(star)) for star in stars]
+    frames = (frames * (args.count // len(frames) + 1))[:args.count]
+    follower = StarFollower(None)
+
+    results = {'size': [width, height], 'scales': [bench_scale(frames, s, follower)
+                                                   for s in DECODE_SCALES]}
+
+    print(f"{'scale':>5}{'found':>7}{'decode ms':>11}{'detect ms':>11}{'total ms':>10}"
+          f"{'err px':>8}{'refine ms':>11}{'refined px':>12}")
+    for r in results['scales']:
+        refine = f"{r['refine']['mean_ms']:>11.2f}{r['refined_error_px']:>12.3f}" if 'refine' in r else ""
+        error = f"{r['error_px']:>8.2f}" if r['error_px'] is not None else f"{'-':>8}"
+        print(f"{r['scale']:>5}{r['found']:>7}{r['decode']['mean_ms']:>11.2f}"
+              f"{r['detect']['mean_ms']:>11.2f}{r['total']['mean_ms']:>10.2f}{error}{refine}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
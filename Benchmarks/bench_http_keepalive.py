@@ -0,0 +1,108 @@
+"""
+Jog latency: a new TCP connection per request vs one HTTP/1.1 keep-alive connection.
+
+Starts the real UnifiedHandler on an ephemeral localhost port with a motor
+stub that accepts every command, then sends a burst of /motor/write jogs
+both ways and reports per-request latency.
+
+Run:
+    python Benchmarks/bench_http_keepalive.py [--count 1000] [--json out.json]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+
+# Allow importing from the Classes/ directory regardless of cwd.
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from Classes.UnifiedServer import ConcurrentHTTPServer, UnifiedHandler
+
+
+class NullMotor:
+    """Accepts every command instantly so only the HTTP path is measured."""
+
+    def send_command(self, cmd):
+        return True
+
+
+class QuietHandler(UnifiedHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def _summary(samples_s: list[float]) -> dict:
+    ms = sorted(s * 1000 for s in samples_s)
+    return {
+        'count':   len(ms),
+        'total_s': round(sum(samples_s), 4),
+        'mean_ms': round(statistics.fmean(ms), 4),
+        'p50_ms':  round(ms[len(ms) // 2], 4),
+        'p99_ms':  round(ms[min(len(ms) - 1, int(len(ms) * 0.99))], 4),
+        'max_ms':  round(ms[-1], 4),
+    }
+
+
+def bench_new_connection(port: int, count: int) -> list[float]:
+    samples = []
+    for i in range(count):
+        t0 = time.perf_counter()
+        conn = http.client.HTTPConnection("127.0.0.1", port)
+        conn.request("GET", f"/motor/write?cmd=s%3D{i}", headers={"Connection": "close"})
+        conn.getresponse().read()
+        conn.close()
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+def bench_keep_alive(port: int, count: int) -> list[float]:
+    samples = []
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    for i in range(count):
+        t0 = time.perf_counter()
+        conn.request("GET", f"/motor/write?cmd=s%3D{i}")
+        conn.getresponse().read()
+        samples.append(time.perf_counter() - t0)
+    conn.close()
+    return samples
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=1000, help="jogs per mode")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    server = ConcurrentHTTPServer(("127.0.0.1", 0), QuietHandler)
+    server.motor_control = NullMotor()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+
+    try:
+        results = {
+            'new_connection': _summary(bench_new_connection(port, args.count)),
+            'keep_alive':     _summary(bench_keep_alive(port, args.count)),
+        }
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    print(f"{'mode':<16}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}{'total s':>10}")
+    for mode, r in results.items():
+        print(f"{mode:<16}{r['mean_ms']:>10.3f}{r['p50_ms']:>10.3f}{r['p99_ms']:>10.3f}{r['total_s']:>10.3f}")
+    speedup = results['new_connection']['mean_ms'] / results['keep_alive']['mean_ms']
+    print(f"keep-alive is {speedup:.2f}x faster per jog")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
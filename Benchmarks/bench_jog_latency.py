@@ -0,0 +1,132 @@
+"""
+Jog latency: HTTP /motor/write vs the binary JogChannel (UDP and TCP).
+
+Starts the real UnifiedHandler and a JogChannel on ephemeral localhost ports,
+both driving the same motor stub, then sends a burst of jogs through each
+path and reports per-jog round-trip latency (request sent → reply/ack read).
+
+Run:
+    python Benchmarks/bench_jog_latency.py [--count 1000] [--json out.json]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+
+# Allow importing from the Classes/ directory regardless of cwd.
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from Classes.UnifiedServer import ConcurrentHTTPServer, UnifiedHandler
+from Classes.JogChannel import JogChannel, JogClient, encode_jog, ACK_FORMAT
+
+
+class NullMotor:
+    """Accepts every command instantly so only the transport is measured."""
+
+    def send_command(self, cmd):
+        return True
+
+    def send_batch(self, commands):
+        return True
+
+
+class QuietHandler(UnifiedHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def _summary(samples_s: list[float]) -> dict:
+    ms = sorted(s * 1000 for s in samples_s)
+    return {
+        'count':   len(ms),
+        'total_s': round(sum(samples_s), 4),
+        'mean_ms': round(statistics.fmean(ms), 4),
+        'p50_ms':  round(ms[len(ms) // 2], 4),
+        'p99_ms':  round(ms[min(len(ms) - 1, int(len(ms) * 0.99))], 4),
+        'max_ms':  round(ms[-1], 4),
+    }
+
+
+def bench_http_keep_alive(port: int, count: int) -> list[float]:
+    # The four commands of a jog in one request, as the app sends them today.
+    samples = []
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    for i in range(count):
+        t0 = time.perf_counter()
+        conn.request("GET", f"/motor/write?cmd=v%3D1%0Ad%3D0%0At%3D2%0As%3D{i}")
+        conn.getresponse().read()
+        samples.append(time.perf_counter() - t0)
+    conn.close()
+    return samples
+
+
+def bench_udp(address, count: int) -> list[float]:
+    samples = []
+    client = JogClient(*address, timeout=1.0)
+    for i in range(count):
+        t0 = time.perf_counter()
+        client.jog(1, 0, i, 2.0)
+        samples.append(time.perf_counter() - t0)
+    client.close()
+    return samples
+
+
+def bench_tcp(address, count: int) -> list[float]:
+    samples = []
+    with socket.create_connection(address) as conn:
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        for i in range(count):
+            t0 = time.perf_counter()
+            conn.sendall(encode_jog(i + 1, 1, 0, i, 2.0))
+            ack = b""
+            while len(ack) < ACK_FORMAT.size:
+                ack += conn.recv(ACK_FORMAT.size - len(ack))
+            samples.append(time.perf_counter() - t0)
+    return samples
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=1000, help="jogs per mode")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    motor = NullMotor()
+    server = ConcurrentHTTPServer(("127.0.0.1", 0), QuietHandler)
+    server.motor_control = motor
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    channel = JogChannel(motor, host="127.0.0.1", port=0)
+    channel.start()
+
+    try:
+        results = {
+            'http_keep_alive': _summary(bench_http_keep_alive(server.server_address[1], args.count)),
+            'jog_udp':         _summary(bench_udp(channel.address, args.count)),
+            'jog_tcp':         _summary(bench_tcp(channel.address, args.count)),
+        }
+    finally:
+        channel.stop()
+        server.shutdown()
+        server.server_close()
+
+    print(f"{'mode':<18}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}{'total s':>10}")
+    for mode, r in results.items():
+        print(f"{mode:<18}{r['mean_ms']:>10.3f}{r['p50_ms']:>10.3f}{r['p99_ms']:>10.3f}{r['total_s']:>10.3f}")
+    for mode in ('jog_udp', 'jog_tcp'):
+        speedup = results['http_keep_alive']['mean_ms'] / results[mode]['mean_ms']
+        print(f"{mode} is {speedup:.2f}x faster per jog than HTTP keep-alive")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+"""
+Motor command throughput and latency, end to end, against the pty Arduino simulator.
+
+Three paths, each against a fresh ArduinoSimulator (moves complete at once)
+driven by a real MotorControl:
+
+  send_command  back-to-back MotorControl.send_command() calls from one thread
+  http_write    GET /motor/write through UnifiedHandler on one keep-alive connection
+  contended     a jog burst while both keep-alive threads (StarFollower's
+                v=1 e=1 and SiderealTracker's v=1 e=1 v=0 e=1) and a tracker
+                sending v/d/t/s moves hammer the same port
+
+Latency is call → return, i.e. until the batch has been written to the
+serial port.  Commands per second counts commands handed to MotorControl;
+wire_commands is what the simulator actually received (the state shadow
+drops repeated modal commands).
+
+Run:
+    python Benchmarks/bench_motor_throughput.py [--count 2000] [--json out.json]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+
+# Allow importing from the Classes/ directory regardless of cwd.
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from Classes.Logger import set_level
+from Classes.MotorsControl import MotorControl, PRIORITY_JOG, PRIORITY_TRACKING, PRIORITY_KEEPALIVE
+from Classes.UnifiedServer import ConcurrentHTTPServer, UnifiedHandler
+from Simulator import ArduinoSimulator
+
+
+class QuietHandler(UnifiedHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def _summary(samples_s: list[float]) -> dict:
+    ms = sorted(s * 1000 for s in samples_s)
+    return {
+        'count':   len(ms),
+        'total_s': round(sum(samples_s), 4),
+        'mean_ms': round(statistics.fmean(ms), 4),
+        'p50_ms':  round(ms[len(ms) // 2], 4),
+        'p99_ms':  round(ms[min(len(ms) - 1, int(len(ms) * 0.99))], 4),
+        'max_ms':  round(ms[-1], 4),
+    }
+
+
+class Rig:
+    """Simulator + started MotorControl, torn down together."""
+
+    def __enter__(self):
+        self.simulator = ArduinoSimulator(time_scale=float('inf')).start()
+        self.motor = MotorControl(port=self.simulator.port)
+        self.motor.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.motor.stop()
+        self.simulator.stop()
+
+    def result(self, samples, commands, elapsed) -> dict:
+        result = _summary(samples)
+        result['commands_per_s'] = round(commands / elapsed, 1)
+        result['wire_commands'] = self.simulator.commands_received
+        return result
+
+
+def bench_send_command(count: int) -> dict:
+    with Rig() as rig:
+        samples = []
+        started = time.perf_counter()
+        for i in range(count):
+            t0 = time.perf_counter()
+            if not rig.motor.send_command(f"s={i % 100 + 1}"):
+                raise RuntimeError("send_command failed")
+            samples.append(time.perf_counter() - t0)
+        elapsed = time.perf_counter() - started
+        time.sleep(0.1)         # let the simulator drain its input
+        return rig.result(samples, count, elapsed)
+
+
+def bench_http_write(count: int) -> dict:
+    with Rig() as rig:
+        server = ConcurrentHTTPServer(("127.0.0.1", 0), QuietHandler)
+        server.motor_control = rig.motor
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1])
+        try:
+            samples = []
+            started = time.perf_counter()
+            for i in range(count):
+                t0 = time.perf_counter()
+                conn.request("GET", f"/motor/write?cmd=s%3D{i % 100 + 1}")
+                response = conn.getresponse()
+                response.read()
+                if response.status != 200:
+                    raise RuntimeError(f"/motor/write returned {response.status}")
+                samples.append(time.perf_counter() - t0)
+            elapsed = time.perf_counter() - started
+        finally:
+            conn.close()
+            server.shutdown()
+            server.server_close()
+        time.sleep(0.1)
+        return rig.result(samples, count, elapsed)
+
+
+def bench_contended(count: int, keepalive_hz: float, tracker_hz: float) -> dict:
+    with Rig() as rig:
+        motor = rig.motor
+        stop = threading.Event()
+        sent = {'keepalive': 0, 'tracking': 0}
+        tracker_samples = []
+
+        def keep_alive(batch):
+            while not stop.wait(1.0 / keepalive_hz):
+                motor.send_batch(batch, priority=PRIORITY_KEEPALIVE, wait=False)
+                sent['keepalive'] += len(batch)
+
+        def tracker():
+            i = 0
+            while not stop.wait(1.0 / tracker_hz):
+                i += 1
+                batch = [f"v={i % 2}", f"d={i // 2 % 2}", f"t={1 + i % 3:.3f}", f"s={i % 50 + 1}"]
+                t0 = time.perf_counter()
+                motor.send_batch(batch, priority=PRIORITY_TRACKING)
+                tracker_samples.append(time.perf_counter() - t0)
+                sent['tracking'] += len(batch)
+
+        threads = [
+            threading.Thread(target=keep_alive, args=(["v=1", "e=1"],), daemon=True),
+            threading.Thread(target=keep_alive, args=(["v=1", "e=1", "v=0", "e=1"],), daemon=True),
+            threading.Thread(target=tracker, daemon=True),
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.2)         # background load reaches steady state
+
+        samples = []
+        started = time.perf_counter()
+        for i in range(count):
+            batch = [f"v={i % 2}", f"d={i % 2}", "t=2", f"s={i % 100 + 1}"]
+            t0 = time.perf_counter()
+            if not motor.send_batch(batch, priority=PRIORITY_JOG):
+                raise RuntimeError("jog batch not written")
+            samples.append(time.perf_counter() - t0)
+        elapsed = time.perf_counter() - started
+        stop.set()
+        for thread in threads:
+            thread.join()
+        time.sleep(0.1)
+
+        commands = count * 4 + sent['keepalive'] + sent['tracking']
+        result = rig.result(samples, commands, elapsed)
+        result['tracker'] = _summary(tracker_samples) if tracker_samples else None
+        result['keepalive_commands'] = sent['keepalive']
+        return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=2000, help="calls per path")
+    parser.add_argument("--keepalive-hz", type=float, default=200.0,
+                        help="rate of each keep-alive thread (1 Hz in production)")
+    parser.add_argument("--tracker-hz", type=float, default=100.0, help="tracker move rate")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    # RX/TX dumps are DEBUG records; keep the logger out of the numbers.
+    set_level("WARNING")
+    results = {
+        'send_command': bench_send_command(args.count),
+        'http_write':   bench_http_write(args.count),
+        'contended':    bench_contended(args.count, args.keepalive_hz, args.tracker_hz),
+    }
+
+    print(f"{'path':<14}{'cmds/s':>10}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}{'wire cmds':>11}")
+    for path, r in results.items():
+        print(f"{path:<14}{r['commands_per_s']:>10.0f}{r['mean_ms']:>10.3f}{r['p50_ms']:>10.3f}"
+              f"{r['p99_ms']:>10.3f}{r['wire_commands']:>11}")
+    tracker = results['contended']['tracker']
+    if tracker:
+        print(f"tracker moves under load: p50 {tracker['p50_ms']:.3f} ms, p99 {tracker['p99_ms']:.3f} ms")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
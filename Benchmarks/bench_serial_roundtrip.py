@@ -0,0 +1,121 @@
+"""
+Serial round trip: 'poll' (in_waiting + 10 ms sleep) vs 'event' (blocking read) reader.
+
+A pty stands in for the Arduino: a fake device thread on the master side
+answers every command line with "ok\n".  MotorControl opens the pty slave,
+sends a command and waits on a telemetry subscription for the reply; the
+time from send_command() to the reply line is one round trip.  Reader
+thread CPU time while idle is also reported.
+
+Run:
+    python Benchmarks/bench_serial_roundtrip.py [--count 300] [--json out.json]
+"""
+
+import argparse
+import json
+import os
+import select
+import statistics
+import sys
+import threading
+import time
+
+# Allow importing from the Classes/ directory regardless of cwd.
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from Classes.MotorsControl import MotorControl
+
+
+class PtyDevice:
+    """Fake Arduino on the master end of a pty: replies "ok\\n" to every line."""
+
+    def __init__(self):
+        self.master, self.slave = os.openpty()
+        self.port = os.ttyname(self.slave)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        pending = b""
+        while not self._stop.is_set():
+            ready, _, _ = select.select([self.master], [], [], 0.1)
+            if not ready:
+                continue
+            try:
+                pending += os.read(self.master, 4096)
+            except OSError:
+                return
+            while b"\n" in pending:
+                _, pending = pending.split(b"\n", 1)
+                os.write(self.master, b"ok\n")
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+        os.close(self.master)
+        os.close(self.slave)
+
+
+def _summary(samples_s: list[float]) -> dict:
+    ms = sorted(s * 1000 for s in samples_s)
+    return {
+        'count':   len(ms),
+        'mean_ms': round(statistics.fmean(ms), 4),
+        'p50_ms':  round(ms[len(ms) // 2], 4),
+        'p99_ms':  round(ms[min(len(ms) - 1, int(len(ms) * 0.99))], 4),
+        'max_ms':  round(ms[-1], 4),
+    }
+
+
+def bench_mode(read_mode: str, count: int, idle_s: float) -> dict:
+    device = PtyDevice()
+    motor = MotorControl(port=device.port, read_mode=read_mode)
+    motor.start()
+    subscription = motor.subscribe()
+    try:
+        samples = []
+        for i in range(count):
+            t0 = time.perf_counter()
+            motor.send_command(f"s={i}")
+            if not subscription.get(timeout=2.0, max_lines=1):
+                raise RuntimeError(f"{read_mode}: no reply to s={i}")
+            samples.append(time.perf_counter() - t0)
+
+        # Idle cost: process CPU time spent while nothing is being sent.
+        cpu0 = time.process_time()
+        time.sleep(idle_s)
+        idle_cpu_ms = (time.process_time() - cpu0) * 1000
+    finally:
+        motor.stop()
+        device.close()
+
+    result = _summary(samples)
+    result['idle_cpu_ms_per_s'] = round(idle_cpu_ms / idle_s, 3)
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=300, help="round trips per mode")
+    parser.add_argument("--idle", type=float, default=2.0, help="seconds of idle CPU sampling")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = {mode: bench_mode(mode, args.count, args.idle) for mode in ('poll', 'event')}
+
+    print(f"{'mode':<8}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}{'idle CPU ms/s':>16}")
+    for mode, r in results.items():
+        print(f"{mode:<8}{r['mean_ms']:>10.3f}{r['p50_ms']:>10.3f}{r['p99_ms']:>10.3f}"
+              f"{r['idle_cpu_ms_per_s']:>16.3f}")
+    speedup = results['poll']['mean_ms'] / results['event']['mean_ms']
+    print(f"event reader round trip is {speedup:.1f}x faster")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
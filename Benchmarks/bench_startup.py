@@ -0,0 +1,132 @@
+"""
+Server startup time: module import cost and time-to-first-/ping.
+
+Each measurement runs in a fresh interpreter so nothing is cached:
+  * import of Classes.UnifiedServer (what RunServer pays before anything)
+  * import of the heavy vision/tracking modules it used to load eagerly
+  * spawn → first successful /ping, and spawn → /ready reporting every
+    lazily loaded subsystem as ready
+
+The spawned server has no serial port or cameras; MotorControl logs the
+failed open and carries on, which is also what happens on a Pi booted
+without the Arduino attached.
+
+Run:
+    python Benchmarks/bench_startup.py [--runs 3] [--json out.json]
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+HEAVY_MODULES = ("Classes.StarFollower", "Classes.CameraRotationFinder",
+                 "Classes.PlateSolver", "Classes.SiderealTracker")
+
+SERVER_SCRIPT = """
+import sys, time
+from Classes.UnifiedServer import TelescopeServer
+server = TelescopeServer(host='127.0.0.1', port=int(sys.argv[1]))
+server.start()
+while True:
+    time.sleep(1)
+"""
+
+
+def _import_seconds(modules) -> float:
+    code = ("import time; t = time.perf_counter(); "
+            + "; ".join(f"import {m}" for m in modules)
+            + "; print(time.perf_counter() - t)")
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT,
+                         capture_output=True, text=True, check=True).stdout
+    return float(out.strip().splitlines()[-1])
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _get(url: str) -> tuple[int | None, bytes]:
+    try:
+        with urllib.request.urlopen(url, timeout=0.5) as resp:
+            return resp.status, resp.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+    except OSError:
+        return None, b""
+
+
+def _subsystems_ready(body: bytes) -> bool:
+    # The motor reports failed without a serial port; only the lazily
+    # loaded subsystems are of interest here.
+    try:
+        subsystems = json.loads(body)['subsystems']
+    except (ValueError, KeyError):
+        return False
+    return all(info['state'] == 'ready'
+               for name, info in subsystems.items() if name != 'motor')
+
+
+def _server_timings(timeout: float = 60.0) -> dict:
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    t0 = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-c", SERVER_SCRIPT, str(port)], cwd=ROOT,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    first_ping = ready = None
+    try:
+        while time.perf_counter() - t0 < timeout:
+            if first_ping is None and _get(base + "/ping")[0] == 200:
+                first_ping = time.perf_counter() - t0
+            if first_ping is not None and _subsystems_ready(_get(base + "/ready")[1]):
+                ready = time.perf_counter() - t0
+                break
+            time.sleep(0.01)
+    finally:
+        proc.terminate()
+        proc.wait()
+    return {'first_ping_s': first_ping, 'all_ready_s': ready}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    server_import = [_import_seconds(["Classes.UnifiedServer"]) for _ in range(args.runs)]
+    heavy_import = [_import_seconds(HEAVY_MODULES) for _ in range(args.runs)]
+    timings = [_server_timings() for _ in range(args.runs)]
+
+    def med(values):
+        values = [v for v in values if v is not None]
+        return round(statistics.median(values), 4) if values else None
+
+    results = {
+        'import_unified_server_s': med(server_import),
+        'import_heavy_modules_s':  med(heavy_import),
+        'first_ping_s':            med(t['first_ping_s'] for t in timings),
+        'all_ready_s':             med(t['all_ready_s'] for t in timings),
+        'runs':                    args.runs,
+    }
+    for key, value in results.items():
+        print(f"{key:<26}{value}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""
+Serial bytes per hour of sidereal tracking, with and without the modal state shadow.
+
+Replays one hour of SiderealTracker traffic on a simulated clock: the 1 Hz
+keep-alive batch (v=1 e=1 v=0 e=1) plus one v/d/t/s move per axis every
+update interval, with step counts and rates from the same astropy drift
+calculation the tracker uses.  Every batch is passed through StateShadow
+and the bytes that would reach the wire are counted both ways.
+
+Run:
+    python Benchmarks/bench_state_shadow.py [--interval 5] [--hours 1] [--json out.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+
+# Allow importing from the Classes/ directory regardless of cwd.
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+from astropy.coordinates import SkyCoord, EarthLocation, AltAz
+from astropy.time import Time
+import astropy.units as u
+
+from Classes.SiderealTracker import SiderealTracker
+from Classes.StateShadow import StateShadow, split_commands
+
+
+class RecordingMotor:
+    """Collects the batches SiderealTracker._send_move would write."""
+
+    def __init__(self):
+        self.batches: list[list[str]] = []
+
+    def send_batch(self, commands, priority=0, wait=True, timeout=2.0):
+        self.batches.append(list(commands))
+        return True
+
+
+def tracking_moves(interval: float, hours: float, ra_hours: float, dec_deg: float,
+                   lat: float, lon: float) -> list[list[list[str]]]:
+    """Move batches per tick, computed exactly as SiderealTracker._run does."""
+    ticks = int(hours * 3600 / interval)
+    times = Time.now() + np.arange(ticks + 1) * interval * u.second
+    location = EarthLocation(lat=lat * u.deg, lon=lon * u.deg)
+    star = SkyCoord(ra=ra_hours * u.hour, dec=dec_deg * u.deg, frame='icrs')
+    altaz = star.transform_to(AltAz(obstime=times, location=location))
+    alt, az = altaz.alt.deg, altaz.az.deg
+
+    motor = RecordingMotor()
+    tracker = SiderealTracker(motor)
+    per_tick = []
+    for i in range(ticks):
+        d_alt = alt[i + 1] - alt[i]
+        d_az = (az[i + 1] - az[i] + 180.0) % 360.0 - 180.0
+        motor.batches = []
+        for axis, delta in (('alt', d_alt), ('az', d_az)):
+            steps = round(abs(delta) * tracker.STEPS_PER_DEGREE)
+            if steps > 0:
+                tracker._send_move(axis=axis, direction=1 if delta >= 0 else 0,
+                                   steps=steps, t_ms=(interval * 1000.0) / steps)
+        per_tick.append(motor.batches)
+    return per_tick
+
+
+def replay(per_tick, interval: float, shadow: StateShadow | None) -> dict:
+    keep_alive = ["v=1", SiderealTracker._ENABLE_ON, "v=0", SiderealTracker._ENABLE_ON]
+    totals = {'keepalive': 0, 'moves': 0}
+
+    def write(kind, batch, now):
+        commands = split_commands(batch) if shadow is None else shadow.filter(batch, now=now)
+        totals[kind] += sum(len(c) + 1 for c in commands)
+
+    now = 0.0
+    for batches in per_tick:
+        tick_end = now + interval
+        for batch in batches:
+            write('moves', batch, now)
+        while now < tick_end:
+            write('keepalive', keep_alive, now)
+            now += 1.0
+    totals['total'] = totals['keepalive'] + totals['moves']
+    return totals
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--interval", type=float, default=5.0, help="tracker update interval (s)")
+    parser.add_argument("--hours", type=float, default=1.0, help="simulated tracking time")
+    parser.add_argument("--max-state-age", type=float, default=None,
+                        help="re-send modal values older than this (s)")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    # Vega from mid-northern latitudes.
+    per_tick = tracking_moves(args.interval, args.hours, 18.6156, 38.7837, 32.0, 35.0)
+    baseline = replay(per_tick, args.interval, None)
+    shadowed = replay(per_tick, args.interval, StateShadow(args.max_state_age))
+
+    per_hour = lambda n: round(n / args.hours)
+    results = {
+        'interval_s': args.interval,
+        'hours': args.hours,
+        'max_state_age_s': args.max_state_age,
+        'baseline_bytes_per_hour': {k: per_hour(v) for k, v in baseline.items()},
+        'shadowed_bytes_per_hour': {k: per_hour(v) for k, v in shadowed.items()},
+        'saved_bytes_per_hour': per_hour(baseline['total'] - shadowed['total']),
+    }
+
+    print(f"{'traffic':<12}{'baseline B/h':>14}{'shadowed B/h':>14}{'saved':>10}")
+    for kind in ('keepalive', 'moves', 'total'):
+        b = results['baseline_bytes_per_hour'][kind]
+        s = results['shadowed_bytes_per_hour'][kind]
+        print(f"{kind:<12}{b:>14}{s:>14}{(b - s) / b * 100 if b else 0:>9.1f}%")
+    print(f"bytes saved per hour of tracking: {results['saved_bytes_per_hour']}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
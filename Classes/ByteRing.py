@@ -0,0 +1,125 @@
+import codecs
+import threading
+
+
+class ByteRing:
+    """
+    Fixed-capacity byte ring buffer.
+
+    The storage is one bytearray allocated up front.  write() copies the
+    incoming bytes in through memoryview slices and, when full, drops the
+    oldest bytes to make room, counting them in overflow_bytes (and each
+    write that had to drop in overflow_events).  Reads hand the stored
+    region out as at most two memoryview segments, so the only copy is the
+    one into the caller's result; text is decoded only by read_text().
+    """
+
+    def __init__(self, capacity: int = 64 * 1024):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._buf = bytearray(capacity)
+        self._view = memoryview(self._buf)
+        self._head = 0          # index of the oldest byte
+        self._size = 0
+        self._lock = threading.Lock()
+        self.overflow_bytes = 0
+        self.overflow_events = 0
+        self.total_written = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+
+    def write(self, data) -> int:
+        """Append *data*; returns how many old bytes were dropped to fit it."""
+        src = memoryview(data).cast('B')
+        n = len(src)
+        if not n:
+            return 0
+        cap = self.capacity
+        with self._lock:
+            self.total_written += n
+            if n >= cap:
+                # Only the newest `cap` bytes survive.
+                dropped = self._size + n - cap
+                self._view[:] = src[n - cap:]
+                self._head, self._size = 0, cap
+            else:
+                dropped = max(0, self._size + n - cap)
+                if dropped:
+                    self._head = (self._head + dropped) % cap
+                    self._size -= dropped
+                tail = (self._head + self._size) % cap
+                first = min(n, cap - tail)
+                self._view[tail:tail + first] = src[:first]
+                if first < n:
+                    self._view[:n - first] = src[first:]
+                self._size += n
+            if dropped:
+                self.overflow_bytes += dropped
+                self.overflow_events += 1
+            return dropped
+
+    # ------------------------------------------------------------------
+    # Consumer side
+    # ------------------------------------------------------------------
+
+    def _segments_locked(self) -> list[memoryview]:
+        start, end = self._head, self._head + self._size
+        if end <= self.capacity:
+            return [self._view[start:end]] if self._size else []
+        return [self._view[start:], self._view[:end - self.capacity]]
+
+    def _clear_locked(self) -> None:
+        self._head = 0
+        self._size = 0
+
+    def read_bytes(self, clear: bool = True) -> bytes:
+        """Everything buffered, oldest first, as one bytes object."""
+        with self._lock:
+            data = b"".join(self._segments_locked())
+            if clear:
+                self._clear_locked()
+        return data
+
+    def read_into(self, out: bytearray, clear: bool = True) -> int:
+        """Append everything buffered to *out*; returns the byte count."""
+        with self._lock:
+            count = 0
+            for segment in self._segments_locked():
+                out += segment
+                count += len(segment)
+            if clear:
+                self._clear_locked()
+        return count
+
+    def read_text(self, encoding: str = 'utf-8', errors: str = 'ignore', clear: bool = True) -> str:
+        """
+        Decode straight from the ring's segments.  An incremental decoder
+        keeps a multi-byte character that straddles the wrap point intact.
+        """
+        with self._lock:
+            decoder = codecs.getincrementaldecoder(encoding)(errors)
+            parts = [decoder.decode(segment) for segment in self._segments_locked()]
+            parts.append(decoder.decode(b"", final=True))
+            if clear:
+                self._clear_locked()
+        return "".join(parts)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clear_locked()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'capacity':        self.capacity,
+                'buffered':        self._size,
+                'total_written':   self.total_written,
+                'overflow_bytes':  self.overflow_bytes,
+                'overflow_events': self.overflow_events,
+            }
@@ -6,15 +6,63 @@ import os
 import signal
 import re
 import json
+import hashlib
+
+from Classes.FrameSource import FrameSource
 
 class CameraDevice:
-    def __init__(self, camera_model, camera_type, video_port, rtsp_port=8554):
+    # How start_stream() captures an MJPG camera:
+    #   'mjpg_streamer' – the mjpg_streamer process serves video_port and
+    #                     FrameSource reads it back over localhost
+    #   'v4l2'          – in this process: FrameSource maps the device's
+    #                     buffers (V4L2Capture) and an MjpegServer on
+    #                     video_port fans the same JPEGs out to viewers
+    CAPTURE_MODES = ('mjpg_streamer', 'v4l2')
+    STREAM_SIZE = (1920, 1080)
+    STREAM_FPS = 30
+
+    def __init__(self, camera_model, camera_type, video_port, rtsp_port=8554, capture='mjpg_streamer'):
+        if capture not in self.CAPTURE_MODES:
+            raise ValueError(f"capture must be one of {self.CAPTURE_MODES}, not {capture!r}")
         self.camera_model = camera_model
         self.camera_type = camera_type
         self.video_port = video_port
         self.rtsp_port = rtsp_port
-        self.video_device = None
-        
+        self.capture = capture
+        self.mjpeg_server = None        # capture='v4l2' only, while streaming
+        # Parsed `v4l2-ctl -l` output, its JSON encoding and ETag.  Filled on
+        # first use, kept current by set_control(), dropped by reset_defaults()
+        # and whenever the device path changes.
+        self._controls_lock = threading.Lock()
+        self._controls_cache = None
+        self._controls_body = None
+        self._controls_etag = None
+        self._video_device = None
+        # Latest decoded frame for the vision subsystems; connects on first use.
+        self.frame_source = FrameSource(self)
+
+    @property
+    def video_device(self):
+        return self._video_device
+
+    @video_device.setter
+    def video_device(self, device):
+        if device != self._video_device:
+            self.invalidate_controls()
+        self._video_device = device
+
+    def invalidate_controls(self):
+        """Forget the cached controls; the next read re-queries the device."""
+        with self._controls_lock:
+            self._controls_cache = None
+            self._controls_body = None
+            self._controls_etag = None
+
+    def _store_controls_locked(self, controls):
+        self._controls_cache = controls
+        self._controls_body = json.dumps(controls).encode()
+        self._controls_etag = '"' + hashlib.sha1(self._controls_body).hexdigest()[:16] + '"'
+
     def get_camera_device_by_type(self):
         """Find camera device by model"""
         try:
@@ -46,11 +94,14 @@ class CameraDevice:
 
         self.video_device = current_device
         print(f"Using video device: {self.video_device}, starting stream with type {self.camera_type}")
-        
+
+        if self.camera_type == "MJPG" and self.capture == 'v4l2':
+            return self._start_in_process()
+        width, height = self.STREAM_SIZE
         if self.camera_type == "MJPG":
             cmd = f"""mjpg_streamer -i "input_uvc.so -d {self.video_device} \
-                -r 1920x1080 \
-                -f 30 \
+                -r {width}x{height} \
+                -f {self.STREAM_FPS} \
                 " -o "output_http.so -p {self.video_port} -w /usr/local/share/mjpg-streamer/www" """
                 
             print(f"Starting MJPG Stream with command: {cmd}")
@@ -66,7 +117,26 @@ class CameraDevice:
         except Exception as e:
             return 500, f"Failed to start stream: {str(e)}".encode()
 
+    def _start_in_process(self):
+        from Classes.MjpegServer import MjpegServer
+        if self.mjpeg_server is None:
+            try:
+                self.mjpeg_server = MjpegServer(self.video_port, name=self.camera_model).start()
+            except OSError as e:
+                return 500, f"Could not serve port {self.video_port}: {e}".encode()
+            self.frame_source.jpeg_sinks.append(self.mjpeg_server.publish)
+            self.frame_source.hold()
+        return 200, f"Stream started on {self.video_device} (in-process)".encode()
+
     def stop_stream(self):
+        if self.mjpeg_server is not None:
+            server, self.mjpeg_server = self.mjpeg_server, None
+            self.frame_source.jpeg_sinks.remove(server.publish)
+            self.frame_source.release()
+            server.stop()
+            self.frame_source.stop()
+            return 200, b"Stream stopped"
+        self.frame_source.stop()
         try:
              # Stop specific to camera type if needed, or generic kill
             if self.camera_type == "MJPG":
@@ -82,7 +152,16 @@ class CameraDevice:
             self.video_device = self.get_camera_device_by_type()
             if not self.video_device:
                 return None
-        
+
+        with self._controls_lock:
+            if self._controls_cache is None:
+                controls = self._query_device_controls()
+                if controls is None:
+                    return None
+                self._store_controls_locked(controls)
+            return self._controls_cache
+
+    def _query_device_controls(self):
         try:
             result = subprocess.run(['v4l2-ctl', '-d', self.video_device, '-l'], 
                                    capture_output=True, text=True, check=True)
@@ -116,16 +195,28 @@ class CameraDevice:
             return None
 
     def get_controls(self):
-        controls = self._get_device_controls_list()
-        if controls is None:
-            return 500, b"Error getting controls or no device found"
-        return 200, json.dumps(controls).encode()
+        code, body, _ = self.get_controls_with_etag()
+        return code, body
+
+    def get_controls_with_etag(self):
+        """Like get_controls() but also returns the ETag of the JSON body (None on error)."""
+        if self._get_device_controls_list() is None:
+            return 500, b"Error getting controls or no device found", None
+        with self._controls_lock:
+            body, etag = self._controls_body, self._controls_etag
+        if body is None:
+            # Invalidated between the two locks; read through once more.
+            return self.get_controls_with_etag()
+        return 200, body, etag
 
     def reset_defaults(self):
         controls = self._get_device_controls_list()
         if controls is None:
             return 500, b"Error getting controls or no device found"
-        
+
+        # Resetting auto controls changes other controls' flags (inactive),
+        # so re-read everything on the next request rather than patching.
+        self.invalidate_controls()
         count = 0
         errors = 0
         for ctrl in controls:
@@ -147,6 +238,33 @@ class CameraDevice:
 
         try:
             subprocess.run(['v4l2-ctl', '-d', self.video_device, '-c', f'{control_name}={value}'], check=True)
+            self._update_cached_control(control_name, value)
             return 200, f"{control_name} set to {value}".encode()
         except subprocess.CalledProcessError:
-            return 500, f"Failed to set {control_name}".encode()
\ No newline at end of file
+            self.invalidate_controls()
+            return 500, f"Failed to set {control_name}".encode()
+
+    def _update_cached_control(self, control_name, value):
+        """
+        Patch the cached value after a successful set.  Only plain in-range
+        integer values are patched; anything the driver might clamp or round,
+        and auto-* controls that toggle other controls' flags, invalidate.
+        """
+        with self._controls_lock:
+            if self._controls_cache is None:
+                return
+            ctrl = next((c for c in self._controls_cache if c['name'] == control_name), None)
+            try:
+                new_value = int(value)
+            except (TypeError, ValueError):
+                new_value = None
+            if (ctrl is None or new_value is None or 'auto' in control_name
+                    or new_value < ctrl.get('min', new_value)
+                    or new_value > ctrl.get('max', new_value)
+                    or (new_value - ctrl.get('min', 0)) % (ctrl.get('step') or 1)):
+                self._controls_cache = None
+                self._controls_body = None
+                self._controls_etag = None
+                return
+            controls = [dict(c, value=new_value) if c is ctrl else c for c in self._controls_cache]
+            self._store_controls_locked(controls)
\ No newline at end of file
@@ -1,25 +1,42 @@
 import cv2
 import numpy as np
 import time
-import requests
 import threading
 import os
+import concurrent.futures
 
 class CameraRotationFinder:
+    # The original fixed wait after the move command.  It is only cut short
+    # by a move-complete report, i.e. when the controller has a
+    # move_complete_pattern and it matched; then SETTLE_TIME lets the mount
+    # stop vibrating.
+    MOVE_WAIT = 5.0
+    SETTLE_TIME = 0.3
+
     def __init__(self, motor_control):
         self.motor = motor_control
 
-    def calculate_rotation(self, camera_device, move_command, debug_path=None):
+    def calculate_rotation(self, camera_device, move_command, debug_path=None,
+                           cancel_event=None, progress_callback=None):
         """
         Takes a picture, moves telescope, takes another picture, 
         calculates rotation angle of the shift vector.
+
+        cancel_event      – optional threading.Event; checked before the move
+                            and while waiting for the telescope to settle.
+        progress_callback – optional callable(fraction, message) for job progress.
         
         Returns: (angle_degrees, message)
         """
+        def report(fraction, message):
+            if progress_callback:
+                progress_callback(fraction, message)
+
         print(f"Starting Rotation Check on {camera_device.camera_model} with command '{move_command}'")
         
         # 1. Capture Image 1
-        img1 = self._capture_frame(camera_device)
+        report(0.0, "Capturing first image")
+        img1 = camera_device.frame_source.capture('rotation_finder')
         if img1 is None:
             return None, "Failed to capture first image (Check if camera is connected)"
         print("Captured Image 1")
@@ -34,15 +51,43 @@ class CameraRotationFinder:
                 print(f"Failed to save debug image 1: {e}")
 
         # 2. Move Telescope
-        if not self.motor.send_command(move_command):
-             return None, "Failed to send motor command"
+        if cancel_event is not None and cancel_event.is_set():
+            return None, "Cancelled"
+        report(0.25, "Moving telescope")
+        move = None
+        if getattr(self.motor, 'move_complete_pattern', None):
+            move = self.motor.move(move_command, timeout=self.MOVE_WAIT)
+        elif not self.motor.send_command(move_command):
+            return None, "Failed to send motor command"
         print(f"Sent command: {move_command}")
 
-        # 3. Wait 2 seconds (as requested)
-        time.sleep(5)
+        # 3. Wait MOVE_WAIT, or until the move-complete report
+        report(0.4, "Waiting for telescope to settle")
+        deadline = time.monotonic() + self.MOVE_WAIT
+        while (remaining := deadline - time.monotonic()) > 0:
+            if cancel_event is not None and cancel_event.is_set():
+                return None, "Cancelled"
+            if move is not None and move.done():
+                error = move.exception()
+                if isinstance(error, ConnectionError):
+                    return None, "Failed to send motor command"
+                if error is None:
+                    print("Move reported complete")
+                    break
+                move = None         # no report; sit out the full wait
+            if move is not None:
+                concurrent.futures.wait([move], timeout=min(0.1, remaining))
+            else:
+                time.sleep(min(0.1, remaining))
+        if cancel_event is not None and cancel_event.is_set():
+            return None, "Cancelled"
 
         # 4. Capture Image 2
-        img2 = self._capture_frame(camera_device)
+        report(0.75, "Capturing second image")
+        # Only a frame read SETTLE_TIME after the mount stops moving (as the
+        # motor estimates it) will do; the timeout counts from then.
+        img2 = camera_device.frame_source.capture('rotation_finder', since=time.monotonic(),
+                                                  timeout=2.0, settle=self.SETTLE_TIME)
         if img2 is None:
             return None, "Failed to capture second image"
         print("Captured Image 2")
@@ -63,70 +108,6 @@ class CameraRotationFinder:
             print(f"Calculation Error: {e}")
             return None, f"Calculation error: {str(e)}"
 
-    def _capture_frame(self, camera_device):
-        """
-        Tries to capture a single frame from the camera.
-        """
-        frame = None
-        
-        # Ensure we know the device
-        if not camera_device.video_device:
-            camera_device.video_device = camera_device.get_camera_device_by_type()
-            
-        # Strategy 1: HTTP Snapshot (for MJPG)
-        if camera_device.camera_type == "MJPG":
-            url = f"http://localhost:{camera_device.video_port}/?action=snapshot"
-            try:
-                # Short timeout
-                response = requests.get(url, timeout=2)
-                if response.status_code == 200:
-                    image_array = np.asarray(bytearray(response.content), dtype=np.uint8)
-                    frame = cv2.imdecode(image_array, cv2.IMREAD_GRAYSCALE)
-                    if frame is not None:
-                        # Flip 180 degrees
-                        return cv2.rotate(frame, cv2.ROTATE_180)
-            except Exception as e:
-                print(f"Snapshot failed: {e}")
-                
-        # Strategy 2: RTSP Capture (for H264)
-        elif camera_device.camera_type == "H264":
-            rtsp_url = f"rtsp://localhost:{camera_device.rtsp_port}/cam"
-            try:
-                cap = cv2.VideoCapture(rtsp_url)
-                if cap.isOpened():
-                    ret, frame_read = cap.read()
-                    cap.release()
-                    if ret and frame_read is not None:
-                        gray = cv2.cvtColor(frame_read, cv2.COLOR_BGR2GRAY)
-                        # Flip 180 degrees
-                        return cv2.rotate(gray, cv2.ROTATE_180)
-            except Exception as e:
-                print(f"RTSP Capture failed: {e}")
-        
-        # Strategy 3: Direct Device Access (Fallback)
-        # Only try if we have a device path
-        if camera_device.video_device:
-            cap = None
-            try:
-                print(f"Attempting direct capture from {camera_device.video_device}")
-                cap = cv2.VideoCapture(camera_device.video_device)
-                if cap.isOpened():
-                    # Read a few frames to settle sensor
-                    for _ in range(5):
-                        cap.read()
-                    ret, frame_read = cap.read()
-                    if ret and frame_read is not None:
-                         gray = cv2.cvtColor(frame_read, cv2.COLOR_BGR2GRAY)
-                         # Flip 180 degrees
-                         return cv2.rotate(gray, cv2.ROTATE_180)
-            except Exception as e:
-                 print(f"Direct capture failed: {e}")
-            finally:
-                if cap:
-                    cap.release()
-             
-        return None
-
     def _compute_shift_angle(self, img1, img2):
         # Use ORB to find keypoints and match
         orb = cv2.ORB_create(nfeatures=500)
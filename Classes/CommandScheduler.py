@@ -0,0 +1,172 @@
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+
+from Classes.Metrics import REGISTRY
+from Classes.Logger import get_logger
+
+_log = get_logger("CommandScheduler")
+
+# Lower value = written first.
+PRIORITY_JOG       = 0    # user-initiated: HTTP /motor/*, jog channel
+PRIORITY_TRACKING  = 1    # StarFollower / SiderealTracker moves
+PRIORITY_KEEPALIVE = 2    # periodic e=1 holds
+
+PRIORITY_NAMES = {
+    PRIORITY_JOG:       'jog',
+    PRIORITY_TRACKING:  'tracking',
+    PRIORITY_KEEPALIVE: 'keepalive',
+}
+
+_QUEUE_WAIT = REGISTRY.histogram(
+    'motor_command_queue_wait_seconds', 'Time a command batch waited for the serial writer',
+    labels=('device', 'priority'))
+_QUEUE_DEPTH = REGISTRY.gauge(
+    'motor_command_queue_depth', 'Command batches waiting for the serial writer',
+    labels=('device', 'priority'))
+_DROPPED = REGISTRY.counter(
+    'motor_command_dropped_total', 'Command batches dropped or rejected by the scheduler',
+    labels=('device', 'priority', 'reason'))
+
+
+class SchedulerFull(Exception):
+    """A priority class stayed at its depth limit for the whole submit timeout."""
+
+
+class SchedulerStopped(Exception):
+    """The scheduler was stopped before the batch was written."""
+
+
+class CommandScheduler:
+    """
+    Single serial writer fed by a priority queue.
+
+    Every thread that wants to talk to the Arduino submits a payload with a
+    priority; one writer thread always takes the most urgent one next (FIFO
+    within a class), so a user jog or tracking move never sits behind a
+    burst of keep-alives.  submit() returns a Future resolved with the
+    write_fn() result once the payload has gone out.
+
+    Each class has a depth limit.  Keep-alives are idempotent, so when their
+    class is full the oldest queued one is dropped in favour of the new one.
+    Jog and tracking submits block (backpressure) until there is room, and
+    fail with SchedulerFull if there is none within their timeout.
+    """
+
+    DEFAULT_DEPTH_LIMITS = {
+        PRIORITY_JOG:       32,
+        PRIORITY_TRACKING:  8,
+        PRIORITY_KEEPALIVE: 1,
+    }
+    COALESCE = frozenset({PRIORITY_KEEPALIVE})
+
+    def __init__(self, write_fn, depth_limits=None, name="SerialWriterThread", device="mount"):
+        self._write_fn = write_fn
+        self.depth_limits = dict(self.DEFAULT_DEPTH_LIMITS)
+        if depth_limits:
+            self.depth_limits.update(depth_limits)
+        self._name = name
+        self.device = device
+        self._cond = threading.Condition()
+        self._heap = []                         # (priority, order, entry)
+        self._order = itertools.count()
+        self._depth = {priority: 0 for priority in self.depth_limits}
+        self._thread = None
+        self._stopped = False
+        self._wait_hist = {p: _QUEUE_WAIT.labels(device, n) for p, n in PRIORITY_NAMES.items()}
+        self._depth_gauge = {p: _QUEUE_DEPTH.labels(device, n) for p, n in PRIORITY_NAMES.items()}
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+
+    def submit(self, payload, priority=PRIORITY_JOG, timeout=2.0) -> Future:
+        if priority not in self.depth_limits:
+            raise ValueError(f"Unknown priority {priority}")
+        future = Future()
+        future.set_running_or_notify_cancel()
+        with self._cond:
+            if self._thread is None and not self._stopped:
+                self._start_locked()
+            if not self._wait_for_room_locked(priority, timeout):
+                reason = 'stopped' if self._stopped else 'full'
+                _DROPPED.labels(self.device, PRIORITY_NAMES[priority], reason).inc()
+                future.set_exception(SchedulerStopped() if self._stopped else SchedulerFull(
+                    f"{PRIORITY_NAMES[priority]} queue full ({self.depth_limits[priority]})"))
+                return future
+            entry = [payload, future, time.perf_counter()]
+            heapq.heappush(self._heap, (priority, next(self._order), entry))
+            self._depth[priority] += 1
+            self._depth_gauge[priority].set(self._depth[priority])
+            self._cond.notify_all()
+        return future
+
+    def _wait_for_room_locked(self, priority, timeout) -> bool:
+        limit = self.depth_limits[priority]
+        if self._stopped:
+            return False
+        if self._depth[priority] < limit:
+            return True
+        if priority in self.COALESCE:
+            self._drop_oldest_locked(priority)
+            return True
+        self._cond.wait_for(lambda: self._stopped or self._depth[priority] < limit, timeout)
+        return not self._stopped and self._depth[priority] < limit
+
+    def _drop_oldest_locked(self, priority):
+        oldest = min((item for item in self._heap if item[0] == priority), key=lambda item: item[1])
+        self._heap.remove(oldest)
+        heapq.heapify(self._heap)
+        self._depth[priority] -= 1
+        _DROPPED.labels(self.device, PRIORITY_NAMES[priority], 'superseded').inc()
+        # A superseded keep-alive counts as delivered: the newer one carries it.
+        oldest[2][1].set_result(True)
+
+    def depth(self, priority=None) -> int:
+        with self._cond:
+            if priority is None:
+                return len(self._heap)
+            return self._depth[priority]
+
+    # ------------------------------------------------------------------
+    # Writer thread
+    # ------------------------------------------------------------------
+
+    def _start_locked(self):
+        self._thread = threading.Thread(target=self._run, daemon=True, name=self._name)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._heap or self._stopped)
+                if not self._heap:
+                    return
+                priority, _, (payload, future, enqueued) = heapq.heappop(self._heap)
+                self._depth[priority] -= 1
+                self._depth_gauge[priority].set(self._depth[priority])
+                self._cond.notify_all()         # room for blocked submitters
+            self._wait_hist[priority].observe(time.perf_counter() - enqueued)
+            try:
+                future.set_result(self._write_fn(payload))
+            except Exception as e:
+                _log.error("Write failed: %s", e, every=5.0)
+                future.set_exception(e)
+
+    def stop(self, timeout=2.0):
+        """Fail everything still queued and stop the writer thread."""
+        with self._cond:
+            self._stopped = True
+            pending = [item[2][1] for item in self._heap]
+            self._heap.clear()
+            for priority in self._depth:
+                self._depth[priority] = 0
+                self._depth_gauge[priority].set(0)
+            self._cond.notify_all()
+            thread = self._thread
+        for future in pending:
+            future.set_exception(SchedulerStopped())
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
@@ -0,0 +1,98 @@
+class FrameRing:
+    """
+    Fixed-size ring of the last *capacity* frames of one camera.
+
+    Storage is allocated once, on the first push (numpy loads on the reader
+    thread, not at import): capture and motion timestamps in float64
+    arrays, and for decoded frames one (capacity, h, w) uint8 block whose
+    slots are overwritten in place.  JPEG frames are kept as the bytes the
+    backend returned.  Entries hand out read-only views into that storage,
+    so reading a frame never copies it.
+
+    A view of a decoded frame is only valid until *capacity* newer frames
+    have been pushed; holds(seq) says whether it still is.  Copy the image
+    to keep it longer.
+
+    Not thread-safe: FrameSource calls it under its condition lock.
+    Sequence numbers start at 1; entry(seq) is (timestamp, motion_time,
+    data, images), where images caches decodes of the entry by scale.
+    """
+
+    def __init__(self, capacity=32):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.count = 0                  # frames pushed so far = newest seq
+        self._timestamps = None
+        self._motion_times = None
+        self._pixels = None
+        self._data = [None] * capacity
+        self._images = [None] * capacity
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+
+    def push(self, data, timestamp, motion_time=None) -> int:
+        """
+        Store a frame (JPEG bytes, or a decoded array copied into its slot)
+        read at *timestamp*, with the last motor activity before it.
+        Returns its seq.
+        """
+        import numpy as np
+        if self._timestamps is None:
+            self._timestamps = np.full(self.capacity, -np.inf)
+            self._motion_times = np.full(self.capacity, np.nan)
+        slot = self.count % self.capacity
+        if isinstance(data, (bytes, bytearray)):
+            data = bytes(data)
+            images = {}
+        else:
+            pixels = self._pixels
+            if pixels is None or pixels.shape[1:] != data.shape or pixels.dtype != data.dtype:
+                # First frame, or the camera changed resolution.  Views into
+                # the old block stay valid; it goes once they do.
+                pixels = self._pixels = np.empty((self.capacity,) + data.shape, data.dtype)
+            np.copyto(pixels[slot], data)
+            data = pixels[slot]
+            data.flags.writeable = False
+            images = {1: data}
+        self._timestamps[slot] = timestamp
+        self._motion_times[slot] = np.nan if motion_time is None else motion_time
+        self._data[slot] = data
+        self._images[slot] = images
+        self.count += 1
+        return self.count
+
+    # ------------------------------------------------------------------
+    # Queries (seqs of entries still held, oldest first)
+    # ------------------------------------------------------------------
+
+    def holds(self, seq) -> bool:
+        return self.count - len(self) < seq <= self.count
+
+    def entry(self, seq):
+        """(timestamp, motion_time, data, images) of *seq*; KeyError once overwritten."""
+        if not self.holds(seq):
+            raise KeyError(f"frame {seq} is not in the ring")
+        slot = (seq - 1) % self.capacity
+        motion_time = float(self._motion_times[slot])
+        return (float(self._timestamps[slot]), None if motion_time != motion_time else motion_time,
+                self._data[slot], self._images[slot])
+
+    def last(self, n) -> list:
+        """Seqs of the newest *n* frames held, oldest first."""
+        return list(range(max(self.count - min(n, len(self)), 0) + 1, self.count + 1))
+
+    def first_after(self, t):
+        """Seq of the oldest frame read at or after monotonic *t*, or None."""
+        if not self.count:
+            return None
+        import numpy as np
+        held = self.last(self.capacity)
+        slots = (np.array(held) - 1) % self.capacity
+        newer = np.flatnonzero(self._timestamps[slots] >= t)
+        return held[newer[0]] if newer.size else None
@@ -0,0 +1,462 @@
+import http.client
+import threading
+import time
+from typing import NamedTuple
+
+from Classes.Metrics import REGISTRY
+from Classes.Logger import get_logger
+from Classes.MjpegStream import MjpegParser, parse_boundary
+from Classes.FrameRing import FrameRing
+
+_log = get_logger("FrameSource")
+
+_FRAME_CAPTURE = REGISTRY.histogram(
+    'frame_capture_seconds', 'Frame capture latency per consumer and strategy',
+    labels=('consumer', 'strategy'))
+_FRAMES = REGISTRY.counter(
+    'frame_source_frames_total', 'Frames decoded by the shared per-camera reader',
+    labels=('camera', 'backend'))
+_DECODES = REGISTRY.counter(
+    'frame_source_decodes_total', 'Frames decoded (or downscaled) because a consumer asked for them',
+    labels=('camera', 'scale'))
+_OPENS = REGISTRY.counter(
+    'frame_source_opens_total', 'Times the shared reader (re)connected to a backend',
+    labels=('camera', 'backend'))
+
+
+# Decode scales: 1/N of the full frame in each direction.  JPEGs use
+# libjpeg's DCT scaling (IMREAD_REDUCED_*), which skips most of the work
+# rather than decoding in full and shrinking.
+DECODE_SCALES = (1, 2, 4, 8)
+_DECODE_FLAGS = {1: 'IMREAD_GRAYSCALE', 2: 'IMREAD_REDUCED_GRAYSCALE_2',
+                 4: 'IMREAD_REDUCED_GRAYSCALE_4', 8: 'IMREAD_REDUCED_GRAYSCALE_8'}
+
+
+def to_full(x, y, scale):
+    """Pixel (x, y) of a 1/scale image in full-frame coordinates (pixel centres line up)."""
+    return (x + 0.5) * scale - 0.5, (y + 0.5) * scale - 0.5
+
+
+class Frame(NamedTuple):
+    image: object           # grayscale numpy array, rotated 180° like every consumer expects;
+                            # read-only, and shared with every other consumer of the frame
+    timestamp: float        # time.monotonic() when the frame was read
+    seq: int                # 1, 2, 3, ... per FrameSource
+    scale: int = 1          # image is 1/scale of the full frame in each direction
+    motion_time: float | None = None    # when the motors stop(ped) moving, as of the frame (motion_clock)
+
+    def to_full(self, x, y):
+        """Pixel (x, y) of this image in full-frame coordinates."""
+        return to_full(x, y, self.scale)
+
+    @property
+    def full_size(self):
+        """(width, height) of the full frame, to within scale - 1 pixels."""
+        h, w = self.image.shape[:2]
+        return w * self.scale, h * self.scale
+
+
+class FrameSource:
+    """
+    One long-lived frame reader per CameraDevice, shared by StarFollower,
+    PlateSolver and CameraRotationFinder.
+
+    The first get() starts a background thread that keeps a connection to
+    the camera open and keeps the latest frames in a FrameRing:
+        MJPG  – one ?action=stream connection to mjpg_streamer, parsed
+                incrementally (MjpegParser); keep-alive ?action=snapshot
+                requests if streaming fails
+        H264  – one cv2.VideoCapture on the RTSP stream, read continuously
+        v4l2  – with CameraDevice capture='v4l2': MJPEG buffers mmap'd from
+                the device in this process (V4L2Capture), no mjpg_streamer
+        then  – the V4L2 device through cv2, as the fallback for all
+    A backend that stops producing frames is closed and the next one tried.
+    MJPG frames are kept as JPEG bytes and decoded on the first get() that
+    wants them (once per scale, however many consumers share the frame), so
+    at 30 fps the frames nobody asks for cost a copy and nothing more.
+    get(scale=4) decodes at quarter resolution for detection-only consumers;
+    Frame.to_full() maps its coordinates back to the full frame.
+    After idle_timeout seconds without a get() the reader lets go of the
+    camera, unless hold() keeps it streaming; the next get() reconnects.
+    Every JPEG read is also passed to the callables in jpeg_sinks (e.g.
+    MjpegServer.publish) as (jpeg, timestamp).
+
+    get() returns at once when a recent enough frame is there.  Pass
+    since=time.monotonic() to insist on a frame read after that moment.
+    get_after(t) is the first frame read at or after t, get_settled(0.3)
+    the first one read 0.3 s after the motors stop moving (motion_clock, set
+    by TelescopeServer to MotorRegistry.last_motion, which estimates the
+    end of a move in progress) and recent(n) the last n frames.  Images are read-only views into the ring, not copies.
+    """
+
+    MAX_AGE = 1.0               # seconds; older frames are not handed out by default
+    IDLE_TIMEOUT = 60.0
+    RETRY_INTERVAL = 1.0        # pause after every backend has failed
+    MAX_FAILURES = 5            # consecutive failed reads before a backend is dropped
+    SNAPSHOT_INTERVAL = 0.05    # MJPG: minimum spacing of snapshot requests
+    STREAM_CHUNK = 64 * 1024    # MJPG: bytes per socket read
+    # Default decode scale per capture() consumer (1 if absent).  Reduced
+    # decodes are opt-in, e.g. decode_profiles['star_follower'] = 4, until
+    # StarFollower's coarse thresholds have been checked on real sky frames.
+    DECODE_PROFILES = {}
+    RING_SIZE = 32              # frames kept: about a second at 30 fps
+
+    def __init__(self, camera_device, idle_timeout=IDLE_TIMEOUT, ring_size=RING_SIZE):
+        self.camera = camera_device
+        self.idle_timeout = idle_timeout
+        self.backend = None             # name of the backend currently delivering
+        # Callable returning the monotonic time the motors stop(ped) moving,
+        # possibly in the future, or None; stamped on every frame and used
+        # by get_settled().
+        self.motion_clock = None
+        # Callables(jpeg, timestamp) fed every JPEG frame on the reader thread.
+        self.jpeg_sinks = []
+        self._holds = 0
+        self._cond = threading.Condition()
+        self.ring = FrameRing(ring_size)    # guarded by _cond
+        self._decode_lock = threading.Lock()
+        self._last_request = 0.0
+        self._waiting = 0               # get() calls blocked right now
+        self._thread = None
+        self._stop_event = threading.Event()
+        # Default decode scale per capture() consumer.
+        self.decode_profiles = dict(self.DECODE_PROFILES)
+
+    # ------------------------------------------------------------------
+    # Consumer side
+    # ------------------------------------------------------------------
+
+    def get(self, timeout=2.0, since=None, max_age=MAX_AGE, scale=1):
+        """
+        The latest Frame, waiting up to *timeout* seconds for one read at or
+        after *since* (monotonic) or, without since, no older than max_age.
+        *scale* is one of DECODE_SCALES.  Returns None if none arrives in time.
+        """
+        oldest = since if since is not None else time.monotonic() - max_age
+        ring = self.ring
+
+        def newest():
+            if ring.count and ring.entry(ring.count)[0] >= oldest:
+                return ring.count
+            return None
+        return self._wait_for(newest, timeout, scale)
+
+    def get_after(self, t, timeout=2.0, scale=1):
+        """The first Frame read at or after monotonic *t* (waiting for it), or None."""
+        return self._wait_for(lambda: self.ring.first_after(t), timeout, scale)
+
+    def get_settled(self, settle, since=None, timeout=2.0, scale=1):
+        """
+        The first Frame read at least *settle* seconds after the motors stop
+        moving, and not before *since*.  A move reported while waiting moves
+        the goal on.  Without a motion_clock, settle counts from since (or
+        from now).  *timeout* is counted from the expected settled time, so
+        a long move in progress extends the wait by its estimated length.
+        """
+        now = time.monotonic()
+        start = since if since is not None else now
+        motion = self._motion_time() if self.motion_clock is not None else None
+        if motion is not None:
+            timeout += max(0.0, motion + settle - now)
+
+        def settled():
+            motion = self._motion_time() if self.motion_clock is not None else start
+            t = motion + settle if motion is not None else start
+            return self.ring.first_after(t if since is None else max(t, since))
+        return self._wait_for(settled, timeout, scale)
+
+    def recent(self, n, scale=1) -> list:
+        """The last *n* Frames held, oldest first; never waits or starts the reader."""
+        with self._cond:
+            seqs = self.ring.last(n)
+        return [frame for frame in (self._decoded(seq, scale) for seq in seqs) if frame is not None]
+
+    def capture(self, consumer, since=None, timeout=2.0, scale=None, settle=None):
+        """
+        get() for a vision subsystem: returns just the image (or None) and
+        records the wait under frame_capture_seconds{consumer=...}.  The
+        scale defaults to the consumer's entry in decode_profiles; with
+        *settle* it is get_settled() instead.
+        """
+        if scale is None:
+            scale = self.decode_profiles.get(consumer, 1)
+        t0 = time.perf_counter()
+        if settle is not None:
+            frame = self.get_settled(settle, since, timeout, scale=scale)
+        else:
+            frame = self.get(timeout, since, scale=scale)
+        _FRAME_CAPTURE.labels(consumer, 'frame_source').observe(time.perf_counter() - t0)
+        if frame is None:
+            _log.warning("%s: no frame from %s within %.1fs", consumer,
+                         self.camera.camera_model, timeout, every=30.0)
+            return None
+        return frame.image
+
+    def latest(self):
+        """The most recent Frame (however old), or None; never waits or starts the reader."""
+        with self._cond:
+            seq = self.ring.count
+        return self._decoded(seq, 1) if seq else None
+
+    def hold(self) -> None:
+        """Keep reading (and feeding jpeg_sinks) without get() calls, until release()."""
+        with self._cond:
+            self._holds += 1
+            self._last_request = time.monotonic()
+            if self._thread is None:
+                self._start_locked()
+
+    def release(self) -> None:
+        with self._cond:
+            self._holds = max(0, self._holds - 1)
+            self._last_request = time.monotonic()
+
+    def stop(self, timeout=2.0) -> None:
+        """Release the camera; a later get() starts over."""
+        with self._cond:
+            thread, self._thread = self._thread, None
+            self._stop_event.set()
+            self._cond.notify_all()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    # ------------------------------------------------------------------
+    # Reader thread
+    # ------------------------------------------------------------------
+
+    def _start_locked(self):
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(self._stop_event,), daemon=True,
+                                        name=f"FrameSource-{self.camera.camera_model}")
+        self._thread.start()
+
+    def _idle(self) -> bool:
+        with self._cond:
+            return (not self._waiting and not self._holds
+                    and time.monotonic() - self._last_request > self.idle_timeout)
+
+    def _backends(self) -> list:
+        camera_type = self.camera.camera_type
+        if camera_type == "MJPG":
+            if getattr(self.camera, 'capture', None) == 'v4l2':
+                return ['v4l2', 'direct']
+            return ['mjpg_stream', 'mjpg_snapshot', 'direct']
+        if camera_type == "H264":
+            return ['rtsp', 'direct']
+        return ['direct']
+
+    def _run(self, stop_event):
+        while not stop_event.is_set():
+            for name in self._backends():
+                if stop_event.is_set() or self._idle():
+                    break
+                self._read_from(name, stop_event)
+            # Decide under the lock, so a get() arriving now either sees the
+            # thread gone (and starts a new one) or keeps this one alive.
+            with self._cond:
+                if self._idle():
+                    if self._stop_event is stop_event:
+                        self._thread = None
+                    self.backend = None
+                    _log.info("%s frame reader idle, releasing the camera", self.camera.camera_model)
+                    return
+            stop_event.wait(self.RETRY_INTERVAL)
+        self.backend = None
+
+    def _read_from(self, name, stop_event):
+        try:
+            read, close = self._open_backend(name)
+        except Exception as e:
+            _log.warning("%s: %s backend unavailable: %s", self.camera.camera_model, name, e, every=30.0)
+            return
+        camera = self.camera.camera_model
+        _OPENS.labels(camera, name).inc()
+        frames = _FRAMES.labels(camera, name)
+        latency = _FRAME_CAPTURE.labels('frame_source', name)
+        self.backend = name
+        failures = 0
+        try:
+            while not stop_event.is_set() and not self._idle():
+                t0 = time.perf_counter()
+                try:
+                    image = read()
+                except Exception as e:
+                    _log.warning("%s: %s read failed: %s", camera, name, e, every=30.0)
+                    image = None
+                if image is None:
+                    failures += 1
+                    if failures >= self.MAX_FAILURES:
+                        return
+                    stop_event.wait(0.1)
+                    continue
+                failures = 0
+                latency.observe(time.perf_counter() - t0)
+                frames.inc()
+                # Backends that know the capture time return (data, timestamp).
+                if isinstance(image, tuple):
+                    self._publish(*image)
+                else:
+                    self._publish(image)
+        finally:
+            try:
+                close()
+            except Exception:
+                pass
+
+    def _wait_for(self, pick, timeout, scale):
+        """Wait until pick() (called under the lock) names a seq; that Frame at *scale*, or None."""
+        if scale not in DECODE_SCALES:
+            raise ValueError(f"scale must be one of {DECODE_SCALES}, not {scale!r}")
+        found = []
+
+        def ready():
+            seq = pick()
+            if seq is not None:
+                found.append(seq)
+            return seq is not None
+
+        with self._cond:
+            self._last_request = time.monotonic()
+            if self._thread is None:
+                self._start_locked()
+            self._waiting += 1
+            try:
+                self._cond.wait_for(ready, timeout)
+            finally:
+                self._waiting -= 1
+                self._last_request = time.monotonic()
+        return self._decoded(found[-1], scale) if found else None
+
+    def _motion_time(self):
+        clock = self.motion_clock
+        if clock is None:
+            return None
+        try:
+            return clock()
+        except Exception as e:
+            _log.warning("motion_clock failed: %s", e, every=60.0)
+            return None
+
+    def _publish(self, image, timestamp=None):
+        """*image* is a decoded frame, or JPEG bytes to decode on demand."""
+        if timestamp is None:
+            timestamp = time.monotonic()
+        motion_time = self._motion_time()
+        with self._cond:
+            self.ring.push(image, timestamp, motion_time)
+            self._cond.notify_all()
+        if self.jpeg_sinks and isinstance(image, bytes):
+            for sink in list(self.jpeg_sinks):
+                try:
+                    sink(image, timestamp)
+                except Exception as e:
+                    _log.warning("%s: JPEG sink failed: %s", self.camera.camera_model, e, every=30.0)
+
+    def _decoded(self, seq, scale):
+        """Frame *seq* with its image at *scale*, decoded on the caller's thread if needed."""
+        with self._decode_lock:
+            with self._cond:
+                if not self.ring.holds(seq):
+                    return None             # overwritten while we waited
+                timestamp, motion_time, data, images = self.ring.entry(seq)
+                image = images.get(scale)
+            if image is None:
+                image = self._scaled(data, scale)
+                if image is None:
+                    return None
+                image.flags.writeable = False
+                _DECODES.labels(self.camera.camera_model, str(scale)).inc()
+                with self._cond:
+                    images[scale] = image
+        return Frame(image, timestamp, seq, scale, motion_time)
+
+    @staticmethod
+    def _scaled(data, scale):
+        import cv2
+        import numpy as np
+        if isinstance(data, (bytes, bytearray)):
+            image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), getattr(cv2, _DECODE_FLAGS[scale]))
+            return cv2.rotate(image, cv2.ROTATE_180) if image is not None else None
+        if scale == 1:
+            return data
+        h, w = data.shape[:2]
+        # Same size as libjpeg's reduced decode: ceil(w / scale) × ceil(h / scale).
+        return cv2.resize(data, (-(-w // scale), -(-h // scale)), interpolation=cv2.INTER_AREA)
+
+    def _open_backend(self, name):
+        """
+        Connect *name*; returns (read, close) where read() gives a grayscale
+        frame, JPEG bytes (decoded later, if at all), either paired with its
+        capture time as (data, timestamp), or None.
+        """
+        # cv2 and friends load here, on the reader thread, not at import.
+        import cv2
+
+        def prepare(frame):
+            return cv2.rotate(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), cv2.ROTATE_180)
+
+        camera = self.camera
+        if name == 'mjpg_stream':
+            connection = http.client.HTTPConnection('localhost', camera.video_port, timeout=2)
+            connection.request('GET', '/?action=stream')
+            response = connection.getresponse()
+            if response.status != 200:
+                connection.close()
+                raise RuntimeError(f"?action=stream returned {response.status}")
+            parser = MjpegParser(parse_boundary(response.getheader('Content-Type', '')))
+
+            def read():
+                # Returns with the newest JPEG of the first chunk that completes
+                # one.  read1() returns whatever one socket read gave, rather
+                # than waiting for a full STREAM_CHUNK.
+                while True:
+                    data = response.read1(self.STREAM_CHUNK)
+                    if not data:
+                        return None             # stream closed
+                    jpeg = parser.feed(data)
+                    if jpeg is not None:
+                        return jpeg
+            return read, connection.close
+
+        if name == 'mjpg_snapshot':
+            import requests
+            session = requests.Session()
+            url = f"http://localhost:{camera.video_port}/?action=snapshot"
+            last = [0.0]
+
+            def read():
+                wait = last[0] + self.SNAPSHOT_INTERVAL - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+                last[0] = time.monotonic()
+                response = session.get(url, timeout=2)
+                return response.content if response.status_code == 200 else None
+            return read, session.close
+
+        if name == 'v4l2':
+            from Classes.V4L2Capture import V4L2Capture
+            if not camera.video_device:
+                camera.video_device = camera.get_camera_device_by_type()
+            if not camera.video_device:
+                raise RuntimeError("no video device")
+            width, height = camera.STREAM_SIZE
+            capture = V4L2Capture(camera.video_device, width, height, camera.STREAM_FPS).open()
+            return capture.read, capture.close
+
+        if name == 'rtsp':
+            target = f"rtsp://localhost:{camera.rtsp_port}/cam"
+        else:
+            if not camera.video_device:
+                camera.video_device = camera.get_camera_device_by_type()
+            if not camera.video_device:
+                raise RuntimeError("no video device")
+            target = camera.video_device
+        cap = cv2.VideoCapture(target)
+        if not cap.isOpened():
+            cap.release()
+            raise RuntimeError(f"could not open {target}")
+
+        def read():
+            ok, frame = cap.read()
+            return prepare(frame) if ok and frame is not None else None
+        return read, cap.release
@@ -0,0 +1,200 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from Classes.Logger import get_logger
+
+_log = get_logger("JobManager")
+
+
+class JobQueueFull(Exception):
+    """Raised by JobManager.submit() when the pending-job limit is reached."""
+
+
+class Job:
+    """
+    One long-running operation (plate solve, rotation check) tracked by JobManager.
+
+    The work function receives the Job as its first argument.  It should report
+    progress with set_progress() and poll cancel_event between expensive steps;
+    cancellation of a running job is cooperative.
+    """
+
+    QUEUED     = "queued"
+    RUNNING    = "running"
+    DONE       = "done"
+    FAILED     = "failed"
+    CANCELLED  = "cancelled"
+
+    FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+    def __init__(self, kind: str, params: dict | None = None):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.params = dict(params or {})
+        self.cancel_event = threading.Event()
+        self.future = None
+        self._lock = threading.Lock()
+        self._state = self.QUEUED
+        self._progress = 0.0
+        self._message = ""
+        self._result = None
+        self._error = None
+        self._created = time.time()
+        self._started = None
+        self._finished = None
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    @property
+    def finished(self) -> bool:
+        return self.state in self.FINISHED_STATES
+
+    def set_progress(self, progress: float, message: str = "") -> None:
+        """Record progress as a fraction in [0, 1] plus a short status message."""
+        with self._lock:
+            self._progress = max(0.0, min(1.0, float(progress)))
+            if message:
+                self._message = message
+
+    def _set_state(self, state: str, result=None, error=None) -> None:
+        with self._lock:
+            self._state = state
+            if state == self.RUNNING:
+                self._started = time.time()
+            if state in self.FINISHED_STATES:
+                self._finished = time.time()
+                self._result = result
+                self._error = error
+                if state == self.DONE:
+                    self._progress = 1.0
+
+    def to_dict(self) -> dict:
+        """Return the job state (safe for JSON serialisation)."""
+        with self._lock:
+            return {
+                'id':                self.id,
+                'kind':              self.kind,
+                'params':            dict(self.params),
+                'state':             self._state,
+                'progress':          round(self._progress, 3),
+                'message':           self._message,
+                'result':            self._result,
+                'error':             self._error,
+                'cancel_requested':  self.cancel_event.is_set(),
+                'created':           self._created,
+                'started':           self._started,
+                'finished':          self._finished,
+            }
+
+
+class JobManager:
+    """
+    Runs long vision operations on a bounded executor and keeps their results.
+
+    * At most *max_workers* jobs run at once (default 1: solves and rotation
+      checks both drive shared hardware, so they run back-to-back).
+    * At most *max_pending* jobs may be queued or running; submit() raises
+      JobQueueFull beyond that.
+    * Finished jobs are kept in an LRU of *max_completed* entries.
+    """
+
+    def __init__(self, max_workers: int = 1, max_pending: int = 8, max_completed: int = 32):
+        self.max_pending = max_pending
+        self.max_completed = max_completed
+        self._lock = threading.Lock()
+        self._active: dict[str, Job] = {}
+        self._completed: OrderedDict[str, Job] = OrderedDict()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="JobWorker")
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def submit(self, kind: str, fn, params: dict | None = None) -> Job:
+        """
+        Queue fn(job) for execution and return the Job immediately.
+
+        fn's return value becomes job.result.  An exception marks the job failed.
+        """
+        job = Job(kind, params)
+        with self._lock:
+            if len(self._active) >= self.max_pending:
+                raise JobQueueFull(f"{len(self._active)} jobs already pending")
+            self._active[job.id] = job
+        job.future = self._executor.submit(self._run_job, job, fn)
+        _log.info("Queued %s job %s", kind, job.id)
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            job = self._active.get(job_id)
+            if job is None:
+                job = self._completed.get(job_id)
+                if job is not None:
+                    self._completed.move_to_end(job_id)
+            return job
+
+    def list(self) -> list[dict]:
+        """Return all known jobs, oldest first."""
+        with self._lock:
+            jobs = list(self._completed.values()) + list(self._active.values())
+        return sorted((j.to_dict() for j in jobs), key=lambda d: d['created'])
+
+    def cancel(self, job_id: str) -> Job | None:
+        """
+        Cancel a job.  A queued job is dropped at once; a running job is asked
+        to stop via its cancel_event.  Returns the Job, or None if unknown.
+        """
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return job
+        job.cancel_event.set()
+        if job.future is not None and job.future.cancel():
+            job._set_state(Job.CANCELLED, error="Cancelled before start")
+            self._retire(job)
+        _log.info("Cancel requested for job %s", job.id)
+        return job
+
+    def shutdown(self) -> None:
+        for job in list(self._active.values()):
+            job.cancel_event.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _run_job(self, job: Job, fn) -> None:
+        if job.cancel_event.is_set():
+            job._set_state(Job.CANCELLED, error="Cancelled before start")
+            self._retire(job)
+            return
+
+        job._set_state(Job.RUNNING)
+        try:
+            result = fn(job)
+            if job.cancel_event.is_set():
+                job._set_state(Job.CANCELLED, result=result, error="Cancelled")
+            else:
+                job._set_state(Job.DONE, result=result)
+        except Exception as e:
+            _log.error("Job %s failed: %s", job.id, e)
+            job._set_state(Job.FAILED, error=str(e))
+        finally:
+            self._retire(job)
+
+    def _retire(self, job: Job) -> None:
+        """Move a finished job from the active set into the completed LRU."""
+        with self._lock:
+            if self._active.pop(job.id, None) is None:
+                return
+            self._completed[job.id] = job
+            while len(self._completed) > self.max_completed:
+                self._completed.popitem(last=False)
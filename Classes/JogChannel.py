@@ -0,0 +1,280 @@
+import socket
+import struct
+import threading
+import time
+from collections import OrderedDict
+
+from Classes.Metrics import REGISTRY
+from Classes.Logger import get_logger
+
+_log = get_logger("JogChannel")
+
+_JOG_FRAMES = REGISTRY.counter(
+    'jog_frames_total', 'Jog frames handled by transport and status',
+    labels=('transport', 'status'))
+_JOG_LATENCY = REGISTRY.histogram(
+    'jog_handle_seconds', 'Jog frame receive → ack time', labels=('transport',))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Wire format (network byte order)
+#
+#   JOG  'TJ' ver:u8 type:u8=1 seq:u32 axis:u8 dir:u8 steps:u32 t_ms:f32   18 B
+#   ACK  'TJ' ver:u8 type:u8=2 seq:u32 status:u8                           9 B
+#
+# axis: 1 = altitude, 0 = azimuth (the Arduino's v=).  dir is sent as d=.
+# t_ms is the inter-step delay (t=); 0 leaves the axis' current rate.
+# ─────────────────────────────────────────────────────────────────────────────
+
+MAGIC   = b'TJ'
+VERSION = 1
+TYPE_JOG = 1
+TYPE_ACK = 2
+
+JOG_FORMAT = struct.Struct('!2sBBIBBIf')
+ACK_FORMAT = struct.Struct('!2sBBIB')
+
+STATUS_OK        = 0
+STATUS_SERIAL    = 1     # send_batch() failed (port closed, write error)
+STATUS_BAD_FRAME = 2     # wrong magic/version/type/length or invalid fields
+
+
+def encode_jog(seq: int, axis: int, direction: int, steps: int, t_ms: float = 0.0) -> bytes:
+    return JOG_FORMAT.pack(MAGIC, VERSION, TYPE_JOG, seq & 0xFFFFFFFF,
+                           axis, direction, steps, t_ms)
+
+
+def decode_ack(frame: bytes) -> tuple[int, int]:
+    """Return (seq, status); raises ValueError on a malformed ack."""
+    if len(frame) != ACK_FORMAT.size:
+        raise ValueError(f"ack must be {ACK_FORMAT.size} bytes, got {len(frame)}")
+    magic, version, kind, seq, status = ACK_FORMAT.unpack(frame)
+    if magic != MAGIC or version != VERSION or kind != TYPE_ACK:
+        raise ValueError("not a jog ack")
+    return seq, status
+
+
+def jog_commands(axis: int, direction: int, steps: int, t_ms: float) -> list[str]:
+    """Translate a jog into the Arduino command batch (same order as SiderealTracker)."""
+    commands = [f"v={axis}", f"d={direction}"]
+    if t_ms > 0:
+        commands.append(f"t={t_ms:g}")
+    commands.append(f"s={steps}")
+    return commands
+
+
+class JogChannel:
+    """
+    Binary jog listener for the app's manual controls, running next to HTTP.
+
+    Each JOG frame becomes one motor.send_batch() call, so it goes through
+    the same write lock and single serial write as the HTTP routes and can't
+    interleave with them.  Every frame is acked with its sequence number.
+
+    UDP clients retransmit on a lost ack; a repeated (address, seq) is acked
+    from a small per-client cache instead of moving the motor twice.  TCP
+    (same port number, same fixed-size frames) is available for networks
+    that drop UDP.
+    """
+
+    RECENT_SEQS = 64        # remembered (seq → status) per client
+    MAX_CLIENTS = 32
+    POLL_INTERVAL = 0.5     # how often blocked receives notice stop()
+
+    def __init__(self, motor, host='0.0.0.0', port=5005, tcp=True):
+        self.motor = motor
+        self._stopping = threading.Event()
+        self._recent_lock = threading.Lock()
+        self._recent: OrderedDict = OrderedDict()   # client addr → OrderedDict(seq → status)
+
+        self._udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._udp.bind((host, port))
+        self._udp.settimeout(self.POLL_INTERVAL)
+        self._tcp = None
+        if tcp:
+            self._tcp = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            try:
+                self._tcp.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                # Port 0 binds UDP to an ephemeral port; reuse its number for TCP.
+                self._tcp.bind((host, self._udp.getsockname()[1]))
+                self._tcp.listen(4)
+                self._tcp.settimeout(self.POLL_INTERVAL)
+            except OSError:
+                # Don't leave the UDP port bound by a channel nobody can stop.
+                self._tcp.close()
+                self._udp.close()
+                raise
+        self._udp_counters = self._counters('udp')
+        self._tcp_counters = self._counters('tcp')
+
+    @staticmethod
+    def _counters(transport):
+        return (
+            {status: _JOG_FRAMES.labels(transport, name) for status, name in (
+                (STATUS_OK, 'ok'), (STATUS_SERIAL, 'serial_error'), (STATUS_BAD_FRAME, 'bad_frame'))},
+            _JOG_FRAMES.labels(transport, 'duplicate'),
+            _JOG_LATENCY.labels(transport),
+        )
+
+    @property
+    def address(self):
+        return self._udp.getsockname()
+
+    def start(self):
+        threading.Thread(target=self._serve_udp, daemon=True, name="JogUdpThread").start()
+        if self._tcp is not None:
+            threading.Thread(target=self._serve_tcp, daemon=True, name="JogTcpThread").start()
+        _log.info("Listening on %s:%d (udp%s)", *self.address, "+tcp" if self._tcp else "")
+
+    def stop(self):
+        self._stopping.set()
+        for sock in (self._udp, self._tcp):
+            if sock is not None:
+                try:
+                    sock.close()
+                except OSError:
+                    pass
+
+    # ------------------------------------------------------------------
+    # Frame handling
+    # ------------------------------------------------------------------
+
+    def handle_frame(self, frame: bytes, client, counters) -> bytes:
+        """Execute (or de-duplicate) one JOG frame and return the ACK frame."""
+        started = time.perf_counter()
+        by_status, duplicate, latency = counters
+        if len(frame) != JOG_FORMAT.size:
+            by_status[STATUS_BAD_FRAME].inc()
+            # Echo seq 0: there is no trustworthy sequence number to ack.
+            return ACK_FORMAT.pack(MAGIC, VERSION, TYPE_ACK, 0, STATUS_BAD_FRAME)
+
+        magic, version, kind, seq, axis, direction, steps, t_ms = JOG_FORMAT.unpack(frame)
+        if (magic != MAGIC or version != VERSION or kind != TYPE_JOG
+                or axis not in (0, 1) or direction not in (0, 1) or not t_ms >= 0):
+            by_status[STATUS_BAD_FRAME].inc()
+            return ACK_FORMAT.pack(MAGIC, VERSION, TYPE_ACK, seq, STATUS_BAD_FRAME)
+
+        status = self._recent_status(client, seq)
+        if status is not None:
+            duplicate.inc()
+        else:
+            ok = self.motor.send_batch(jog_commands(axis, direction, steps, t_ms))
+            status = STATUS_OK if ok else STATUS_SERIAL
+            by_status[status].inc()
+            if ok:
+                self._remember(client, seq, status)
+            else:
+                # Not remembered: a retransmit should get another attempt.
+                _log.warning("Jog seq=%d failed: serial connection issue", seq, every=5.0)
+        latency.observe(time.perf_counter() - started)
+        return ACK_FORMAT.pack(MAGIC, VERSION, TYPE_ACK, seq, status)
+
+    def _recent_status(self, client, seq):
+        with self._recent_lock:
+            seqs = self._recent.get(client)
+            return seqs.get(seq) if seqs else None
+
+    def _remember(self, client, seq, status):
+        with self._recent_lock:
+            seqs = self._recent.get(client)
+            if seqs is None:
+                seqs = self._recent[client] = OrderedDict()
+                while len(self._recent) > self.MAX_CLIENTS:
+                    self._recent.popitem(last=False)
+            else:
+                self._recent.move_to_end(client)
+            seqs[seq] = status
+            while len(seqs) > self.RECENT_SEQS:
+                seqs.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # Transports
+    # ------------------------------------------------------------------
+
+    def _serve_udp(self):
+        while not self._stopping.is_set():
+            try:
+                frame, client = self._udp.recvfrom(64)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            ack = self.handle_frame(frame, client, self._udp_counters)
+            try:
+                self._udp.sendto(ack, client)
+            except OSError as e:
+                _log.warning("UDP ack to %s failed: %s", client, e, every=5.0)
+
+    def _serve_tcp(self):
+        while not self._stopping.is_set():
+            try:
+                conn, client = self._tcp.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            conn.settimeout(None)
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            threading.Thread(target=self._serve_tcp_client, args=(conn, client),
+                             daemon=True, name="JogTcpClientThread").start()
+
+    def _serve_tcp_client(self, conn, client):
+        key = ('tcp', client)
+        with conn:
+            while not self._stopping.is_set():
+                frame = _recv_exact(conn, JOG_FORMAT.size)
+                if frame is None:
+                    return
+                try:
+                    conn.sendall(self.handle_frame(frame, key, self._tcp_counters))
+                except OSError:
+                    return
+
+
+def _recv_exact(conn, size):
+    buf = bytearray()
+    while len(buf) < size:
+        try:
+            chunk = conn.recv(size - len(buf))
+        except OSError:
+            return None
+        if not chunk:
+            return None
+        buf.extend(chunk)
+    return bytes(buf)
+
+
+class JogClient:
+    """
+    Minimal UDP client (reference for the app, used by tests and benchmarks).
+    jog() retransmits with the same sequence number until acked.
+    """
+
+    def __init__(self, host, port, timeout=0.2, retries=3):
+        self.address = (host, port)
+        self.timeout = timeout
+        self.retries = retries
+        self._seq = 0
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.settimeout(timeout)
+
+    def jog(self, axis, direction, steps, t_ms=0.0) -> int:
+        """Send one jog and return the ack status; raises TimeoutError if never acked."""
+        self._seq = (self._seq + 1) & 0xFFFFFFFF
+        frame = encode_jog(self._seq, axis, direction, steps, t_ms)
+        for _ in range(self.retries + 1):
+            self._sock.sendto(frame, self.address)
+            deadline = time.monotonic() + self.timeout
+            while time.monotonic() < deadline:
+                try:
+                    seq, status = decode_ack(self._sock.recv(64))
+                except socket.timeout:
+                    break
+                except ValueError:
+                    continue
+                if seq == self._seq:
+                    return status
+        raise TimeoutError(f"jog seq={self._seq} not acked")
+
+    def close(self):
+        self._sock.close()
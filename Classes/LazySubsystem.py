@@ -0,0 +1,85 @@
+import importlib
+import threading
+import time
+
+from Classes.Logger import get_logger
+
+_log = get_logger("LazySubsystem")
+
+
+class LazySubsystem:
+    """
+    Defers importing and constructing a heavy subsystem (cv2, astropy, ...)
+    until it is first needed.
+
+    get() loads on first use and blocks concurrent callers until the instance
+    is ready; warm_up() does the same from a background thread so the HTTP
+    socket can start serving before the imports finish.  If loading fails the
+    error is kept and the next get() retries.
+    """
+
+    PENDING = "pending"
+    LOADING = "loading"
+    READY   = "ready"
+    FAILED  = "failed"
+
+    def __init__(self, name: str, module_name: str, class_name: str, *args, **kwargs):
+        self.name = name
+        self._module_name = module_name
+        self._class_name = class_name
+        self._args = args
+        self._kwargs = kwargs
+        self._lock = threading.Lock()
+        self._instance = None
+        self._state = self.PENDING
+        self._error = None
+        self._load_seconds = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._instance is not None
+
+    @property
+    def instance(self):
+        """The instance if already loaded, else None (never triggers a load)."""
+        return self._instance
+
+    def get(self):
+        instance = self._instance
+        if instance is not None:
+            return instance
+        with self._lock:
+            if self._instance is None:
+                self._load_locked()
+            return self._instance
+
+    def warm_up(self) -> None:
+        """Load now, swallowing errors (they are reported by status())."""
+        try:
+            self.get()
+        except Exception:
+            pass
+
+    def status(self) -> dict:
+        return {
+            'state':        self._state,
+            'load_seconds': self._load_seconds,
+            'error':        self._error,
+        }
+
+    def _load_locked(self) -> None:
+        self._state = self.LOADING
+        started = time.perf_counter()
+        try:
+            module = importlib.import_module(self._module_name)
+            cls = getattr(module, self._class_name)
+            self._instance = cls(*self._args, **self._kwargs)
+        except Exception as e:
+            self._state = self.FAILED
+            self._error = f"{type(e).__name__}: {e}"
+            _log.error("Failed to load %s: %s", self.name, self._error)
+            raise
+        self._load_seconds = round(time.perf_counter() - started, 3)
+        self._state = self.READY
+        self._error = None
+        _log.info("%s ready (%ss)", self.name, self._load_seconds)
@@ -0,0 +1,222 @@
+import atexit
+import collections
+import os
+import queue
+import sys
+import threading
+import time
+
+
+DEBUG   = 10
+INFO    = 20
+WARNING = 30
+ERROR   = 40
+
+_LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+_LEVELS_BY_NAME = {name: level for level, name in _LEVEL_NAMES.items()}
+
+
+class LogWriter:
+    """
+    Background log sink.
+
+    Callers only build a small tuple and put_nowait() it on a bounded queue;
+    formatting and stream I/O happen on the writer thread, so a slow stdout
+    (journald, a full pipe) never blocks the serial or tracking threads.
+    When the queue is full the record is dropped and counted instead.
+
+    Optionally every record is also kept in an in-memory ring (raw record
+    tuples, bytes payloads left undecoded) that can be dumped on demand,
+    e.g. after a tracking failure.  With ring_only=True nothing is written
+    to the stream until flush_ring() is called.
+    """
+
+    def __init__(self, stream=None, level=INFO, queue_size=10000,
+                 ring_capacity=0, ring_only=False):
+        self.stream = stream if stream is not None else sys.stdout
+        self.level = level
+        self.ring_only = ring_only
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._ring = collections.deque(maxlen=ring_capacity) if ring_capacity else None
+        self._ring_lock = threading.Lock()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+
+    def submit(self, level, name, fmt, args) -> None:
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait((time.time(), level, name, fmt, args))
+        except queue.Full:
+            self.dropped += 1
+
+    # ------------------------------------------------------------------
+    # Ring buffer
+    # ------------------------------------------------------------------
+
+    def enable_ring(self, capacity: int, ring_only: bool = False) -> None:
+        with self._ring_lock:
+            old = list(self._ring) if self._ring is not None else []
+            self._ring = collections.deque(old, maxlen=capacity) if capacity else None
+        self.ring_only = ring_only and capacity > 0
+
+    def ring_lines(self) -> list[str]:
+        """Formatted copy of the ring, oldest first (the ring is not cleared)."""
+        with self._ring_lock:
+            records = list(self._ring) if self._ring is not None else []
+        return [_format(record) for record in records]
+
+    def flush_ring(self) -> int:
+        """Write the ring to the stream and clear it.  Returns the record count."""
+        with self._ring_lock:
+            if self._ring is None:
+                return 0
+            records = list(self._ring)
+            self._ring.clear()
+        self._write([_format(record) for record in records])
+        return len(records)
+
+    # ------------------------------------------------------------------
+    # Writer thread
+    # ------------------------------------------------------------------
+
+    def flush(self, timeout: float = 2.0) -> None:
+        """Block until every queued record has been handled (used at exit and in tests)."""
+        if self._thread is None:
+            return
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.005)
+
+    def _start(self) -> None:
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True,
+                                                name="LogWriterThread")
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            # Drain whatever else is queued so one write covers the burst.
+            try:
+                while len(batch) < 512:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+
+            if self._ring is not None:
+                with self._ring_lock:
+                    if self._ring is not None:
+                        self._ring.extend(batch)
+            if not self.ring_only:
+                self._write([_format(record) for record in batch])
+            for _ in batch:
+                self._queue.task_done()
+
+    def _write(self, lines: list[str]) -> None:
+        if not lines:
+            return
+        try:
+            self.stream.write("\n".join(lines) + "\n")
+            self.stream.flush()
+        except Exception:
+            pass
+
+
+class Logger:
+    """
+    Named front end to a LogWriter.
+
+    Messages use %-style formatting, applied on the writer thread:
+        log.info("Star at (%d, %d)", cx, cy)
+
+    Pass every=<seconds> to rate-limit a call site (keyed by its format
+    string); suppressed repeats are counted and reported with the next one
+    that gets through.
+    """
+
+    def __init__(self, name: str, writer: LogWriter):
+        self.name = name
+        self.writer = writer
+        self._rate_lock = threading.Lock()
+        self._rate_state: dict[str, list] = {}   # fmt → [next_allowed, suppressed]
+
+    def is_enabled_for(self, level) -> bool:
+        return level >= self.writer.level
+
+    def log(self, level, fmt, *args, every=None) -> None:
+        if level < self.writer.level:
+            return
+        if every is not None:
+            now = time.monotonic()
+            with self._rate_lock:
+                state = self._rate_state.get(fmt)
+                if state is None:
+                    state = self._rate_state[fmt] = [0.0, 0]
+                if now < state[0]:
+                    state[1] += 1
+                    return
+                suppressed = state[1]
+                state[0] = now + every
+                state[1] = 0
+            if suppressed:
+                fmt = f"{fmt} (+{suppressed} suppressed)"
+        self.writer.submit(level, self.name, fmt, args)
+
+    def debug(self, fmt, *args, every=None) -> None:
+        self.log(DEBUG, fmt, *args, every=every)
+
+    def info(self, fmt, *args, every=None) -> None:
+        self.log(INFO, fmt, *args, every=every)
+
+    def warning(self, fmt, *args, every=None) -> None:
+        self.log(WARNING, fmt, *args, every=every)
+
+    def error(self, fmt, *args, every=None) -> None:
+        self.log(ERROR, fmt, *args, every=every)
+
+
+def _format(record) -> str:
+    ts, level, name, fmt, args = record
+    try:
+        message = fmt % args if args else fmt
+    except Exception as e:
+        message = f"{fmt} {args!r} (format error: {e})"
+    stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts))
+    return f"{stamp}.{int(ts % 1 * 1000):03d} {_LEVEL_NAMES.get(level, level)} [{name}] {message}"
+
+
+# Process-wide writer, configured from the environment:
+#   TELESCOPE_LOG_LEVEL      DEBUG / INFO / WARNING / ERROR (default INFO)
+#   TELESCOPE_LOG_RING       ring capacity in records (default 0 = no ring)
+#   TELESCOPE_LOG_RING_ONLY  1 = keep records in the ring only until flushed
+WRITER = LogWriter(
+    level=_LEVELS_BY_NAME.get(os.environ.get("TELESCOPE_LOG_LEVEL", "INFO").upper(), INFO),
+    ring_capacity=int(os.environ.get("TELESCOPE_LOG_RING", "0") or 0),
+    ring_only=os.environ.get("TELESCOPE_LOG_RING_ONLY") == "1",
+)
+atexit.register(WRITER.flush)
+
+_loggers: dict[str, Logger] = {}
+_loggers_lock = threading.Lock()
+
+
+def get_logger(name: str) -> Logger:
+    with _loggers_lock:
+        logger = _loggers.get(name)
+        if logger is None:
+            logger = _loggers[name] = Logger(name, WRITER)
+        return logger
+
+
+def set_level(level) -> None:
+    """Set the process-wide level (a level constant or its name)."""
+    if isinstance(level, str):
+        level = _LEVELS_BY_NAME[level.upper()]
+    WRITER.level = level
@@ -0,0 +1,212 @@
+import bisect
+import threading
+import time
+
+
+# Seconds.  Covers a sub-millisecond serial write up to a 60 s ASTAP run.
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Counter:
+    """Monotonically increasing value."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value = 0
+
+    def inc(self, amount=1) -> None:
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self):
+        return self._value
+
+    def _samples(self, name, labels):
+        yield name, labels, self._value
+
+
+class Gauge:
+    """Value that can go up and down (e.g. a buffer depth)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value = 0
+
+    def set(self, value) -> None:
+        self._value = value
+
+    def inc(self, amount=1) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount=1) -> None:
+        with self._lock:
+            self._value -= amount
+
+    @property
+    def value(self):
+        return self._value
+
+    def _samples(self, name, labels):
+        yield name, labels, self._value
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram.  The bucket array is allocated once; observe() is
+    a bisect plus three increments under an uncontended lock.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self._lock = threading.Lock()
+        self._upper = tuple(buckets)
+        self._counts = [0] * (len(self._upper) + 1)   # last slot is +Inf
+        self._sum = 0.0
+        self._count = 0
+
+    def observe(self, value) -> None:
+        index = bisect.bisect_left(self._upper, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def time(self) -> "_Timer":
+        """Context manager that observes the elapsed wall time (not for hot paths)."""
+        return _Timer(self)
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def sum(self) -> float:
+        return self._sum
+
+    def _samples(self, name, labels):
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+        cumulative = 0
+        for upper, bucket_count in zip(self._upper, counts):
+            cumulative += bucket_count
+            yield f"{name}_bucket", labels + (("le", _format_value(upper)),), cumulative
+        yield f"{name}_bucket", labels + (("le", "+Inf"),), count
+        yield f"{name}_sum", labels, total
+        yield f"{name}_count", labels, count
+
+
+class _Timer:
+    def __init__(self, histogram):
+        self._histogram = histogram
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._histogram.observe(time.perf_counter() - self._start)
+        return False
+
+
+class MetricFamily:
+    """
+    A named metric with optional labels.  labels(...) returns the child for a
+    label-value combination, creating it on first use only; callers on hot
+    paths should look the child up once and keep the reference.
+    """
+
+    def __init__(self, name, help_text, kind, factory, label_names=()):
+        self.name = name
+        self.help = help_text
+        self.kind = kind
+        self.label_names = tuple(label_names)
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._children = {}
+        if not self.label_names:
+            self._children[()] = factory()
+
+    def labels(self, *values):
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.label_names):
+                raise ValueError(f"{self.name} expects labels {self.label_names}")
+            with self._lock:
+                child = self._children.setdefault(key, self._factory())
+        return child
+
+    # Unlabelled families proxy straight to their single child.
+    def __getattr__(self, attr):
+        if self.label_names or attr.startswith('_'):
+            raise AttributeError(attr)
+        return getattr(self._children[()], attr)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in sorted(self._children.items()):
+            labels = tuple(zip(self.label_names, key))
+            for sample_name, sample_labels, value in child._samples(self.name, labels):
+                lines.append(f"{sample_name}{_format_labels(sample_labels)} {_format_value(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds every metric family; render() produces the Prometheus text format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._families: dict[str, MetricFamily] = {}
+
+    def counter(self, name, help_text, labels=()):
+        return self._get_or_create(name, help_text, "counter", Counter, labels)
+
+    def gauge(self, name, help_text, labels=()):
+        return self._get_or_create(name, help_text, "gauge", Gauge, labels)
+
+    def histogram(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._get_or_create(name, help_text, "histogram",
+                                   lambda: Histogram(buckets), labels)
+
+    def _get_or_create(self, name, help_text, kind, factory, labels):
+        with self._lock:
+            family = self._families.get(name)
+            if family is None:
+                family = MetricFamily(name, help_text, kind, factory, labels)
+                self._families[name] = family
+            elif family.kind != kind or family.label_names != tuple(labels):
+                raise ValueError(f"Metric {name} already registered as a different {family.kind}")
+            return family
+
+    def render(self) -> str:
+        with self._lock:
+            families = sorted(self._families.values(), key=lambda f: f.name)
+        lines = []
+        for family in families:
+            lines.extend(family.render())
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels) -> str:
+    if not labels:
+        return ""
+    body = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+    return "{" + body + "}"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value) -> str:
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+# Process-wide registry exported by GET /metrics.
+REGISTRY = MetricsRegistry()
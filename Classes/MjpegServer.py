@@ -0,0 +1,199 @@
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from Classes.Metrics import REGISTRY
+from Classes.Logger import get_logger
+
+_log = get_logger("MjpegServer")
+
+_CLIENTS = REGISTRY.gauge(
+    'mjpeg_server_clients', 'Viewers connected to the in-process MJPEG stream', labels=('camera',))
+_FRAMES_SENT = REGISTRY.counter(
+    'mjpeg_server_frames_sent_total', 'JPEG frames written to stream viewers', labels=('camera',))
+_FRAMES_SKIPPED = REGISTRY.counter(
+    'mjpeg_server_frames_skipped_total', 'Frames a viewer was too slow to be sent', labels=('camera',))
+
+
+class MjpegServer:
+    """
+    Serves one camera's JPEG frames on its video_port the way mjpg_streamer's
+    output_http does, so browsers, the Android app and FrameSource's
+    mjpg_stream backend work against either:
+        GET /?action=stream     multipart/x-mixed-replace, one part per frame
+        GET /?action=snapshot   the latest frame as image/jpeg
+
+    publish() (from the capture thread) keeps a reference to the frame's
+    bytes and wakes the viewers; each viewer's thread then writes that same
+    object to its socket with one sendmsg() for header, body and trailer,
+    so fanning out costs no copies and no re-encoding.  A viewer that falls
+    behind is sent the newest frame next rather than queueing old ones; a
+    viewer that stops reading is dropped after write_timeout seconds.
+    """
+
+    BOUNDARY = "boundarydonotcross"     # mjpg_streamer's
+    FRAME_WAIT = 1.0                    # seconds between checks for stop() / dead viewers
+
+    def __init__(self, port, host='0.0.0.0', name='camera', max_clients=8, write_timeout=5.0):
+        self.host = host
+        self.port = port
+        self.name = name
+        self.max_clients = max_clients
+        self.write_timeout = write_timeout
+        self.clients = 0
+        self._cond = threading.Condition()
+        self._jpeg = None
+        self._timestamp = 0.0
+        self._seq = 0
+        self._stopping = threading.Event()
+        self._server = None
+        self._thread = None
+        self._clients_gauge = _CLIENTS.labels(name)
+        self._sent = _FRAMES_SENT.labels(name)
+        self._skipped = _FRAMES_SKIPPED.labels(name)
+
+    def start(self) -> 'MjpegServer':
+        mjpeg = self
+
+        class Handler(_MjpegHandler):
+            server_ref = mjpeg
+
+        self._stopping.clear()
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True,
+                                        name=f"MjpegServer-{self.name}")
+        self._thread.start()
+        _log.info("Serving %s MJPEG on port %d", self.name, self.port)
+        return self
+
+    def stop(self) -> None:
+        self._stopping.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def publish(self, jpeg, timestamp=None) -> None:
+        """Make *jpeg* (bytes, not copied) the current frame."""
+        with self._cond:
+            self._jpeg = jpeg
+            self._timestamp = time.monotonic() if timestamp is None else timestamp
+            self._seq += 1
+            self._cond.notify_all()
+
+    def latest(self):
+        """(seq, jpeg, timestamp) of the current frame; jpeg is None before the first."""
+        with self._cond:
+            return self._seq, self._jpeg, self._timestamp
+
+    def wait_frame(self, after_seq, timeout):
+        """(seq, jpeg, timestamp) of a frame newer than *after_seq*, or None on timeout/stop."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq > after_seq or self._stopping.is_set(), timeout)
+            if self._seq <= after_seq or self._stopping.is_set():
+                return None
+            return self._seq, self._jpeg, self._timestamp
+
+    def stats(self) -> dict:
+        with self._cond:
+            seq = self._seq
+        return {'port': self.port, 'clients': self.clients, 'frames_published': seq}
+
+    # Called by the handler threads.
+    def _admit(self) -> bool:
+        with self._cond:
+            if self.clients >= self.max_clients:
+                return False
+            self.clients += 1
+        self._clients_gauge.inc()
+        return True
+
+    def _leave(self) -> None:
+        with self._cond:
+            self.clients -= 1
+        self._clients_gauge.dec()
+
+
+class _MjpegHandler(BaseHTTPRequestHandler):
+    server_ref: MjpegServer = None
+
+    def log_message(self, format, *args):
+        _log.debug("%s - %s", self.address_string(), format % args)
+
+    def do_GET(self):
+        action = parse_qs(urlsplit(self.path).query).get('action', [''])[0]
+        if action == 'stream':
+            self._stream()
+        elif action == 'snapshot':
+            self._snapshot()
+        else:
+            self.send_error(404, "Use /?action=stream or /?action=snapshot")
+
+    def _snapshot(self):
+        mjpeg = self.server_ref
+        _, jpeg, _ = mjpeg.latest()
+        if jpeg is None:
+            frame = mjpeg.wait_frame(0, mjpeg.FRAME_WAIT * 2)
+            jpeg = frame[1] if frame else None
+        if jpeg is None:
+            self.send_error(503, "No frame yet")
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/jpeg')
+        self.send_header('Content-Length', str(len(jpeg)))
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(jpeg)
+
+    def _stream(self):
+        mjpeg = self.server_ref
+        if not mjpeg._admit():
+            self.send_error(503, "Too many viewers")
+            return
+        try:
+            self.close_connection = True
+            self.send_response(200)
+            self.send_header('Content-Type', f'multipart/x-mixed-replace;boundary={mjpeg.BOUNDARY}')
+            self.send_header('Cache-Control', 'no-cache, private')
+            self.send_header('Pragma', 'no-cache')
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            self.wfile.flush()
+            sock = self.connection
+            sock.settimeout(mjpeg.write_timeout)
+            delimiter = f"--{mjpeg.BOUNDARY}\r\n".encode()
+            last = max(mjpeg.latest()[0] - 1, 0)   # start with the current frame, if any
+            while not mjpeg._stopping.is_set():
+                frame = mjpeg.wait_frame(last, mjpeg.FRAME_WAIT)
+                if frame is None:
+                    continue
+                seq, jpeg, timestamp = frame
+                if last > 0 and seq > last + 1:
+                    mjpeg._skipped.inc(seq - last - 1)
+                last = seq
+                header = (b"%sContent-Type: image/jpeg\r\nContent-Length: %d\r\n"
+                          b"X-Timestamp: %.6f\r\n\r\n" % (delimiter, len(jpeg), timestamp))
+                _send_all(sock, [header, jpeg, b"\r\n"])
+                mjpeg._sent.inc()
+        except (OSError, socket.timeout):
+            pass                                # viewer went away or stalled
+        finally:
+            mjpeg._leave()
+
+
+def _send_all(sock, parts) -> None:
+    """sendmsg() *parts* as one write, continuing after partial sends without joining them."""
+    views = [memoryview(part) for part in parts]
+    while views:
+        sent = sock.sendmsg(views)
+        while views and sent >= len(views[0]):
+            sent -= len(views[0])
+            views.pop(0)
+        if views and sent:
+            views[0] = views[0][sent:]
@@ -0,0 +1,110 @@
+import re
+
+_BOUNDARY = re.compile(rb'boundary="?([^";]+)"?', re.IGNORECASE)
+_CONTENT_LENGTH = re.compile(rb'^content-length:\s*(\d+)\s*$', re.IGNORECASE | re.MULTILINE)
+
+
+def parse_boundary(content_type) -> bytes:
+    """The part boundary of a multipart/x-mixed-replace Content-Type, without the leading '--'."""
+    if isinstance(content_type, str):
+        content_type = content_type.encode('latin-1')
+    match = _BOUNDARY.search(content_type or b"")
+    if not match:
+        raise ValueError(f"No multipart boundary in Content-Type {content_type!r}")
+    boundary = match.group(1).strip()
+    return boundary[2:] if boundary.startswith(b"--") else boundary
+
+
+class MjpegParser:
+    """
+    Incremental parser for an mjpg_streamer ?action=stream body
+    (multipart/x-mixed-replace, one JPEG per part).
+
+    feed() appends whatever the socket returned to one reusable bytearray
+    and walks the complete parts in it.  Only the newest complete JPEG is
+    copied out; older ones that finished in the same chunk are skipped
+    without being copied, let alone decoded.  Consumed bytes are released
+    with `del buf[:n]`, which CPython does by moving the buffer start, so
+    the partial part at the tail is never shifted around.
+
+    Parts with a Content-Length (mjpg_streamer sends one) are cut by
+    length; otherwise at the next boundary.  Junk between parts is skipped,
+    and a part growing past max_frame_bytes is dropped to resynchronise.
+    """
+
+    HEADER_END = b"\r\n\r\n"
+
+    def __init__(self, boundary, max_frame_bytes=8 * 1024 * 1024):
+        if isinstance(boundary, str):
+            boundary = boundary.encode('latin-1')
+        self.delimiter = b"--" + boundary
+        self.max_frame_bytes = max_frame_bytes
+        self.frames = 0             # complete JPEGs seen
+        self.skipped = 0            # complete JPEGs never copied (superseded in the same chunk)
+        self.resyncs = 0
+        self._buf = bytearray()
+        # Current part once its headers are parsed: (body_start, length or None)
+        self._part = None
+
+    def feed(self, data):
+        """Add *data*; returns the newest JPEG completed by it (bytes), or None."""
+        buf = self._buf
+        buf += data
+        newest = None
+        pos = 0
+        while True:
+            if self._part is None:
+                start = buf.find(self.delimiter, pos)
+                if start < 0:
+                    # Keep a possible partial delimiter at the end.
+                    pos = max(pos, len(buf) - len(self.delimiter))
+                    break
+                end = buf.find(self.HEADER_END, start + len(self.delimiter))
+                if end < 0:
+                    pos = start
+                    if len(buf) - start > 4096:     # headers never that long: junk
+                        pos = start + len(self.delimiter)
+                        self.resyncs += 1
+                        continue
+                    break
+                match = _CONTENT_LENGTH.search(buf, start, end)
+                self._part = (end + len(self.HEADER_END), int(match.group(1)) if match else None)
+            body, length = self._part
+            if length is not None:
+                body_end = body + length
+                if body_end > len(buf):
+                    pos = self._wait_for_body(body)
+                    break
+                next_pos = body_end
+            else:
+                body_end = buf.find(self.delimiter, body)
+                if body_end < 0:
+                    pos = self._wait_for_body(body)
+                    break
+                next_pos = body_end
+                # The CRLF before the next delimiter belongs to the framing.
+                if buf[body_end - 2:body_end] == b"\r\n":
+                    body_end -= 2
+            if newest is not None:
+                self.skipped += 1
+            newest = (body, body_end)
+            self.frames += 1
+            self._part = None
+            pos = next_pos
+        frame = bytes(buf[newest[0]:newest[1]]) if newest is not None else None
+        if pos:
+            del buf[:pos]
+            if self._part is not None:
+                self._part = (self._part[0] - pos, self._part[1])
+        return frame
+
+    def _wait_for_body(self, body) -> int:
+        """The part at *body* is incomplete; returns how much of the buffer is consumed."""
+        if len(self._buf) - body > self.max_frame_bytes:
+            self._part = None
+            self.resyncs += 1
+            return len(self._buf)
+        return body         # its headers are parsed; keep only the body so far
+
+    def buffered(self) -> int:
+        return len(self._buf)
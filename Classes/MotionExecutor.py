@@ -0,0 +1,202 @@
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+from Classes.CommandScheduler import PRIORITY_TRACKING
+from Classes.Metrics import REGISTRY
+from Classes.Logger import get_logger
+
+_log = get_logger("MotionExecutor")
+
+_SEGMENTS = REGISTRY.counter(
+    'motion_segments_total', 'Planned t=/s= segments streamed to the motor controller',
+    labels=('axis', 'result'))
+_NAMED_AXIS = re.compile(r'\bv=(\d+)')
+
+_SEGMENT_LAG = REGISTRY.histogram(
+    'motion_segment_lag_seconds', 'Time from a segment\'s planned end to its move-complete report',
+    labels=('axis',))
+
+
+class _AxisQueue:
+    """Plans waiting for (or running on) one axis."""
+
+    def __init__(self, axis):
+        self.axis = axis
+        # Entries: [plan, direction, future, next_segment_index, cancelled]
+        self.plans = deque()
+        self.rate = 0.0         # signed steps/s at the end of the last submitted plan
+        self.thread = None
+
+
+class MotionExecutor:
+    """
+    Streams MotionPlans to a MotorControl, one thread per axis.
+
+    Each segment goes out as a v/d/t/s batch at tracking priority, and the
+    next one follows after the segment's planned duration.  With
+    wait_for_done=True it instead waits for the controller to report the
+    segment complete: a line matching done_pattern (by default the
+    controller's move_complete_pattern, so only firmware known to send one
+    should use it) that does not name a different axis.  Plans queue per
+    axis and run back to back, so a caller can hand over the next plan
+    while the current one is still moving.
+
+    submit() returns a Future resolved True when the plan has finished, or
+    False if it was replaced, cancelled or a write failed.
+    """
+
+    DONE_SLACK = 0.5        # seconds past a segment's planned end before moving on
+    # Paced segments go out this long after the previous one's planned end,
+    # so serial and scheduling jitter can't cut a move short.
+    PACE_SLACK = 0.002
+
+    def __init__(self, motor_control, wait_for_done=False, done_pattern=None):
+        if done_pattern is None:
+            done_pattern = getattr(motor_control, 'move_complete_pattern', None)
+        if wait_for_done and not done_pattern:
+            raise ValueError("wait_for_done needs a done_pattern (or a controller move_complete_pattern)")
+        self.motor = motor_control
+        self.wait_for_done = wait_for_done
+        self.done_pattern = done_pattern
+        self._cond = threading.Condition()
+        self._axes: dict[int, _AxisQueue] = {}
+        self._stopped = False
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def submit(self, axis: int, direction: int, plan, replace: bool = False) -> Future:
+        """
+        Queue *plan* on *axis* in *direction* (the d= value).  replace=True
+        drops everything queued for the axis first; the segment already on
+        the wire still completes.
+        """
+        future = Future()
+        future.set_running_or_notify_cancel()
+        with self._cond:
+            if self._stopped:
+                future.set_result(False)
+                return future
+            queue = self._axes.get(axis)
+            if queue is None:
+                queue = self._axes[axis] = _AxisQueue(axis)
+            if replace:
+                self._cancel_locked(queue)
+            queue.rate = plan.end_rate if direction else -plan.end_rate
+            if not plan.segments:
+                future.set_result(True)
+                return future
+            queue.plans.append([plan, direction, future, 0, False])
+            if queue.thread is None:
+                queue.thread = threading.Thread(target=self._run, args=(queue,), daemon=True,
+                                                name=f"MotionAxis{axis}Thread")
+                queue.thread.start()
+            self._cond.notify_all()
+        return future
+
+    def rate(self, axis: int) -> float:
+        """Signed steps/s (positive for d=1) the axis ends up at once its queue has run."""
+        with self._cond:
+            queue = self._axes.get(axis)
+            return queue.rate if queue is not None else 0.0
+
+    def pending_seconds(self, axis: int) -> float:
+        """Planned time left on *axis*: the running plan's remaining segments plus the queue."""
+        with self._cond:
+            queue = self._axes.get(axis)
+            if queue is None:
+                return 0.0
+            return sum(segment.duration
+                       for plan, _, _, index, cancelled in queue.plans if not cancelled
+                       for segment in plan.segments[index:])
+
+    def cancel(self, axis=None) -> None:
+        """Drop queued plans (on one axis or all); the axes end at rest."""
+        with self._cond:
+            for queue in self._axes.values():
+                if axis is None or queue.axis == axis:
+                    self._cancel_locked(queue)
+                    queue.rate = 0.0
+            self._cond.notify_all()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            for queue in self._axes.values():
+                self._cancel_locked(queue)
+            self._cond.notify_all()
+
+    # ------------------------------------------------------------------
+    # Axis threads
+    # ------------------------------------------------------------------
+
+    def _cancel_locked(self, queue):
+        for entry in queue.plans:
+            entry[4] = True
+            if not entry[2].done():
+                entry[2].set_result(False)
+        # The running entry (if any) stays at the head until its thread sees
+        # the flag; the rest can go now.
+        while len(queue.plans) > 1:
+            queue.plans.pop()
+
+    def _run(self, queue):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: queue.plans or self._stopped)
+                if self._stopped:
+                    queue.plans.clear()
+                    return
+                entry = queue.plans[0]
+            finished = self._execute(queue, entry)
+            with self._cond:
+                if queue.plans and queue.plans[0] is entry:
+                    queue.plans.popleft()
+            if not entry[2].done():
+                entry[2].set_result(finished)
+
+    def _execute(self, queue, entry) -> bool:
+        plan, direction, _, _, _ = entry
+        axis = queue.axis
+        label = str(axis)
+        if self.wait_for_done:
+            done = re.compile(self.done_pattern).search
+
+            def reported(text):
+                # "done" and "done v=1 ..." both count for v=1; "done v=0" doesn't.
+                named = _NAMED_AXIS.search(text)
+                return bool(done(text)) and (named is None or int(named.group(1)) == axis)
+        for index, segment in enumerate(plan.segments):
+            with self._cond:
+                if entry[4] or self._stopped:
+                    return False
+                entry[3] = index + 1
+            batch = [f"v={axis}", f"d={direction}", f"t={segment.t_ms:.3f}", f"s={segment.steps}"]
+            planned_end = time.monotonic() + segment.duration
+            if not self.wait_for_done:
+                if not self.motor.send_batch(batch, priority=PRIORITY_TRACKING):
+                    _SEGMENTS.labels(label, 'failed').inc()
+                    return False
+                _SEGMENTS.labels(label, 'sent').inc()
+                time.sleep(segment.duration + self.PACE_SLACK)
+                continue
+            reply = self.motor.request(batch, reported, timeout=segment.duration + self.DONE_SLACK,
+                                       priority=PRIORITY_TRACKING)
+            try:
+                reply.result()
+            except TimeoutError:
+                # No report: assume it finished and keep the plan going.
+                _SEGMENTS.labels(label, 'timeout').inc()
+                _log.warning("No move-complete report for axis %d; continuing", axis, every=10.0)
+                continue
+            except Exception as e:
+                _SEGMENTS.labels(label, 'failed').inc()
+                _log.warning("Segment on axis %d not sent: %r", axis, e, every=10.0)
+                return False
+            _SEGMENTS.labels(label, 'done').inc()
+            _SEGMENT_LAG.labels(label).observe(max(0.0, time.monotonic() - planned_end))
+        return True
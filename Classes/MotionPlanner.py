@@ -0,0 +1,154 @@
+import math
+from typing import NamedTuple
+
+# Velocity profile shapes.  'constant' is the original behaviour: one
+# fixed-rate t=/s= move, i.e. a step change in velocity at each end.
+PROFILE_CONSTANT  = 'constant'
+PROFILE_TRAPEZOID = 'trapezoid'     # linear velocity ramps (bounded acceleration)
+PROFILE_SCURVE    = 'scurve'        # smoothstep ramps (acceleration also ramps)
+PROFILES = (PROFILE_CONSTANT, PROFILE_TRAPEZOID, PROFILE_SCURVE)
+
+# Peak acceleration of a ramp relative to a linear ramp of the same length
+# and velocity change: smoothstep 3x²-2x³ peaks at 1.5x the mean slope.
+_RAMP_PEAK = {PROFILE_TRAPEZOID: 1.0, PROFILE_SCURVE: 1.5}
+
+
+class Segment(NamedTuple):
+    """One constant-rate piece of a plan: s=steps at t=t_ms per step."""
+    steps: int
+    t_ms: float
+
+    @property
+    def duration(self) -> float:
+        return self.steps * self.t_ms / 1000.0
+
+
+class MotionPlan(NamedTuple):
+    segments: list
+    end_rate: float         # steps/s the axis is left moving at (0 = at rest)
+
+    @property
+    def steps(self) -> int:
+        return sum(segment.steps for segment in self.segments)
+
+    @property
+    def duration(self) -> float:
+        return sum(segment.duration for segment in self.segments)
+
+
+class MotionPlanner:
+    """
+    Turns per-axis targets into velocity profiles and quantises them into
+    the t=/s= segments the Arduino understands.
+
+    plan_move(steps)                       – rest to rest, as fast as
+                                              max_speed / accel allow
+                                              (StarFollower corrections).
+    plan_velocity(steps, duration, rate)   – cover exactly *steps* in
+                                              *duration*, blending from the
+                                              axis' current rate and ending
+                                              at a steady one (sidereal ticks).
+
+    Rates are in steps/s, accel in steps/s².  Every segment is a constant
+    step rate lasting about segment_ms; the Arduino can only change speed
+    between segments, so shorter segments follow the curve more closely at
+    the cost of more serial traffic.  Step totals are always exact.
+    """
+
+    def __init__(self, max_speed=2000.0, accel=4000.0,
+                 profile=PROFILE_TRAPEZOID, segment_ms=50.0):
+        if profile not in PROFILES:
+            raise ValueError(f"profile must be one of {PROFILES}, not {profile!r}")
+        if max_speed <= 0 or accel <= 0 or segment_ms <= 0:
+            raise ValueError("max_speed, accel and segment_ms must be positive")
+        self.max_speed = float(max_speed)
+        self.accel = float(accel)
+        self.profile = profile
+        self.segment_ms = float(segment_ms)
+
+    # ------------------------------------------------------------------
+    # Plans
+    # ------------------------------------------------------------------
+
+    def plan_move(self, steps: int) -> MotionPlan:
+        steps = int(steps)
+        if steps <= 0:
+            return MotionPlan([], 0.0)
+        if self.profile == PROFILE_CONSTANT:
+            return MotionPlan([Segment(steps, 1000.0 / self.max_speed)], 0.0)
+        k = _RAMP_PEAK[self.profile]
+        # Each ramp covers v·T_r/2 = k·v²/(2a); two of them must fit in `steps`.
+        peak = min(self.max_speed, math.sqrt(steps * self.accel / k))
+        ramp = k * peak / self.accel
+        cruise = max(0.0, (steps - peak * ramp) / peak)
+        phases = [(ramp, 0.0, peak), (cruise, peak, peak), (ramp, peak, 0.0)]
+        return MotionPlan(self._quantise(phases, steps), 0.0)
+
+    def plan_velocity(self, steps: int, duration: float, start_rate: float = 0.0) -> MotionPlan:
+        steps = int(steps)
+        if steps <= 0 or duration <= 0:
+            return MotionPlan([], 0.0)
+        if self.profile == PROFILE_CONSTANT:
+            return MotionPlan([Segment(steps, duration * 1000.0 / steps)], steps / duration)
+        k = _RAMP_PEAK[self.profile]
+        v0 = max(0.0, float(start_rate))
+        # Ramp v0 → v0+δ over T_r = k|δ|/a, then cruise; solve
+        #   δ·D − sign(δ)·k·δ²/(2a) = steps − v0·D   for δ.
+        target = steps - v0 * duration
+        sign = 1.0 if target >= 0 else -1.0
+        disc = duration * duration - sign * 2.0 * k * target / self.accel
+        if disc >= 0:
+            delta = sign * (duration - math.sqrt(disc)) * self.accel / k
+            ramp = k * abs(delta) / self.accel
+        else:
+            # Not reachable within the acceleration limit: ramp for the
+            # whole interval so the step count still comes out exact.
+            delta = 2.0 * target / duration
+            ramp = duration
+        rate = v0 + delta
+        if rate < 0:
+            # Would have to reverse to land on the count; just hold a rate.
+            return MotionPlan([Segment(steps, duration * 1000.0 / steps)], steps / duration)
+        phases = [(ramp, v0, rate), (duration - ramp, rate, rate)]
+        return MotionPlan(self._quantise(phases, steps), rate)
+
+    # ------------------------------------------------------------------
+    # Quantisation
+    # ------------------------------------------------------------------
+
+    def _position(self, phases, t) -> float:
+        """Steps covered after *t* seconds of the (duration, v_start, v_end) phases."""
+        position = 0.0
+        for length, v_start, v_end in phases:
+            if length <= 0:
+                continue
+            x = min(1.0, t / length)
+            if self.profile == PROFILE_SCURVE:
+                area = x ** 3 - x ** 4 / 2.0          # ∫ 3x²-2x³
+            else:
+                area = x * x / 2.0                    # ∫ x
+            position += v_start * x * length + (v_end - v_start) * length * area
+            t -= length
+            if t <= 0:
+                break
+        return position
+
+    def _quantise(self, phases, steps) -> list:
+        total = sum(length for length, _, _ in phases)
+        slot = self.segment_ms / 1000.0
+        count = max(1, math.ceil(total / slot - 1e-9))
+        segments = []
+        done, started = 0, 0.0
+        for i in range(1, count + 1):
+            end = min(total, i * slot)
+            position = steps if i == count else min(steps, round(self._position(phases, end)))
+            if position <= done:
+                continue                    # no whole step yet: fold into the next slot
+            n = position - done
+            segments.append(Segment(n, (end - started) * 1000.0 / n))
+            done, started = position, end
+        if started < total and segments:
+            # Trailing slots with no step: stretch the last segment over them.
+            last = segments[-1]
+            segments[-1] = Segment(last.steps, last.t_ms + (total - started) * 1000.0 / last.steps)
+        return segments
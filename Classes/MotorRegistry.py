@@ -0,0 +1,191 @@
+import threading
+from typing import NamedTuple
+
+from Classes.MotorsControl import MotorControl
+from Classes.CommandScheduler import PRIORITY_JOG
+from Classes.Logger import get_logger
+
+_log = get_logger("MotorRegistry")
+
+# The main mount board and the axes the trackers drive on it.
+MAIN_DEVICE = 'mount'
+DEFAULT_AXES = {'alt': 1, 'az': 0}
+
+
+class MotorAxis(NamedTuple):
+    """
+    A logical axis: a name, the controller that drives it and its v= number
+    on that controller.  Batches sent through an axis are prefixed with the
+    v= that selects it.
+    """
+    name: str
+    device: object          # MotorControl (or anything with its interface)
+    number: int
+
+    @property
+    def select(self) -> str:
+        return f"v={self.number}"
+
+    def send_batch(self, commands, priority=PRIORITY_JOG, wait=True, timeout=2.0) -> bool:
+        return self.device.send_batch([self.select, *commands], priority=priority,
+                                      wait=wait, timeout=timeout)
+
+    def request(self, commands, expect, timeout=5.0, priority=PRIORITY_JOG):
+        if isinstance(commands, str):
+            commands = [commands]
+        return self.device.request([self.select, *commands], expect, timeout, priority)
+
+
+def default_axes(motor_control) -> dict:
+    """alt/az on a single board, as the trackers have always assumed."""
+    return {name: MotorAxis(name, motor_control, number) for name, number in DEFAULT_AXES.items()}
+
+
+class MotorRegistry:
+    """
+    The serial controllers on this machine, by name, and the logical axes
+    they drive.
+
+    Each device is its own MotorControl: its own port, reader thread,
+    priority writer thread, state shadow and metrics (labelled with the
+    device name), so traffic to a focuser never queues behind the mount.
+    Callers address axes ('alt', 'az', 'focus', ...) rather than ports.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._devices: dict = {}
+        self._axes: dict[str, MotorAxis] = {}
+
+    @classmethod
+    def single(cls, port='/dev/ttyACM0', **kwargs) -> 'MotorRegistry':
+        """The classic setup: one mount board driving alt and az."""
+        registry = cls()
+        registry.add_device(MAIN_DEVICE, port, axes=DEFAULT_AXES, **kwargs)
+        return registry
+
+    # ------------------------------------------------------------------
+    # Configuration
+    # ------------------------------------------------------------------
+
+    def add_device(self, name, port, baudrate=115200, axes=None, **kwargs):
+        """Open a MotorControl on *port* and register it (and its axes) as *name*."""
+        return self.attach(name, MotorControl(port=port, baudrate=baudrate, name=name, **kwargs), axes)
+
+    def attach(self, name, motor_control, axes=None):
+        """Register an existing controller; *axes* maps axis names to v= numbers."""
+        with self._lock:
+            if name in self._devices:
+                raise ValueError(f"Device '{name}' already registered")
+            self._devices[name] = motor_control
+        for axis, number in (axes or {}).items():
+            self.add_axis(axis, name, number)
+        return motor_control
+
+    def add_axis(self, axis, device, number) -> MotorAxis:
+        with self._lock:
+            if device not in self._devices:
+                raise KeyError(f"Unknown device '{device}'")
+            if axis in self._axes:
+                raise ValueError(f"Axis '{axis}' already mapped")
+            handle = self._axes[axis] = MotorAxis(axis, self._devices[device], int(number))
+        return handle
+
+    def add_device_spec(self, spec, **kwargs):
+        """Add a device from a NAME=PORT[@BAUD][:AXIS=N,...] string (see parse_device_spec)."""
+        name, port, baudrate, axes = self.parse_device_spec(spec)
+        return self.add_device(name, port, baudrate, axes, **kwargs)
+
+    @staticmethod
+    def parse_device_spec(spec):
+        """
+        "focuser=/dev/ttyUSB0@57600:focus=0" → ('focuser', '/dev/ttyUSB0', 57600, {'focus': 0}).
+        The baud rate defaults to 115200 and the axis list may be empty.
+        """
+        name, sep, rest = spec.partition('=')
+        if not sep or not name or not rest:
+            raise ValueError(f"Device spec must be NAME=PORT[@BAUD][:AXIS=N,...], not {spec!r}")
+        port, _, axis_list = rest.partition(':')
+        port, _, baud = port.partition('@')
+        axes = {}
+        for item in filter(None, axis_list.split(',')):
+            axis, sep, number = item.partition('=')
+            if not sep:
+                raise ValueError(f"Axis must be NAME=N, not {item!r}")
+            axes[axis] = int(number)
+        return name, port, int(baud) if baud else 115200, axes
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def device(self, name=MAIN_DEVICE):
+        with self._lock:
+            try:
+                return self._devices[name]
+            except KeyError:
+                raise KeyError(f"Unknown device '{name}'") from None
+
+    def axis(self, name) -> MotorAxis:
+        with self._lock:
+            try:
+                return self._axes[name]
+            except KeyError:
+                raise KeyError(f"Unknown axis '{name}'") from None
+
+    def devices(self) -> dict:
+        with self._lock:
+            return dict(self._devices)
+
+    def axes(self, *names) -> dict:
+        """All axes, or just *names*, as {name: MotorAxis}."""
+        with self._lock:
+            if not names:
+                return dict(self._axes)
+            missing = [name for name in names if name not in self._axes]
+            if missing:
+                raise KeyError(f"Unknown axis '{missing[0]}'")
+            return {name: self._axes[name] for name in names}
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        for motor in self.devices().values():
+            motor.start()
+
+    def stop(self) -> None:
+        for name, motor in self.devices().items():
+            try:
+                motor.stop()
+            except Exception as e:
+                _log.error("Stopping device %s failed: %s", name, e)
+
+    def last_motion(self):
+        """The latest MotorControl.last_motion() of any device, or None (a FrameSource motion_clock)."""
+        times = [motor.last_motion() for motor in self.devices().values() if hasattr(motor, 'last_motion')]
+        times = [t for t in times if t is not None]
+        return max(times) if times else None
+
+    def status(self) -> dict:
+        """Per-device connection and queue state plus the axis map (for /motor/devices)."""
+        devices = {}
+        for name, motor in self.devices().items():
+            info = {
+                'port':      getattr(motor, 'port', None),
+                'connected': bool(getattr(motor, 'is_connected', False)),
+            }
+            if hasattr(motor, 'queue_depth'):
+                info['queue_depth'] = motor.queue_depth()
+            if hasattr(motor, 'rx_buffer_stats'):
+                info['rx_buffer'] = motor.rx_buffer_stats()
+            recorder = motor.recorder_stats() if hasattr(motor, 'recorder_stats') else None
+            if recorder:
+                info['recorder'] = recorder
+            devices[name] = info
+        axes = {}
+        for name, axis in self.axes().items():
+            owner = next((d for d, m in self.devices().items() if m is axis.device), None)
+            axes[name] = {'device': owner, 'number': axis.number}
+        return {'devices': devices, 'axes': axes}
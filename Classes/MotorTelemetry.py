@@ -0,0 +1,185 @@
+import threading
+import time
+from typing import NamedTuple
+
+
+class RxLine(NamedTuple):
+    """One framed serial line with its hub sequence number and wall-clock arrival time."""
+    seq: int
+    timestamp: float
+    data: bytes
+
+    @property
+    def text(self) -> str:
+        return self.data.decode('utf-8', errors='replace').strip()
+
+
+class LineFramer:
+    """
+    Splits a byte stream into newline-terminated lines.  Not thread-safe;
+    owned by whichever thread feeds it.
+    """
+
+    # A line longer than this with no newline is emitted as-is so a chatty
+    # device without line endings can't grow the partial buffer forever.
+    MAX_PARTIAL = 4096
+
+    def __init__(self, max_partial: int = MAX_PARTIAL):
+        self.max_partial = max_partial
+        self._partial = bytearray()
+
+    def feed(self, data: bytes) -> list[bytes]:
+        """Append *data*; return the complete lines (newline included), oldest first."""
+        self._partial.extend(data)
+        lines = []
+        start = 0
+        while True:
+            end = self._partial.find(b"\n", start)
+            if end < 0:
+                break
+            lines.append(bytes(self._partial[start:end + 1]))
+            start = end + 1
+        if start:
+            del self._partial[:start]
+        if len(self._partial) >= self.max_partial:
+            lines.append(bytes(self._partial))
+            self._partial.clear()
+        return lines
+
+
+class TelemetryHub:
+    """
+    Fans serial RX lines out to any number of subscribers.
+
+    Incoming bytes are split into lines and stored in a bounded ring.  Every
+    line gets a monotonically increasing sequence number; each Subscription
+    keeps its own cursor into the ring, so readers never steal lines from one
+    another.  Waiting readers block on a condition variable and are woken the
+    moment publish() appends a line — no sleep-polling.
+
+    A subscriber that falls more than *capacity* lines behind skips ahead to
+    the oldest retained line; the skipped count is reported in .dropped.
+    """
+
+    MAX_PARTIAL = LineFramer.MAX_PARTIAL
+
+    def __init__(self, capacity: int = 1024):
+        self.capacity = capacity
+        self._lines: list[bytes | None] = [None] * capacity
+        self._times: list[float] = [0.0] * capacity
+        self._next_seq = 0          # sequence number the next line will get
+        self._framer = LineFramer(self.MAX_PARTIAL)
+        self._cond = threading.Condition()
+        self._closed = False
+
+    # ------------------------------------------------------------------
+    # Producer side (serial reader thread)
+    # ------------------------------------------------------------------
+
+    def publish(self, data: bytes, timestamp: float | None = None) -> int:
+        """Append raw serial bytes; returns the number of complete lines published."""
+        if not data:
+            return 0
+        with self._cond:
+            return len(self._publish_locked(self._framer.feed(data), timestamp))
+
+    def publish_lines(self, lines: list[bytes], timestamp: float | None = None) -> list[RxLine]:
+        """Append lines framed by the caller; returns them as RxLine records."""
+        if not lines:
+            return []
+        with self._cond:
+            return self._publish_locked(lines, timestamp)
+
+    def _publish_locked(self, lines, timestamp) -> list[RxLine]:
+        if timestamp is None:
+            timestamp = time.time()
+        records = []
+        for line in lines:
+            index = self._next_seq % self.capacity
+            self._lines[index] = line
+            self._times[index] = timestamp
+            records.append(RxLine(self._next_seq, timestamp, line))
+            self._next_seq += 1
+        if records:
+            self._cond.notify_all()
+        return records
+
+    def close(self) -> None:
+        """Wake every waiting subscriber; subsequent get() calls return at once."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    # ------------------------------------------------------------------
+    # Consumer side
+    # ------------------------------------------------------------------
+
+    @property
+    def next_seq(self) -> int:
+        with self._cond:
+            return self._next_seq
+
+    @property
+    def closed(self) -> bool:
+        with self._cond:
+            return self._closed
+
+    def subscribe(self, from_seq: int | None = None) -> "Subscription":
+        """
+        Create a subscriber.  By default it sees only lines published from now
+        on; pass *from_seq* to replay retained lines starting at that sequence.
+        """
+        with self._cond:
+            cursor = self._next_seq if from_seq is None else max(0, from_seq)
+        return Subscription(self, cursor)
+
+    def _read(self, cursor: int, timeout: float | None, max_lines: int, timed: bool = False):
+        """
+        Return (lines, new_cursor, dropped); lines is a list of (seq, bytes),
+        or of RxLine when *timed* is set.
+        """
+        with self._cond:
+            if cursor >= self._next_seq and not self._closed:
+                self._cond.wait_for(lambda: cursor < self._next_seq or self._closed,
+                                    timeout=timeout)
+            oldest = max(0, self._next_seq - self.capacity)
+            dropped = 0
+            if cursor < oldest:
+                dropped = oldest - cursor
+                cursor = oldest
+            end = min(self._next_seq, cursor + max_lines)
+            if timed:
+                lines = [RxLine(seq, self._times[seq % self.capacity], self._lines[seq % self.capacity])
+                         for seq in range(cursor, end)]
+            else:
+                lines = [(seq, self._lines[seq % self.capacity]) for seq in range(cursor, end)]
+            return lines, end, dropped
+
+
+class Subscription:
+    """A single reader's cursor into a TelemetryHub.  Not shared between threads."""
+
+    def __init__(self, hub: TelemetryHub, cursor: int):
+        self._hub = hub
+        self.cursor = cursor
+        self.dropped = 0
+
+    @property
+    def closed(self) -> bool:
+        """True once the hub is closed; get() then never blocks, so stop reading when it returns nothing."""
+        return self._hub.closed
+
+    def get(self, timeout: float | None = None, max_lines: int = 256) -> list[tuple[int, bytes]]:
+        """
+        Block until at least one new line is available (or *timeout* expires)
+        and return the new lines as (seq, line_bytes) tuples.
+        """
+        lines, self.cursor, dropped = self._hub._read(self.cursor, timeout, max_lines)
+        self.dropped += dropped
+        return lines
+
+    def get_lines(self, timeout: float | None = None, max_lines: int = 256) -> list[RxLine]:
+        """Like get(), but returns RxLine records carrying each line's arrival time."""
+        lines, self.cursor, dropped = self._hub._read(self.cursor, timeout, max_lines, timed=True)
+        self.dropped += dropped
+        return lines
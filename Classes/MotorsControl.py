@@ -1,17 +1,134 @@
+import re
 import threading
 import time
+from concurrent.futures import Future
 import serial
 
+from Classes.MotorTelemetry import TelemetryHub, LineFramer
+from Classes.ByteRing import ByteRing
+from Classes.SerialRecorder import SerialRecorder, source_name
+from Classes.StateShadow import StateShadow
+from Classes.CommandScheduler import (CommandScheduler, PRIORITY_JOG,
+                                      PRIORITY_TRACKING, PRIORITY_KEEPALIVE)
+from Classes.Metrics import REGISTRY
+from Classes.Logger import get_logger
+
+_log = get_logger("MotorControl")
+
+_TX_BYTES = REGISTRY.counter(
+    'motor_serial_tx_bytes_total', 'Bytes written to the motor serial port', labels=('device',))
+_RX_BYTES = REGISTRY.counter(
+    'motor_serial_rx_bytes_total', 'Bytes read from the motor serial port', labels=('device',))
+_WRITE_LOCK_WAIT = REGISTRY.histogram(
+    'motor_serial_write_lock_wait_seconds', 'Time spent waiting for the serial write lock',
+    labels=('device',))
+_RX_BUFFER_DEPTH = REGISTRY.gauge(
+    'motor_serial_rx_buffer_bytes', 'Bytes waiting in the read() buffer', labels=('device',))
+_RX_OVERFLOW = REGISTRY.counter(
+    'motor_serial_rx_overflow_bytes_total', 'Oldest RX bytes dropped because the read() buffer was full',
+    labels=('device',))
+
+
 class MotorControl:
-    def __init__(self):
+    """
+    Owns one Arduino serial port.  *name* labels the device's metrics and
+    threads, so several controllers can run side by side in a MotorRegistry.
+
+    read_mode selects how the background reader waits for RX bytes:
+      'event' – block in a read with a timeout (select() on the fd under the
+                hood); wakes as soon as bytes arrive and idles otherwise.
+      'poll'  – the original loop: check in_waiting, sleep 10 ms.
+
+    RX bytes are framed into timestamped lines (RxLine).  request() writes a
+    command batch and returns a Future that resolves with the first RX line
+    matching a pattern, e.g. a move-complete report after s=N; move() does
+    that with move_complete_pattern, which is None (no completion reports
+    relied on) unless the firmware is known to send one.  Pending requests
+    that see no match are failed with TimeoutError by the reader thread, so
+    timeouts are honoured to within READ_TIMEOUT.
+
+    Writes go through a CommandScheduler: one writer thread, jog before
+    tracking before keep-alive.  send_batch() still blocks until its batch
+    has been written and returns whether the write succeeded.  On the
+    writer thread a StateShadow drops modal commands (v/d/t/e) the
+    controller already has; resync() re-sends the full state.
+
+    last_motion() is when the motors stop (or stopped) moving: the end of
+    the last s= batch estimated from its steps × t= (the axis' modal t as
+    written) plus MOVE_MARGIN, so while a move runs it lies in the future.
+    Moves on one axis are assumed to run back to back.  With a
+    move_complete_pattern, a report that completes every outstanding move
+    can only bring that time forward.  Cameras use it to pick settled frames.
+
+    read() and read_bytes() drain a fixed-size ByteRing of rx_buffer_size
+    bytes.  If nobody drains it, the oldest bytes are dropped and counted
+    instead of the buffer growing without bound.
+
+    With record_dir set, every TX payload (as written, after the shadow)
+    and RX chunk is logged by a SerialRecorder, TX tagged with the thread
+    that sent it; read the logs back with Classes/SerialLog.py.
+    """
+
+    PRIORITY_JOG       = PRIORITY_JOG
+    PRIORITY_TRACKING  = PRIORITY_TRACKING
+    PRIORITY_KEEPALIVE = PRIORITY_KEEPALIVE
+
+    READ_TIMEOUT = 0.5      # seconds; bounds how long stop() waits on the reader
+    POLL_INTERVAL = 0.01    # 'poll' mode sleep
+    # What ArduinoSimulator reports after a move.  Not confirmed for the
+    # mount firmware, so it is only used when passed as move_complete_pattern.
+    MOVE_COMPLETE_PATTERN = r'^done\b'
+    RX_BUFFER_SIZE = 64 * 1024
+    STEP_DELAY_MS = 1.0     # t= assumed for an axis until one is written
+    MOVE_MARGIN = 0.25      # seconds added to every move estimate (serial latency, ramp, ringing)
+
+    def __init__(self, port='/dev/ttyACM0', baudrate=115200, read_mode='event',
+                 move_complete_pattern=None,
+                 state_shadow=True, max_state_age=None, rx_buffer_size=RX_BUFFER_SIZE,
+                 name='mount', record_dir=None):
         # Serial Bridge Configuration
-        serial_port = '/dev/ttyACM0'
-        serial_baud = 115200
+        serial_port = port
+        serial_baud = baudrate
+        self.name = name
+        self.port = port
+        self.baudrate = baudrate
+        if read_mode not in ('event', 'poll'):
+            raise ValueError(f"read_mode must be 'event' or 'poll', not {read_mode!r}")
+        self.read_mode = read_mode
+        self.move_complete_pattern = move_complete_pattern
+        self.__move_complete = re.compile(move_complete_pattern).search if move_complete_pattern else None
+        # Move estimates, from the commands as written (guarded by __motion_lock):
+        self.__motion_lock = threading.Lock()
+        self.__wire_axis = None         # last v= written
+        self.__step_delays = {}         # axis → last t= written, ms
+        self.__move_ends = {}           # axis → estimated monotonic end of its last move
+        self.__reported_end = None      # when a completion report closed every outstanding move
+        self.__moves_pending = 0
+        self.__framer = LineFramer()
+        # Pending request() futures, oldest first: [matcher, future, deadline]
+        self.__waiters = []
+        self.__waiters_lock = threading.Lock()
         self.__serial_connection = None
-        self.__serial_buffer = bytearray()
-        self.__serial_buffer_lock = threading.Lock()
+        self.__serial_buffer = ByteRing(rx_buffer_size)
+        # Line fan-out for streaming clients; read() keeps its own buffer so
+        # pollers and streams no longer steal each other's bytes.
+        self.__telemetry = TelemetryHub()
+        self.__stop_event = threading.Event()
+        self.__reader_thread = None
 
         self.__serial_write_lock = threading.Lock()
+        self.__scheduler = CommandScheduler(self.__write_payload, name=f"SerialWriterThread-{name}",
+                                            device=name)
+        # Modal v/d/t/e shadow; redundant mode commands are dropped at write time.
+        self.__shadow = StateShadow(max_state_age, device=name) if state_shadow else None
+        self.__recorder = SerialRecorder(record_dir, device=name) if record_dir else None
+
+        # Per-device metric children, looked up once.
+        self.__tx_bytes = _TX_BYTES.labels(name)
+        self.__rx_bytes = _RX_BYTES.labels(name)
+        self.__write_lock_wait = _WRITE_LOCK_WAIT.labels(name)
+        self.__rx_buffer_depth = _RX_BUFFER_DEPTH.labels(name)
+        self.__rx_overflow = _RX_OVERFLOW.labels(name)
 
         try:
             self.__serial_connection = serial.Serial(
@@ -19,63 +136,315 @@ class MotorControl:
                 baudrate=serial_baud,
                 dsrdtr=False,
                 rtscts=False,
-                timeout=1
+                timeout=self.READ_TIMEOUT
             )
+            _log.info("Serial connection opened on %s (%s)", serial_port, name)
+        except Exception as e:
+            _log.error("Failed to open serial port %s (%s): %s", serial_port, name, e)
+            return
+        try:
             # Explicitly disable DTR/RTS to prevent Arduino reset
             self.__serial_connection.dtr = False
             self.__serial_connection.rts = False
-            print(f"Serial connection opened on {serial_port}")
         except Exception as e:
-            print(f"Failed to open serial port {serial_port}: {e}")
-            
+            # ptys and some USB adapters have no modem lines
+            _log.warning("Could not clear DTR/RTS on %s: %s", serial_port, e)
+
     def __serial_read_worker(self):
         """Background thread to continuously read from serial port to buffer"""
-        while True:
-            if self.__serial_connection and self.__serial_connection.is_open:
+        while not self.__stop_event.is_set():
+            if self.__waiters:
+                self.__expire_waiters(time.monotonic())
+            connection = self.__serial_connection
+            if not (connection and connection.is_open):
+                self.__stop_event.wait(1)
+                continue
+            try:
+                if self.read_mode == 'event':
+                    # Blocks until a byte arrives or READ_TIMEOUT passes, then
+                    # drains whatever else the driver already has.
+                    data = connection.read(1)
+                    if data and connection.in_waiting:
+                        data += connection.read(connection.in_waiting)
+                else:
+                    data = b""
+                    if connection.in_waiting > 0:
+                        data = connection.read(connection.in_waiting)
+
+                if data:
+                    # Raw bytes go to the log; decoding happens on the writer thread.
+                    _log.debug("RX %r", data)
+                    self.__rx_bytes.inc(len(data))
+                    if self.__recorder is not None:
+                        self.__recorder.record_rx(data)
+                    dropped = self.__serial_buffer.write(data)
+                    if dropped:
+                        self.__rx_overflow.inc(dropped)
+                        _log.warning("RX buffer full, dropped %d oldest bytes", dropped, every=5.0)
+                    self.__rx_buffer_depth.set(len(self.__serial_buffer))
+                    lines = self.__telemetry.publish_lines(self.__framer.feed(data), time.time())
+                    if lines and self.__move_complete is not None:
+                        self.__note_completions(lines)
+                    if lines and self.__waiters:
+                        self.__resolve_waiters(lines)
+            except Exception as e:
+                if self.__stop_event.is_set():
+                    break
+                _log.error("Serial background read error: %s", e, every=5.0)
+                self.__stop_event.wait(1)
+                continue
+            if self.read_mode == 'poll':
+                self.__stop_event.wait(self.POLL_INTERVAL)
+
+    def __note_completions(self, lines):
+        done = sum(1 for line in lines if self.__move_complete(line.text))
+        if done:
+            with self.__motion_lock:
+                self.__moves_pending = max(0, self.__moves_pending - done)
+                if not self.__moves_pending and self.__move_ends:
+                    self.__reported_end = time.monotonic()
+
+    def __note_moves(self, lines):
+        """Track v=/t= as written and estimate when each s= finishes."""
+        now = time.monotonic()
+        moves = 0
+        with self.__motion_lock:
+            for line in lines:
+                key, _, value = line.strip().partition('=')
                 try:
-                    if self.__serial_connection.in_waiting > 0:
-                        data = self.__serial_connection.read(self.__serial_connection.in_waiting)
-                    
-                        # Decode bytes to string to interpret control characters like \n
-                        print(f"////// Reading from serial:\n {data.decode('utf-8', errors='replace')} \\\\\\\\\\\\")
-                        
-                        if data:
-                            with self.__serial_buffer_lock:
-                                self.__serial_buffer.extend(data)
-                except Exception as e:
-                    print(f"Serial background read error: {e}")
-                    time.sleep(1)
-            time.sleep(0.01)
-
-    def start(self):        
+                    if key == 'v':
+                        self.__wire_axis = int(value)
+                    elif key == 't':
+                        self.__step_delays[self.__wire_axis] = float(value)
+                    elif key == 's':
+                        axis = self.__wire_axis
+                        delay = self.__step_delays.get(axis, self.STEP_DELAY_MS)
+                        start = max(now, self.__move_ends.get(axis, now))
+                        self.__move_ends[axis] = start + abs(int(value)) * delay / 1000.0
+                        moves += 1
+                except ValueError:
+                    continue        # the controller rejects it too
+            if moves:
+                self.__moves_pending += moves
+                self.__reported_end = None
+
+    def __resolve_waiters(self, lines):
+        resolved = []
+        with self.__waiters_lock:
+            for line in lines:
+                text = line.text
+                for waiter in self.__waiters:
+                    if waiter[0](text):
+                        self.__waiters.remove(waiter)
+                        resolved.append((waiter[1], line))
+                        break
+        # Completing futures runs callbacks; keep that outside the lock.
+        for future, line in resolved:
+            future.set_result(line)
+
+    def __expire_waiters(self, now, error=None):
+        with self.__waiters_lock:
+            expired = [w for w in self.__waiters if error is not None or w[2] <= now]
+            for waiter in expired:
+                self.__waiters.remove(waiter)
+        for _, future, _ in expired:
+            future.set_exception(error or TimeoutError("no matching reply from the motor controller"))
+
+    @property
+    def is_connected(self):
+        return bool(self.__serial_connection and self.__serial_connection.is_open)
+
+    def start(self):
         # Start the serial reader thread
-        serial_reader_thread = threading.Thread(target=self.__serial_read_worker)
-        serial_reader_thread.daemon = True
-        serial_reader_thread.start()
-        
-    def send_command(self, command):
-        if command:
-            if self.__serial_connection and self.__serial_connection.is_open:
+        self.__stop_event.clear()
+        self.__reader_thread = threading.Thread(target=self.__serial_read_worker,
+                                                name=f"SerialReaderThread-{self.name}")
+        self.__reader_thread.daemon = True
+        self.__reader_thread.start()
+
+    def stop(self, timeout=2.0):
+        """Stop the reader thread, wake stream subscribers and close the port."""
+        self.__stop_event.set()
+        connection = self.__serial_connection
+        if connection is not None and hasattr(connection, 'cancel_read'):
+            try:
+                connection.cancel_read()    # wake a reader blocked in read()
+            except Exception:
+                pass
+        if self.__reader_thread is not None:
+            self.__reader_thread.join(timeout)
+            self.__reader_thread = None
+        self.__scheduler.stop()
+        self.__expire_waiters(time.monotonic(), ConnectionError("motor control stopped"))
+        self.__telemetry.close()
+        if self.__recorder is not None:
+            self.__recorder.close()
+        if connection is not None:
+            with self.__serial_write_lock:
                 try:
-                    with self.__serial_write_lock:
-                        print(f"Writing to serial: {command}")
-                        self.__serial_connection.write(f"{command}\n".encode())
-                    return True
-                except Exception as e:
-                    print(f"Serial write error: {e}")
-                    return False
-        return False
-    
+                    connection.close()
+                except Exception:
+                    pass
+
+    def send_command(self, command, priority=PRIORITY_JOG):
+        return self.send_batch([command], priority)
+
+    def send_batch(self, commands, priority=PRIORITY_JOG, wait=True, timeout=2.0):
+        """
+        Write several commands as one contiguous block: a single serial
+        write, so no other thread's command (e.g. a keep-alive v=/e=) can
+        land in the middle of the sequence.
+
+        The batch is queued on the scheduler at *priority*.  With wait=True
+        (the default) this blocks until it is written and returns the write
+        result; with wait=False it returns as soon as the batch is queued.
+        *timeout* bounds both the backpressure wait and the write wait.
+        """
+        commands = [command for command in commands if command]
+        if not commands or not self.is_connected:
+            return False
+        source = source_name() if self.__recorder is not None else ''
+        future = self.__scheduler.submit((commands, False, source), priority, timeout)
+        if not wait:
+            return not (future.done() and future.exception() is not None)
+        try:
+            return future.result(timeout)
+        except Exception as e:
+            _log.warning("Command batch not written: %r", e, every=5.0)
+            return False
+
+    def __write_payload(self, item):
+        """Runs on the scheduler's writer thread, so the shadow sees wire order."""
+        commands, force, source = item
+        connection = self.__serial_connection
+        if not (connection and connection.is_open):
+            return False
+        if self.__shadow is not None:
+            commands = self.__shadow.filter(commands, force=force)
+            if not commands:
+                return True
+        payload = "".join(f"{command}\n" for command in commands).encode()
+        try:
+            wait_start = time.perf_counter()
+            with self.__serial_write_lock:
+                lock_wait = time.perf_counter() - wait_start
+                if self.__recorder is not None:
+                    # Logged before the write so the reply can't be logged first.
+                    self.__recorder.record_tx(payload, source)
+                connection.write(payload)
+            self.__note_moves(payload.decode().splitlines())
+            self.__write_lock_wait.observe(lock_wait)
+            _log.debug("TX %r", payload)
+            self.__tx_bytes.inc(len(payload))
+            return True
+        except Exception as e:
+            _log.error("Serial write error: %s", e, every=5.0)
+            if self.__shadow is not None:
+                self.__shadow.invalidate()
+            return False
+
+    def resync(self, timeout=2.0):
+        """
+        Re-send the full modal state (after a reconnect, an Arduino reset or
+        a suspected desync).  Returns whether the write succeeded.
+        """
+        if self.__shadow is None or not self.is_connected:
+            return False
+        commands = self.__shadow.resync_commands()
+        if not commands:
+            return True
+        source = source_name() if self.__recorder is not None else ''
+        future = self.__scheduler.submit((commands, True, source), PRIORITY_JOG, timeout)
+        try:
+            return future.result(timeout)
+        except Exception as e:
+            _log.warning("Resync not written: %r", e)
+            return False
+
+    def last_motion(self):
+        """
+        Monotonic time the motors stop moving: estimated from the last
+        moves (in the future while they run), or None before the first s=.
+        """
+        with self.__motion_lock:
+            if not self.__move_ends:
+                return None
+            end = max(self.__move_ends.values()) + self.MOVE_MARGIN
+            if self.__reported_end is not None:
+                end = min(end, self.__reported_end)
+            return end
+
+    def state_snapshot(self):
+        """Shadowed modal state and bytes saved so far (None if shadowing is off)."""
+        return self.__shadow.snapshot() if self.__shadow is not None else None
+
+    def queue_depth(self, priority=None):
+        """Batches waiting for the serial writer (all classes, or one)."""
+        return self.__scheduler.depth(priority)
+
+    def request(self, commands, expect, timeout=5.0, priority=PRIORITY_JOG):
+        """
+        Send *commands* (a string or a list, written as one batch) and return
+        a Future resolved with the first RxLine, received after the write,
+        whose text matches *expect* (a regex, or a callable taking the text).
+        Each RX line resolves at most one pending request, oldest first.
+        The Future fails with TimeoutError after *timeout* seconds, or with
+        ConnectionError if the write fails or the controller is stopped.
+        """
+        if isinstance(commands, str):
+            commands = [commands]
+        if callable(expect):
+            matcher = expect
+        else:
+            matcher = re.compile(expect).search
+        future = Future()
+        future.set_running_or_notify_cancel()
+        waiter = [matcher, future, time.monotonic() + timeout]
+        # Registered before the write so a fast reply can't be missed.
+        with self.__waiters_lock:
+            self.__waiters.append(waiter)
+        if not self.send_batch(commands, priority):
+            with self.__waiters_lock:
+                if waiter in self.__waiters:
+                    self.__waiters.remove(waiter)
+            if not future.done():
+                future.set_exception(ConnectionError("Serial connection issue"))
+        return future
+
+    def move(self, commands, timeout=5.0, priority=PRIORITY_JOG):
+        """
+        request() that waits for the move-complete report.  Needs a
+        move_complete_pattern; without one, send the batch and wait for
+        last_motion() instead.
+        """
+        if self.move_complete_pattern is None:
+            raise ValueError("no move_complete_pattern configured for this controller")
+        return self.request(commands, self.move_complete_pattern, timeout, priority)
+
+    def subscribe(self, from_seq=None):
+        """Return a TelemetryHub Subscription that receives every RX line."""
+        return self.__telemetry.subscribe(from_seq)
+
     def read(self):
-        with self.__serial_buffer_lock:
-            if len(self.__serial_buffer) > 0:
-                # Decode bytes to string (handling errors)
-                response_data = self.__serial_buffer.decode('utf-8', errors='ignore')
-                # Clear the buffer
-                # print(f"##### Sending to HTTP client:\n {response_data} #####")
-                self.__serial_buffer.clear()
-                
-                return response_data
-        return None
+        """Drain the RX buffer as text, or None if it is empty."""
+        if not len(self.__serial_buffer):
+            return None
+        response_data = self.__serial_buffer.read_text()
+        self.__rx_buffer_depth.set(len(self.__serial_buffer))
+        return response_data
+
+    def read_bytes(self) -> bytes:
+        """Drain the RX buffer as raw bytes (b"" if empty); nothing is decoded."""
+        data = self.__serial_buffer.read_bytes()
+        self.__rx_buffer_depth.set(len(self.__serial_buffer))
+        return data
+
+    def recorder_stats(self):
+        """Serial log file and counters, or None if recording is off."""
+        return self.__recorder.stats() if self.__recorder is not None else None
+
+    def rx_buffer_stats(self) -> dict:
+        """Capacity, fill level and overflow counters of the RX buffer."""
+        return self.__serial_buffer.stats()
     
     
\ No newline at end of file
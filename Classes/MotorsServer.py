@@ -1,13 +1,13 @@
 from http.server import BaseHTTPRequestHandler, HTTPServer
 import urllib
-import time
 import threading
 from Classes.MotorsControl import MotorControl
 
 class MotorsServer:
-    def __init__(self, host: str, port: int):
+    def __init__(self, host: str, port: int, motor_port: str = '/dev/ttyACM0'):
         self.__host = host
         self.__port = port
+        self.__motor_port = motor_port
         self.__is_running = False
         self.__serial_server = None
         self.__serial_thread = None
@@ -19,7 +19,7 @@ class MotorsServer:
             self.__serial_server = HTTPServer((self.__host, self.__port), SerialBridgeHandler)
             
             # Initialize MotorControl and attach to server instance
-            self.__serial_server.motor_control = MotorControl()
+            self.__serial_server.motor_control = MotorControl(port=self.__motor_port)
             self.__serial_server.motor_control.start()
 
             self.__serial_thread = threading.Thread(target=self.__serial_server.serve_forever)
@@ -37,12 +37,7 @@ class MotorsServer:
             
             # Stop motor control
             if hasattr(self.__serial_server, 'motor_control'):
-                # Assuming MotorControl has a stop method? The user's snippet in SerialBridgeHandler didn't call stop explicitly but maybe it should.
-                # If MotorControl is a thread, it likely needs stopping.
-                # Looking at SerialBridgeHandler code it has .start(), so assume .stop() or .join()?
-                # I'll check MotorControl.py to be safe, but for now I'll just leave it or assume it's needed.
-                # Actually, checking MotorsControl.py is good practice.
-                pass
+                self.__serial_server.motor_control.stop()
                 
             print("Motors server stopped.")
         else:
@@ -86,12 +81,12 @@ class SerialBridgeHandler(BaseHTTPRequestHandler):
                 
         elif parsed_path.path == '/read':
             try:
-                response_data = self.motors_control.read()
+                response_data = self.motors_control.read_bytes()
                         
                 self.send_response(200)
                 self.send_header('Content-Type', 'text/plain')
                 self.end_headers()
-                self.wfile.write(response_data.encode())
+                self.wfile.write(response_data)
             except Exception as e:
                 self.send_response(500)
                 self.send_header('Content-Type', 'text/plain')
@@ -103,19 +98,21 @@ class SerialBridgeHandler(BaseHTTPRequestHandler):
             self.send_response(200)
             self.send_header('Content-Type', 'application/octet-stream')
             self.send_header('Cache-Control', 'no-cache')
-            self.send_header('Connection', 'keep-alive')
+            self.send_header('Connection', 'close')
             self.end_headers()
+            # The body runs until the connection closes, so it can't be reused.
+            self.close_connection = True
 
+            subscription = self.motors_control.subscribe()
             try:
                 while True:
-                    data = self.motors_control.read()
-                    
-                    if data:
+                    lines = subscription.get(timeout=15.0)
+                    if lines:
                         # Write raw bytes directly to the stream
-                        self.wfile.write(data)
+                        self.wfile.write(b"".join(line for _, line in lines))
                         self.wfile.flush()
-                    
-                    time.sleep(0.01)
+                    elif subscription.closed:
+                        break       # motor control stopped; end the stream
             except Exception as e:
                 print(f"Stream client disconnected: {e}")
 
@@ -2,24 +2,43 @@ import subprocess
 import os
 import re
 import cv2
-import numpy as np
-import requests
+import threading
 import time
 
+from Classes.Metrics import REGISTRY
+
+_ASTAP_ATTEMPT = REGISTRY.histogram(
+    'plate_solver_astap_attempt_seconds', 'Wall time of each ASTAP attempt',
+    labels=('attempt',))
+
 class PlateSolver:
     def __init__(self):
         # Use xvfb-run to simulate display for ASTAP
         self.astap_command = ["xvfb-run", "-a", "astap"] 
         self.temp_image_path = "/tmp/solve_image.jpg"
         self.report_path = "/tmp/astap_report.ini"
+        # The temp image/report paths are shared, so solves run one at a time.
+        self._solve_lock = threading.Lock()
     
-    def solve(self, camera_device, timeout=30):
+    def solve(self, camera_device, timeout=30, cancel_event=None, progress_callback=None):
         """
         Captures an image, solves it using ASTAP, and returns RA/DEC.
+
+        cancel_event      – optional threading.Event; checked between ASTAP attempts.
+        progress_callback – optional callable(fraction, message) for job progress.
         """
+        with self._solve_lock:
+            return self._solve(camera_device, timeout, cancel_event, progress_callback)
+
+    def _solve(self, camera_device, timeout, cancel_event, progress_callback):
+        def report(fraction, message):
+            if progress_callback:
+                progress_callback(fraction, message)
+
         # 1. Capture Image
+        report(0.0, "Capturing image")
         print(f"Capturing image for plate solving from {camera_device.camera_model}...")
-        img = self._capture_frame(camera_device)
+        img = camera_device.frame_source.capture('plate_solver')
         
         if img is None:
             return {"success": False, "error": "Failed to capture image"}
@@ -43,7 +62,12 @@ class PlateSolver:
             last_stderr = ""
             last_return_code = -1
 
-            for attempt in attempt_variants:
+            for index, attempt in enumerate(attempt_variants):
+                if cancel_event is not None and cancel_event.is_set():
+                    return {"success": False, "error": "Cancelled"}
+                report(0.1 + 0.9 * index / len(attempt_variants),
+                       f"ASTAP attempt '{attempt['label']}'")
+
                 cmd = self.astap_command + [
                     "-f", self.temp_image_path,
                     "-r", self.report_path,
@@ -51,7 +75,11 @@ class PlateSolver:
                 ] + attempt["args"]
 
                 print(f"Running ASTAP attempt '{attempt['label']}': {' '.join(cmd)}")
-                result = subprocess.run(cmd, capture_output=True, text=True, timeout=per_attempt_timeout)
+                attempt_start = time.perf_counter()
+                try:
+                    result = subprocess.run(cmd, capture_output=True, text=True, timeout=per_attempt_timeout)
+                finally:
+                    _ASTAP_ATTEMPT.labels(attempt['label']).observe(time.perf_counter() - attempt_start)
                 last_stdout = (result.stdout or "").strip()
                 last_stderr = (result.stderr or "").strip()
                 last_return_code = result.returncode
@@ -116,62 +144,6 @@ class PlateSolver:
         except Exception as e:
             return {"success": False, "error": f"Error parsing results: {str(e)}"}
 
-    def _capture_frame(self, camera_device):
-        """
-        Reused logic from CameraRotationFinder to get a single frame
-        """
-        # Ensure we know the device
-        if not camera_device.video_device:
-            camera_device.video_device = camera_device.get_camera_device_by_type()
-            
-        if camera_device.camera_type == "MJPG":
-            url = f"http://localhost:{camera_device.video_port}/?action=snapshot"
-            try:
-                response = requests.get(url, timeout=2)
-                if response.status_code == 200:
-                    image_array = np.asarray(bytearray(response.content), dtype=np.uint8)
-                    frame = cv2.imdecode(image_array, cv2.IMREAD_GRAYSCALE) # ASTAP works well with BW
-                    if frame is not None:
-                        return cv2.rotate(frame, cv2.ROTATE_180) # Keep your existing rotation logic
-            except Exception as e:
-                print(f"Snapshot failed: {e}")
-
-        elif camera_device.camera_type == "H264":
-            rtsp_url = f"rtsp://localhost:{camera_device.rtsp_port}/cam"
-            cap = None
-            try:
-                cap = cv2.VideoCapture(rtsp_url)
-                if cap.isOpened():
-                    ret, frame_read = cap.read()
-                    if ret and frame_read is not None:
-                        gray = cv2.cvtColor(frame_read, cv2.COLOR_BGR2GRAY)
-                        return cv2.rotate(gray, cv2.ROTATE_180)
-            except Exception as e:
-                print(f"RTSP capture failed: {e}")
-            finally:
-                if cap:
-                    cap.release()
-
-        if camera_device.video_device:
-            cap = None
-            try:
-                cap = cv2.VideoCapture(camera_device.video_device)
-                if cap.isOpened():
-                    for _ in range(5):
-                        cap.read()
-                    ret, frame_read = cap.read()
-                    if ret and frame_read is not None:
-                        gray = cv2.cvtColor(frame_read, cv2.COLOR_BGR2GRAY)
-                        return cv2.rotate(gray, cv2.ROTATE_180)
-            except Exception as e:
-                print(f"Direct capture failed: {e}")
-            finally:
-                if cap:
-                    cap.release()
-        
-        # Add H264/RTSP snapshot logic here if needed (e.g., using ffmpeg to grab one frame)
-        return None
-
     def _prepare_image_for_astap(self, frame):
         if frame is None:
             return None
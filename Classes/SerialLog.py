@@ -0,0 +1,115 @@
+import mmap
+import os
+import time
+from typing import NamedTuple
+
+from Classes.SerialRecorder import (MAGIC, VERSION, FILE_HEADER, RECORD, FILE_SUFFIX,
+                                    KIND_TX, KIND_RX, KIND_SOURCE)
+
+KIND_NAMES = {KIND_TX: 'tx', KIND_RX: 'rx'}
+
+
+class SerialRecord(NamedTuple):
+    """One recorded frame.  t is monotonic seconds; wall_time is the matching time.time()."""
+    t: float
+    wall_time: float
+    kind: str               # 'tx' or 'rx'
+    source: str             # originating thread/subsystem ('' for the reader)
+    data: bytes
+
+
+class SerialLog:
+    """
+    Read-only view of one SerialRecorder file through a memory map.
+
+    Iterating yields SerialRecords in recorded order.  Nothing is read
+    into memory up front, so a whole night's log opens instantly; a record
+    cut short by a crash ends the iteration instead of raising.
+
+        for record in SerialLog.read_all("logs/serial", device="mount"):
+            print(record.t, record.kind, record.source, record.data)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < FILE_HEADER.size:
+                raise ValueError(f"{path}: not a serial log (too short)")
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, device, self.wall_time, self.monotonic_ns = FILE_HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path}: not a serial log")
+        if version > VERSION:
+            self.close()
+            raise ValueError(f"{path}: serial log version {version} is newer than this reader")
+        self.device = device.rstrip(b"\0").decode('utf-8', 'replace')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def __iter__(self):
+        data = self._map
+        offset, end = FILE_HEADER.size, len(data)
+        sources = {}
+        wall_offset = self.wall_time - self.monotonic_ns / 1e9
+        while offset + RECORD.size <= end:
+            timestamp, kind, source_id, length = RECORD.unpack_from(data, offset)
+            offset += RECORD.size
+            if offset + length > end:
+                break                           # torn final record
+            payload = data[offset:offset + length]
+            offset += length
+            if kind == KIND_SOURCE:
+                sources[source_id] = payload.decode('utf-8', 'replace')
+                continue
+            t = timestamp / 1e9
+            yield SerialRecord(t, t + wall_offset, KIND_NAMES.get(kind, str(kind)),
+                               sources.get(source_id, ''), payload)
+
+    @staticmethod
+    def find(directory, device=None) -> list:
+        """Log files in *directory* (optionally one device's), oldest first."""
+        prefix = f"{device}-" if device else ""
+        return [os.path.join(directory, name) for name in sorted(os.listdir(directory))
+                if name.startswith(prefix) and name.endswith(FILE_SUFFIX)]
+
+    @classmethod
+    def read_all(cls, paths, device=None):
+        """Records from several files in order; *paths* may also be a directory."""
+        if isinstance(paths, (str, os.PathLike)):
+            paths = cls.find(paths, device) if os.path.isdir(paths) else [paths]
+        for path in paths:
+            with cls(path) as log:
+                yield from log
+
+
+def replay(records, send, speed=1.0, kinds=('tx',)) -> int:
+    """
+    Call send(record) for each record of the given *kinds*, spaced as they
+    were recorded (speed=2 replays twice as fast, inf as fast as possible).
+    Returns the number of records sent.
+    """
+    sent = 0
+    start = first = None
+    for record in records:
+        if record.kind not in kinds:
+            continue
+        if first is None:
+            start, first = time.monotonic(), record.t
+        elif speed != float('inf'):
+            delay = start + (record.t - first) / speed - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        send(record)
+        sent += 1
+    return sent
@@ -0,0 +1,206 @@
+import os
+import re
+import struct
+import threading
+import time
+
+from Classes.Metrics import REGISTRY
+from Classes.Logger import get_logger
+
+_log = get_logger("SerialRecorder")
+
+# On-disk format (little endian), read back by Classes/SerialLog.py:
+#   file header  magic, version, flags, device (16 bytes, NUL padded),
+#                wall clock and monotonic_ns when the file was opened
+#   record       monotonic_ns, kind, source id, payload length, payload
+# A SOURCE record maps a source id to its name (the payload) for the rest
+# of the file; every file starts with the full table so it reads standalone.
+MAGIC = b"TWSERLOG"
+VERSION = 1
+FILE_HEADER = struct.Struct('<8sHH16sdq')
+RECORD = struct.Struct('<qBBH')
+KIND_TX, KIND_RX, KIND_SOURCE = 0, 1, 2
+MAX_PAYLOAD = 0xFFFF
+FILE_SUFFIX = '.serlog'
+
+_RECORDED = REGISTRY.counter(
+    'motor_serial_recorded_bytes_total', 'Bytes of serial log written to disk', labels=('device',))
+_DROPPED = REGISTRY.counter(
+    'motor_serial_recorder_dropped_total', 'Serial frames not recorded because the buffer was full',
+    labels=('device',))
+
+# HTTPWorker_3, JobWorker_0 → one source per pool, not per thread.
+_POOL_SUFFIX = re.compile(r'_\d+$')
+
+
+def source_name(thread=None) -> str:
+    """The recording source for *thread* (default: the calling thread)."""
+    thread = thread or threading.current_thread()
+    return _POOL_SUFFIX.sub('', thread.name)
+
+
+class SerialRecorder:
+    """
+    Compact, rotating binary log of one controller's serial traffic.
+
+    record() packs a timestamped TX or RX frame onto an in-memory buffer
+    (one lock, two bytearray appends) and returns; a background thread
+    writes the buffer out every flush_interval seconds, so the serial
+    threads never wait on the disk.  If the disk falls so far behind that
+    max_buffer bytes are pending, frames are dropped and counted.
+
+    Files are <directory>/<device>-<YYYYmmdd-HHMMSS>-<n>.serlog; a file is
+    closed once it reaches max_file_bytes and only the newest max_files are
+    kept.  With the defaults a night of tracking traffic fits comfortably
+    in one file.
+    """
+
+    def __init__(self, directory, device='mount', max_file_bytes=16 * 1024 * 1024,
+                 max_files=8, flush_interval=1.0, max_buffer=1024 * 1024):
+        self.directory = directory
+        self.device = device
+        self.max_file_bytes = max_file_bytes
+        self.max_files = max_files
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.dropped = 0
+        self.bytes_written = 0
+        self.path = None
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()      # file writes: writer thread vs flush()/close()
+        self._buffer = bytearray()
+        self._sources: dict[str, int] = {}
+        # Sources whose definitions are already on disk; a new file repeats
+        # them (later ones are defined inside the chunk being written).
+        self._flushed_sources: dict[str, int] = {}
+        self._file = None
+        self._file_bytes = 0
+        self._file_index = 0
+        self._closed = threading.Event()
+        self._recorded = _RECORDED.labels(device)
+        self._dropped = _DROPPED.labels(device)
+        os.makedirs(directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, daemon=True,
+                                        name=f"SerialRecorderThread-{device}")
+        self._thread.start()
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+
+    def record_tx(self, data, source='') -> None:
+        self.record(KIND_TX, data, source)
+
+    def record_rx(self, data, source='') -> None:
+        self.record(KIND_RX, data, source)
+
+    def record(self, kind, data, source='') -> None:
+        timestamp = time.monotonic_ns()
+        with self._lock:
+            if self._closed.is_set():
+                return
+            if len(self._buffer) >= self.max_buffer:
+                self.dropped += 1
+                self._dropped.inc()
+                return
+            source_id = self._sources.get(source)
+            if source_id is None:
+                source_id = self._define_source_locked(source)
+            # Frames longer than a record holds (never, for Arduino lines)
+            # are split rather than truncated.
+            for start in range(0, max(len(data), 1), MAX_PAYLOAD):
+                chunk = data[start:start + MAX_PAYLOAD]
+                self._buffer += RECORD.pack(timestamp, kind, source_id, len(chunk))
+                self._buffer += chunk
+
+    def _define_source_locked(self, source):
+        if len(self._sources) > 0xFF:
+            return 0                            # table full: record as the first source
+        source_id = self._sources[source] = len(self._sources)
+        name = source.encode('utf-8', 'replace')[:MAX_PAYLOAD]
+        self._buffer += RECORD.pack(time.monotonic_ns(), KIND_SOURCE, source_id, len(name))
+        self._buffer += name
+        return source_id
+
+    # ------------------------------------------------------------------
+    # Writer thread
+    # ------------------------------------------------------------------
+
+    def flush(self) -> None:
+        """Write everything recorded so far (the writer thread also does this periodically)."""
+        with self._io_lock:
+            with self._lock:
+                pending, self._buffer = self._buffer, bytearray()
+                sources, self._flushed_sources = self._flushed_sources, dict(self._sources)
+            if pending:
+                self._write(pending, sources)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed.is_set():
+                return
+            self._closed.set()
+        self._thread.join(self.flush_interval + 2.0)
+        self.flush()
+        with self._io_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending = len(self._buffer)
+            sources = len(self._sources)
+        return {
+            'path':          self.path,
+            'bytes_written': self.bytes_written,
+            'pending_bytes': pending,
+            'dropped':       self.dropped,
+            'sources':       sources,
+        }
+
+    def _run(self):
+        while not self._closed.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                _log.error("Writing serial log failed: %s", e, every=30.0)
+
+    def _write(self, data, sources):
+        if self._file is None:
+            self._open(sources)
+        self._file.write(data)
+        self._file.flush()
+        self._file_bytes += len(data)
+        self.bytes_written += len(data)
+        self._recorded.inc(len(data))
+        if self._file_bytes >= self.max_file_bytes:
+            self._file.close()
+            self._file = None
+            self._prune()
+
+    def _open(self, sources):
+        self._file_index += 1
+        name = f"{self.device}-{time.strftime('%Y%m%d-%H%M%S')}-{self._file_index:03d}{FILE_SUFFIX}"
+        self.path = os.path.join(self.directory, name)
+        self._file = open(self.path, 'wb')
+        header = FILE_HEADER.pack(MAGIC, VERSION, 0, self.device.encode()[:16],
+                                  time.time(), time.monotonic_ns())
+        table = bytearray(header)
+        for source, source_id in sources.items():
+            encoded = source.encode('utf-8', 'replace')[:MAX_PAYLOAD]
+            table += RECORD.pack(time.monotonic_ns(), KIND_SOURCE, source_id, len(encoded))
+            table += encoded
+        self._file.write(table)
+        self._file_bytes = len(table)
+        _log.info("Recording %s serial traffic to %s", self.device, self.path)
+
+    def _prune(self):
+        prefix = f"{self.device}-"
+        files = sorted(name for name in os.listdir(self.directory)
+                       if name.startswith(prefix) and name.endswith(FILE_SUFFIX))
+        for name in files[:max(0, len(files) - self.max_files + 1)]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError as e:
+                _log.warning("Could not remove old serial log %s: %s", name, e)
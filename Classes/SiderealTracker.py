@@ -5,6 +5,18 @@ from astropy.coordinates import SkyCoord, EarthLocation, AltAz
 from astropy.time import Time
 import astropy.units as u
 
+from Classes.Metrics import REGISTRY
+from Classes.Logger import get_logger
+from Classes.CommandScheduler import PRIORITY_TRACKING, PRIORITY_KEEPALIVE
+from Classes.MotionPlanner import MotionPlanner, PROFILES, PROFILE_CONSTANT
+from Classes.MotionExecutor import MotionExecutor
+from Classes.MotorRegistry import default_axes
+
+_log = get_logger("SiderealTracker")
+
+_TRANSFORM = REGISTRY.histogram(
+    'sidereal_transform_seconds', 'SiderealTracker RA/Dec → Alt/Az transform time per tick').labels()
+
 
 class SiderealTracker:
     """
@@ -34,6 +46,15 @@ class SiderealTracker:
     Axis convention matches StarFollower:
         Altitude  : v=1   up=d=1  down=d=0
         Azimuth   : v=0   clockwise=d=1  counter-clockwise=d=0
+    The tracker addresses the logical axes 'alt' and 'az'; pass *axes*
+    (MotorAxis handles, e.g. from MotorRegistry.axes('alt', 'az')) when they
+    are not v=1 / v=0 on motor_control.
+
+    With profile='trapezoid' or 'scurve' each tick is instead planned by
+    MotionPlanner.plan_velocity, starting from the rate the previous tick
+    left the axis at, and streamed as short t=/s= segments by a
+    MotionExecutor.  The next tick is computed while the current one is
+    still moving, so the axes never stop between ticks.
     """
 
     STEPS_PER_DEGREE: float = 400_000 / 360.0   # ≈ 1111.11 steps / degree
@@ -43,14 +64,20 @@ class SiderealTracker:
     _ENABLE_ON  = "e=1\n"
     _ENABLE_OFF = "e=0\n"
 
-    def __init__(self, motor_control):
+    def __init__(self, motor_control, axes=None):
         self.motor = motor_control
+        self._axes = axes or default_axes(motor_control)
         self._lock = threading.Lock()
         # Set → tracking active.  Cleared → threads idle (wait for next start).
         self._active_event = threading.Event()
         self._params: dict = {}
         self._thread: threading.Thread | None = None
         self._keep_alive_thread: threading.Thread | None = None
+        # Profiled mode: one executor per controller, created on first use.
+        self._executors: dict = {}
+        # Guarded by _lock, so stop() can't interleave with a tick's submits.
+        self._plan_end: Time | None = None      # sky time the last queued tick ends at
+        self._plan_futures: list = []
 
     # ------------------------------------------------------------------
     # Public API
@@ -58,7 +85,8 @@ class SiderealTracker:
 
     def start(self, ra_hours: float, dec_deg: float,
               lat: float, lon: float,
-              update_interval: float = 5.0) -> None:
+              update_interval: float = 5.0,
+              profile: str = PROFILE_CONSTANT) -> None:
         """
         Begin sidereal tracking.
 
@@ -70,14 +98,24 @@ class SiderealTracker:
             update_interval – Seconds between motor correction ticks.
                               Steps are spread evenly across this window via t=<ms>
                               so the motor moves continuously, not in a single burst.
+            profile         – 'constant' (one fixed-rate move per tick), or
+                              'trapezoid' / 'scurve' to blend the rate
+                              between ticks (see MotionPlanner).
         """
+        if profile not in PROFILES:
+            raise ValueError(f"profile must be one of {PROFILES}, not {profile!r}")
         with self._lock:
+            if not self._active_event.is_set():
+                # Resuming: the next tick starts from now, not where the old run left off.
+                self._plan_end = None
+                self._plan_futures = []
             self._params = {
                 'ra_hours':        float(ra_hours),
                 'dec_deg':         float(dec_deg),
                 'lat':             float(lat),
                 'lon':             float(lon),
                 'update_interval': float(update_interval),
+                'profile':         profile,
             }
 
         self._active_event.set()
@@ -86,21 +124,26 @@ class SiderealTracker:
             self._thread = threading.Thread(target=self._run, daemon=True,
                                             name="SiderealTrackerThread")
             self._thread.start()
-            print("[SiderealTracker] Tracking thread started.")
+            _log.info("Tracking thread started.")
         else:
-            print("[SiderealTracker] Parameters updated; existing thread will use new values.")
+            _log.info("Parameters updated; existing thread will use new values.")
 
         if self._keep_alive_thread is None or not self._keep_alive_thread.is_alive():
             self._keep_alive_thread = threading.Thread(
                 target=self._run_keep_alive, daemon=True,
                 name="SiderealTrackerKeepAliveThread")
             self._keep_alive_thread.start()
-            print("[SiderealTracker] Keep-alive thread started.")
+            _log.info("Keep-alive thread started.")
 
     def stop(self) -> None:
         """Pause tracking.  Threads stay alive and resume on the next start() call."""
-        self._active_event.clear()
-        print("[SiderealTracker] Stopped.")
+        with self._lock:
+            self._active_event.clear()
+            for executor in list(self._executors.values()):
+                executor.cancel()
+            self._plan_end = None
+            self._plan_futures = []
+        _log.info("Stopped.")
 
     def get_status(self) -> dict:
         """Return current state and parameters (safe for JSON serialisation)."""
@@ -121,7 +164,7 @@ class SiderealTracker:
         Idles (blocks on _active_event) when stop() has been called.
         Wakes and resumes tracking immediately when start() is called again.
         """
-        print("[SiderealTracker] Thread ready.")
+        _log.info("Thread ready.")
         while True:
             # Block here — no CPU burn — until start() sets the event.
             self._active_event.wait()
@@ -132,47 +175,30 @@ class SiderealTracker:
                     continue
                 p = dict(self._params)
 
-            ra_hours        = p['ra_hours']
-            dec_deg         = p['dec_deg']
-            lat             = p['lat']
-            lon             = p['lon']
             update_interval = p['update_interval']
+            if p['profile'] != PROFILE_CONSTANT:
+                self._profiled_tick(p)
+                continue
+            with self._lock:
+                self._plan_end = None
 
             # ---- Compute sidereal drift for the next interval ----------
             t1 = Time.now()
             t2 = t1 + update_interval * u.second
+            altaz1, d_alt, d_az = self._drift(p, t1, t2)
 
-            location = EarthLocation(lat=lat * u.deg, lon=lon * u.deg)
-            star     = SkyCoord(ra=ra_hours * u.hour,
-                                dec=dec_deg * u.deg,
-                                frame='icrs')
-            frame1 = AltAz(obstime=t1, location=location)
-            frame2 = AltAz(obstime=t2, location=location)
-
-            altaz1 = star.transform_to(frame1)
-            altaz2 = star.transform_to(frame2)
-
-            d_alt = altaz2.alt.deg - altaz1.alt.deg
-
-            # Normalise to [-180°, 180°] to handle the 359° → 0° wrap.
-            d_az = altaz2.az.deg - altaz1.az.deg
-            if d_az > 180.0:
-                d_az -= 360.0
-            elif d_az < -180.0:
-                d_az += 360.0
-
-            print(f"[SiderealTracker] Alt={altaz1.alt.deg:.3f}°  Az={altaz1.az.deg:.3f}°  "
-                  f"Δalt={d_alt * 3600:.3f}\"  Δaz={d_az * 3600:.3f}\"  "
-                  f"interval={update_interval}s")
+            _log.info("Alt=%.3f°  Az=%.3f°  Δalt=%.3f\"  Δaz=%.3f\"  interval=%ss",
+                      altaz1.alt.deg, altaz1.az.deg, d_alt * 3600, d_az * 3600,
+                      update_interval, every=60.0)
 
             # ---- Drive altitude axis ----------------------------------
             steps_alt = round(abs(d_alt) * self.STEPS_PER_DEGREE)
             if steps_alt > 0 and self._active_event.is_set():
                 t_ms_alt = (update_interval * 1000.0) / steps_alt
                 dir_alt  = 1 if d_alt >= 0 else 0    # up=1, down=0
-                print(f"[SiderealTracker] Altitude  steps={steps_alt}  "
-                      f"t={t_ms_alt:.3f}ms/step  dir={'up' if dir_alt else 'down'}")
-                self._send_move(axis=1, direction=dir_alt,
+                _log.debug("Altitude  steps=%d  t=%.3fms/step  dir=%s",
+                           steps_alt, t_ms_alt, 'up' if dir_alt else 'down')
+                self._send_move(axis='alt', direction=dir_alt,
                                 steps=steps_alt, t_ms=t_ms_alt)
 
             # Check for stop() between the two axis moves.
@@ -184,9 +210,9 @@ class SiderealTracker:
             if steps_az > 0 and self._active_event.is_set():
                 t_ms_az = (update_interval * 1000.0) / steps_az
                 dir_az  = 1 if d_az >= 0 else 0    # clockwise=1, ccw=0
-                print(f"[SiderealTracker] Azimuth   steps={steps_az}  "
-                      f"t={t_ms_az:.3f}ms/step  dir={'cw' if dir_az else 'ccw'}")
-                self._send_move(axis=0, direction=dir_az,
+                _log.debug("Azimuth   steps=%d  t=%.3fms/step  dir=%s",
+                           steps_az, t_ms_az, 'cw' if dir_az else 'ccw')
+                self._send_move(axis='az', direction=dir_az,
                                 steps=steps_az, t_ms=t_ms_az)
 
             # ---- Wait for next tick -----------------------------------
@@ -201,29 +227,114 @@ class SiderealTracker:
 
         Mirrors StarFollower._run_keep_alive but covers both axes.
         """
-        print("[SiderealTracker] Keep-alive thread ready.")
+        _log.info("Keep-alive thread ready.")
         while True:
             self._active_event.wait()
 
             while self._active_event.is_set():
-                self.motor.send_command("v=1")   # select altitude axis
-                self.motor.send_command(self._ENABLE_ON)
-                self.motor.send_command("v=0")   # select azimuth axis
-                self.motor.send_command(self._ENABLE_ON)
+                # Queued, not awaited: a newer keep-alive supersedes it.
+                for device, cmds in self._enable_batches(self._ENABLE_ON).items():
+                    device.send_batch(cmds, priority=PRIORITY_KEEPALIVE, wait=False)
                 time.sleep(1)
 
             # De-energise both axes when stopped.
-            self.motor.send_command("v=1")
-            self.motor.send_command(self._ENABLE_OFF)
-            self.motor.send_command("v=0")
-            self.motor.send_command(self._ENABLE_OFF)
-            print("[SiderealTracker] Keep-alive disabled (both axes de-energised).")
+            for device, cmds in self._enable_batches(self._ENABLE_OFF).items():
+                device.send_batch(cmds, priority=PRIORITY_KEEPALIVE)
+            _log.info("Keep-alive disabled (both axes de-energised).")
+
+    def _enable_batches(self, enable_cmd: str) -> dict:
+        """One v=/e= batch per controller: "v=1 e=1 v=0 e=1" when alt and az share a board."""
+        batches: dict = {}
+        for axis in self._axes.values():
+            batches.setdefault(axis.device, []).extend([axis.select, enable_cmd])
+        return batches
+
+    def _profiled_tick(self, p: dict) -> None:
+        """
+        One tick in profiled mode.  The tick's sky interval starts where
+        the previous one ended (so no drift is lost) and ends update_interval
+        after the work already queued, which also absorbs any lag from
+        waiting on move-complete reports.  Returns once the previous tick's
+        plans have finished, keeping one tick queued ahead.
+        """
+        planner = MotionPlanner(profile=p['profile'])
+        interval = p['update_interval']
+
+        backlog = max(self._executor_for(axis).pending_seconds(axis.number)
+                      for axis in self._axes.values())
+        now = Time.now()
+        with self._lock:
+            t1 = self._plan_end if self._plan_end is not None else now
+        t2 = now + (backlog + interval) * u.second
+        altaz1, d_alt, d_az = self._drift(p, t1, t2)
+        _log.info("Alt=%.3f°  Az=%.3f°  Δalt=%.3f\"  Δaz=%.3f\"  interval=%ss  profile=%s",
+                  altaz1.alt.deg, altaz1.az.deg, d_alt * 3600, d_az * 3600,
+                  interval, p['profile'], every=60.0)
+
+        plans = []
+        for name, delta in (('alt', d_alt), ('az', d_az)):
+            axis = self._axes[name]
+            executor = self._executor_for(axis)
+            direction = 1 if delta >= 0 else 0
+            steps = round(abs(delta) * self.STEPS_PER_DEGREE)
+            # Blend from the current rate unless the axis has to reverse.
+            rate = executor.rate(axis.number)
+            start_rate = abs(rate) if (rate >= 0) == (direction == 1) else 0.0
+            plans.append((executor, axis.number, direction,
+                          planner.plan_velocity(steps, interval, start_rate)))
+
+        # Submitted under the lock and only while still active: a stop() in
+        # between has cancelled the executors and reset the plan state.
+        with self._lock:
+            if not self._active_event.is_set():
+                return
+            futures = [executor.submit(number, direction, plan)
+                       for executor, number, direction, plan in plans]
+            self._plan_end = t2
+            previous, self._plan_futures = self._plan_futures, futures
+        for future in previous:
+            try:
+                future.result(timeout=2 * interval + 1.0)
+            except Exception:
+                _log.warning("Previous tick still running; queueing anyway", every=60.0)
+
+    def _executor_for(self, axis) -> MotionExecutor:
+        executor = self._executors.get(axis.device)
+        if executor is None:
+            # Wait for move-complete reports only where the firmware's are configured.
+            executor = self._executors[axis.device] = MotionExecutor(
+                axis.device, wait_for_done=bool(getattr(axis.device, 'move_complete_pattern', None)))
+        return executor
+
+    def _drift(self, p: dict, t1: Time, t2: Time):
+        """Alt/Az at *t1* and the (d_alt, d_az) in degrees the star moves by *t2*."""
+        transform_start = time.perf_counter()
+        location = EarthLocation(lat=p['lat'] * u.deg, lon=p['lon'] * u.deg)
+        star     = SkyCoord(ra=p['ra_hours'] * u.hour,
+                            dec=p['dec_deg'] * u.deg,
+                            frame='icrs')
+        frame1 = AltAz(obstime=t1, location=location)
+        frame2 = AltAz(obstime=t2, location=location)
+
+        altaz1 = star.transform_to(frame1)
+        altaz2 = star.transform_to(frame2)
+        _TRANSFORM.observe(time.perf_counter() - transform_start)
+
+        d_alt = altaz2.alt.deg - altaz1.alt.deg
+
+        # Normalise to [-180°, 180°] to handle the 359° → 0° wrap.
+        d_az = altaz2.az.deg - altaz1.az.deg
+        if d_az > 180.0:
+            d_az -= 360.0
+        elif d_az < -180.0:
+            d_az += 360.0
+        return altaz1, d_alt, d_az
 
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
 
-    def _send_move(self, axis: int, direction: int,
+    def _send_move(self, axis: str, direction: int,
                    steps: int, t_ms: float) -> None:
         """
         Send the four-command sequence for a single-axis move.
@@ -234,13 +345,16 @@ class SiderealTracker:
 
         The 't' command sets the inter-step delay in milliseconds; the
         's' command sets the step count and triggers the move.
+
+        The four commands go out as one batch (a single serial write), so the
+        keep-alive thread's v= cannot re-select the axis mid-sequence.
+        *axis* is 'alt' or 'az'; its handle supplies the controller and v=.
         """
+        handle = self._axes[axis]
         cmds = [
-            f"v={axis}",
             f"d={direction}",
             f"t={t_ms:.3f}",
             f"s={steps}",
         ]
-        for cmd in cmds:
-            if not self.motor.send_command(cmd):
-                print(f"[SiderealTracker] Warning: failed to send '{cmd}'")
+        if not handle.send_batch(cmds, priority=PRIORITY_TRACKING):
+            _log.warning("Failed to send move on %s: %s", axis, cmds, every=10.0)
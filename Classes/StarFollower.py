@@ -2,7 +2,22 @@ import cv2
 import numpy as np
 import threading
 import time
-import requests
+
+from Classes.Metrics import REGISTRY
+from Classes.Logger import get_logger
+from Classes.CommandScheduler import PRIORITY_TRACKING, PRIORITY_KEEPALIVE
+from Classes.MotionPlanner import MotionPlanner, PROFILES, PROFILE_CONSTANT
+from Classes.MotionExecutor import MotionExecutor
+from Classes.StateShadow import split_commands
+from Classes.MotorRegistry import default_axes
+from Classes.FrameSource import DECODE_SCALES, to_full
+
+_log = get_logger("StarFollower")
+
+_FIND_STAR = REGISTRY.histogram(
+    'star_follower_find_star_seconds', 'StarFollower._find_star compute time').labels()
+_CYCLE_PERIOD = REGISTRY.histogram(
+    'star_follower_cycle_seconds', 'Time between successive StarFollower correction cycles').labels()
 
 
 class StarFollower:
@@ -18,31 +33,58 @@ class StarFollower:
         Down  – v=1\\nd=0
         Left  – v=0\\nd=0
         Right – v=0\\nd=1
+    i.e. the logical axes 'alt' (v=1) and 'az' (v=0).  Pass *axes*
+    (MotorAxis handles, e.g. from MotorRegistry.axes('alt', 'az')) when
+    they live elsewhere.
+
+    With profile='trapezoid' or 'scurve' a correction is planned by
+    MotionPlanner.plan_move (ramped up to the speed_cmd rate and back down
+    to rest) instead of one fixed-rate move, and the next frame is taken
+    once the move has finished rather than while the mount is still moving.
+
+    Frames can be searched at reduced resolution (scale=4: 1/16 of the
+    pixels to decode and filter), per start() or the camera's FrameSource
+    decode profile; the default is full resolution.  At a reduced scale,
+    only when the coarse position is too close to the dead-zone edge to
+    decide on a correction is the frame decoded in full and the centroid
+    refined in a small window around it.
     """
 
-    # Raw Arduino serial direction strings
-    _CMD_UP    = "v=1\nd=1\n"
-    _CMD_DOWN  = "v=1\nd=0\n"    
-    _CMD_LEFT  = "v=0\nd=0\n"
-    _CMD_RIGHT = "v=0\nd=1\n"
+    # Correction directions: logical axis and d= value
+    _DIRECTIONS = {
+        'up':    ('alt', 1),
+        'down':  ('alt', 0),
+        'left':  ('az', 0),
+        'right': ('az', 1),
+    }
+    # _find_star detection threshold (DoG peak, in σ of the DoG image) by
+    # decode scale.  Scales above 1 were calibrated on the synthetic frames
+    # of Benchmarks/bench_decode_scale.py only: no-star peaks ~41σ / 20σ /
+    # 10σ, stars ≥ 80σ / 47σ / 27σ at scale 2 / 4 / 8.
+    _MIN_SIGMA = {1: 80, 2: 55, 4: 35, 8: 20}
+    # Seconds after the last motor activity before a frame counts as still.
+    SETTLE_TIME = 0.2
     _ALWAYS_ENABLE_ON = "e=1\n"  
     _ALWAYS_ENABLE_OFF = "e=0\n"  
 
-    def __init__(self, motor_control):
+    def __init__(self, motor_control, axes=None):
         self.motor = motor_control
+        self._axes = axes or default_axes(motor_control)
         self._lock = threading.Lock()
         # Set   → loop is active.   Cleared → loop idles (waits to be re-activated).
         self._active_event = threading.Event()
         self._params: dict = {}
         self._thread: threading.Thread | None = None
         self._keep_alive_thread: threading.Thread | None = None
+        self._executors: dict = {}      # controller → MotionExecutor, on first use
 
     # ------------------------------------------------------------------
     # Public API (called by the HTTP handler; never block the server)
     # ------------------------------------------------------------------
 
     def start(self, duration: float, threshold: float,
-              steps_cmd: str, speed_cmd: str, camera_device) -> None:
+              steps_cmd: str, speed_cmd: str, camera_device,
+              profile: str = PROFILE_CONSTANT, scale: int | None = None) -> None:
         """
         Activate (or update) the auto-centre loop.
 
@@ -57,7 +99,17 @@ class StarFollower:
             speed_cmd      – raw Arduino serial string that sets the move speed
                              (e.g. "sp=50").
             camera_device  – CameraDevice instance to grab frames from.
+            profile        – 'constant' (raw commands, as before), or
+                             'trapezoid' / 'scurve' for planned moves; then
+                             a t=<ms> speed_cmd sets the cruise rate.
+            scale          – detection resolution, 1/scale of the frame in each
+                             direction (one of DECODE_SCALES); None uses the
+                             camera's decode profile.
         """
+        if profile not in PROFILES:
+            raise ValueError(f"profile must be one of {PROFILES}, not {profile!r}")
+        if scale is not None and scale not in DECODE_SCALES:
+            raise ValueError(f"scale must be one of {DECODE_SCALES}, not {scale!r}")
         with self._lock:
             self._params = {
                 'duration':      float(duration),
@@ -65,6 +117,8 @@ class StarFollower:
                 'steps_cmd':     steps_cmd,
                 'speed_cmd':     speed_cmd,
                 'camera_device': camera_device,
+                'profile':       profile,
+                'scale':         scale,
             }
 
         # Tell the running thread to (re)start work
@@ -75,21 +129,23 @@ class StarFollower:
             self._thread = threading.Thread(target=self._run, daemon=True,
                                             name="StarFollowerThread")
             self._thread.start()
-            print("[StarFollower] Background thread started.")
+            _log.info("Background thread started.")
         else:
-            print("[StarFollower] Parameters updated; existing thread will use new values.")
+            _log.info("Parameters updated; existing thread will use new values.")
 
         # Spawn the keep-alive thread only once
         if self._keep_alive_thread is None or not self._keep_alive_thread.is_alive():
             self._keep_alive_thread = threading.Thread(target=self._run_keep_alive, daemon=True,
                                                        name="StarFollowerKeepAliveThread")
             self._keep_alive_thread.start()
-            print("[StarFollower] Keep-alive thread started.")
+            _log.info("Keep-alive thread started.")
 
     def stop(self) -> None:
         """Pause the auto-centre loop.  The background thread keeps running but idles."""
         self._active_event.clear()
-        print("[StarFollower] Stopped.")
+        for executor in list(self._executors.values()):
+            executor.cancel()
+        _log.info("Stopped.")
 
     def get_status(self) -> dict:
         """Return the current state and parameters (safe for JSON serialisation)."""
@@ -120,7 +176,7 @@ class StarFollower:
             offset_y_pct   – vertical offset from centre as % of frame height
                              (positive = star is below centre)
         """
-        frame = self._capture_frame(camera_device)
+        frame = camera_device.frame_source.capture('star_follower', scale=1)
         if frame is None:
             return {'found': False, 'error': 'Could not capture frame'}
 
@@ -178,11 +234,19 @@ class StarFollower:
         Idles (blocks on _active_event) when stop() has been called.
         Wakes immediately and restarts work when start() is called again.
         """
-        print("[StarFollower] Thread ready.")
+        _log.info("Thread ready.")
+        last_cycle = None
         while True:
             # Block here – no CPU burn – until start() sets the event
+            if not self._active_event.is_set():
+                last_cycle = None   # don't count idle time as a cycle
             self._active_event.wait()
 
+            now = time.perf_counter()
+            if last_cycle is not None:
+                _CYCLE_PERIOD.observe(now - last_cycle)
+            last_cycle = now
+
             # Snapshot params under the lock so start() can safely update them
             with self._lock:
                 if not self._params:
@@ -196,20 +260,41 @@ class StarFollower:
             steps_cmd     = p['steps_cmd']
             speed_cmd     = p['speed_cmd']
             camera        = p['camera_device']
+            profile       = p['profile']
+            source        = camera.frame_source
+            scale         = p['scale'] or source.decode_profiles.get('star_follower', 1)
+            moves         = []
 
             # ---- Capture frame ----------------------------------------
-            frame = self._capture_frame(camera)
+            # A frame read after this point and SETTLE_TIME after the mount
+            # stops moving, so last cycle's corrections don't smear it.  The
+            # 2 s timeout starts once the move is expected to have settled.
+            frame = source.capture('star_follower', since=time.monotonic(), scale=scale,
+                                   timeout=2.0, settle=self.SETTLE_TIME)
             if frame is None:
-                print("[StarFollower] Frame capture failed, retrying after delay...")
+                _log.warning("Frame capture failed, retrying after delay...", every=30.0)
                 time.sleep(duration)
                 continue
 
             h, w = frame.shape[:2]
+            h, w = h * scale, w * scale
 
             # ---- Detect star ------------------------------------------
-            star = self._find_star(frame)
+            find_start = time.perf_counter()
+            star = self._find_star(frame, scale)
+            if star is not None:
+                star = to_full(*star, scale)
+                # Too close to the dead-zone edge to call at this resolution:
+                # decode the newest frame (this one, or one read moments later
+                # with the mount at rest) in full and refine around the star.
+                if scale > 1 and self._undecided(star, w, h, threshold_pct, scale):
+                    full = source.capture('star_follower', scale=1)
+                    if full is not None:
+                        h, w = full.shape[:2]
+                        star = self._refine(full, star, 2 * scale + 6)
+            _FIND_STAR.observe(time.perf_counter() - find_start)
             if star is None:
-                print("[StarFollower] No star detected in frame.")
+                _log.info("No star detected in frame.", every=30.0)
                 time.sleep(duration)
                 continue
 
@@ -220,16 +305,15 @@ class StarFollower:
             offset_x_pct = abs(dx) / w * 100
             offset_y_pct = abs(dy) / h * 100
 
-            print(f"[StarFollower] Star at ({cx}, {cy})  "
-                  f"offset_x={offset_x_pct:.1f}%  offset_y={offset_y_pct:.1f}%  "
-                  f"(threshold={threshold_pct}%)")
+            _log.debug("Star at (%.1f, %.1f)  offset_x=%.1f%%  offset_y=%.1f%%  (threshold=%s%%)",
+                       cx, cy, offset_x_pct, offset_y_pct, threshold_pct)
 
             # ---- Horizontal correction --------------------------------
             if offset_x_pct > threshold_pct:
-                direction = self._CMD_RIGHT if dx > 0 else self._CMD_LEFT
-                axis_name = "right" if dx > 0 else "left"
-                print(f"[StarFollower] Correcting horizontal → {axis_name}")
-                self._send_move(speed_cmd, steps_cmd, direction)
+                direction = "right" if dx > 0 else "left"
+                axis_name = direction
+                _log.debug("Correcting horizontal → %s", axis_name)
+                moves.append(self._correct(speed_cmd, steps_cmd, direction, profile))
 
             # Re-check: stop() may have been called during the motor send
             if not self._active_event.is_set():
@@ -237,15 +321,23 @@ class StarFollower:
 
             # ---- Vertical correction ----------------------------------
             if offset_y_pct > threshold_pct:
-                direction = self._CMD_DOWN if dy > 0 else self._CMD_UP
-                axis_name = "down" if dy > 0 else "up"
-                print(f"[StarFollower] Correcting vertical → {axis_name}")
-                self._send_move(speed_cmd, steps_cmd, direction)
+                direction = "down" if dy > 0 else "up"
+                axis_name = direction
+                _log.debug("Correcting vertical → %s", axis_name)
+                moves.append(self._correct(speed_cmd, steps_cmd, direction, profile))
 
             # ---- Wait for next cycle ---------------------------------
-            # time.sleep returns after `duration` seconds; stop() will take
-            # effect at the latest after the current sleep expires.
-            time.sleep(duration)
+            # Planned moves: let them finish (within the cycle) so the next
+            # frame isn't smeared.  time.sleep returns after `duration`
+            # seconds; stop() will take effect at the latest after it expires.
+            cycle_end = time.perf_counter() + duration
+            for move in moves:
+                if move is not None:
+                    try:
+                        move.result(timeout=max(0.0, cycle_end - time.perf_counter()))
+                    except Exception:
+                        _log.debug("Planned move still running at the end of the cycle")
+            time.sleep(max(0.0, cycle_end - time.perf_counter()))
 
     # ------------------------------------------------------------------
     # Internal helpers
@@ -259,32 +351,76 @@ class StarFollower:
         While active  – sends v=1 (select vertical axis) + e=1 every second.
         When stopped  – sends v=1 + e=0 once, then idles until re-activated.
         """
-        print("[StarFollower] Keep-alive thread ready.")
+        _log.info("Keep-alive thread ready.")
         while True:
             # Block here until start() sets the event
             self._active_event.wait()
 
             # Inner loop: send keep-alive every second while active
             while self._active_event.is_set():
-                self.motor.send_command("v=1")  # select up/down motor
-                self.motor.send_command(self._ALWAYS_ENABLE_ON)
+                # select up/down motor + enable, as one block
+                # Queued, not awaited: a newer keep-alive supersedes it.
+                self._axes['alt'].send_batch([self._ALWAYS_ENABLE_ON],
+                                             priority=PRIORITY_KEEPALIVE, wait=False)
                 time.sleep(1)
 
             # Active event cleared: release motor hold
-            self.motor.send_command("v=1")  # select up/down motor
-            self.motor.send_command(self._ALWAYS_ENABLE_OFF)
-            print("[StarFollower] Keep-alive disabled (e=0 sent to up/down motor).")
+            self._axes['alt'].send_batch([self._ALWAYS_ENABLE_OFF], priority=PRIORITY_KEEPALIVE)
+            _log.info("Keep-alive disabled (e=0 sent to up/down motor).")
 
-    def _send_move(self, speed_cmd: str, steps_cmd: str, direction_cmd: str) -> None:
-        """Send the three-stage command sequence: speed → steps → direction."""
-        for cmd in (speed_cmd, steps_cmd, direction_cmd):
-            if not self.motor.send_command(cmd):
-                print(f"[StarFollower] Warning: failed to send command: '{cmd}'")
+    def _correct(self, speed_cmd: str, steps_cmd: str, direction: str, profile: str):
+        """Send one correction; returns the planned move's Future, or None."""
+        if profile == PROFILE_CONSTANT:
+            self._send_move(speed_cmd, steps_cmd, direction)
+            return None
+        return self._send_planned_move(speed_cmd, steps_cmd, direction, profile)
 
-    def _find_star(self, frame) -> tuple[int, int] | None:
+    def _send_planned_move(self, speed_cmd: str, steps_cmd: str, direction: str, profile: str):
+        """
+        Plan the correction (s= from steps_cmd, cruise rate from a t=<ms>
+        speed_cmd) and hand it to the axis' executor, replacing whatever is
+        still queued for that axis.
+        """
+        values = dict(command.partition('=')[::2] for command in split_commands([speed_cmd, steps_cmd]))
+        try:
+            steps = int(float(values['s']))
+            delay_ms = float(values.get('t', 0))
+        except (KeyError, ValueError):
+            _log.warning("Cannot plan move from %r %r; sending it as-is",
+                         speed_cmd, steps_cmd, every=60.0)
+            self._send_move(speed_cmd, steps_cmd, direction)
+            return None
+        axis_name, d = self._DIRECTIONS[direction]
+        axis = self._axes[axis_name]
+        planner = MotionPlanner(profile=profile)
+        if delay_ms > 0:
+            planner.max_speed = 1000.0 / delay_ms
+        executor = self._executors.get(axis.device)
+        if executor is None:
+            executor = self._executors[axis.device] = MotionExecutor(
+                axis.device, wait_for_done=bool(getattr(axis.device, 'move_complete_pattern', None)))
+        return executor.submit(axis.number, d, planner.plan_move(steps), replace=True)
+
+    def _send_move(self, speed_cmd: str, steps_cmd: str, direction: str) -> None:
+        """
+        Send the three-stage command sequence: speed → steps → direction
+        (v=/d= for *direction*, on the controller that owns that axis).
+        Sent as one batch so the keep-alive thread's v= cannot re-select the
+        axis in the middle of the move.
+        """
+        axis_name, d = self._DIRECTIONS[direction]
+        axis = self._axes[axis_name]
+        cmds = [speed_cmd, steps_cmd, f"{axis.select}\nd={d}\n"]
+        if not axis.device.send_batch(cmds, priority=PRIORITY_TRACKING):
+            _log.warning("Failed to send move: %s", cmds, every=10.0)
+
+    def _find_star(self, frame, scale=1) -> tuple[int, int] | None:
         """
         Locate the brightest star in a grayscale frame.
 
+        *scale* says the frame is reduced 1/scale in each direction; the
+        filter kernels shrink with it so a star still matches the tight blur.
+
         Pipeline:
             1. Gaussian blur  – merges star pixels into a smooth blob and
                                suppresses isolated hot pixels / noise.
@@ -296,11 +432,13 @@ class StarFollower:
         levels rather than separating star from sky, producing wildly wrong
         centroids.
 
-        Returns (cx, cy) in pixel coordinates, or None if the frame is too dark.
+        Returns (cx, cy) in pixel coordinates of *frame*, or None if the frame
+        is too dark.
         """
         # Step 1: float background subtraction (removes slow sky gradient).
         frame_f      = frame.astype(np.float32)
-        background_f = cv2.GaussianBlur(frame_f, (51, 51), 0)
+        k            = _kernel(51, scale)
+        background_f = cv2.GaussianBlur(frame_f, (k, k), 0)
         residual_f   = frame_f - background_f
 
         # Step 2: Difference of Gaussians (DoG) — the key point-source filter.
@@ -308,8 +446,9 @@ class StarFollower:
         # blur sees it strongly and the wide blur sees it weakly → big difference.
         # A JPEG compression block artifact (8+ px wide) gives a SMALL DoG
         # response because both blur sizes see it with similar amplitude → near 0.
-        tight = cv2.GaussianBlur(residual_f, (5, 5), 1)
-        wide  = cv2.GaussianBlur(residual_f, (21, 21), 5)
+        k_tight, k_wide = _kernel(5, scale), _kernel(21, scale)
+        tight = cv2.GaussianBlur(residual_f, (k_tight, k_tight), max(1.0 / scale, 0.5))
+        wide  = cv2.GaussianBlur(residual_f, (k_wide, k_wide), 5.0 / scale)
         dog   = tight - wide   # strong only for point-source-sized features
 
         # Step 3: find the brightest point in the DoG image.
@@ -324,70 +463,44 @@ class StarFollower:
             return None
 
         # no-star artifact: ~55-68σ  |  real star: ~131-290σ
-        # Threshold at 100σ sits cleanly in the gap.
+        # Threshold at 100σ sits cleanly in the gap.  Reduced frames average
+        # the noise away and the star with it, so both fall; see _MIN_SIGMA.
         sigma = (max_val - mean) / std
-        if sigma < 80:
+        if sigma < self._MIN_SIGMA[scale]:
             return None
 
         return max_loc  # (cx, cy)
 
-    def _capture_frame(self, camera_device):
-        """
-        Capture a single grayscale frame from *camera_device*.
-
-        Mirrors the capture strategy used by CameraRotationFinder and PlateSolver:
-            1. HTTP snapshot (MJPG streams)
-            2. RTSP capture  (H264 streams)
-            3. Direct device access (fallback)
+    @staticmethod
+    def _undecided(star, w, h, threshold_pct, scale) -> bool:
+        """True if *star* lies within *scale* pixels of the dead-zone edge on either axis."""
+        cx, cy = star
+        return (abs(abs(cx - w / 2) - w * threshold_pct / 100) <= scale or
+                abs(abs(cy - h / 2) - h * threshold_pct / 100) <= scale)
 
-        Returns a grayscale numpy array (rotated 180°), or None on failure.
+    @staticmethod
+    def _refine(frame, star, radius) -> tuple[float, float]:
         """
-        if not camera_device.video_device:
-            camera_device.video_device = camera_device.get_camera_device_by_type()
-
-        # ---- Strategy 1: HTTP snapshot (MJPG) -------------------------
-        if camera_device.camera_type == "MJPG":
-            url = f"http://localhost:{camera_device.video_port}/?action=snapshot"
-            try:
-                response = requests.get(url, timeout=2)
-                if response.status_code == 200:
-                    arr = np.asarray(bytearray(response.content), dtype=np.uint8)
-                    frame = cv2.imdecode(arr, cv2.IMREAD_GRAYSCALE)
-                    if frame is not None:
-                        return cv2.rotate(frame, cv2.ROTATE_180)
-            except Exception as e:
-                print(f"[StarFollower] MJPG snapshot failed: {e}")
-
-        # ---- Strategy 2: RTSP capture (H264) --------------------------
-        elif camera_device.camera_type == "H264":
-            rtsp_url = f"rtsp://localhost:{camera_device.rtsp_port}/cam"
-            try:
-                cap = cv2.VideoCapture(rtsp_url)
-                if cap.isOpened():
-                    ret, frame_bgr = cap.read()
-                    cap.release()
-                    if ret and frame_bgr is not None:
-                        gray = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2GRAY)
-                        return cv2.rotate(gray, cv2.ROTATE_180)
-            except Exception as e:
-                print(f"[StarFollower] RTSP capture failed: {e}")
-
-        # ---- Strategy 3: Direct device access (fallback) --------------
-        if camera_device.video_device:
-            cap = None
-            try:
-                cap = cv2.VideoCapture(camera_device.video_device)
-                if cap.isOpened():
-                    for _ in range(5):   # flush stale buffered frames
-                        cap.read()
-                    ret, frame_bgr = cap.read()
-                    if ret and frame_bgr is not None:
-                        gray = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2GRAY)
-                        return cv2.rotate(gray, cv2.ROTATE_180)
-            except Exception as e:
-                print(f"[StarFollower] Direct capture failed: {e}")
-            finally:
-                if cap:
-                    cap.release()
-
-        return None
+        Sub-pixel centroid of the star near *star* in a full-resolution frame:
+        intensity-weighted mean of the pixels in a (2·radius+1)² window that
+        stand out from its median by more than a quarter of the peak.
+        """
+        h, w = frame.shape[:2]
+        x, y = int(round(star[0])), int(round(star[1]))
+        x0, y0 = max(0, x - radius), max(0, y - radius)
+        roi = frame[y0:max(0, min(h, y + radius + 1)), x0:max(0, min(w, x + radius + 1))].astype(np.float32)
+        if roi.size == 0:
+            return star
+        floor = float(np.median(roi))
+        roi -= floor + (float(roi.max()) - floor) / 4
+        np.maximum(roi, 0, out=roi)
+        total = float(roi.sum())
+        if total <= 0:
+            return star
+        ys, xs = np.indices(roi.shape)
+        return x0 + float((xs * roi).sum()) / total, y0 + float((ys * roi).sum()) / total
+
+
+def _kernel(size, scale) -> int:
+    """Odd Gaussian kernel size for a full-resolution *size* at 1/scale."""
+    return max(3, int(size / scale) // 2 * 2 + 1)
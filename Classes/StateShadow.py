@@ -0,0 +1,207 @@
+import threading
+import time
+
+from Classes.Metrics import REGISTRY
+
+_ELIDED_COMMANDS = REGISTRY.counter(
+    'motor_serial_elided_commands_total', 'Modal commands skipped because the controller already had that state',
+    labels=('device',))
+_ELIDED_BYTES = REGISTRY.counter(
+    'motor_serial_elided_bytes_total', 'Serial bytes saved by modal state shadowing',
+    labels=('device',))
+
+
+# Modal keys.  'v' selects the axis; the others belong to the selected axis.
+AXIS_KEY = 'v'
+AXIS_MODAL_KEYS = ('d', 't', 'e')
+ACTION_KEYS = ('s',)      # always sent; s=N starts a move on the selected axis
+
+
+def split_commands(commands) -> list[str]:
+    """Flatten a batch into single commands: "v=1\\nd=0" counts as two, blanks dropped."""
+    flat = []
+    for command in commands:
+        for part in command.split("\n"):
+            part = part.strip()
+            if part:
+                flat.append(part)
+    return flat
+
+
+class StateShadow:
+    """
+    Host-side copy of the Arduino's modal state: the selected axis (v=) and,
+    per axis, direction (d=), step delay (t=) and enable (e=).  As in the
+    rest of this code, d=/t=/e= are taken to apply to the axis last
+    selected with v=.
+
+    filter() rewrites a batch to the minimum that still leaves the
+    controller in the requested state: a modal command whose value the
+    controller already has is dropped, and a v= is held back until some
+    later command (in this or a following batch) actually needs that axis
+    selected.  So a steady keep-alive "v=1 e=1 v=0 e=1" costs nothing once
+    both axes are enabled.
+
+    Anything not understood (unknown keys, malformed values) is passed
+    through and invalidates the shadow, as its effect on the modes is
+    unknown.  max_state_age, if set, makes values older than that many
+    seconds count as unknown, so they get re-sent periodically.
+
+    Call filter() from the serial writer only, in wire order.
+    """
+
+    def __init__(self, max_state_age=None, device="mount"):
+        self.max_state_age = max_state_age
+        self._elided_commands = _ELIDED_COMMANDS.labels(device)
+        self._elided_bytes = _ELIDED_BYTES.labels(device)
+        self._lock = threading.Lock()
+        # What we believe the controller has: key → (value, written_at).
+        # Axis-modal keys are stored as (axis, key).
+        self._known: dict = {}
+        # Last requested value for every key, kept across invalidate() so
+        # resync_commands() can rebuild the full state.
+        self._requested: dict = {}
+        # A v= the caller asked for but nothing has needed yet.  It carries
+        # over to later batches, so a bare "s=N" still goes to that axis.
+        self._pending_axis = None
+        self.commands_in = 0
+        self.commands_out = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    # ------------------------------------------------------------------
+    # Writer side
+    # ------------------------------------------------------------------
+
+    def filter(self, commands, now=None, force=False) -> list[str]:
+        """
+        Return the commands that actually need writing.  force=True writes
+        everything as given (resync) while still recording the state.
+        """
+        if now is None:
+            now = time.monotonic()
+        commands = split_commands(commands)
+        out = []
+        with self._lock:
+            selected = self._value_locked(AXIS_KEY, now)
+            pending_axis = self._pending_axis
+            for command in commands:
+                key, _, raw = command.partition('=')
+                value = _normalise(raw)
+                if key == AXIS_KEY and value is not None:
+                    self._requested[AXIS_KEY] = value
+                    if force:
+                        out.append(command)
+                        selected, pending_axis = value, None
+                        self._known[AXIS_KEY] = (selected, now)
+                    else:
+                        pending_axis = None if value == selected else value
+                    continue
+                axis = pending_axis if pending_axis is not None else selected
+                if key in AXIS_MODAL_KEYS and value is not None and axis is not None:
+                    self._requested[(axis, key)] = value
+                    if not force and self._value_locked((axis, key), now) == value:
+                        continue
+                    if pending_axis is not None:
+                        out.append(f"v={pending_axis}")
+                        selected, pending_axis = pending_axis, None
+                        self._known[AXIS_KEY] = (selected, now)
+                    out.append(command)
+                    self._known[(axis, key)] = (value, now)
+                    continue
+                # Actions and anything unrecognised need the axis selected.
+                if pending_axis is not None:
+                    out.append(f"v={pending_axis}")
+                    selected, pending_axis = pending_axis, None
+                    self._known[AXIS_KEY] = (selected, now)
+                out.append(command)
+                if key in AXIS_MODAL_KEYS and value is not None:
+                    # No axis known: it landed on one of them, we can't say which.
+                    for known_key in [k for k in self._known if isinstance(k, tuple) and k[1] == key]:
+                        del self._known[known_key]
+                    continue
+                if key not in ACTION_KEYS:
+                    self._known.clear()
+                    selected = None
+
+            self._pending_axis = pending_axis
+            self.commands_in += len(commands)
+            self.commands_out += len(out)
+            bytes_in = sum(len(c) + 1 for c in commands)
+            bytes_out = sum(len(c) + 1 for c in out)
+            self.bytes_in += bytes_in
+            self.bytes_out += bytes_out
+        self._elided_commands.inc(len(commands) - len(out))
+        self._elided_bytes.inc(bytes_in - bytes_out)
+        return out
+
+    def _value_locked(self, key, now):
+        entry = self._known.get(key)
+        if entry is None:
+            return None
+        value, written_at = entry
+        if self.max_state_age is not None and now - written_at > self.max_state_age:
+            return None
+        return value
+
+    # ------------------------------------------------------------------
+    # Resync
+    # ------------------------------------------------------------------
+
+    def invalidate(self) -> None:
+        """Forget what the controller has (write error, reconnect, desync)."""
+        with self._lock:
+            self._known.clear()
+
+    def resync_commands(self) -> list[str]:
+        """
+        Invalidate and return the commands that re-apply every requested
+        value: per-axis d/t/e, then the selected axis last.  Write them with
+        filter(..., force=True).
+        """
+        with self._lock:
+            self._known.clear()
+            requested = dict(self._requested)
+        commands = []
+        axes = sorted({key[0] for key in requested if isinstance(key, tuple)})
+        for axis in axes:
+            commands.append(f"v={axis}")
+            for key in AXIS_MODAL_KEYS:
+                if (axis, key) in requested:
+                    commands.append(f"{key}={requested[(axis, key)]}")
+        if AXIS_KEY in requested:
+            commands.append(f"v={requested[AXIS_KEY]}")
+        return commands
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            now = time.monotonic()
+            known = {}
+            for key in list(self._known):
+                value = self._value_locked(key, now)
+                if value is None:
+                    continue
+                if isinstance(key, tuple):
+                    known.setdefault(f"axis{key[0]}", {})[key[1]] = value
+                else:
+                    known[key] = value
+            return {
+                'known':        known,
+                'commands_in':  self.commands_in,
+                'commands_out': self.commands_out,
+                'bytes_in':     self.bytes_in,
+                'bytes_out':    self.bytes_out,
+                'bytes_saved':  self.bytes_in - self.bytes_out,
+            }
+
+
+def _normalise(raw: str):
+    """Canonical text for a modal value ("2.000" and "2" are the same delay), or None."""
+    raw = raw.strip()
+    if not raw:
+        return None
+    try:
+        number = float(raw)
+    except ValueError:
+        return None
+    return f"{number:g}" if number != int(number) else str(int(number))
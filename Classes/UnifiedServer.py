@@ -1,4 +1,5 @@
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from http.server import HTTPServer, BaseHTTPRequestHandler
 import urllib.parse
 import sys
@@ -6,94 +7,513 @@ import os
 
 # Robust import for MotorControl
 try:
-    from Classes.MotorsControl import MotorControl
+    from Classes.MotorRegistry import MotorRegistry
     from Classes.CameraDevice import CameraDevice
-    from Classes.CameraRotationFinder import CameraRotationFinder
-    from Classes.PlateSolver import PlateSolver
-    from Classes.StarFollower import StarFollower
-    from Classes.SiderealTracker import SiderealTracker
+    from Classes.JobManager import JobManager, JobQueueFull
+    from Classes.JogChannel import JogChannel
+    from Classes.LazySubsystem import LazySubsystem
+    from Classes.Metrics import REGISTRY
+    from Classes.Logger import WRITER as LOG_WRITER, get_logger
+    from Classes.MotionPlanner import PROFILES, PROFILE_CONSTANT
+    from Classes.FrameSource import DECODE_SCALES
 except (ImportError, ModuleNotFoundError):
     # Fallback if run directly or path issues
     sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-    from Classes.MotorsControl import MotorControl
+    from Classes.MotorRegistry import MotorRegistry
     from Classes.CameraDevice import CameraDevice
-    from Classes.CameraRotationFinder import CameraRotationFinder
-    from Classes.PlateSolver import PlateSolver
-    from Classes.StarFollower import StarFollower
-    from Classes.SiderealTracker import SiderealTracker
-
+    from Classes.JobManager import JobManager, JobQueueFull
+    from Classes.JogChannel import JogChannel
+    from Classes.LazySubsystem import LazySubsystem
+    from Classes.Metrics import REGISTRY
+    from Classes.Logger import WRITER as LOG_WRITER, get_logger
+    from Classes.MotionPlanner import PROFILES, PROFILE_CONSTANT
+    from Classes.FrameSource import DECODE_SCALES
+
+# The vision and tracking subsystems (cv2, numpy, astropy) are imported
+# lazily through LazySubsystem; see TelescopeServer.start().
+
+import json
+import select
+import socket
 import subprocess
 import os
 import glob
 import time
 
 
+_log = get_logger("UnifiedServer")
+
+_HTTP_REQUESTS = REGISTRY.counter(
+    'http_requests_total', 'HTTP requests by route, method and status code',
+    labels=('route', 'method', 'code'))
+_HTTP_LATENCY = REGISTRY.histogram(
+    'http_request_duration_seconds', 'HTTP request handling time by route',
+    labels=('route',))
+
+
+class ConcurrentHTTPServer(HTTPServer):
+    """
+    HTTPServer that hands every accepted connection to a bounded worker pool.
+
+    A slow route (ASTAP solve, rotation check, an open /motor/stream) only
+    occupies one worker, so /motor/write and /ping keep answering while it
+    runs.  At most *max_in_flight* requests (default max_workers) are
+    handled at once; beyond that a request is answered 503 instead of
+    queueing behind the slow ones.  The slot is taken per request, so an
+    idle keep-alive connection holds none: it holds a pool thread, of which
+    there are *max_connections* (default CONNECTIONS_PER_WORKER ×
+    max_workers), until UnifiedHandler.KEEPALIVE_TIMEOUT closes it.  A
+    connection beyond that cap is answered 503 from the accept loop.
+    """
+
+    CONNECTIONS_PER_WORKER = 4
+
+    _BUSY_RESPONSE = (b"HTTP/1.1 503 Service Unavailable\r\n"
+                      b"Content-Type: text/plain\r\n"
+                      b"Content-Length: 11\r\n"
+                      b"Connection: close\r\n\r\n"
+                      b"Server busy")
+
+    def __init__(self, server_address, handler_class,
+                 max_workers=16, max_in_flight=None,
+                 route_timeouts=None, default_timeout=10.0, max_connections=None):
+        super().__init__(server_address, handler_class)
+        if max_in_flight is None:
+            max_in_flight = max_workers
+        if max_connections is None:
+            max_connections = max(max_in_flight, max_workers * self.CONNECTIONS_PER_WORKER)
+        self.max_workers = max_workers
+        self.max_in_flight = max_in_flight
+        self.max_connections = max_connections
+        self.route_timeouts = dict(route_timeouts or {})
+        self.default_timeout = default_timeout
+        self._in_flight = threading.BoundedSemaphore(max_in_flight)     # requests being handled
+        self._connections = threading.BoundedSemaphore(max_connections)  # open connections
+        # Set by server_close(); long-lived streams poll it between reads.
+        self.stopping = threading.Event()
+        # name → LazySubsystem; exposed as attributes, see __getattr__.
+        self.subsystems = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_connections,
+                                            thread_name_prefix="HTTPWorker")
+
+    def __getattr__(self, name):
+        # Only called for attributes not set directly: resolve lazily loaded
+        # subsystems, so handlers keep using self.server.star_follower etc.
+        subsystems = self.__dict__.get('subsystems', {})
+        if name in subsystems:
+            return subsystems[name].get()
+        raise AttributeError(name)
+
+    def loaded_subsystem(self, name):
+        """Return the subsystem if it is already loaded, else None (no load)."""
+        lazy = self.subsystems.get(name)
+        if lazy is not None:
+            return lazy.instance
+        return self.__dict__.get(name)
+
+    def route_timeout(self, path):
+        """Timeout (seconds) for *path*: the longest matching prefix wins."""
+        best, timeout = -1, self.default_timeout
+        for prefix, value in self.route_timeouts.items():
+            if path.startswith(prefix) and len(prefix) > best:
+                best, timeout = len(prefix), value
+        return timeout
+
+    def begin_request(self) -> bool:
+        """Take a request slot; False (answer 503) if max_in_flight are running."""
+        return self._in_flight.acquire(blocking=False)
+
+    def end_request(self) -> None:
+        self._in_flight.release()
+
+    def process_request(self, request, client_address):
+        if not self._connections.acquire(blocking=False):
+            self._reject_busy(request)
+            return
+        try:
+            self._executor.submit(self._process_request_worker, request, client_address)
+        except RuntimeError:
+            # Executor already shut down (server is stopping).
+            self._connections.release()
+            self.shutdown_request(request)
+
+    def _process_request_worker(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._connections.release()
+
+    def _reject_busy(self, request):
+        try:
+            request.settimeout(1.0)
+            request.sendall(self._BUSY_RESPONSE)
+        except OSError:
+            pass
+        self.shutdown_request(request)
+
+    def server_close(self):
+        self.stopping.set()
+        super().server_close()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class RouteTable:
+    """
+    Maps (method, path) to a handler method name.  Built once at import.
+
+    Entries match a path exactly or any path below it ('/motor/write' also
+    matches '/motor/write/'), with the longest registered prefix winning.
+    Lookup walks the path's '/' boundaries from the right, so dispatch costs
+    a handful of dict lookups regardless of how many routes exist.
+    """
+
+    def __init__(self, routes):
+        self._routes: dict[str, dict[str, str]] = {}
+        for method, prefix, handler_name in routes:
+            self._routes.setdefault(method, {})[prefix.rstrip('/') or '/'] = handler_name
+
+    def match(self, method, path):
+        """Return (prefix, handler_name) or None."""
+        table = self._routes.get(method)
+        if not table:
+            return None
+        candidate = path.rstrip('/') or '/'
+        while candidate:
+            handler_name = table.get(candidate)
+            if handler_name is not None:
+                return candidate, handler_name
+            candidate = candidate[:candidate.rfind('/')]
+        return None
+
+
 class UnifiedHandler(BaseHTTPRequestHandler):
+    # Persistent connections: the Android app reuses one socket for its jogs.
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; without TCP_NODELAY the
+    # body waits ~40 ms for the client's delayed ACK on a reused connection.
+    disable_nagle_algorithm = True
+    # Socket timeout until the route is known; see ConcurrentHTTPServer.route_timeout.
+    timeout = 10.0
+    # Seconds an idle keep-alive connection may wait for its next request.
+    KEEPALIVE_TIMEOUT = 5.0
+    # Seconds a motor stream waits for serial data before an idle heartbeat
+    # (also bounds how long an open stream delays server shutdown).
+    STREAM_IDLE_TIMEOUT = 5.0
+
     def do_GET(self):
-        parsed_path = urllib.parse.urlparse(self.path)
-        path = parsed_path.path
-        query = urllib.parse.parse_qs(parsed_path.query)
-
-        # Routing
-        if path.startswith('/motor'):
-            self.handle_motor(path, query)
-        elif path.startswith('/cam/hd'):
-            self.handle_camera(self.server.hd_cam, path.replace('/cam/hd', ''), query)
-        elif path.startswith('/cam/uc60'):
-            self.handle_camera(self.server.uc60_cam, path.replace('/cam/uc60', ''), query)
-        elif path.startswith('/cam/check_rotation'):
-            self.handle_rotation_check(query)
-        elif path.startswith('/cam/solve'):
-            self.handle_plate_solve(query)
-        elif path.startswith('/star_follower'):
-            self.handle_star_follower(path, query)
-        elif path.startswith('/sidereal'):
-            self.handle_sidereal(path, query)
-        elif path == '/ping':
-            self.send_response(200)
-            self.send_header('Content-Type', 'text/plain')
-            self.end_headers()
-            self.wfile.write(b"pong")
-        elif path == '/restart':
-            subprocess.run(["sudo", "reboot"], check=True)
-        else:
-            self.send_response(404)
-            self.end_headers()
+        self._dispatch('GET')
 
-    def handle_motor(self, path, query):
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_DELETE(self):
+        self._dispatch('DELETE')
+
+    def _dispatch(self, method):
+        started = time.perf_counter()
+        self.status_code = None
+        path, _, query_string = self.path.partition('?')
+        query = urllib.parse.parse_qs(query_string) if query_string else {}
+
+        match = ROUTES.match(method, path)
+        self.route = match[0] if match else None
+        self.route_timeout = (self.server.route_timeout(self.route) if match
+                              else self.server.default_timeout)
+        self.connection.settimeout(self.route_timeout)
+
+        # Always drain the body so the next request on this connection parses.
+        try:
+            self.body = self._read_body()
+        except ValueError:
+            # Where the body ends is unknown, so the connection can't be reused.
+            self.body = None
+            self.close_connection = True
+        query.update(self._body_params())
+
+        busy = not self.server.begin_request()
+        try:
+            if busy:
+                self.respond(503, b"Server busy")
+            elif self.body is None:
+                self.respond(400, b"Invalid Content-Length", headers={'Connection': 'close'})
+            elif match is None:
+                self.respond(404, b"Endpoint not found")
+            else:
+                getattr(self, match[1])(path, query)
+        finally:
+            if not busy:
+                self.server.end_request()
+            # Idle keep-alive connections wait at most this long for the next request.
+            self.connection.settimeout(self.KEEPALIVE_TIMEOUT)
+            route = self.route or 'unmatched'
+            _HTTP_LATENCY.labels(route).observe(time.perf_counter() - started)
+            _HTTP_REQUESTS.labels(route, method, self.status_code).inc()
+
+    def send_response(self, code, message=None):
+        self.status_code = code
+        super().send_response(code, message)
+
+    def _read_body(self):
+        """The request body; ValueError if Content-Length is not a non-negative integer."""
+        length = int(self.headers.get('Content-Length') or 0)
+        if length < 0:
+            raise ValueError(f"negative Content-Length {length}")
+        return self.rfile.read(length) if length else b""
+
+    def _body_params(self):
+        """Parse a urlencoded or JSON-object body into parse_qs-style lists."""
+        if not self.body:
+            return {}
+        content_type = self.headers.get('Content-Type', '')
+        if 'json' in content_type:
+            try:
+                data = json.loads(self.body)
+            except ValueError:
+                return {}
+            if not isinstance(data, dict):
+                return {}
+            return {k: [str(v)] if not isinstance(v, list) else [str(i) for i in v]
+                    for k, v in data.items()}
+        if 'x-www-form-urlencoded' in content_type:
+            return urllib.parse.parse_qs(self.body.decode('utf-8', errors='replace'))
+        return {}
+
+    def _client_disconnected(self):
+        """True if the peer has closed its end (readable socket with no data)."""
+        try:
+            readable, _, _ = select.select([self.connection], [], [], 0)
+            return bool(readable) and not self.connection.recv(1, socket.MSG_PEEK)
+        except OSError:
+            return True
+
+    def _camera_by_name(self, cam_name):
+        if cam_name.lower() == 'hd':
+            return self.server.hd_cam
+        if cam_name.lower() == 'uc60':
+            return self.server.uc60_cam
+        return None
+
+    def handle_ping(self, path, query):
+        self.respond(200, b"pong")
+
+    def handle_metrics(self, path, query):
+        """GET /metrics → Prometheus text exposition of every registered metric."""
+        self.respond(200, REGISTRY.render().encode(),
+                     content_type='text/plain; version=0.0.4')
+
+    def handle_log(self, path, query):
+        """GET /log → the in-memory log ring as text (empty if the ring is disabled)."""
+        lines = LOG_WRITER.ring_lines()
+        self.respond(200, ("\n".join(lines) + "\n" if lines else "").encode())
+
+    def handle_log_flush(self, path, query):
+        """POST /log/flush → write the log ring to stdout and clear it."""
+        self.respond_json(200, {'flushed': LOG_WRITER.flush_ring(),
+                                'dropped': LOG_WRITER.dropped})
+
+    def handle_ready(self, path, query):
+        """
+        GET /ready → JSON readiness per subsystem; 200 once everything has
+        loaded, 503 while any subsystem is still pending, loading or failed.
+        """
         motor = self.server.motor_control
-        if '/write' in path:
-            cmd = query.get('cmd', [None])[0]
-            if cmd:
-                if motor.send_command(cmd):
-                    self.respond(200, b"OK")
-                else:
-                    self.respond(503, b"Serial connection issue")
+        subsystems = {
+            'http':  {'state': LazySubsystem.READY},
+            'motor': {'state': LazySubsystem.READY if getattr(motor, 'is_connected', False)
+                      else LazySubsystem.FAILED},
+        }
+        for name, lazy in self.server.subsystems.items():
+            subsystems[name] = lazy.status()
+        ready = all(info['state'] == LazySubsystem.READY for info in subsystems.values())
+        self.respond_json(200 if ready else 503, {'ready': ready, 'subsystems': subsystems})
+
+    def handle_restart(self, path, query):
+        self.respond(200, b"Rebooting")
+        subprocess.run(["sudo", "reboot"], check=True)
+
+    def handle_motor(self, path, query):
+        self.respond(404, b"Motor endpoint not found")
+
+    def _motor_target(self, query):
+        """
+        The controller a /motor request addresses: ?axis=<name> (its
+        controller, plus the v= that selects it), ?device=<name>, or the
+        mount board.  Returns (motor, select_commands), or responds 404 and
+        returns (None, None).
+        """
+        axis = query.get('axis', [None])[0]
+        device = query.get('device', [None])[0]
+        if axis is None and device is None:
+            return self.server.motor_control, []
+        registry = getattr(self.server, 'motor_registry', None)
+        try:
+            if axis is not None:
+                if registry is None:
+                    raise KeyError(f"Unknown axis '{axis}'")
+                handle = registry.axis(axis)
+                return handle.device, [handle.select]
+            if registry is None:
+                raise KeyError(f"Unknown device '{device}'")
+            return registry.device(device), []
+        except KeyError as e:
+            self.respond(404, str(e.args[0]).encode())
+            return None, None
+
+    def handle_motor_devices(self, path, query):
+        """GET /motor/devices → serial controllers and the logical axes they drive."""
+        registry = getattr(self.server, 'motor_registry', None)
+        if registry is None:
+            self.respond(404, b"No motor registry")
+        else:
+            self.respond_json(200, registry.status())
+
+    def handle_motor_write(self, path, query):
+        """GET /motor/write?cmd=<cmd>[&axis=<name>|&device=<name>]"""
+        cmd = query.get('cmd', [None])[0]
+        if cmd:
+            motor, select = self._motor_target(query)
+            if motor is None:
+                return
+            if motor.send_batch(select + [cmd]) if select else motor.send_command(cmd):
+                self.respond(200, b"OK")
             else:
-                self.respond(400, b"Missing 'cmd' parameter")
-        elif '/read' in path:
-            data = motor.read()
-            if data:
-                self.respond(200, data.encode())
+                self.respond(503, b"Serial connection issue")
+        else:
+            self.respond(400, b"Missing 'cmd' parameter")
+
+    def handle_motor_batch(self, path, query):
+        """
+        POST /motor/batch → write many commands as one contiguous serial block.
+
+        Body: newline-separated commands (text/plain), a JSON list or
+        {"commands": [...]}, or repeated cmd=<cmd> form/query parameters.
+        ?axis=<name> prefixes the batch with that axis' v= and sends it to
+        the controller that owns it; ?device=<name> picks a controller.
+        """
+        motor, select = self._motor_target(query)
+        if motor is None:
+            return
+        commands = query.get('commands') or query.get('cmd') or []
+        if not commands and self.body:
+            text = self.body.decode('utf-8', errors='replace')
+            if 'json' in self.headers.get('Content-Type', ''):
+                try:
+                    data = json.loads(text)
+                except ValueError:
+                    self.respond(400, b"Invalid JSON body")
+                    return
+                if isinstance(data, list):
+                    commands = [str(c) for c in data]
             else:
-                self.respond(200, b"") # Return empty if no data
-        elif '/stream' in path:
-             # Streaming logic is blocking, might need rethink for unified server if concurrency issues arise
-             # but BaseHTTPRequestHandler is usually threaded in ThreadingMixIn servers
-             self.send_response(200)
-             self.send_header('Content-Type', 'application/octet-stream')
-             self.end_headers()
-             try:
-                while True:
-                    data = motor.read()
-                    if data:
-                        self.wfile.write(data.encode())
-                        self.wfile.flush()
-                    time.sleep(0.01)
-             except:
-                 pass
+                commands = text.splitlines()
+        commands = [c.strip() for c in commands if c.strip()]
+
+        if not commands:
+            self.respond(400, b"No commands in batch")
+        elif motor.send_batch(select + commands):
+            self.respond(200, f"OK {len(commands)}".encode())
+        else:
+            self.respond(503, b"Serial connection issue")
+
+    def handle_motor_read(self, path, query):
+        # Raw bytes straight from the RX ring; empty if no data.
+        motor, _ = self._motor_target(query)
+        if motor is not None:
+            self.respond(200, motor.read_bytes())
+
+    def handle_motor_state(self, path, query):
+        """GET /motor/state → shadowed modal state and serial bytes saved."""
+        motor, _ = self._motor_target(query)
+        if motor is None:
+            return
+        snapshot = motor.state_snapshot()
+        if snapshot is None:
+            self.respond(404, b"State shadowing is disabled")
+        else:
+            self.respond_json(200, snapshot)
+
+    def handle_motor_resync(self, path, query):
+        """GET /motor/resync → re-send the full modal state to the Arduino."""
+        motor, _ = self._motor_target(query)
+        if motor is None:
+            return
+        if motor.resync():
+            self.respond(200, b"OK")
         else:
-            self.respond(404, b"Motor endpoint not found")
+            self.respond(503, b"Serial connection issue")
+
+    def handle_motor_stream(self, path, query):
+        # Runs on its own worker (ConcurrentHTTPServer); the /motor route
+        # timeout bounds each write, so a stalled client frees the worker.
+        # The body is close-delimited, so the connection is not reused.
+        motor, _ = self._motor_target(query)
+        if motor is None:
+            return
+        self.close_connection = True
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        subscription = motor.subscribe()
+        try:
+            while not self.server.stopping.is_set():
+                lines = subscription.get(timeout=self.STREAM_IDLE_TIMEOUT)
+                if lines:
+                    self.wfile.write(b"".join(line for _, line in lines))
+                    self.wfile.flush()
+                elif subscription.closed or self._client_disconnected():
+                    break
+        except OSError:
+            pass
+
+    def handle_motor_events(self, path, query):
+        """
+        GET /motor/events → Server-Sent Events, one event per serial RX line.
+
+        Each event carries the line's sequence number as its id, so a client
+        reconnecting with Last-Event-ID resumes without gaps (as long as the
+        lines are still in the ring).  A comment is sent when idle so dead
+        connections are noticed.
+        """
+        last_id = self.headers.get('Last-Event-ID')
+        from_seq = int(last_id) + 1 if last_id and last_id.isdigit() else None
+        motor, _ = self._motor_target(query)
+        if motor is None:
+            return
+
+        self.close_connection = True
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        subscription = motor.subscribe(from_seq)
+        try:
+            while not self.server.stopping.is_set():
+                lines = subscription.get(timeout=self.STREAM_IDLE_TIMEOUT)
+                if not lines:
+                    if subscription.closed:
+                        break               # motor control stopped; end the stream
+                    self.wfile.write(b": idle\n\n")
+                else:
+                    chunks = []
+                    for seq, line in lines:
+                        text = line.rstrip(b"\r\n")
+                        chunks.append(b"id: %d\ndata: %s\n\n" % (seq, text))
+                    self.wfile.write(b"".join(chunks))
+                self.wfile.flush()
+        except OSError:
+            pass
+
+    def handle_hd_camera(self, path, query):
+        self.handle_camera(self.server.hd_cam, path[len(self.route):], query)
+
+    def handle_uc60_camera(self, path, query):
+        self.handle_camera(self.server.uc60_cam, path[len(self.route):], query)
 
     def handle_camera(self, camera, subpath, query):
         if subpath.startswith('/start'):
@@ -103,8 +523,7 @@ class UnifiedHandler(BaseHTTPRequestHandler):
             code, msg = camera.stop_stream()
             self.respond(code, msg)
         elif subpath.startswith('/controls'):
-            code, msg = camera.get_controls()
-            self.respond(code, msg)
+            self.handle_camera_controls(camera)
         elif subpath.startswith('/reset_controls'):
             code, msg = camera.reset_defaults()
             self.respond(code, msg)
@@ -119,7 +538,25 @@ class UnifiedHandler(BaseHTTPRequestHandler):
         else:
             self.respond(404, b"Camera endpoint not found")
 
-    def handle_rotation_check(self, query):
+    def handle_camera_controls(self, camera):
+        """
+        GET /cam/<name>/controls → JSON control list from the camera's cache,
+        tagged with an ETag.  A matching If-None-Match gets a bare 304.
+        """
+        code, body, etag = camera.get_controls_with_etag()
+        if etag is None:
+            self.respond(code, body)
+            return
+        if_none_match = self.headers.get('If-None-Match', '')
+        candidates = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+        if etag in candidates or '*' in candidates:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.respond(code, body, content_type='application/json', headers={'ETag': etag})
+
+    def handle_rotation_check(self, path, query):
         cam_name = query.get('camera', [None])[0]
         cmd = query.get('cmd', [None])[0]
         
@@ -145,7 +582,7 @@ class UnifiedHandler(BaseHTTPRequestHandler):
         except Exception as e:
             self.respond(500, f"Server Error: {str(e)}".encode())
             
-    def handle_plate_solve(self, query):
+    def handle_plate_solve(self, path, query):
         """
         Usage: /cam/solve?camera=hd
         """
@@ -154,24 +591,16 @@ class UnifiedHandler(BaseHTTPRequestHandler):
         # Select camera
         camera = self.server.hd_cam if cam_name == 'hd' else self.server.uc60_cam
         
-        # Initialize solver if not exists
-        if not hasattr(self.server, 'plate_solver'):
-            self.server.plate_solver = PlateSolver()
-            
-        # Run solve
-        result = self.server.plate_solver.solve(camera)
+        # Run solve, bounded by the route timeout
+        result = self.server.plate_solver.solve(camera, timeout=self.route_timeout)
         
         # Return JSON result
-        import json
-        self.send_response(200 if result['success'] else 500)
-        self.send_header('Content-Type', 'application/json')
-        self.end_headers()
-        self.wfile.write(json.dumps(result).encode())
+        self.respond_json(200 if result['success'] else 500, result)
 
     def handle_star_follower(self, path, query):
         """
         Routes:
-            GET /star_follower/start?camera=hd|uc60&duration=<s>&threshold=<%>&steps_cmd=<cmd>&speed_cmd=<cmd>
+            GET /star_follower/start?camera=hd|uc60&duration=<s>&threshold=<%>&steps_cmd=<cmd>&speed_cmd=<cmd>[&profile=constant|trapezoid|scurve][&scale=1|2|4|8]
             GET /star_follower/stop
             GET /star_follower/status          → JSON
             GET /star_follower/debug_star?camera=hd|uc60  → JSON
@@ -185,6 +614,8 @@ class UnifiedHandler(BaseHTTPRequestHandler):
             threshold  = query.get('threshold', [None])[0]
             steps_cmd  = query.get('steps_cmd', [None])[0]
             speed_cmd  = query.get('speed_cmd', [None])[0]
+            profile    = query.get('profile',   [PROFILE_CONSTANT])[0]
+            scale      = query.get('scale',     [None])[0]
 
             missing = [n for n, v in [('camera', cam_name), ('duration', duration),
                                       ('threshold', threshold), ('steps_cmd', steps_cmd),
@@ -192,6 +623,14 @@ class UnifiedHandler(BaseHTTPRequestHandler):
             if missing:
                 self.respond(400, f"Missing parameters: {', '.join(missing)}".encode())
                 return
+            if profile not in PROFILES:
+                self.respond(400, f"Unknown profile '{profile}'".encode())
+                return
+            if scale is not None:
+                if not scale.isdigit() or int(scale) not in DECODE_SCALES:
+                    self.respond(400, f"scale must be one of {DECODE_SCALES}".encode())
+                    return
+                scale = int(scale)
 
             if cam_name.lower() == 'hd':
                 camera = self.server.hd_cam
@@ -202,9 +641,11 @@ class UnifiedHandler(BaseHTTPRequestHandler):
                 return
 
             try:
-                # Mutual exclusion: stop sidereal tracker if it is running.
-                if self.server.sidereal_tracker.get_status()['active']:
-                    self.server.sidereal_tracker.stop()
+                # Mutual exclusion: stop sidereal tracker if it is running
+                # (an unloaded tracker cannot be running; don't load astropy for it).
+                sidereal = self.server.loaded_subsystem('sidereal_tracker')
+                if sidereal is not None and sidereal.get_status()['active']:
+                    sidereal.stop()
 
                 sf.start(
                     duration=float(duration),
@@ -212,6 +653,8 @@ class UnifiedHandler(BaseHTTPRequestHandler):
                     steps_cmd=steps_cmd,
                     speed_cmd=speed_cmd,
                     camera_device=camera,
+                    profile=profile,
+                    scale=scale,
                 )
                 self.respond(200, b"Star follower started")
             except Exception as e:
@@ -222,22 +665,13 @@ class UnifiedHandler(BaseHTTPRequestHandler):
             self.respond(200, b"Star follower stopped")
 
         elif '/status' in path:
-            import json
-            status = sf.get_status()
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps(status).encode())
+            self.respond_json(200, sf.get_status())
 
         elif '/debug_star' in path:
-            import json
             cam_name = query.get('camera', ['hd'])[0]
             camera = self.server.hd_cam if cam_name.lower() == 'hd' else self.server.uc60_cam
             result = sf.debug_star(camera)
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps(result).encode())
+            self.respond_json(200, result)
 
         else:
             self.respond(404, b"Star follower endpoint not found")
@@ -245,11 +679,10 @@ class UnifiedHandler(BaseHTTPRequestHandler):
     def handle_sidereal(self, path, query):
         """
         Routes:
-            GET /sidereal/start?ra=<hours>&dec=<deg>&lat=<deg>&lon=<deg>&interval=<sec>
+            GET /sidereal/start?ra=<hours>&dec=<deg>&lat=<deg>&lon=<deg>&interval=<sec>[&profile=constant|trapezoid|scurve]
             GET /sidereal/stop
             GET /sidereal/status  → JSON
         """
-        import json
         st = self.server.sidereal_tracker
 
         if '/start' in path:
@@ -258,17 +691,22 @@ class UnifiedHandler(BaseHTTPRequestHandler):
             lat      = query.get('lat',      [None])[0]
             lon      = query.get('lon',      [None])[0]
             interval = query.get('interval', ['5.0'])[0]
+            profile  = query.get('profile',  [PROFILE_CONSTANT])[0]
 
             missing = [n for n, v in [('ra', ra), ('dec', dec),
                                       ('lat', lat), ('lon', lon)] if v is None]
             if missing:
                 self.respond(400, f"Missing parameters: {', '.join(missing)}".encode())
                 return
+            if profile not in PROFILES:
+                self.respond(400, f"Unknown profile '{profile}'".encode())
+                return
 
             try:
                 # Mutual exclusion: stop camera star follower if it is running.
-                if self.server.star_follower.get_status()['active']:
-                    self.server.star_follower.stop()
+                follower = self.server.loaded_subsystem('star_follower')
+                if follower is not None and follower.get_status()['active']:
+                    follower.stop()
 
                 st.start(
                     ra_hours=float(ra),
@@ -276,6 +714,7 @@ class UnifiedHandler(BaseHTTPRequestHandler):
                     lat=float(lat),
                     lon=float(lon),
                     update_interval=float(interval),
+                    profile=profile,
                 )
                 self.respond(200, b"Sidereal tracker started")
             except Exception as e:
@@ -286,50 +725,231 @@ class UnifiedHandler(BaseHTTPRequestHandler):
             self.respond(200, b"Sidereal tracker stopped")
 
         elif '/status' in path:
-            status = st.get_status()
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps(status).encode())
+            self.respond_json(200, st.get_status())
 
         else:
             self.respond(404, b"Sidereal endpoint not found")
 
-    def respond(self, code, message):
+    def handle_jobs_post(self, path, query):
+        """
+        Routes:
+            POST /jobs/solve?camera=hd|uc60                 → 202 JSON job
+            POST /jobs/rotation?camera=hd|uc60&cmd=<cmd>    → 202 JSON job
+        Parameters may also be sent as a urlencoded or JSON body.
+        """
+        kind = path[len('/jobs/'):].strip('/')
+        cam_name = query.get('camera', ['hd'])[0]
+        camera = self._camera_by_name(cam_name)
+        if camera is None:
+            self.respond(400, f"Unknown camera '{cam_name}'".encode())
+            return
+
+        if kind == 'solve':
+            solver = self.server.plate_solver
+            solve_timeout = self.server.route_timeout('/cam/solve')
+
+            def work(job):
+                return solver.solve(camera, timeout=solve_timeout,
+                                    cancel_event=job.cancel_event,
+                                    progress_callback=job.set_progress)
+            params = {'camera': cam_name}
+
+        elif kind == 'rotation':
+            cmd = query.get('cmd', [None])[0]
+            if not cmd:
+                self.respond(400, b"Missing 'cmd'")
+                return
+            finder = self.server.rotation_finder
+
+            def work(job):
+                angle, msg = finder.calculate_rotation(camera, cmd,
+                                                       cancel_event=job.cancel_event,
+                                                       progress_callback=job.set_progress)
+                return {'success': angle is not None, 'angle': angle, 'message': msg}
+            params = {'camera': cam_name, 'cmd': cmd}
+
+        else:
+            self.respond(404, f"Unknown job type '{kind}'".encode())
+            return
+
+        try:
+            job = self.server.job_manager.submit(kind, work, params)
+        except JobQueueFull as e:
+            self.respond(503, f"Job queue full: {e}".encode())
+            return
+        self.respond_json(202, job.to_dict(), headers={'Location': f"/jobs/{job.id}"})
+
+    def handle_jobs_get(self, path, query):
+        """
+        Routes:
+            GET /jobs        → JSON list of known jobs
+            GET /jobs/<id>   → JSON job state, progress and result
+        """
+        job_id = path[len('/jobs'):].strip('/')
+        if not job_id:
+            self.respond_json(200, self.server.job_manager.list())
+            return
+        job = self.server.job_manager.get(job_id)
+        if job is None:
+            self.respond(404, f"Unknown job '{job_id}'".encode())
+            return
+        self.respond_json(200, job.to_dict())
+
+    def handle_jobs_delete(self, path, query):
+        """DELETE /jobs/<id> → cancel a queued or running job."""
+        job_id = path[len('/jobs/'):].strip('/')
+        job = self.server.job_manager.cancel(job_id)
+        if job is None:
+            self.respond(404, f"Unknown job '{job_id}'".encode())
+            return
+        self.respond_json(200, job.to_dict())
+
+    def respond_json(self, code, payload, headers=None):
+        self.respond(code, json.dumps(payload).encode(),
+                     content_type='application/json', headers=headers)
+
+    def respond(self, code, message, content_type='text/plain', headers=None):
+        # HTTP/1.1 keep-alive: every response must carry its exact length.
         self.send_response(code)
-        self.send_header('Content-Type', 'text/plain')
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(message)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
         self.end_headers()
         self.wfile.write(message)
 
 
+ROUTES = RouteTable([
+    ('GET',    '/ping',                'handle_ping'),
+    ('GET',    '/restart',             'handle_restart'),
+    ('GET',    '/metrics',             'handle_metrics'),
+    ('GET',    '/ready',               'handle_ready'),
+    ('GET',    '/log',                 'handle_log'),
+    ('POST',   '/log/flush',           'handle_log_flush'),
+    ('GET',    '/motor',               'handle_motor'),
+    ('GET',    '/motor/devices',       'handle_motor_devices'),
+    ('GET',    '/motor/write',         'handle_motor_write'),
+    ('POST',   '/motor/batch',         'handle_motor_batch'),
+    ('GET',    '/motor/read',          'handle_motor_read'),
+    ('GET',    '/motor/state',         'handle_motor_state'),
+    ('GET',    '/motor/resync',        'handle_motor_resync'),
+    ('GET',    '/motor/stream',        'handle_motor_stream'),
+    ('GET',    '/motor/events',        'handle_motor_events'),
+    ('GET',    '/cam/hd',              'handle_hd_camera'),
+    ('GET',    '/cam/uc60',            'handle_uc60_camera'),
+    ('GET',    '/cam/check_rotation',  'handle_rotation_check'),
+    ('GET',    '/cam/solve',           'handle_plate_solve'),
+    ('GET',    '/star_follower',       'handle_star_follower'),
+    ('GET',    '/sidereal',            'handle_sidereal'),
+    ('GET',    '/jobs',                'handle_jobs_get'),
+    ('POST',   '/jobs',                'handle_jobs_post'),
+    ('DELETE', '/jobs',                'handle_jobs_delete'),
+])
+
+
 class TelescopeServer:
-    def __init__(self, host='0.0.0.0', port=5000):
+    # Per-route timeouts in seconds (longest prefix wins).  They bound socket
+    # I/O on every route and the ASTAP run on /cam/solve.
+    DEFAULT_ROUTE_TIMEOUTS = {
+        '/ping':               2.0,
+        '/motor':              5.0,
+        '/cam/check_rotation': 30.0,
+        '/cam/solve':          30.0,
+    }
+
+    def __init__(self, host='0.0.0.0', port=5000,
+                 max_workers=16, max_in_flight=None, route_timeouts=None, max_connections=None,
+                 warm_up=True, jog_port=None, motor_port='/dev/ttyACM0', motor_devices=(),
+                 record_dir=None, camera_capture='mjpg_streamer'):
         self.host = host
         self.port = port
+        self.motor_port = motor_port
+        # Extra controllers as NAME=PORT[@BAUD][:AXIS=N,...] specs.
+        self.motor_devices = list(motor_devices)
+        # Directory for the binary serial logs (None = not recorded).
+        self.record_dir = record_dir
+        # How MJPG cameras are captured; see CameraDevice.CAPTURE_MODES.
+        self.camera_capture = camera_capture
+        self.jog_port = jog_port
+        self.jog_channel = None
+        self.warm_up = warm_up
+        self.max_workers = max_workers
+        self.max_in_flight = max_in_flight
+        self.max_connections = max_connections
+        self.route_timeouts = dict(self.DEFAULT_ROUTE_TIMEOUTS)
+        if route_timeouts:
+            self.route_timeouts.update(route_timeouts)
         self.server = None
         self.thread = None
 
     def start(self):
         print("Starting Telescope Unified Server...")
         
-        self.server = HTTPServer((self.host, self.port), UnifiedHandler)
+        self.server = ConcurrentHTTPServer((self.host, self.port), UnifiedHandler,
+                                           max_workers=self.max_workers,
+                                           max_in_flight=self.max_in_flight,
+                                           max_connections=self.max_connections,
+                                           route_timeouts=self.route_timeouts)
         
         # Initialize components
-        self.server.motor_control = MotorControl()
-        self.server.motor_control.start()
+        # The mount board drives alt/az; any extra controllers add axes.
+        registry = MotorRegistry.single(self.motor_port, record_dir=self.record_dir)
+        for spec in self.motor_devices:
+            registry.add_device_spec(spec, record_dir=self.record_dir)
+        registry.start()
+        self.server.motor_registry = registry
+        self.server.motor_control = registry.device()
+
+        # Optional binary jog listener; shares MotorControl.send_batch (and
+        # so its write lock) with the HTTP motor routes.
+        # A port that can't be bound costs the jog listener, not the server.
+        if self.jog_port is not None:
+            try:
+                self.jog_channel = JogChannel(self.server.motor_control, self.host, self.jog_port)
+            except OSError as e:
+                _log.error("Jog listener on port %s unavailable, continuing without it: %s",
+                           self.jog_port, e)
+                self.jog_channel = None
+            else:
+                self.jog_channel.start()
         
         # self.server.hd_cam = CameraDevice(camera_model="HD USB Camera", camera_type="H264", video_port=5001, rtsp_port=8554)
-        self.server.hd_cam = CameraDevice(camera_model="HD USB Camera", camera_type="MJPG", video_port=5001, rtsp_port=8554)
-        self.server.uc60_cam = CameraDevice(camera_model="UC60", camera_type="MJPG", video_port=5002)
-        
-        self.server.rotation_finder = CameraRotationFinder(self.server.motor_control)
-        self.server.star_follower = StarFollower(self.server.motor_control)
-        self.server.sidereal_tracker = SiderealTracker(self.server.motor_control)
+        self.server.hd_cam = CameraDevice(camera_model="HD USB Camera", camera_type="MJPG", video_port=5001, rtsp_port=8554,
+                                          capture=self.camera_capture)
+        self.server.uc60_cam = CameraDevice(camera_model="UC60", camera_type="MJPG", video_port=5002,
+                                            capture=self.camera_capture)
+        # Frames are stamped with the last motor activity, so the vision
+        # code can ask for one taken after the mount has settled.
+        for camera in (self.server.hd_cam, self.server.uc60_cam):
+            camera.frame_source.motion_clock = registry.last_motion
+
+        self.server.job_manager = JobManager()
+
+        # Heavy subsystems load on first use (or in the background below)
+        # so /ping and the motor routes answer as soon as the socket is up.
+        motor = self.server.motor_control
+        for lazy in (
+            LazySubsystem('star_follower',    'Classes.StarFollower',         'StarFollower', motor,
+                          registry.axes('alt', 'az')),
+            LazySubsystem('rotation_finder',  'Classes.CameraRotationFinder', 'CameraRotationFinder', motor),
+            LazySubsystem('plate_solver',     'Classes.PlateSolver',          'PlateSolver'),
+            LazySubsystem('sidereal_tracker', 'Classes.SiderealTracker',      'SiderealTracker', motor,
+                          registry.axes('alt', 'az')),
+        ):
+            self.server.subsystems[lazy.name] = lazy
 
         self.thread = threading.Thread(target=self.server.serve_forever)
         self.thread.daemon = True
         self.thread.start()
         print(f"Server running on {self.host}:{self.port}")                
+
+        if self.warm_up:
+            threading.Thread(target=self._warm_up_subsystems, daemon=True,
+                             name="SubsystemWarmUp").start()
+
+    def _warm_up_subsystems(self):
+        for lazy in list(self.server.subsystems.values()):
+            lazy.warm_up()
         
     def _ensure_mediamtx_running(self):
         try:
@@ -374,6 +994,14 @@ class TelescopeServer:
             print(f"Error checking/starting MediaMTX: {e}")
 
     def stop(self):
+        if self.jog_channel:
+            self.jog_channel.stop()
         if self.server:
+            for name in ('hd_cam', 'uc60_cam'):
+                camera = self.server.__dict__.get(name)
+                if camera is not None and camera.mjpeg_server is not None:
+                    camera.stop_stream()
+            self.server.job_manager.shutdown()
+            self.server.motor_registry.stop()
             self.server.shutdown()
             self.server.server_close()
@@ -0,0 +1,246 @@
+import ctypes
+import fcntl
+import mmap
+import os
+import select
+import time
+
+from Classes.Logger import get_logger
+
+_log = get_logger("V4L2Capture")
+
+# ----------------------------------------------------------------------
+# The slice of <linux/videodev2.h> needed for mmap streaming capture.
+# ctypes lays the structs out like the C compiler does, so the sizes (and
+# with them the ioctl numbers) come out right on 32- and 64-bit alike.
+# ----------------------------------------------------------------------
+
+V4L2_BUF_TYPE_VIDEO_CAPTURE = 1
+V4L2_MEMORY_MMAP = 1
+V4L2_FIELD_ANY = 0
+V4L2_BUF_FLAG_TIMESTAMP_MASK = 0xe000
+V4L2_BUF_FLAG_TIMESTAMP_MONOTONIC = 0x2000
+
+
+def fourcc(code: str) -> int:
+    a, b, c, d = code.encode('ascii')
+    return a | b << 8 | c << 16 | d << 24
+
+
+V4L2_PIX_FMT_MJPEG = fourcc('MJPG')
+
+
+class v4l2_pix_format(ctypes.Structure):
+    _fields_ = [('width', ctypes.c_uint32), ('height', ctypes.c_uint32),
+                ('pixelformat', ctypes.c_uint32), ('field', ctypes.c_uint32),
+                ('bytesperline', ctypes.c_uint32), ('sizeimage', ctypes.c_uint32),
+                ('colorspace', ctypes.c_uint32), ('priv', ctypes.c_uint32),
+                ('flags', ctypes.c_uint32), ('ycbcr_enc', ctypes.c_uint32),
+                ('quantization', ctypes.c_uint32), ('xfer_func', ctypes.c_uint32)]
+
+
+class _v4l2_format_union(ctypes.Union):
+    # The kernel union also holds v4l2_window, which has pointers.
+    _fields_ = [('pix', v4l2_pix_format), ('raw_data', ctypes.c_uint8 * 200),
+                ('_align', ctypes.c_void_p)]
+
+
+class v4l2_format(ctypes.Structure):
+    _fields_ = [('type', ctypes.c_uint32), ('fmt', _v4l2_format_union)]
+
+
+class v4l2_fract(ctypes.Structure):
+    _fields_ = [('numerator', ctypes.c_uint32), ('denominator', ctypes.c_uint32)]
+
+
+class v4l2_captureparm(ctypes.Structure):
+    _fields_ = [('capability', ctypes.c_uint32), ('capturemode', ctypes.c_uint32),
+                ('timeperframe', v4l2_fract), ('extendedmode', ctypes.c_uint32),
+                ('readbuffers', ctypes.c_uint32), ('reserved', ctypes.c_uint32 * 4)]
+
+
+class _v4l2_streamparm_union(ctypes.Union):
+    _fields_ = [('capture', v4l2_captureparm), ('raw_data', ctypes.c_uint8 * 200)]
+
+
+class v4l2_streamparm(ctypes.Structure):
+    _fields_ = [('type', ctypes.c_uint32), ('parm', _v4l2_streamparm_union)]
+
+
+class v4l2_requestbuffers(ctypes.Structure):
+    _fields_ = [('count', ctypes.c_uint32), ('type', ctypes.c_uint32),
+                ('memory', ctypes.c_uint32), ('capabilities', ctypes.c_uint32),
+                ('flags', ctypes.c_uint8), ('reserved', ctypes.c_uint8 * 3)]
+
+
+class timeval(ctypes.Structure):
+    _fields_ = [('tv_sec', ctypes.c_long), ('tv_usec', ctypes.c_long)]
+
+
+class v4l2_timecode(ctypes.Structure):
+    _fields_ = [('type', ctypes.c_uint32), ('flags', ctypes.c_uint32),
+                ('frames', ctypes.c_uint8), ('seconds', ctypes.c_uint8),
+                ('minutes', ctypes.c_uint8), ('hours', ctypes.c_uint8),
+                ('userbits', ctypes.c_uint8 * 4)]
+
+
+class _v4l2_buffer_m(ctypes.Union):
+    _fields_ = [('offset', ctypes.c_uint32), ('userptr', ctypes.c_ulong),
+                ('planes', ctypes.c_void_p), ('fd', ctypes.c_int32)]
+
+
+class v4l2_buffer(ctypes.Structure):
+    _fields_ = [('index', ctypes.c_uint32), ('type', ctypes.c_uint32),
+                ('bytesused', ctypes.c_uint32), ('flags', ctypes.c_uint32),
+                ('field', ctypes.c_uint32), ('timestamp', timeval),
+                ('timecode', v4l2_timecode), ('sequence', ctypes.c_uint32),
+                ('memory', ctypes.c_uint32), ('m', _v4l2_buffer_m),
+                ('length', ctypes.c_uint32), ('reserved2', ctypes.c_uint32),
+                ('request_fd', ctypes.c_int32)]
+
+
+def _ioc(direction, number, struct):
+    size = ctypes.sizeof(struct) if not isinstance(struct, int) else struct
+    return direction << 30 | size << 16 | ord('V') << 8 | number
+
+
+_IOW, _IOR, _IOWR = 1, 2, 3
+VIDIOC_S_FMT = _ioc(_IOWR, 5, v4l2_format)
+VIDIOC_REQBUFS = _ioc(_IOWR, 8, v4l2_requestbuffers)
+VIDIOC_QUERYBUF = _ioc(_IOWR, 9, v4l2_buffer)
+VIDIOC_QBUF = _ioc(_IOWR, 15, v4l2_buffer)
+VIDIOC_DQBUF = _ioc(_IOWR, 17, v4l2_buffer)
+VIDIOC_STREAMON = _ioc(_IOW, 18, ctypes.sizeof(ctypes.c_int))
+VIDIOC_STREAMOFF = _ioc(_IOW, 19, ctypes.sizeof(ctypes.c_int))
+VIDIOC_S_PARM = _ioc(_IOWR, 22, v4l2_streamparm)
+
+
+class V4L2Capture:
+    """
+    MJPEG capture straight from a V4L2 device through mmap'd driver
+    buffers, with no helper process in between.
+
+    open() sets the format and frame rate, maps *buffers* driver buffers
+    and starts streaming.  read() waits for the next filled buffer and
+    returns (jpeg, timestamp): the bytes the camera sent, copied once out
+    of the mapping so the buffer goes straight back to the driver, and the
+    driver's capture time (CLOCK_MONOTONIC, i.e. time.monotonic()).  That
+    one bytes object is what every consumer shares: the FrameRing, the
+    vision code's decoder and each MjpegServer viewer.  Nothing re-encodes.
+
+    Linux only.  The camera has to offer MJPG at (about) the requested size.
+    """
+
+    def __init__(self, device, width=1920, height=1080, fps=30, buffers=4,
+                 pixelformat=V4L2_PIX_FMT_MJPEG, timeout=2.0):
+        self.device = device
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.buffer_count = buffers
+        self.pixelformat = pixelformat
+        self.timeout = timeout
+        self.frames = 0
+        self.sequence_gaps = 0      # frames the driver dropped (we fell behind)
+        self._fd = None
+        self._maps = []
+        self._last_sequence = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def open(self) -> 'V4L2Capture':
+        self._fd = os.open(self.device, os.O_RDWR | os.O_NONBLOCK)
+        try:
+            self._configure()
+            self._map_buffers()
+            fcntl.ioctl(self._fd, VIDIOC_STREAMON, ctypes.c_int(V4L2_BUF_TYPE_VIDEO_CAPTURE))
+        except Exception:
+            self.close()
+            raise
+        _log.info("Capturing %s at %dx%d, %s fps, %d mmap buffers", self.device,
+                  self.width, self.height, self.fps, len(self._maps))
+        return self
+
+    def _configure(self):
+        fmt = v4l2_format()
+        fmt.type = V4L2_BUF_TYPE_VIDEO_CAPTURE
+        fmt.fmt.pix.width = self.width
+        fmt.fmt.pix.height = self.height
+        fmt.fmt.pix.pixelformat = self.pixelformat
+        fmt.fmt.pix.field = V4L2_FIELD_ANY
+        fcntl.ioctl(self._fd, VIDIOC_S_FMT, fmt)
+        if fmt.fmt.pix.pixelformat != self.pixelformat:
+            raise RuntimeError(f"{self.device} does not capture MJPG")
+        # The driver picks the nearest size it supports.
+        self.width, self.height = fmt.fmt.pix.width, fmt.fmt.pix.height
+
+        parm = v4l2_streamparm()
+        parm.type = V4L2_BUF_TYPE_VIDEO_CAPTURE
+        parm.parm.capture.timeperframe.numerator = 1
+        parm.parm.capture.timeperframe.denominator = int(self.fps)
+        try:
+            fcntl.ioctl(self._fd, VIDIOC_S_PARM, parm)
+        except OSError as e:
+            _log.warning("%s: could not set %s fps: %s", self.device, self.fps, e)
+
+    def _map_buffers(self):
+        request = v4l2_requestbuffers()
+        request.count = self.buffer_count
+        request.type = V4L2_BUF_TYPE_VIDEO_CAPTURE
+        request.memory = V4L2_MEMORY_MMAP
+        fcntl.ioctl(self._fd, VIDIOC_REQBUFS, request)
+        if request.count < 2:
+            raise RuntimeError(f"{self.device}: only {request.count} capture buffers")
+        for index in range(request.count):
+            buf = self._buffer(index)
+            fcntl.ioctl(self._fd, VIDIOC_QUERYBUF, buf)
+            self._maps.append(mmap.mmap(self._fd, buf.length, mmap.MAP_SHARED,
+                                        mmap.PROT_READ | mmap.PROT_WRITE, offset=buf.m.offset))
+            fcntl.ioctl(self._fd, VIDIOC_QBUF, buf)
+
+    @staticmethod
+    def _buffer(index=0) -> v4l2_buffer:
+        buf = v4l2_buffer()
+        buf.index = index
+        buf.type = V4L2_BUF_TYPE_VIDEO_CAPTURE
+        buf.memory = V4L2_MEMORY_MMAP
+        return buf
+
+    def read(self):
+        """The next (jpeg, timestamp), or None if no frame arrives within timeout."""
+        readable, _, _ = select.select([self._fd], [], [], self.timeout)
+        if not readable:
+            return None
+        buf = self._buffer()
+        try:
+            fcntl.ioctl(self._fd, VIDIOC_DQBUF, buf)
+        except BlockingIOError:
+            return None
+        try:
+            jpeg = self._maps[buf.index][:buf.bytesused]
+        finally:
+            fcntl.ioctl(self._fd, VIDIOC_QBUF, buf)
+        if self._last_sequence is not None and buf.sequence > self._last_sequence + 1:
+            self.sequence_gaps += buf.sequence - self._last_sequence - 1
+        self._last_sequence = buf.sequence
+        self.frames += 1
+        if buf.flags & V4L2_BUF_FLAG_TIMESTAMP_MASK != V4L2_BUF_FLAG_TIMESTAMP_MONOTONIC:
+            return jpeg, time.monotonic()
+        return jpeg, buf.timestamp.tv_sec + buf.timestamp.tv_usec / 1e6
+
+    def close(self) -> None:
+        if self._fd is None:
+            return
+        try:
+            fcntl.ioctl(self._fd, VIDIOC_STREAMOFF, ctypes.c_int(V4L2_BUF_TYPE_VIDEO_CAPTURE))
+        except OSError:
+            pass
+        for mapping in self._maps:
+            mapping.close()
+        self._maps = []
+        os.close(self._fd)
+        self._fd = None
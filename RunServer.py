@@ -1,4 +1,5 @@
 from Classes.UnifiedServer import TelescopeServer
+import argparse
 import time
 import sys
 
@@ -8,15 +9,47 @@ import sys
 # sudo fuser -k 5000/tcp; fuser -k 5001/tcp; fuser -k 5002/tcp; fuser -k 5003/tcp; 
 
 def main():
+    parser = argparse.ArgumentParser(description="Telescope unified server")
+    parser.add_argument("--motor-port", default="/dev/ttyACM0", help="Arduino serial port")
+    parser.add_argument("--simulate", action="store_true",
+                        help="run against the pty Arduino simulator instead of the board")
+    parser.add_argument("--time-scale", type=float, default=1.0,
+                        help="simulated move speed-up (with --simulate)")
+    parser.add_argument("--device", action="append", metavar="NAME=PORT[@BAUD][:AXIS=N,...]",
+                        help="extra motor controller, e.g. focuser=/dev/ttyUSB0:focus=0 (repeatable)")
+    parser.add_argument("--record", metavar="DIR",
+                        help="log all serial traffic to rotating binary files in DIR "
+                             "(replay with python -m Simulator.replay DIR)")
+    parser.add_argument("--jog-port", type=int, metavar="PORT",
+                        help="also accept binary jog frames on UDP/TCP PORT (e.g. 5005); "
+                             "unauthenticated, so off by default")
+    parser.add_argument("--camera-capture", choices=("mjpg_streamer", "v4l2"), default="mjpg_streamer",
+                        help="v4l2: capture MJPG cameras in-process and serve their streams "
+                             "ourselves instead of running mjpg_streamer")
+    args = parser.parse_args()
+
     print(f"========== Starting Telescope Server at {time.strftime('%Y-%m-%d %H:%M:%S')} ==========", flush=True)
-    server = TelescopeServer(port=5000)
+    simulator = None
+    motor_port = args.motor_port
+    if args.simulate:
+        from Simulator import ArduinoSimulator
+        simulator = ArduinoSimulator(time_scale=args.time_scale).start()
+        motor_port = simulator.port
+        print(f"Simulating the motor Arduino on {motor_port}", flush=True)
+    server = TelescopeServer(port=5000, jog_port=args.jog_port, motor_port=motor_port,
+                             motor_devices=args.device or (), record_dir=args.record,
+                             camera_capture=args.camera_capture)
     server.start()
     
     print("Unified Server is running.", flush=True)
     print("Endpoints:", flush=True)
-    print("  Motors: /motor/read, /motor/write, /motor/stream", flush=True)
+    print("  Server: /ping, /ready, /metrics, /log, POST /log/flush", flush=True)
+    print("  Motors: /motor/devices, /motor/read, /motor/write, /motor/state, /motor/resync, /motor/stream, /motor/events (SSE)", flush=True)
     print("  HD Camera: /cam/hd/start, /cam/hd/stop, /cam/hd/set_brightness, ...", flush=True)
     print("  UC60 Camera: /cam/uc60/start, /cam/uc60/stop, ...", flush=True)
+    print("  Jobs: POST /jobs/solve, POST /jobs/rotation, GET|DELETE /jobs/<id>", flush=True)
+    if server.jog_channel is not None:
+        print(f"  Jog: binary frames on UDP/TCP {args.jog_port} (see Classes/JogChannel.py)", flush=True)
     
     try:
         while True:
@@ -24,6 +57,8 @@ def main():
     except KeyboardInterrupt:
         print("\nStopping server...", flush=True)
         server.stop() 
+        if simulator is not None:
+            simulator.stop()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,214 @@
+import os
+import select
+import threading
+import time
+import tty
+from collections import deque
+
+from Classes.Logger import get_logger
+
+_log = get_logger("ArduinoSimulator")
+
+AXIS_NAMES = {1: 'alt', 0: 'az'}
+
+
+class _Axis:
+    """One stepper: modal settings plus the move in progress, if any."""
+
+    def __init__(self, number):
+        self.number = number
+        self.direction = 1
+        self.delay_ms = 1.0
+        self.enabled = False
+        self.position = 0
+        # Move in progress: (started_at, steps, direction, finishes_at)
+        self.move = None
+
+    def position_at(self, now) -> int:
+        if self.move is None:
+            return self.position
+        started, steps, direction, finishes = self.move
+        done = steps if finishes <= started else \
+            min(steps, int(steps * (now - started) / (finishes - started)))
+        return self.position + (done if direction else -done)
+
+
+class ArduinoSimulator:
+    """
+    Stand-in for the motor Arduino on a pseudo-terminal.
+
+    MotorControl opens `port` (the pty slave) exactly as it would open
+    /dev/ttyACM0.  The simulator reads the same one-value-per-line protocol:
+
+        v=N   select axis (1 altitude, 0 azimuth)
+        d=N   direction of the selected axis
+        t=F   inter-step delay of the selected axis, ms
+        e=N   energise (1) / release (0) the selected axis
+        s=N   step the selected axis N steps; starts immediately
+
+    Like the real board it keeps reading while motors run, and the two axes
+    move independently.  A move takes N × t ms divided by time_scale
+    (time_scale=inf completes it at once) and ends with
+        done v=<axis> pos=<position>
+    which matches MotorControl.MOVE_COMPLETE_PATTERN.  An s= for an axis
+    that is still moving replaces the old move, reported as
+        stopped v=<axis> pos=<position>
+    and lines that don't parse are answered with "err ...".
+    """
+
+    def __init__(self, time_scale=1.0, link=None):
+        if time_scale <= 0:
+            raise ValueError("time_scale must be positive")
+        self.time_scale = time_scale
+        self.link = link
+        self.master, self.slave = os.openpty()
+        # No echo or CR/LF translation on the slave side, as on a USB CDC port.
+        tty.setraw(self.slave)
+        self.port = os.ttyname(self.slave)
+        self.axes = {number: _Axis(number) for number in AXIS_NAMES}
+        self.selected = None
+        self.history = deque(maxlen=10000)      # received command lines
+        self.commands_received = 0
+        self.moves_completed = 0
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        if link:
+            if os.path.islink(link):
+                os.unlink(link)
+            os.symlink(self.port, link)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True, name="ArduinoSimulator")
+        self._thread.start()
+        _log.info("Simulating the motor Arduino on %s (time scale %g)",
+                  self.link or self.port, self.time_scale)
+        return self
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(2.0)
+        for fd in (self.master, self.slave):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        if self.link and os.path.islink(self.link):
+            os.unlink(self.link)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ------------------------------------------------------------------
+    # Device loop
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        pending = b""
+        while not self._stop_event.is_set():
+            now = time.monotonic()
+            self._finish_moves(now)
+            timeout = self._next_completion(now)
+            ready, _, _ = select.select([self.master], [], [], timeout)
+            if not ready:
+                continue
+            try:
+                pending += os.read(self.master, 4096)
+            except OSError:
+                return      # stop() closed the pty
+            *lines, pending = pending.split(b"\n")
+            for line in lines:
+                self._handle_line(line.strip().decode('ascii', errors='replace'))
+
+    def _next_completion(self, now) -> float:
+        with self._lock:
+            ends = [axis.move[3] for axis in self.axes.values() if axis.move is not None]
+        return max(0.0, min(ends) - now) if ends else 0.1
+
+    def _finish_moves(self, now):
+        replies = []
+        with self._lock:
+            for axis in self.axes.values():
+                if axis.move is not None and axis.move[3] <= now:
+                    axis.position = axis.position_at(axis.move[3])
+                    axis.move = None
+                    self.moves_completed += 1
+                    replies.append(f"done v={axis.number} pos={axis.position}")
+        for reply in replies:
+            self._reply(reply)
+
+    def _handle_line(self, line):
+        if not line:
+            return
+        self.history.append(line)
+        self.commands_received += 1
+        key, sep, raw = line.partition('=')
+        try:
+            value = float(raw) if sep else None
+        except ValueError:
+            value = None
+        if value is None or key not in ('v', 'd', 't', 'e', 's'):
+            self._reply(f"err unknown command '{line}'")
+            return
+        if key == 'v':
+            if int(value) not in self.axes:
+                self._reply(f"err no axis {int(value)}")
+                return
+            self.selected = int(value)
+            return
+        if self.selected is None:
+            self._reply("err no axis selected")
+            return
+        now = time.monotonic()
+        replies = []
+        with self._lock:
+            axis = self.axes[self.selected]
+            if key == 'd':
+                axis.direction = 1 if value else 0
+            elif key == 't':
+                axis.delay_ms = max(0.0, value)
+            elif key == 'e':
+                axis.enabled = bool(value)
+            else:
+                if axis.move is not None:
+                    axis.position = axis.position_at(now)
+                    axis.move = None
+                    replies.append(f"stopped v={axis.number} pos={axis.position}")
+                steps = int(value)
+                duration = steps * axis.delay_ms / 1000.0 / self.time_scale
+                axis.move = (now, steps, axis.direction, now + duration)
+        for reply in replies:
+            self._reply(reply)
+
+    def _reply(self, text):
+        try:
+            os.write(self.master, text.encode() + b"\n")
+        except OSError:
+            pass
+
+    # ------------------------------------------------------------------
+    # Inspection
+    # ------------------------------------------------------------------
+
+    def state(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                'selected': self.selected,
+                'commands_received': self.commands_received,
+                'moves_completed': self.moves_completed,
+                'axes': {
+                    AXIS_NAMES[number]: {
+                        'direction': axis.direction,
+                        'delay_ms':  axis.delay_ms,
+                        'enabled':   axis.enabled,
+                        'position':  axis.position_at(now),
+                        'moving':    axis.move is not None,
+                    }
+                    for number, axis in self.axes.items()
+                },
+            }
@@ -0,0 +1,5 @@
+"""Hardware stand-ins for running the server, tests and benchmarks without the telescope."""
+
+from Simulator.ArduinoSimulator import ArduinoSimulator
+
+__all__ = ['ArduinoSimulator']
@@ -0,0 +1,39 @@
+"""
+Run the motor Arduino simulator on a pty until Ctrl-C.
+
+Run:
+    python -m Simulator [--link /tmp/ttyACM-sim] [--time-scale 1.0]
+
+then point the server at it:
+    python RunServer.py --motor-port /tmp/ttyACM-sim
+"""
+
+import argparse
+import sys
+import time
+
+from Simulator.ArduinoSimulator import ArduinoSimulator
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--link", help="also expose the pty under this path (symlink)")
+    parser.add_argument("--time-scale", type=float, default=1.0,
+                        help="run moves this many times faster than real time ('inf' = instant)")
+    args = parser.parse_args()
+
+    simulator = ArduinoSimulator(time_scale=args.time_scale, link=args.link).start()
+    print(f"Arduino simulator on {simulator.port}"
+          + (f" (linked as {args.link})" if args.link else ""), flush=True)
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print(f"\n{simulator.state()}", flush=True)
+    finally:
+        simulator.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""
+Replay a recorded serial log (Classes/SerialRecorder.py) against the simulator or a port.
+
+Run:
+    python -m Simulator.replay logs/serial [--device mount] [--speed 10]
+    python -m Simulator.replay logs/serial --port /dev/ttyACM0
+    python -m Simulator.replay logs/serial/mount-20261017-021500-001.serlog --dump [--json]
+
+Without --port a fresh ArduinoSimulator is started (moves run --speed times
+faster, like the replay itself).  Recorded TX frames are re-sent with their
+original spacing; the replies are compared with the recorded RX lines and
+the simulator's final state is printed.  --dump just prints the records.
+"""
+
+import argparse
+import json
+import sys
+
+from Classes.MotorsControl import MotorControl
+from Classes.SerialLog import SerialLog, replay
+from Simulator.ArduinoSimulator import ArduinoSimulator
+
+
+def dump(records, as_json) -> None:
+    start = None
+    for record in records:
+        start = record.t if start is None else start
+        if as_json:
+            print(json.dumps({'t': round(record.t - start, 6), 'wall_time': record.wall_time,
+                              'kind': record.kind, 'source': record.source,
+                              'data': record.data.decode('utf-8', 'replace')}))
+        else:
+            print(f"{record.t - start:12.6f} {record.kind} {record.source or '-':<28} {record.data!r}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("log", nargs="+", help="log files, or a directory of them")
+    parser.add_argument("--device", help="only this device's files (with a directory)")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed-up ('inf' = no waits)")
+    parser.add_argument("--port", help="replay to this serial port instead of a simulator")
+    parser.add_argument("--dump", action="store_true", help="print the records instead of replaying")
+    parser.add_argument("--json", action="store_true", help="with --dump: one JSON object per line")
+    args = parser.parse_args()
+
+    paths = args.log[0] if len(args.log) == 1 else args.log
+    records = SerialLog.read_all(paths, args.device)
+    if args.dump:
+        dump(records, args.json)
+        return 0
+
+    records = list(records)
+    simulator = None
+    port = args.port
+    if port is None:
+        simulator = ArduinoSimulator(time_scale=args.speed).start()
+        port = simulator.port
+    # No state shadow: the log already holds exactly what went on the wire.
+    motor = MotorControl(port=port, state_shadow=False, name='replay')
+    motor.start()
+    subscription = motor.subscribe()
+    replies = []
+
+    def collect(timeout):
+        batch = subscription.get(timeout=timeout)
+        replies.extend(text.decode('utf-8', 'replace').strip() for _, text in batch)
+        return batch
+
+    def send(record):
+        motor.send_batch(record.data.decode('utf-8', 'replace').splitlines())
+        collect(0)      # keep up with the replies during long replays
+
+    try:
+        sent = replay(records, send, args.speed)
+        while collect(0.5):
+            pass
+    finally:
+        motor.stop()
+        if simulator is not None:
+            simulator.stop()
+
+    recorded = [line.strip() for r in records if r.kind == 'rx'
+                for line in r.data.decode('utf-8', 'replace').splitlines() if line.strip()]
+    print(f"replayed {sent} TX frames; {len(replies)} reply lines (recorded: {len(recorded)})")
+    mismatches = [(i, a, b) for i, (a, b) in enumerate(zip(recorded, replies)) if a != b]
+    for i, want, got in mismatches[:10]:
+        print(f"  line {i}: recorded {want!r}, replayed {got!r}")
+    if simulator is not None:
+        print(json.dumps(simulator.state(), indent=2))
+    return 0 if not mismatches and len(recorded) == len(replies) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""
+Tests for the pty Arduino simulator, driven through MotorControl exactly as
+the server drives the real board (POSIX only).
+
+Run:
+    python Tests/test_arduino_simulator.py
+"""
+
+import sys
+import os
+import time
+
+# Allow importing from the Classes/ directory regardless of cwd.
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from Classes.MotorsControl import MotorControl
+from Simulator import ArduinoSimulator
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Helpers
+# ─────────────────────────────────────────────────────────────────────────────
+
+def check(condition: bool, message: str) -> None:
+    label = "  OK  " if condition else "  FAIL"
+    print(f"{label}: {message}")
+    if not condition:
+        raise AssertionError(message)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Tests
+# ─────────────────────────────────────────────────────────────────────────────
+
+def test_move_timing_and_position():
+    """s=N takes N × t ms (scaled) and reports the new position."""
+    with ArduinoSimulator(time_scale=10.0) as simulator:
+        motor = MotorControl(port=simulator.port,
+                             move_complete_pattern=MotorControl.MOVE_COMPLETE_PATTERN)
+        motor.start()
+        try:
+            started = time.perf_counter()
+            line = motor.move(["v=1", "d=1", "t=2", "s=500"], timeout=3.0).result(timeout=3.0)
+            elapsed = time.perf_counter() - started
+            check(line.text == "done v=1 pos=500", f"move-complete reply ({line.text!r})")
+            check(0.09 <= elapsed < 0.3, f"500 × 2 ms at 10x took {elapsed * 1000:.0f} ms")
+
+            line = motor.move(["d=0", "s=200"], timeout=3.0).result(timeout=3.0)
+            check(line.text == "done v=1 pos=300", "direction and axis are modal")
+            state = simulator.state()['axes']
+            check(state['alt']['position'] == 300 and state['az']['position'] == 0,
+                  "azimuth untouched")
+        finally:
+            motor.stop()
+
+
+def test_axes_move_concurrently():
+    """Both axes step at once, and the device keeps reading during moves."""
+    with ArduinoSimulator(time_scale=10.0) as simulator:
+        motor = MotorControl(port=simulator.port,
+                             move_complete_pattern=MotorControl.MOVE_COMPLETE_PATTERN)
+        motor.start()
+        try:
+            started = time.perf_counter()
+            alt = motor.move(["v=1", "t=2", "s=500"], timeout=3.0)
+            az = motor.move(["v=0", "t=2", "s=500"], timeout=3.0)
+            texts = sorted(f.result(timeout=3.0).text for f in (alt, az))
+            elapsed = time.perf_counter() - started
+            check(elapsed < 0.18, f"two 100 ms moves overlapped ({elapsed * 1000:.0f} ms)")
+            check(texts == ["done v=0 pos=500", "done v=1 pos=500"], f"both axes reported ({texts})")
+            check(simulator.state()['moves_completed'] == 2, "two moves completed")
+        finally:
+            motor.stop()
+
+
+def test_replaced_move_and_errors():
+    """A new s= on a moving axis stops the old move; junk lines get an err reply."""
+    with ArduinoSimulator(time_scale=1.0) as simulator:
+        motor = MotorControl(port=simulator.port,
+                             move_complete_pattern=MotorControl.MOVE_COMPLETE_PATTERN)
+        motor.start()
+        subscription = motor.subscribe()
+        try:
+            check(motor.send_batch(["v=0", "t=1", "s=100000"]), "long move started")
+            time.sleep(0.05)
+            line = motor.move("s=10", timeout=2.0).result(timeout=2.0)
+            lines = [text.decode().strip() for _, text in subscription.get(timeout=1.0)]
+            check(lines[0].startswith("stopped v=0 pos="), f"old move reported stopped ({lines[0]!r})")
+            stopped_at = int(lines[0].rsplit("=", 1)[1])
+            check(0 < stopped_at < 1000, f"stopped part-way ({stopped_at} steps)")
+            check(line.text == f"done v=0 pos={stopped_at + 10}", "new move continues from there")
+
+            reply = motor.request("x=1", expect=r"^err", timeout=2.0).result(timeout=2.0)
+            check(reply.text == "err unknown command 'x=1'", f"unknown command ({reply.text!r})")
+        finally:
+            motor.stop()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Test runner
+# ─────────────────────────────────────────────────────────────────────────────
+
+TESTS = [
+    ("Move timing and position",           test_move_timing_and_position),
+    ("Axes move concurrently",             test_axes_move_concurrently),
+    ("Replaced move and errors",           test_replaced_move_and_errors),
+]
+
+if __name__ == "__main__":
+    passed, failed = 0, 0
+    failures: list[tuple[str, str]] = []
+
+    print("\n" + "=" * 60)
+    print(" ArduinoSimulator Test Suite")
+    print("=" * 60)
+
+    for name, fn in TESTS:
+        print(f"\n[{name}]")
+        try:
+            fn()
+            print(f"  → PASS")
+            passed += 1
+        except AssertionError as exc:
+            print(f"  → FAIL: {exc}")
+            failed += 1
+            failures.append((name, str(exc)))
+        except Exception as exc:
+            print(f"  → ERROR: {type(exc).__name__}: {exc}")
+            failed += 1
+            failures.append((name, f"{type(exc).__name__}: {exc}"))
+
+    print("\n" + "=" * 60)
+    print(f" Results: {passed} passed, {failed} failed  (total {passed + failed})")
+    if failures:
+        print("\n Failed:")
+        for name, msg in failures:
+            print(f"   • {name}: {msg}")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,111 @@
+"""
+Tests for ByteRing — the fixed-size RX buffer behind MotorControl.read().
+
+Run:
+    python Tests/test_byte_ring.py
+"""
+
+import sys
+import os
+
+# Allow importing from the Classes/ directory regardless of cwd.
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from Classes.ByteRing import ByteRing
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Helpers
+# ─────────────────────────────────────────────────────────────────────────────
+
+def check(condition: bool, message: str) -> None:
+    label = "  OK  " if condition else "  FAIL"
+    print(f"{label}: {message}")
+    if not condition:
+        raise AssertionError(message)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Tests
+# ─────────────────────────────────────────────────────────────────────────────
+
+def test_wraparound_preserves_order():
+    """Writes that wrap past the end read back oldest-first."""
+    ring = ByteRing(8)
+    ring.write(b"abcdef")
+    check(ring.read_bytes() == b"abcdef", "first read")
+    ring.write(b"ghij")            # head at 0 after the read, so no wrap yet
+    ring.write(b"klm")
+    check(len(ring) == 7, "7 bytes buffered")
+    check(ring.read_bytes(clear=False) == b"ghijklm", "peek leaves data in place")
+    out = bytearray(b">")
+    check(ring.read_into(out) == 7 and out == b">ghijklm", "read_into appends")
+    check(len(ring) == 0 and ring.read_bytes() == b"", "drained")
+
+
+def test_overflow_drops_oldest():
+    """A full ring keeps the newest bytes and counts what it dropped."""
+    ring = ByteRing(8)
+    check(ring.write(b"12345") == 0, "no drop while it fits")
+    check(ring.write(b"6789") == 1, "one byte dropped")
+    check(ring.read_bytes(clear=False) == b"23456789", "oldest byte gone")
+    check(ring.write(b"ABCDEFGHIJ") == 10, "oversized write drops old and its own head")
+    check(ring.read_bytes() == b"CDEFGHIJ", "only the newest capacity bytes survive")
+    stats = ring.stats()
+    check(stats['overflow_bytes'] == 11 and stats['overflow_events'] == 2,
+          f"overflow counters ({stats})")
+    check(stats['total_written'] == 19, "total_written counts every byte")
+
+
+def test_text_decoded_across_wrap():
+    """A multi-byte character split by the wrap point decodes intact."""
+    ring = ByteRing(8)
+    ring.write(b"1234567")
+    ring.write("°b".encode())      # b"\xc2\xb0b" lands at indices 7, 0, 1
+    check(ring.read_text() == "34567°b", "degree sign survives the wrap")
+    ring.write(b"ok\xff\n")
+    check(ring.read_text() == "ok\n", "invalid bytes ignored by default")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Test runner
+# ─────────────────────────────────────────────────────────────────────────────
+
+TESTS = [
+    ("Wraparound preserves order",         test_wraparound_preserves_order),
+    ("Overflow drops oldest",              test_overflow_drops_oldest),
+    ("Text decoded across wrap",           test_text_decoded_across_wrap),
+]
+
+if __name__ == "__main__":
+    passed, failed = 0, 0
+    failures: list[tuple[str, str]] = []
+
+    print("\n" + "=" * 60)
+    print(" ByteRing Test Suite")
+    print("=" * 60)
+
+    for name, fn in TESTS:
+        print(f"\n[{name}]")
+        try:
+            fn()
+            print(f"  → PASS")
+            passed += 1
+        except AssertionError as exc:
+            print(f"  → FAIL: {exc}")
+            failed += 1
+            failures.append((name, str(exc)))
+        except Exception as exc:
+            print(f"  → ERROR: {type(exc).__name__}: {exc}")
+            failed += 1
+            failures.append((name, f"{type(exc).__name__}: {exc}"))
+
+    print("\n" + "=" * 60)
+    print(f" Results: {passed} passed, {failed} failed  (total {passed + failed})")
+    if failures:
+        print("\n Failed:")
+        for name, msg in failures:
+            print(f"   • {name}: {msg}")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,161 @@
+"""
+Tests for the CameraDevice control cache — v4l2-ctl is replaced by a fake,
+so no camera is required.
+
+Run:
+    python Tests/test_camera_device.py
+"""
+
+import sys
+import os
+import subprocess
+from types import SimpleNamespace
+
+# Allow importing from the Classes/ directory regardless of cwd.
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import Classes.CameraDevice as camera_module
+from Classes.CameraDevice import CameraDevice
+
+
+V4L2_LIST = """
+                     brightness 0x00980900 (int)    : min=-64 max=64 step=1 default=0 value=0
+                       contrast 0x00980901 (int)    : min=0 max=95 step=1 default=32 value=32
+ white_balance_automatic 0x0098090c (bool)   : default=1 value=1
+"""
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Helpers
+# ─────────────────────────────────────────────────────────────────────────────
+
+def check(condition: bool, message: str) -> None:
+    label = "  OK  " if condition else "  FAIL"
+    print(f"{label}: {message}")
+    if not condition:
+        raise AssertionError(message)
+
+
+class FakeV4l2:
+    """Replaces subprocess.run inside CameraDevice; counts `v4l2-ctl -l` spawns."""
+
+    def __init__(self):
+        self.list_calls = 0
+        self.set_calls: list[str] = []
+
+    def __enter__(self):
+        self._original = camera_module.subprocess.run
+        camera_module.subprocess.run = self.run
+        return self
+
+    def __exit__(self, *exc):
+        camera_module.subprocess.run = self._original
+        return False
+
+    def run(self, args, **kwargs):
+        if args[-1] == '-l':
+            self.list_calls += 1
+            return SimpleNamespace(returncode=0, stdout=V4L2_LIST)
+        if '-c' in args:
+            self.set_calls.append(args[-1])
+            return SimpleNamespace(returncode=0, stdout="")
+        raise subprocess.CalledProcessError(1, args)
+
+
+def _camera() -> CameraDevice:
+    camera = CameraDevice("FakeCam", "MJPG", 5001)
+    camera.video_device = "/dev/video0"
+    return camera
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Tests
+# ─────────────────────────────────────────────────────────────────────────────
+
+def test_controls_are_cached():
+    """Repeated get_controls() calls spawn v4l2-ctl once and share one ETag."""
+    with FakeV4l2() as fake:
+        camera = _camera()
+        code1, body1, etag1 = camera.get_controls_with_etag()
+        code2, body2, etag2 = camera.get_controls_with_etag()
+        check(code1 == code2 == 200, "both reads succeed")
+        check(fake.list_calls == 1, f"v4l2-ctl -l spawned once (got {fake.list_calls})")
+        check(body1 == body2 and etag1 == etag2, "same body and ETag")
+
+
+def test_set_control_updates_cache():
+    """An in-range set patches the cached value and changes the ETag without a re-read."""
+    with FakeV4l2() as fake:
+        camera = _camera()
+        _, _, etag_before = camera.get_controls_with_etag()
+        camera.set_control("brightness", "10")
+        _, body, etag_after = camera.get_controls_with_etag()
+        check(fake.list_calls == 1, "no re-read after an in-range set")
+        check('"value": 10' in body.decode(), "cached brightness updated")
+        check(etag_after != etag_before, "ETag changed")
+
+        camera.set_control("white_balance_automatic", "0")
+        camera.get_controls()
+        check(fake.list_calls == 2, "auto-* control invalidates the cache")
+
+
+def test_reset_and_device_change_invalidate():
+    """reset_defaults() and a new device path both force a fresh query."""
+    with FakeV4l2() as fake:
+        camera = _camera()
+        camera.get_controls()
+        camera.reset_defaults()
+        camera.get_controls()
+        check(fake.list_calls == 2, f"reset_defaults invalidates (got {fake.list_calls})")
+
+        camera.video_device = "/dev/video0"
+        camera.get_controls()
+        check(fake.list_calls == 2, "same device path keeps the cache")
+        camera.video_device = "/dev/video2"
+        camera.get_controls()
+        check(fake.list_calls == 3, "new device path drops the cache")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Test runner
+# ─────────────────────────────────────────────────────────────────────────────
+
+TESTS = [
+    ("Controls are cached",                test_controls_are_cached),
+    ("set_control updates cache",          test_set_control_updates_cache),
+    ("Reset and device change invalidate", test_reset_and_device_change_invalidate),
+]
+
+
+if __name__ == "__main__":
+    passed, failed = 0, 0
+    failures: list[tuple[str, str]] = []
+
+    print("\n" + "=" * 60)
+    print(" CameraDevice Test Suite")
+    print("=" * 60)
+
+    for name, fn in TESTS:
+        print(f"\n[{name}]")
+        try:
+            fn()
+            print(f"  → PASS")
+            passed += 1
+        except AssertionError as exc:
+            print(f"  → FAIL: {exc}")
+            failed += 1
+            failures.append((name, str(exc)))
+        except Exception as exc:
+            print(f"  → ERROR: {type(exc).__name__}: {exc}")
+            failed += 1
+            failures.append((name, f"{type(exc).__name__}: {exc}"))
+
+    print("\n" + "=" * 60)
+    print(f" Results: {passed} passed, {failed} failed  (total {passed + failed})")
+    if failures:
+        print("\n Failed:")
+        for name, msg in failures:
+            print(f"   • {name}: {msg}")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,173 @@
+"""
+Tests for the priority CommandScheduler — pure Python, the serial write is a
+recording function that can be held to let the queue build up.
+
+Run:
+    python Tests/test_command_scheduler.py
+"""
+
+import sys
+import os
+import threading
+import time
+
+# Allow importing from the Classes/ directory regardless of cwd.
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from Classes.CommandScheduler import (CommandScheduler, SchedulerFull, SchedulerStopped,
+                                      PRIORITY_JOG, PRIORITY_TRACKING, PRIORITY_KEEPALIVE)
+from Classes.Metrics import REGISTRY
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Helpers
+# ─────────────────────────────────────────────────────────────────────────────
+
+def check(condition: bool, message: str) -> None:
+    label = "  OK  " if condition else "  FAIL"
+    print(f"{label}: {message}")
+    if not condition:
+        raise AssertionError(message)
+
+
+class HeldWriter:
+    """Serial stand-in: records payloads; the first write blocks until released."""
+
+    def __init__(self):
+        self.written: list[bytes] = []
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, payload: bytes) -> bool:
+        self.entered.set()
+        self.release.wait(5)
+        self.written.append(payload)
+        return True
+
+
+def _held_scheduler(**kwargs):
+    """Scheduler whose writer is parked inside a first 'busy' write."""
+    writer = HeldWriter()
+    scheduler = CommandScheduler(writer, **kwargs)
+    scheduler.submit(b"busy", PRIORITY_JOG)
+    writer.entered.wait(2)
+    return scheduler, writer
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Tests
+# ─────────────────────────────────────────────────────────────────────────────
+
+def test_priority_order():
+    """Queued batches go out jog → tracking → keep-alive, FIFO within a class."""
+    scheduler, writer = _held_scheduler()
+    try:
+        futures = [
+            scheduler.submit(b"keepalive", PRIORITY_KEEPALIVE),
+            scheduler.submit(b"track1", PRIORITY_TRACKING),
+            scheduler.submit(b"jog1", PRIORITY_JOG),
+            scheduler.submit(b"track2", PRIORITY_TRACKING),
+            scheduler.submit(b"jog2", PRIORITY_JOG),
+        ]
+        writer.release.set()
+        check(all(f.result(timeout=2) is True for f in futures), "every batch written")
+        check(writer.written == [b"busy", b"jog1", b"jog2", b"track1", b"track2", b"keepalive"],
+              f"priority order ({writer.written})")
+    finally:
+        writer.release.set()
+        scheduler.stop()
+
+
+def test_keepalive_coalesced():
+    """A full keep-alive class drops the older keep-alive instead of growing."""
+    scheduler, writer = _held_scheduler()
+    try:
+        old = scheduler.submit(b"e=1 #1", PRIORITY_KEEPALIVE)
+        new = scheduler.submit(b"e=1 #2", PRIORITY_KEEPALIVE)
+        check(scheduler.depth(PRIORITY_KEEPALIVE) == 1, "depth stays at the limit of 1")
+        check(old.done() and old.result() is True, "superseded keep-alive resolved")
+        writer.release.set()
+        new.result(timeout=2)
+        check(writer.written == [b"busy", b"e=1 #2"], f"only the newest written ({writer.written})")
+    finally:
+        writer.release.set()
+        scheduler.stop()
+
+
+def test_backpressure_and_stop():
+    """A full tracking class rejects after its timeout; stop() fails queued work."""
+    scheduler, writer = _held_scheduler(depth_limits={PRIORITY_TRACKING: 2})
+    try:
+        queued = [scheduler.submit(b"t", PRIORITY_TRACKING) for _ in range(2)]
+        started = time.perf_counter()
+        rejected = scheduler.submit(b"t", PRIORITY_TRACKING, timeout=0.2)
+        waited = time.perf_counter() - started
+        check(isinstance(rejected.exception(), SchedulerFull), "third submit → SchedulerFull")
+        check(0.15 < waited < 1.0, f"submitter blocked for the timeout ({waited:.2f}s)")
+        scheduler.stop(timeout=0.1)
+        check(all(isinstance(f.exception(timeout=1), SchedulerStopped) for f in queued),
+              "queued batches fail with SchedulerStopped")
+        check(isinstance(scheduler.submit(b"x").exception(), SchedulerStopped),
+              "submit after stop fails")
+    finally:
+        writer.release.set()
+
+
+def test_queue_wait_exported():
+    """Queue wait is observed per priority class."""
+    writer = HeldWriter()
+    writer.release.set()
+    scheduler = CommandScheduler(writer)
+    try:
+        scheduler.submit(b"k", PRIORITY_KEEPALIVE).result(timeout=2)
+        text = REGISTRY.render()
+        check('motor_command_queue_wait_seconds_count{device="mount",priority="keepalive"}' in text,
+              "keep-alive queue wait histogram exported")
+    finally:
+        scheduler.stop()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Test runner
+# ─────────────────────────────────────────────────────────────────────────────
+
+TESTS = [
+    ("Priority order",                     test_priority_order),
+    ("Keep-alive coalesced",               test_keepalive_coalesced),
+    ("Backpressure and stop",              test_backpressure_and_stop),
+    ("Queue wait exported",                test_queue_wait_exported),
+]
+
+
+if __name__ == "__main__":
+    passed, failed = 0, 0
+    failures: list[tuple[str, str]] = []
+
+    print("\n" + "=" * 60)
+    print(" CommandScheduler Test Suite")
+    print("=" * 60)
+
+    for name, fn in TESTS:
+        print(f"\n[{name}]")
+        try:
+            fn()
+            print(f"  → PASS")
+            passed += 1
+        except AssertionError as exc:
+            print(f"  → FAIL: {exc}")
+            failed += 1
+            failures.append((name, str(exc)))
+        except Exception as exc:
+            print(f"  → ERROR: {type(exc).__name__}: {exc}")
+            failed += 1
+            failures.append((name, f"{type(exc).__name__}: {exc}"))
+
+    print("\n" + "=" * 60)
+    print(f" Results: {passed} passed, {failed} failed  (total {passed + failed})")
+    if failures:
+        print("\n Failed:")
+        for name, msg in failures:
+            print(f"   • {name}: {msg}")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,193 @@
+"""
+Tests for reduced-resolution frame decoding (FrameSource scale=2/4/8) and
+StarFollower's coarse-then-refine star detection on synthetic sky frames.
+
+Run:
+    python Tests/test_decode_scale.py
+"""
+
+import sys
+import os
+import time
+
+# Allow importing from the Classes/ directory regardless of cwd.
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import cv2
+import numpy as np
+
+from Classes.FrameSource import DECODE_SCALES, FrameSource, to_full
+from Classes.Metrics import REGISTRY
+from Classes.StarFollower import StarFollower
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Helpers
+# ─────────────────────────────────────────────────────────────────────────────
+
+def check(condition: bool, message: str) -> None:
+    label = "  OK  " if condition else "  FAIL"
+    print(f"{label}: {message}")
+    if not condition:
+        raise AssertionError(message)
+
+
+class FakeCamera:
+    camera_model = "FakeScaleCam"
+    camera_type = "MJPG"
+
+
+class OneFrameSource(FrameSource):
+    """Reads *frame* (JPEG bytes or an array) once, then nothing new."""
+
+    def __init__(self, frame):
+        super().__init__(FakeCamera())
+        self.frame = frame
+
+    def _open_backend(self, name):
+        frames = [self.frame]
+
+        def read():
+            if frames:
+                return frames.pop()
+            time.sleep(0.05)
+            return self.frame if self._stop_event.is_set() else read()
+        return read, lambda: None
+
+
+def sky(width=960, height=540, star=None, seed=0):
+    """Grayscale sky with noise and, optionally, a Gaussian star at sub-pixel *star*."""
+    rng = np.random.default_rng(seed)
+    ys, xs = np.mgrid[0:height, 0:width].astype(np.float32)
+    image = 20 + 8 * xs / width + rng.normal(0, 2.5, (height, width)).astype(np.float32)
+    if star is not None:
+        image += 200 * np.exp(-((xs - star[0]) ** 2 + (ys - star[1]) ** 2) / (2 * 1.3 ** 2))
+    return np.clip(image, 0, 255).astype(np.uint8)
+
+
+def jpeg_of(image) -> bytes:
+    """JPEG bytes that FrameSource decodes (rotating 180°) back to *image*."""
+    ok, encoded = cv2.imencode('.jpg', cv2.rotate(image, cv2.ROTATE_180),
+                               [cv2.IMWRITE_JPEG_QUALITY, 90])
+    assert ok
+    return encoded.tobytes()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Tests
+# ─────────────────────────────────────────────────────────────────────────────
+
+def test_scaled_get():
+    print("\n[1] get(scale=N): reduced decode, once per scale, for JPEG and raw frames")
+    check(to_full(0, 0, 1) == (0, 0), "scale 1 coordinates are unchanged")
+    check(to_full(0, 0, 4) == (1.5, 1.5), "a 1/4 pixel maps to the centre of its 4×4 block")
+
+    decodes = REGISTRY.counter('frame_source_decodes_total', '', labels=('camera', 'scale'))
+    source = OneFrameSource(jpeg_of(sky()))
+    try:
+        before = {s: decodes.labels("FakeScaleCam", str(s)).value for s in DECODE_SCALES}
+        for scale in DECODE_SCALES:
+            frame = source.get(scale=scale)
+            check(frame is not None and frame.scale == scale, f"scale {scale}: got a frame")
+            check(frame.image.shape == (-(-540 // scale), -(-960 // scale)),
+                  f"scale {scale}: image is {frame.image.shape[1]}×{frame.image.shape[0]}")
+            check(abs(frame.full_size[0] - 960) < scale, f"scale {scale}: full_size ≈ 960 wide")
+        again = source.get(scale=4)
+        check(again.image is source.get(scale=4).image, "repeated scale-4 gets share one image")
+        counts = {s: decodes.labels("FakeScaleCam", str(s)).value - before[s] for s in DECODE_SCALES}
+        check(all(n == 1 for n in counts.values()), f"each scale decoded exactly once: {counts}")
+        check(source.latest().image.shape == (540, 960), "latest() is still full resolution")
+        try:
+            source.get(scale=3)
+            check(False, "scale 3 is rejected")
+        except ValueError:
+            check(True, "scale 3 is rejected")
+    finally:
+        source.stop()
+
+    raw = OneFrameSource(sky())
+    try:
+        frame = raw.get(scale=2)
+        check(frame is not None and frame.image.shape == (270, 480), "raw frames are downscaled too")
+        check(raw.capture('star_follower').shape == (540, 960),
+              "no reduced decode unless a profile asks for it")
+        raw.decode_profiles['star_follower'] = 4
+        check(raw.capture('star_follower').shape == (135, 240),
+              "capture('star_follower') uses its decode profile (scale 4)")
+        check(raw.capture('plate_solver').shape == (540, 960), "other consumers get full frames")
+    finally:
+        raw.stop()
+
+
+def test_find_star_at_each_scale():
+    print("\n[2] _find_star at every scale: star found within a coarse pixel, empty sky rejected")
+    follower = StarFollower(None)
+    star = (613.4, 201.7)
+    jpeg, empty = jpeg_of(sky(star=star, seed=1)), jpeg_of(sky(seed=2))
+    for scale in DECODE_SCALES:
+        found = follower._find_star(FrameSource._scaled(jpeg, scale), scale)
+        check(found is not None, f"scale {scale}: star found")
+        cx, cy = to_full(*found, scale)
+        error = float(np.hypot(cx - star[0], cy - star[1]))
+        check(error <= scale, f"scale {scale}: full-frame error {error:.2f} px ≤ {scale}")
+        check(follower._find_star(FrameSource._scaled(empty, scale), scale) is None,
+              f"scale {scale}: no star in an empty sky")
+
+
+def test_refine_and_escalation():
+    print("\n[3] Escalation: undecided only near the dead-zone edge; refine is sub-pixel")
+    w, h = 960, 540
+    # 10 % dead zone → edge at 96 px from centre horizontally, 54 px vertically.
+    undecided = StarFollower._undecided
+    check(undecided((480 + 93, 270), w, h, 10, 4), "3 px inside the edge is undecided at scale 4")
+    check(not undecided((480 + 93, 270), w, h, 10, 2), "… but decided at scale 2")
+    check(undecided((480, 270 - 50), w, h, 10, 4), "vertical edge counts as well")
+    check(not undecided((480 + 30, 270 + 20), w, h, 10, 8), "near the centre needs no escalation")
+
+    star = (481.3, 302.6)
+    full = FrameSource._scaled(jpeg_of(sky(star=star, seed=3)), 1)
+    coarse = (star[0] + 2.6, star[1] - 3.1)         # as far off as a scale-4 estimate
+    rx, ry = StarFollower._refine(full, coarse, 2 * 4 + 6)
+    error = float(np.hypot(rx - star[0], ry - star[1]))
+    check(error < 0.2, f"refined centroid within 0.2 px ({error:.3f})")
+    check(StarFollower._refine(full, (-50, -50), 5) == (-50, -50),
+          "a window off the frame leaves the estimate alone")
+
+TESTS = [
+    ("Scaled get, decoded once per scale",  test_scaled_get),
+    ("Find star at each scale",             test_find_star_at_each_scale),
+    ("Refine and escalation",               test_refine_and_escalation),
+]
+
+if __name__ == "__main__":
+    passed, failed = 0, 0
+    failures: list[tuple[str, str]] = []
+
+    print("\n" + "=" * 60)
+    print(" Decode Scale Test Suite")
+    print("=" * 60)
+
+    for name, fn in TESTS:
+        print(f"\n[{name}]")
+        try:
+            fn()
+            print(f"  → PASS")
+            passed += 1
+        except AssertionError as exc:
+            print(f"  → FAIL: {exc}")
+            failed += 1
+            failures.append((name, str(exc)))
+        except Exception as exc:
+            print(f"  → ERROR: {type(exc).__name__}: {exc}")
+            failed += 1
+            failures.append((name, f"{type(exc).__name__}: {exc}"))
+
+    print("\n" + "=" * 60)
+    print(f" Results: {passed} passed, {failed} failed  (total {passed + failed})")
+    if failures:
+        print("\n Failed:")
+        for name, msg in failures:
+            print(f"   • {name}: {msg}")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
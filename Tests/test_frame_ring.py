@@ -0,0 +1,231 @@
+"""
+Tests for FrameRing and the FrameSource queries built on it (first frame
+after T, last N frames, first frame after the motors settled), plus the
+motion clock MotorControl keeps against the Arduino simulator (POSIX only).
+
+Run:
+    python Tests/test_frame_ring.py
+"""
+
+import sys
+import os
+import time
+
+# Allow importing from the Classes/ directory regardless of cwd.
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+
+from Classes.FrameRing import FrameRing
+from Classes.FrameSource import FrameSource
+from Classes.MotorRegistry import MotorRegistry
+from Classes.MotorsControl import MotorControl
+from Simulator import ArduinoSimulator
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Helpers
+# ─────────────────────────────────────────────────────────────────────────────
+
+def check(condition: bool, message: str) -> None:
+    label = "  OK  " if condition else "  FAIL"
+    print(f"{label}: {message}")
+    if not condition:
+        raise AssertionError(message)
+
+
+class FakeCamera:
+    camera_model = "FakeRingCam"
+    camera_type = "MJPG"
+
+
+class CountingSource(FrameSource):
+    """Frames are 8×8 arrays filled with their read number, every *interval* seconds."""
+
+    def __init__(self, interval=0.01, **kwargs):
+        super().__init__(FakeCamera(), **kwargs)
+        self.interval = interval
+
+    def _open_backend(self, name):
+        produced = [0]
+
+        def read():
+            time.sleep(self.interval)
+            produced[0] += 1
+            return np.full((8, 8), produced[0] % 256, np.uint8)
+        return read, lambda: None
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Tests
+# ─────────────────────────────────────────────────────────────────────────────
+
+def test_ring_storage():
+    print("\n[1] FrameRing: preallocated slots, read-only views, queries, wrap-around")
+    ring = FrameRing(4)
+    check(ring.first_after(0) is None and ring.last(3) == [], "empty ring answers nothing")
+    for i in range(1, 7):
+        check(ring.push(np.full((2, 3), i, np.uint8), 10.0 + i, motion_time=10.0) == i, f"push {i} → seq {i}")
+    check(len(ring) == 4 and ring.last(10) == [3, 4, 5, 6], "only the newest 4 are held")
+    check(ring.last(2) == [5, 6], "last(2) is the newest two, oldest first")
+    check(not ring.holds(2) and ring.holds(3), "seq 2 was overwritten, 3 is held")
+    try:
+        ring.entry(2)
+        check(False, "an overwritten entry raises KeyError")
+    except KeyError:
+        check(True, "an overwritten entry raises KeyError")
+
+    timestamp, motion_time, image, images = ring.entry(5)
+    check((timestamp, motion_time) == (15.0, 10.0), "timestamps and motion time kept")
+    check(int(image[0, 0]) == 5 and images[1] is image, "entry 5 holds frame 5")
+    check(np.shares_memory(image, ring._pixels), "entry is a view into the preallocated block")
+    check(not image.flags.writeable, "views are read-only")
+    pixels = ring._pixels
+    ring.push(np.full((2, 3), 7, np.uint8), 17.0)
+    check(ring._pixels is pixels, "same-size frames reuse the block")
+    check(ring.entry(7)[1] is None, "no motion time → None")
+
+    check(ring.first_after(15.0) == 5, "first_after(15) is the frame read at 15, not the newest")
+    check(ring.first_after(14.5) == 5 and ring.first_after(99) is None, "first_after between and past frames")
+
+    ring.push(b"\xff\xd8jpeg", 18.0)
+    check(ring.entry(8)[2] == b"\xff\xd8jpeg" and ring.entry(8)[3] == {}, "JPEG frames kept as bytes")
+    ring.push(np.zeros((4, 4), np.uint8), 19.0)
+    check(ring._pixels is not pixels and ring.entry(7)[2].shape == (2, 3),
+          "a new resolution gets a new block; older views still read the old one")
+
+
+def test_source_queries():
+    print("\n[2] FrameSource: get_after, recent and get share the ring without copying")
+    source = CountingSource(ring_size=16)
+    try:
+        first = source.get()
+        check(first is not None, "reader started")
+        t = time.monotonic()
+        time.sleep(0.08)
+        after = source.get_after(t)
+        newest = source.get()
+        check(after is not None and after.timestamp >= t, "get_after returns a frame read after t")
+        check(after.seq < newest.seq, f"… the first one (seq {after.seq}), not the newest ({newest.seq})")
+        previous = source.ring.entry(after.seq - 1)[0]
+        check(previous < t, "the frame before it was read before t")
+
+        frames = source.recent(5)
+        check(len(frames) == 5, "recent(5) gives five frames")
+        check([f.seq for f in frames] == list(range(frames[0].seq, frames[0].seq + 5)),
+              "consecutive seqs, oldest first")
+        check(all(a.timestamp < b.timestamp for a, b in zip(frames, frames[1:])), "timestamps increase")
+        check(all(np.shares_memory(f.image, source.ring._pixels) for f in frames), "no copies")
+        check(not frames[0].image.flags.writeable, "read-only")
+        try:
+            frames[0].image[0, 0] = 0
+            check(False, "writing to a shared frame fails")
+        except ValueError:
+            check(True, "writing to a shared frame fails")
+        check(source.get_after(time.monotonic() + 10, timeout=0.1) is None, "nothing from the future")
+    finally:
+        source.stop()
+
+
+def test_settled_frames_and_motion_clock():
+    print("\n[3] get_settled follows the motion clock; MotorControl estimates when moves end")
+    source = CountingSource()
+    motion = [None]
+    source.motion_clock = lambda: motion[0]
+    try:
+        source.get()
+        motion[0] = time.monotonic()
+        frame = source.get_settled(0.1)
+        check(frame is not None and frame.timestamp >= motion[0] + 0.1,
+              f"frame read ≥ 0.1 s after the move ({frame.timestamp - motion[0]:.3f} s)")
+        check(frame.motion_time == motion[0], "frame stamped with the motion time")
+
+        # A move reported while waiting moves the goal on.
+        start = time.monotonic()
+        motion[0] = start + 0.15
+        frame = source.get_settled(0.05, since=start)
+        check(frame.timestamp >= start + 0.2, "a later move pushes the settled frame back")
+
+        # The timeout counts from the expected end of the move, not from now.
+        start = time.monotonic()
+        motion[0] = start + 0.5
+        frame = source.get_settled(0.05, timeout=0.2)
+        check(frame is not None and frame.timestamp >= start + 0.55,
+              "a long move in progress extends the wait")
+    finally:
+        source.stop()
+
+    with ArduinoSimulator() as sim:
+        registry = MotorRegistry.single(sim.port)
+        registry.start()
+        try:
+            motor = registry.device()
+            check(motor.last_motion() is None and registry.last_motion() is None, "no motion yet")
+            sent = time.monotonic()
+            motor.send_batch(["v=1", "d=1", "t=2", "s=150"])
+            end = motor.last_motion()
+            expected = sent + 0.3 + motor.MOVE_MARGIN
+            check(expected <= end <= expected + 0.1,
+                  f"steps × t + margin estimates the end (+{end - sent:.2f} s)")
+            time.sleep(0.2)
+            check(motor.last_motion() == end, "'done' is ignored without a move_complete_pattern")
+            check(registry.last_motion() == end, "the registry reports the latest device")
+            motor.send_batch(["v=0", "e=1"])
+            check(motor.last_motion() == end, "non-move commands don't count as motion")
+            motor.send_batch(["v=1", "s=50"])
+            check(motor.last_motion() >= end + 0.1, "t= is modal per axis; moves queue up")
+        finally:
+            registry.stop()
+
+    with ArduinoSimulator() as sim:
+        motor = MotorControl(port=sim.port, move_complete_pattern=MotorControl.MOVE_COMPLETE_PATTERN)
+        motor.start()
+        try:
+            sent = time.monotonic()
+            move = motor.move(["v=1", "d=1", "t=1", "s=300"], timeout=3.0)
+            check(motor.last_motion() >= sent + 0.3, "while the move runs, the estimate is ahead")
+            move.result(timeout=3.0)
+            done = motor.last_motion()
+            check(sent + 0.25 <= done <= time.monotonic(),
+                  f"the done report brings it forward (+{done - sent:.2f} s)")
+        finally:
+            motor.stop()
+
+TESTS = [
+    ("Ring storage",                        test_ring_storage),
+    ("Source queries",                      test_source_queries),
+    ("Settled frames and motion clock",     test_settled_frames_and_motion_clock),
+]
+
+if __name__ == "__main__":
+    passed, failed = 0, 0
+    failures: list[tuple[str, str]] = []
+
+    print("\n" + "=" * 60)
+    print(" Frame Ring Test Suite")
+    print("=" * 60)
+
+    for name, fn in TESTS:
+        print(f"\n[{name}]")
+        try:
+            fn()
+            print(f"  → PASS")
+            passed += 1
+        except AssertionError as exc:
+            print(f"  → FAIL: {exc}")
+            failed += 1
+            failures.append((name, str(exc)))
+        except Exception as exc:
+            print(f"  → ERROR: {type(exc).__name__}: {exc}")
+            failed += 1
+            failures.append((name, f"{type(exc).__name__}: {exc}"))
+
+    print("\n" + "=" * 60)
+    print(f" Results: {passed} passed, {failed} failed  (total {passed + failed})")
+    if failures:
+        print("\n Failed:")
+        for name, msg in failures:
+            print(f"   • {name}: {msg}")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,215 @@
+"""
+Tests for FrameSource, the shared per-camera frame reader — scripted fake
+backends plus a local HTTP server standing in for mjpg_streamer, so no
+camera is required.
+
+Run:
+    python Tests/test_frame_source.py
+"""
+
+import sys
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Allow importing from the Classes/ directory regardless of cwd.
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import cv2
+import numpy as np
+
+from Classes.FrameSource import FrameSource
+from Classes.Metrics import REGISTRY
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Helpers
+# ─────────────────────────────────────────────────────────────────────────────
+
+def check(condition: bool, message: str) -> None:
+    label = "  OK  " if condition else "  FAIL"
+    print(f"{label}: {message}")
+    if not condition:
+        raise AssertionError(message)
+
+
+class FakeCamera:
+    def __init__(self, camera_type="MJPG", video_port=0):
+        self.camera_model = "FakeCam"
+        self.camera_type = camera_type
+        self.video_port = video_port
+        self.rtsp_port = 8554
+        self.video_device = "/dev/video-fake"
+
+
+class ScriptedSource(FrameSource):
+    """
+    Backends are replaced by *script*: name → None (cannot open) or the
+    number of frames it yields before failing (0 = forever).
+    """
+
+    RETRY_INTERVAL = 0.05
+
+    def __init__(self, camera, script, interval=0.01, **kwargs):
+        super().__init__(camera, **kwargs)
+        self.script = script
+        self.interval = interval
+        self.opens = []
+        self.closes = 0
+
+    def _open_backend(self, name):
+        self.opens.append(name)
+        budget = self.script.get(name)
+        if budget is None:
+            raise RuntimeError("unavailable")
+        produced = [0]
+
+        def read():
+            time.sleep(self.interval)
+            if budget and produced[0] >= budget:
+                return None
+            produced[0] += 1
+            return np.full((4, 4), produced[0], np.uint8)
+
+        def close():
+            self.closes += 1
+        return read, close
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Tests
+# ─────────────────────────────────────────────────────────────────────────────
+
+def test_consumers_share_one_reader():
+    """Concurrent consumers get frames from one connection; since= waits for a newer frame."""
+    source = ScriptedSource(FakeCamera(), {'mjpg_stream': 0})
+    try:
+        results = []
+
+        def consumer():
+            for _ in range(5):
+                results.append(source.get(timeout=1.0))
+
+        threads = [threading.Thread(target=consumer) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        check(all(frame is not None for frame in results), "every get() got a frame")
+        check(source.opens == ['mjpg_stream'], f"one backend connection ({source.opens})")
+
+        first = source.get()
+        t0 = time.monotonic()
+        fresh = source.get(since=t0)
+        check(fresh.seq > first.seq and fresh.timestamp >= t0, "since= returns a frame read afterwards")
+        check(source.latest().seq >= fresh.seq, "latest() is the newest frame")
+        check(source.capture('test_consumer').shape == (4, 4), "capture() returns the image")
+        check('frame_capture_seconds_count{consumer="test_consumer",strategy="frame_source"}'
+              in REGISTRY.render(), "capture wait recorded per consumer")
+    finally:
+        source.stop()
+
+
+def test_fallback_reconnect_and_idle():
+    """An unavailable backend falls back; a failing one reconnects; idle releases the camera."""
+    source = ScriptedSource(FakeCamera(), {'direct': 3}, idle_timeout=0.3)
+    frame = source.get(timeout=1.0)
+    check(frame is not None and source.backend == 'direct', "fell back to direct capture")
+    frames = [source.get(since=time.monotonic(), timeout=1.0) for _ in range(6)]
+    check(all(f is not None for f in frames), "frames keep coming across reconnects")
+    check(source.opens.count('direct') >= 2, f"direct reopened after failing ({source.opens})")
+
+    deadline = time.monotonic() + 2.0
+    while source._thread is not None and time.monotonic() < deadline:
+        time.sleep(0.05)
+    check(source._thread is None and source.backend is None, "reader stopped when idle")
+    check(source.closes == len([n for n in source.opens if n == 'direct']), "every connection closed")
+    check(source.get(timeout=1.0) is not None, "next get() reconnects")
+    source.stop()
+
+
+def test_mjpg_snapshot_backend():
+    """Without ?action=stream, snapshots reuse one keep-alive connection; grayscale, rotated 180°."""
+    image = np.zeros((32, 48, 3), np.uint8)
+    image[:8, :8] = 255                          # bright top-left corner
+    ok, jpeg = cv2.imencode('.jpg', image)
+    body = jpeg.tobytes()
+    connections = set()
+
+    class SnapshotHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            if "action=snapshot" not in self.path:
+                self.send_error(404)
+                return
+            connections.add(self.client_address)
+            self.send_response(200)
+            self.send_header("Content-Type", "image/jpeg")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SnapshotHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    source = FrameSource(FakeCamera("MJPG", server.server_address[1]))
+    try:
+        frames = [source.get(since=time.monotonic(), timeout=3.0) for _ in range(4)]
+        check(all(f is not None for f in frames), "snapshots decoded")
+        gray = frames[-1].image
+        check(gray.ndim == 2 and gray.shape == (32, 48), f"grayscale {gray.shape}")
+        check(gray[-4, -4] > 200 and gray[4, 4] < 50, "rotated 180°")
+        check(len(connections) == 1, f"one keep-alive connection ({len(connections)})")
+        check(source.backend == 'mjpg_snapshot', "fell back to snapshots")
+    finally:
+        source.stop()
+        server.shutdown()
+        server.server_close()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Test runner
+# ─────────────────────────────────────────────────────────────────────────────
+
+TESTS = [
+    ("Consumers share one reader",         test_consumers_share_one_reader),
+    ("Fallback, reconnect and idle",       test_fallback_reconnect_and_idle),
+    ("MJPG snapshot backend",              test_mjpg_snapshot_backend),
+]
+
+if __name__ == "__main__":
+    passed, failed = 0, 0
+    failures: list[tuple[str, str]] = []
+
+    print("\n" + "=" * 60)
+    print(" FrameSource Test Suite")
+    print("=" * 60)
+
+    for name, fn in TESTS:
+        print(f"\n[{name}]")
+        try:
+            fn()
+            print(f"  → PASS")
+            passed += 1
+        except AssertionError as exc:
+            print(f"  → FAIL: {exc}")
+            failed += 1
+            failures.append((name, str(exc)))
+        except Exception as exc:
+            print(f"  → ERROR: {type(exc).__name__}: {exc}")
+            failed += 1
+            failures.append((name, f"{type(exc).__name__}: {exc}"))
+
+    print("\n" + "=" * 60)
+    print(f" Results: {passed} passed, {failed} failed  (total {passed + failed})")
+    if failures:
+        print("\n Failed:")
+        for name, msg in failures:
+            print(f"   • {name}: {msg}")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,203 @@
+"""
+Tests for JobManager — pure Python, no hardware required.
+
+Run:
+    python Tests/test_job_manager.py
+"""
+
+import sys
+import os
+import threading
+import time
+
+# Allow importing from the Classes/ directory regardless of cwd.
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from Classes.JobManager import Job, JobManager, JobQueueFull
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Helpers
+# ─────────────────────────────────────────────────────────────────────────────
+
+def check(condition: bool, message: str) -> None:
+    label = "  OK  " if condition else "  FAIL"
+    print(f"{label}: {message}")
+    if not condition:
+        raise AssertionError(message)
+
+
+def wait_for(predicate, timeout: float = 2.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Tests
+# ─────────────────────────────────────────────────────────────────────────────
+
+def test_submit_returns_immediately_and_completes():
+    """submit() returns a queued job at once; the result is stored when done."""
+    manager = JobManager()
+    release = threading.Event()
+
+    def work(job):
+        job.set_progress(0.5, "half way")
+        release.wait(2)
+        return {"success": True, "value": 42}
+
+    t0 = time.perf_counter()
+    job = manager.submit("solve", work, {"camera": "hd"})
+    check(time.perf_counter() - t0 < 0.1, "submit() does not wait for the work")
+    check(wait_for(lambda: job.to_dict()["message"] == "half way"), "progress is visible while running")
+    check(job.state == Job.RUNNING, f"job is running (got {job.state})")
+
+    release.set()
+    check(wait_for(lambda: job.finished), "job finishes")
+    d = manager.get(job.id).to_dict()
+    check(d["state"] == Job.DONE, f"state is done (got {d['state']})")
+    check(d["progress"] == 1.0, "progress is 1.0 when done")
+    check(d["result"] == {"success": True, "value": 42}, "result is stored")
+    check(d["params"] == {"camera": "hd"}, "params are stored")
+    manager.shutdown()
+
+
+def test_failed_job_records_error():
+    """An exception in the work function marks the job failed."""
+    manager = JobManager()
+
+    def work(job):
+        raise RuntimeError("boom")
+
+    job = manager.submit("rotation", work)
+    check(wait_for(lambda: job.finished), "job finishes")
+    check(job.state == Job.FAILED, f"state is failed (got {job.state})")
+    check(job.to_dict()["error"] == "boom", "error message is stored")
+    manager.shutdown()
+
+
+def test_jobs_run_back_to_back():
+    """With one worker, a second job waits in the queue until the first finishes."""
+    manager = JobManager(max_workers=1)
+    release = threading.Event()
+    first = manager.submit("solve", lambda job: release.wait(2))
+    second = manager.submit("solve", lambda job: "second")
+    check(wait_for(lambda: first.state == Job.RUNNING), "first job running")
+    check(second.state == Job.QUEUED, f"second job queued (got {second.state})")
+    release.set()
+    check(wait_for(lambda: second.finished), "second job finishes after the first")
+    check(second.to_dict()["result"] == "second", "second job result stored")
+    manager.shutdown()
+
+
+def test_cancel_queued_job():
+    """Cancelling a queued job drops it without running the work."""
+    manager = JobManager(max_workers=1)
+    release = threading.Event()
+    ran = []
+    manager.submit("solve", lambda job: release.wait(2))
+    queued = manager.submit("solve", lambda job: ran.append(True))
+    manager.cancel(queued.id)
+    release.set()
+    check(wait_for(lambda: queued.finished), "queued job finishes")
+    time.sleep(0.1)
+    check(queued.state == Job.CANCELLED, f"state is cancelled (got {queued.state})")
+    check(ran == [], "work function never ran")
+    manager.shutdown()
+
+
+def test_cancel_running_job_is_cooperative():
+    """Cancelling a running job sets cancel_event; the job ends as cancelled."""
+    manager = JobManager()
+
+    def work(job):
+        job.cancel_event.wait(2)
+        return {"success": False, "error": "Cancelled"}
+
+    job = manager.submit("solve", work)
+    check(wait_for(lambda: job.state == Job.RUNNING), "job running")
+    manager.cancel(job.id)
+    check(wait_for(lambda: job.finished), "job stops after cancel")
+    check(job.state == Job.CANCELLED, f"state is cancelled (got {job.state})")
+    manager.shutdown()
+
+
+def test_pending_limit():
+    """submit() raises JobQueueFull once max_pending jobs are queued/running."""
+    manager = JobManager(max_workers=1, max_pending=2)
+    release = threading.Event()
+    manager.submit("solve", lambda job: release.wait(2))
+    manager.submit("solve", lambda job: release.wait(2))
+    try:
+        manager.submit("solve", lambda job: None)
+        raised = False
+    except JobQueueFull:
+        raised = True
+    check(raised, "third submit raises JobQueueFull")
+    release.set()
+    manager.shutdown()
+
+
+def test_completed_lru():
+    """Only the max_completed most recently used finished jobs are kept."""
+    manager = JobManager(max_completed=2)
+    jobs = [manager.submit("solve", lambda job, i=i: i) for i in range(3)]
+    check(wait_for(lambda: all(j.finished for j in jobs)), "all jobs finish")
+    time.sleep(0.05)
+    check(manager.get(jobs[0].id) is None, "oldest finished job evicted")
+    check(manager.get(jobs[1].id) is not None, "second job kept")
+    check(manager.get(jobs[2].id) is not None, "newest job kept")
+    manager.shutdown()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Test runner
+# ─────────────────────────────────────────────────────────────────────────────
+
+TESTS = [
+    ("Submit returns immediately",         test_submit_returns_immediately_and_completes),
+    ("Failed job records error",           test_failed_job_records_error),
+    ("Jobs run back-to-back",              test_jobs_run_back_to_back),
+    ("Cancel queued job",                  test_cancel_queued_job),
+    ("Cancel running job",                 test_cancel_running_job_is_cooperative),
+    ("Pending limit",                      test_pending_limit),
+    ("Completed LRU",                      test_completed_lru),
+]
+
+
+if __name__ == "__main__":
+    passed, failed = 0, 0
+    failures: list[tuple[str, str]] = []
+
+    print("\n" + "=" * 60)
+    print(" JobManager Test Suite")
+    print("=" * 60)
+
+    for name, fn in TESTS:
+        print(f"\n[{name}]")
+        try:
+            fn()
+            print(f"  → PASS")
+            passed += 1
+        except AssertionError as exc:
+            print(f"  → FAIL: {exc}")
+            failed += 1
+            failures.append((name, str(exc)))
+        except Exception as exc:
+            print(f"  → ERROR: {type(exc).__name__}: {exc}")
+            failed += 1
+            failures.append((name, f"{type(exc).__name__}: {exc}"))
+
+    print("\n" + "=" * 60)
+    print(f" Results: {passed} passed, {failed} failed  (total {passed + failed})")
+    if failures:
+        print("\n Failed:")
+        for name, msg in failures:
+            print(f"   • {name}: {msg}")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,184 @@
+"""
+Tests for the binary jog channel — loopback sockets and a fake motor.
+
+Run:
+    python Tests/test_jog_channel.py
+"""
+
+import sys
+import os
+import socket
+import threading
+
+# Allow importing from the Classes/ directory regardless of cwd.
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from Classes.JogChannel import (JogChannel, JogClient, encode_jog, decode_ack,
+                                JOG_FORMAT, STATUS_OK, STATUS_SERIAL, STATUS_BAD_FRAME)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Helpers
+# ─────────────────────────────────────────────────────────────────────────────
+
+def check(condition: bool, message: str) -> None:
+    label = "  OK  " if condition else "  FAIL"
+    print(f"{label}: {message}")
+    if not condition:
+        raise AssertionError(message)
+
+
+class FakeMotor:
+    def __init__(self, ok=True):
+        self.ok = ok
+        self.batches: list[list[str]] = []
+        self._lock = threading.Lock()
+
+    def send_batch(self, commands):
+        with self._lock:
+            self.batches.append(list(commands))
+        return self.ok
+
+
+def _start_channel(motor):
+    channel = JogChannel(motor, host="127.0.0.1", port=0)
+    channel.start()
+    return channel
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Tests
+# ─────────────────────────────────────────────────────────────────────────────
+
+def test_udp_jog_becomes_one_batch():
+    """A UDP jog is acked and delivered as a single v/d/t/s batch."""
+    motor = FakeMotor()
+    channel = _start_channel(motor)
+    client = JogClient(*channel.address)
+    try:
+        status = client.jog(axis=1, direction=0, steps=200, t_ms=2.5)
+        check(status == STATUS_OK, f"ack status OK (got {status})")
+        check(motor.batches == [["v=1", "d=0", "t=2.5", "s=200"]], f"one batch ({motor.batches})")
+        client.jog(axis=0, direction=1, steps=10)
+        check(motor.batches[-1] == ["v=0", "d=1", "s=10"], "t_ms=0 omits t=")
+    finally:
+        client.close()
+        channel.stop()
+
+
+def test_retransmit_is_not_executed_twice():
+    """Resending the same seq is acked again but moves the motor only once."""
+    motor = FakeMotor()
+    channel = _start_channel(motor)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.settimeout(2)
+    try:
+        frame = encode_jog(7, 1, 1, 50)
+        for _ in range(3):
+            sock.sendto(frame, channel.address)
+            check(decode_ack(sock.recv(64)) == (7, STATUS_OK), "seq 7 acked OK")
+        check(len(motor.batches) == 1, f"motor moved once (got {len(motor.batches)})")
+    finally:
+        sock.close()
+        channel.stop()
+
+
+def test_bad_frame_and_serial_error():
+    """Malformed frames are rejected; a failed serial write reports STATUS_SERIAL."""
+    motor = FakeMotor(ok=False)
+    channel = _start_channel(motor)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.settimeout(2)
+    try:
+        sock.sendto(b"s=100", channel.address)
+        check(decode_ack(sock.recv(64))[1] == STATUS_BAD_FRAME, "short frame → BAD_FRAME")
+        sock.sendto(encode_jog(1, 5, 0, 10), channel.address)
+        check(decode_ack(sock.recv(64)) == (1, STATUS_BAD_FRAME), "axis 5 → BAD_FRAME")
+        sock.sendto(encode_jog(2, 1, 0, 10), channel.address)
+        check(decode_ack(sock.recv(64)) == (2, STATUS_SERIAL), "write failure → SERIAL")
+        sock.sendto(encode_jog(2, 1, 0, 10), channel.address)
+        sock.recv(64)
+        check(len(motor.batches) == 2, "a failed jog is retried on retransmit")
+    finally:
+        sock.close()
+        channel.stop()
+
+
+def test_tcp_transport():
+    """The same frames work over TCP on the same port number."""
+    motor = FakeMotor()
+    channel = _start_channel(motor)
+    try:
+        with socket.create_connection(channel.address, timeout=2) as conn:
+            conn.sendall(encode_jog(1, 0, 1, 5) + encode_jog(2, 1, 0, 6))
+            acks = b""
+            while len(acks) < 18:
+                acks += conn.recv(64)
+        check(decode_ack(acks[:9]) == (1, STATUS_OK) and decode_ack(acks[9:]) == (2, STATUS_OK),
+              "both frames acked in order")
+        check([b[-1] for b in motor.batches] == ["s=5", "s=6"], "both jogs delivered")
+        check(JOG_FORMAT.size == 18, "jog frame is 18 bytes")
+    finally:
+        channel.stop()
+
+
+def test_failed_tcp_bind_releases_udp():
+    """If the TCP port is taken, construction fails and the UDP port is released."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as taken:
+        taken.bind(("127.0.0.1", 0))
+        taken.listen(1)
+        port = taken.getsockname()[1]
+        try:
+            JogChannel(FakeMotor(), host="127.0.0.1", port=port)
+            check(False, "OSError when the TCP port is in use")
+        except OSError:
+            check(True, "OSError when the TCP port is in use")
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as udp:
+            udp.bind(("127.0.0.1", port))
+            check(True, "UDP port free again after the failed construction")
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Test runner
+# ─────────────────────────────────────────────────────────────────────────────
+
+TESTS = [
+    ("UDP jog becomes one batch",          test_udp_jog_becomes_one_batch),
+    ("Retransmit not executed twice",      test_retransmit_is_not_executed_twice),
+    ("Bad frame and serial error",         test_bad_frame_and_serial_error),
+    ("TCP transport",                      test_tcp_transport),
+    ("Failed TCP bind releases UDP",       test_failed_tcp_bind_releases_udp),
+]
+
+
+if __name__ == "__main__":
+    passed, failed = 0, 0
+    failures: list[tuple[str, str]] = []
+
+    print("\n" + "=" * 60)
+    print(" JogChannel Test Suite")
+    print("=" * 60)
+
+    for name, fn in TESTS:
+        print(f"\n[{name}]")
+        try:
+            fn()
+            print(f"  → PASS")
+            passed += 1
+        except AssertionError as exc:
+            print(f"  → FAIL: {exc}")
+            failed += 1
+            failures.append((name, str(exc)))
+        except Exception as exc:
+            print(f"  → ERROR: {type(exc).__name__}: {exc}")
+            failed += 1
+            failures.append((name, f"{type(exc).__name__}: {exc}"))
+
+    print("\n" + "=" * 60)
+    print(f" Results: {passed} passed, {failed} failed  (total {passed + failed})")
+    if failures:
+        print("\n Failed:")
+        for name, msg in failures:
+            print(f"   • {name}: {msg}")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
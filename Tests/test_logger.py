@@ -0,0 +1,154 @@
+"""
+Tests for the asynchronous Logger — pure Python, no hardware.
+
+Run:
+    python Tests/test_logger.py
+"""
+
+import io
+import sys
+import os
+import threading
+import time
+
+# Allow importing from the Classes/ directory regardless of cwd.
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from Classes.Logger import LogWriter, Logger, DEBUG, INFO
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Assertion helper
+# ─────────────────────────────────────────────────────────────────────────────
+
+def check(condition: bool, message: str) -> None:
+    label = "  OK  " if condition else "  FAIL"
+    print(f"{label}: {message}")
+    if not condition:
+        raise AssertionError(message)
+
+
+class BlockingStream:
+    """A stream whose write() stalls until released — a wedged stdout."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.data = []
+
+    def write(self, text):
+        self.release.wait(5)
+        self.data.append(text)
+
+    def flush(self):
+        pass
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Tests
+# ─────────────────────────────────────────────────────────────────────────────
+
+def test_levels_and_formatting():
+    """Records below the level are discarded; formatting happens on the writer."""
+    stream = io.StringIO()
+    log = Logger("Test", LogWriter(stream=stream, level=INFO))
+    log.debug("hidden %d", 1)
+    log.info("Star at (%d, %d)", 10, 20)
+    log.writer.flush()
+    out = stream.getvalue()
+    print(out)
+    check("hidden" not in out, "DEBUG record filtered at INFO level")
+    check("INFO [Test] Star at (10, 20)" in out, "INFO record formatted with name prefix")
+
+
+def test_rate_limit_reports_suppressed():
+    """every= keeps one record per window and reports the suppressed count."""
+    stream = io.StringIO()
+    log = Logger("Test", LogWriter(stream=stream))
+    for _ in range(5):
+        log.info("No star detected.", every=0.2)
+    time.sleep(0.25)
+    log.info("No star detected.", every=0.2)
+    log.writer.flush()
+    lines = stream.getvalue().splitlines()
+    print(lines)
+    check(len(lines) == 2, f"two records emitted (got {len(lines)})")
+    check(lines[1].endswith("(+4 suppressed)"), "second record reports 4 suppressed")
+
+
+def test_slow_stream_never_blocks_caller():
+    """A stalled stream fills the queue; callers drop records instead of waiting."""
+    stream = BlockingStream()
+    log = Logger("Test", LogWriter(stream=stream, queue_size=10))
+    start = time.perf_counter()
+    for i in range(1000):
+        log.info("TX %r", b"s=100\n")
+    elapsed = time.perf_counter() - start
+    dropped = log.writer.dropped
+    stream.release.set()
+    log.writer.flush()
+    check(elapsed < 0.5, f"1000 calls returned in {elapsed * 1000:.1f} ms")
+    check(dropped > 0, f"records dropped while the stream was stalled ({dropped})")
+
+
+def test_ring_only_flush_on_demand():
+    """ring_only keeps raw records in memory until flush_ring() writes them."""
+    stream = io.StringIO()
+    writer = LogWriter(stream=stream, level=DEBUG, ring_capacity=3, ring_only=True)
+    log = Logger("Serial", writer)
+    for i in range(5):
+        log.debug("RX %r", bytes([0x30 + i]) + b"\n")
+    writer.flush()
+    check(stream.getvalue() == "", "nothing written before flush_ring()")
+    check(len(writer.ring_lines()) == 3, "ring keeps only the newest 3 records")
+    count = writer.flush_ring()
+    out = stream.getvalue()
+    print(out)
+    check(count == 3, "flush_ring() reports 3 records")
+    check("RX b'4\\n'" in out and "RX b'1\\n'" not in out, "oldest records evicted")
+    check(writer.ring_lines() == [], "ring cleared after flush")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Test runner
+# ─────────────────────────────────────────────────────────────────────────────
+
+TESTS = [
+    ("Levels and formatting",              test_levels_and_formatting),
+    ("Rate limit reports suppressed",      test_rate_limit_reports_suppressed),
+    ("Slow stream never blocks caller",    test_slow_stream_never_blocks_caller),
+    ("Ring-only flush on demand",          test_ring_only_flush_on_demand),
+]
+
+
+if __name__ == "__main__":
+    passed, failed = 0, 0
+    failures: list[tuple[str, str]] = []
+
+    print("\n" + "=" * 60)
+    print(" Logger Test Suite")
+    print("=" * 60)
+
+    for name, fn in TESTS:
+        print(f"\n[{name}]")
+        try:
+            fn()
+            print(f"  → PASS")
+            passed += 1
+        except AssertionError as exc:
+            print(f"  → FAIL: {exc}")
+            failed += 1
+            failures.append((name, str(exc)))
+        except Exception as exc:
+            print(f"  → ERROR: {type(exc).__name__}: {exc}")
+            failed += 1
+            failures.append((name, f"{type(exc).__name__}: {exc}"))
+
+    print("\n" + "=" * 60)
+    print(f" Results: {passed} passed, {failed} failed  (total {passed + failed})")
+    if failures:
+        print("\n Failed:")
+        for name, msg in failures:
+            print(f"   • {name}: {msg}")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
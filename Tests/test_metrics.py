@@ -0,0 +1,116 @@
+"""
+Tests for the Metrics registry — pure Python.
+
+Run:
+    python Tests/test_metrics.py
+"""
+
+import sys
+import os
+
+# Allow importing from the Classes/ directory regardless of cwd.
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from Classes.Metrics import MetricsRegistry
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Assertion helper
+# ─────────────────────────────────────────────────────────────────────────────
+
+def check(condition: bool, message: str) -> None:
+    label = "  OK  " if condition else "  FAIL"
+    print(f"{label}: {message}")
+    if not condition:
+        raise AssertionError(message)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Tests
+# ─────────────────────────────────────────────────────────────────────────────
+
+def test_counter_and_gauge_render():
+    """Counters and gauges render as single samples with their labels."""
+    reg = MetricsRegistry()
+    reg.counter("bytes_total", "Bytes", labels=("dir",)).labels("tx").inc(5)
+    reg.gauge("depth", "Depth").labels().set(3)
+    text = reg.render()
+    print(text)
+    check('bytes_total{dir="tx"} 5' in text, "labelled counter sample")
+    check("depth 3" in text, "unlabelled gauge sample")
+    check("# TYPE bytes_total counter" in text, "counter TYPE line")
+
+
+def test_histogram_buckets_are_cumulative():
+    """Histogram buckets are cumulative and end with +Inf == count."""
+    reg = MetricsRegistry()
+    hist = reg.histogram("lat_seconds", "Latency", buckets=(0.1, 1.0)).labels()
+    for value in (0.05, 0.5, 0.5, 5.0):
+        hist.observe(value)
+    text = reg.render()
+    print(text)
+    check('lat_seconds_bucket{le="0.1"} 1' in text, "le=0.1 bucket holds 1")
+    check('lat_seconds_bucket{le="1.0"} 3' in text, "le=1.0 bucket is cumulative (3)")
+    check('lat_seconds_bucket{le="+Inf"} 4' in text, "+Inf bucket equals count")
+    check("lat_seconds_count 4" in text, "count sample")
+    check(abs(hist.sum - 6.05) < 1e-9, f"sum is 6.05 (got {hist.sum})")
+
+
+def test_get_or_create_returns_same_family():
+    """Registering the same name twice returns the existing family."""
+    reg = MetricsRegistry()
+    a = reg.histogram("capture_seconds", "Capture", labels=("strategy",))
+    b = reg.histogram("capture_seconds", "Capture", labels=("strategy",))
+    check(a is b, "same family object returned")
+    check(a.labels("rtsp") is b.labels("rtsp"), "same child for the same labels")
+    try:
+        reg.counter("capture_seconds", "Capture")
+        raised = False
+    except ValueError:
+        raised = True
+    check(raised, "re-registering as a different kind raises ValueError")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Test runner
+# ─────────────────────────────────────────────────────────────────────────────
+
+TESTS = [
+    ("Counter and gauge render",           test_counter_and_gauge_render),
+    ("Histogram buckets cumulative",       test_histogram_buckets_are_cumulative),
+    ("Get-or-create same family",          test_get_or_create_returns_same_family),
+]
+
+
+if __name__ == "__main__":
+    passed, failed = 0, 0
+    failures: list[tuple[str, str]] = []
+
+    print("\n" + "=" * 60)
+    print(" Metrics Test Suite")
+    print("=" * 60)
+
+    for name, fn in TESTS:
+        print(f"\n[{name}]")
+        try:
+            fn()
+            print(f"  → PASS")
+            passed += 1
+        except AssertionError as exc:
+            print(f"  → FAIL: {exc}")
+            failed += 1
+            failures.append((name, str(exc)))
+        except Exception as exc:
+            print(f"  → ERROR: {type(exc).__name__}: {exc}")
+            failed += 1
+            failures.append((name, f"{type(exc).__name__}: {exc}"))
+
+    print("\n" + "=" * 60)
+    print(f" Results: {passed} passed, {failed} failed  (total {passed + failed})")
+    if failures:
+        print("\n Failed:")
+        for name, msg in failures:
+            print(f"   • {name}: {msg}")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
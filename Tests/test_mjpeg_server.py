@@ -0,0 +1,243 @@
+"""
+Tests for the in-process capture path: MjpegServer fan-out to several
+viewers, FrameSource's v4l2 backend feeding it (with a scripted stand-in
+for the device, so no camera is required) and the V4L2 ABI definitions.
+
+Run:
+    python Tests/test_mjpeg_server.py
+"""
+
+import sys
+import os
+import ctypes
+import http.client
+import time
+
+# Allow importing from the Classes/ directory regardless of cwd.
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from Classes import V4L2Capture as v4l2
+from Classes.CameraDevice import CameraDevice
+from Classes.FrameSource import FrameSource
+from Classes.MjpegServer import MjpegServer
+from Classes.MjpegStream import MjpegParser, parse_boundary
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Helpers
+# ─────────────────────────────────────────────────────────────────────────────
+
+def check(condition: bool, message: str) -> None:
+    label = "  OK  " if condition else "  FAIL"
+    print(f"{label}: {message}")
+    if not condition:
+        raise AssertionError(message)
+
+
+def fake_jpeg(n: int) -> bytes:
+    """Bytes shaped like a JPEG; the server never looks inside."""
+    return b"\xff\xd8" + b"frame-%04d-" % n + bytes(range(256)) * 8 + b"\xff\xd9"
+
+
+class Viewer:
+    """A ?action=stream client parsing parts with MjpegParser."""
+
+    def __init__(self, port):
+        self.connection = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+        self.connection.request("GET", "/?action=stream")
+        self.response = self.connection.getresponse()
+        self.status = self.response.status
+        if self.status == 200:
+            self.parser = MjpegParser(parse_boundary(self.response.getheader("Content-Type")))
+
+    def next_frame(self):
+        while True:
+            jpeg = self.parser.feed(self.response.read1(65536))
+            if jpeg is not None:
+                return jpeg
+
+    def close(self):
+        self.response.close()       # holds its own reference to the socket
+        self.connection.close()
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+class ScriptedV4L2Source(FrameSource):
+    """The v4l2 backend yields numbered fake JPEGs with 'driver' timestamps."""
+
+    RETRY_INTERVAL = 0.05
+
+    def __init__(self, camera, **kwargs):
+        super().__init__(camera, **kwargs)
+        self.opened = []
+        self.stamps = set()
+
+    def _open_backend(self, name):
+        self.opened.append(name)
+        if name != 'v4l2':
+            raise RuntimeError("unavailable")
+        count = [0]
+
+        def read():
+            time.sleep(0.01)
+            count[0] += 1
+            stamp = time.monotonic() - 0.004     # exposure ended a little before the dequeue
+            self.stamps.add(stamp)
+            return fake_jpeg(count[0]), stamp
+        return read, lambda: None
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Tests
+# ─────────────────────────────────────────────────────────────────────────────
+
+def test_fan_out_to_viewers():
+    print("\n[1] MjpegServer: every viewer gets the same frames; snapshot; viewer limit")
+    server = MjpegServer(0, host="127.0.0.1", name="FakeFanOut", max_clients=2).start()
+    viewers = []
+    try:
+        connection = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+        connection.request("GET", "/?action=snapshot")
+        response = connection.getresponse()
+        response.read()
+        check(response.status == 503, "snapshot before any frame is 503")
+        connection.close()
+
+        viewers = [Viewer(server.port), Viewer(server.port)]
+        check(all(v.status == 200 for v in viewers), "two viewers connected")
+        check(wait_until(lambda: server.clients == 2), "server counts two clients")
+        third = Viewer(server.port)
+        check(third.status == 503, "a third viewer is turned away (max_clients=2)")
+        third.close()
+
+        for n in range(1, 6):
+            server.publish(fake_jpeg(n), timestamp=float(n))
+            received = [v.next_frame() for v in viewers]
+            check(received == [fake_jpeg(n)] * 2, f"frame {n} reached both viewers intact")
+
+        connection = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+        connection.request("GET", "/?action=snapshot")
+        response = connection.getresponse()
+        check(response.status == 200 and response.getheader("Content-Type") == "image/jpeg",
+              "snapshot is image/jpeg")
+        check(response.read() == fake_jpeg(5), "snapshot is the latest frame")
+        connection.request("GET", "/index.html")
+        response = connection.getresponse()
+        response.read()
+        check(response.status == 404, "other paths are 404")
+        connection.close()
+
+        viewers[0].close()
+        check(wait_until(lambda: (server.publish(fake_jpeg(0)), server.clients)[1] == 1),
+              "a closed viewer is noticed on the next write")
+    finally:
+        for viewer in viewers:
+            viewer.close()
+        server.stop()
+
+
+def test_in_process_capture_feeds_server():
+    print("\n[2] capture='v4l2': frames flow device → ring → viewers without any get()")
+    try:
+        CameraDevice("Cam", "MJPG", 0, capture="ffmpeg")
+        check(False, "unknown capture mode rejected")
+    except ValueError:
+        check(True, "unknown capture mode rejected")
+
+    camera = CameraDevice("FakeV4L2Cam", "MJPG", 0, capture="v4l2")
+    camera.frame_source = source = ScriptedV4L2Source(camera, idle_timeout=0.05)
+    check(source._backends() == ['v4l2', 'direct'], "MJPG + v4l2 skips the mjpg_streamer backends")
+    sunk = []
+    source.jpeg_sinks.append(lambda jpeg, timestamp: sunk.append((jpeg, timestamp)))
+    code, _ = camera._start_in_process()
+    try:
+        check(code == 200 and camera.mjpeg_server is not None, "in-process stream started")
+        viewer = Viewer(camera.mjpeg_server.port)
+        first = viewer.next_frame()
+        check(first.startswith(b"\xff\xd8frame-"), "the viewer receives camera frames")
+        time.sleep(0.2)     # well past idle_timeout, with no get()
+        check(source._thread is not None and source.backend == 'v4l2',
+              "hold() keeps the reader streaming without consumers")
+        check(viewer.next_frame() != first, "… and the viewer keeps getting new frames")
+        viewer.close()
+
+        with source._cond:
+            timestamp, _, jpeg, _ = source.ring.entry(source.ring.count)
+        check(timestamp in source.stamps, "the ring keeps the driver's capture time")
+        match = [entry for entry in sunk if entry[1] == timestamp]
+        check(match and match[0][0] is jpeg, "sinks get the very bytes object the ring holds")
+    finally:
+        code, _ = camera.stop_stream()
+    check(code == 200 and camera.mjpeg_server is None, "stop_stream shuts the server down")
+    check(source._holds == 0 and source._thread is None, "… and releases the reader")
+    check(source.opened.count('v4l2') >= 1, "opened through the v4l2 backend")
+
+
+def test_v4l2_abi():
+    print("\n[3] V4L2 structs and ioctl numbers match <linux/videodev2.h>")
+    if ctypes.sizeof(ctypes.c_void_p) == 8:
+        check(ctypes.sizeof(v4l2.v4l2_format) == 208, "sizeof(v4l2_format) == 208")
+        check(ctypes.sizeof(v4l2.v4l2_buffer) == 88, "sizeof(v4l2_buffer) == 88")
+        check(v4l2.VIDIOC_S_FMT == 0xc0d05605, "VIDIOC_S_FMT")
+        check(v4l2.VIDIOC_QUERYBUF == 0xc0585609, "VIDIOC_QUERYBUF")
+        check(v4l2.VIDIOC_QBUF == 0xc058560f and v4l2.VIDIOC_DQBUF == 0xc0585611, "VIDIOC_QBUF / DQBUF")
+    check(v4l2.VIDIOC_REQBUFS == 0xc0145608, "VIDIOC_REQBUFS")
+    check(v4l2.VIDIOC_STREAMON == 0x40045612 and v4l2.VIDIOC_STREAMOFF == 0x40045613,
+          "VIDIOC_STREAMON / STREAMOFF")
+    check(v4l2.VIDIOC_S_PARM == 0xc0cc5616, "VIDIOC_S_PARM")
+    check(v4l2.V4L2_PIX_FMT_MJPEG == 0x47504a4d, "MJPG fourcc")
+
+    capture = v4l2.V4L2Capture("/dev/null")
+    try:
+        capture.open()
+        check(False, "/dev/null is not a camera")
+    except OSError:
+        check(capture._fd is None, "a failed open() closes the device again")
+
+
+TESTS = [
+    ("Fan-out to viewers",                  test_fan_out_to_viewers),
+    ("In-process capture feeds the server", test_in_process_capture_feeds_server),
+    ("V4L2 ABI",                            test_v4l2_abi),
+]
+
+if __name__ == "__main__":
+    passed, failed = 0, 0
+    failures: list[tuple[str, str]] = []
+
+    print("\n" + "=" * 60)
+    print(" MJPEG Server Test Suite")
+    print("=" * 60)
+
+    for name, fn in TESTS:
+        print(f"\n[{name}]")
+        try:
+            fn()
+            print(f"  → PASS")
+            passed += 1
+        except AssertionError as exc:
+            print(f"  → FAIL: {exc}")
+            failed += 1
+            failures.append((name, str(exc)))
+        except Exception as exc:
+            print(f"  → ERROR: {type(exc).__name__}: {exc}")
+            failed += 1
+            failures.append((name, f"{type(exc).__name__}: {exc}"))
+
+    print("\n" + "=" * 60)
+    print(f" Results: {passed} passed, {failed} failed  (total {passed + failed})")
+    if failures:
+        print("\n Failed:")
+        for name, msg in failures:
+            print(f"   • {name}: {msg}")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,203 @@
+"""
+Tests for MjpegParser and FrameSource's ?action=stream backend — a local
+HTTP server stands in for mjpg_streamer, so no camera is required.
+
+Run:
+    python Tests/test_mjpeg_stream.py
+"""
+
+import sys
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Allow importing from the Classes/ directory regardless of cwd.
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import cv2
+import numpy as np
+
+from Classes.FrameSource import FrameSource
+from Classes.Metrics import REGISTRY
+from Classes.MjpegStream import MjpegParser, parse_boundary
+
+
+BOUNDARY = b"boundarydonotcross"
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Helpers
+# ─────────────────────────────────────────────────────────────────────────────
+
+def check(condition: bool, message: str) -> None:
+    label = "  OK  " if condition else "  FAIL"
+    print(f"{label}: {message}")
+    if not condition:
+        raise AssertionError(message)
+
+
+def part(body: bytes, length=True) -> bytes:
+    """One part exactly as mjpg_streamer's output_http writes it."""
+    headers = b"Content-Type: image/jpeg\r\n"
+    if length:
+        headers += b"Content-Length: %d\r\n" % len(body)
+    headers += b"X-Timestamp: 1.000000\r\n\r\n"
+    return b"--" + BOUNDARY + b"\r\n" + headers + body + b"\r\n"
+
+
+def feed_in_chunks(parser, data, rng):
+    out, i = [], 0
+    while i < len(data):
+        n = rng.randint(1, 700)
+        frame = parser.feed(data[i:i + n])
+        if frame is not None:
+            out.append(frame)
+        i += n
+    return out
+
+
+class FakeCamera:
+    camera_model = "FakeStreamCam"
+    camera_type = "MJPG"
+    rtsp_port = 8554
+    video_device = None
+
+    def __init__(self, video_port):
+        self.video_port = video_port
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Tests
+# ─────────────────────────────────────────────────────────────────────────────
+
+def test_parser_any_chunking():
+    """Frames survive arbitrary chunk splits; only the newest per chunk is copied out."""
+    check(parse_boundary("multipart/x-mixed-replace;boundary=boundarydonotcross") == BOUNDARY,
+          "boundary from Content-Type")
+    check(parse_boundary('multipart/x-mixed-replace; boundary="--abc"') == b"abc", "quoted, leading --")
+
+    rng = random.Random(7)
+    bodies = [bytes(rng.getrandbits(8) for _ in range(rng.randint(50, 3000))) for _ in range(20)]
+    stream = b"".join(part(body) for body in bodies)
+    parser = MjpegParser(BOUNDARY)
+    frames = feed_in_chunks(parser, stream, rng)
+    check(parser.frames == 20, f"all parts parsed ({parser.frames})")
+    check(len(frames) + parser.skipped == 20, "each part either returned or skipped")
+    check(all(frame in bodies for frame in frames) and frames[-1] == bodies[-1],
+          "returned frames intact, newest last")
+    check(parser.buffered() < 100, f"consumed bytes released ({parser.buffered()} left)")
+
+    parser = MjpegParser(BOUNDARY)
+    check(parser.feed(stream) == bodies[-1] and parser.skipped == 19,
+          "one big chunk: only the newest copied")
+
+
+def test_parser_without_length_and_resync():
+    """Parts without Content-Length end at the next boundary; junk and oversized parts are skipped."""
+    parser = MjpegParser(BOUNDARY, max_frame_bytes=1000)
+    frames = []
+    for data in (b"HTTP preamble junk\r\n", part(b"first", length=False), part(b"second", length=False),
+                 b"--" + BOUNDARY + b"\r\nContent-Type: image/jpeg\r\n\r\n" + b"x" * 1500,
+                 part(b"third", length=True)):
+        frame = parser.feed(data)
+        if frame is not None:
+            frames.append(frame)
+    check(frames == [b"first", b"second", b"third"], f"frames recovered ({frames})")
+    check(parser.resyncs == 1, "oversized part dropped")
+
+
+def test_stream_backend_decodes_on_demand():
+    """One ?action=stream connection at full rate; only requested frames are decoded."""
+    images = []
+    for i in range(4):
+        image = np.zeros((24, 32, 3), np.uint8)
+        image[:, i * 8:(i + 1) * 8] = 255
+        images.append(cv2.imencode('.jpg', image)[1].tobytes())
+    requests_seen = []
+
+    class StreamHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests_seen.append(self.path)
+            self.send_response(200)
+            self.send_header("Content-Type", "multipart/x-mixed-replace;boundary=" + BOUNDARY.decode())
+            self.end_headers()
+            try:
+                i = 0
+                while True:
+                    self.wfile.write(part(images[i % 4]))
+                    i += 1
+                    time.sleep(0.002)
+            except OSError:
+                pass
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StreamHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    source = FrameSource(FakeCamera(server.server_address[1]))
+    decodes = REGISTRY.counter('frame_source_decodes_total', '', labels=('camera', 'scale')).labels("FakeStreamCam", "1")
+    frames_total = REGISTRY.counter('frame_source_frames_total', '',
+                                    labels=('camera', 'backend')).labels("FakeStreamCam", "mjpg_stream")
+    try:
+        first = source.get(timeout=3.0)
+        check(first is not None and source.backend == 'mjpg_stream', "frames from ?action=stream")
+        check(first.image.shape == (24, 32), "decoded grayscale")
+        time.sleep(0.3)
+        frame = source.get(since=time.monotonic(), timeout=2.0)
+        again = source.latest()
+        check(frame.seq > first.seq and again.seq >= frame.seq, "newer frames keep arriving")
+        check(requests_seen == ['/?action=stream'], f"a single stream request ({requests_seen})")
+        published, decoded = frames_total.value, decodes.value
+        check(published > 20 and decoded <= 4, f"{published:.0f} frames read, {decoded:.0f} decoded")
+    finally:
+        source.stop()
+        server.shutdown()
+        server.server_close()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Test runner
+# ─────────────────────────────────────────────────────────────────────────────
+
+TESTS = [
+    ("Parser, any chunking",               test_parser_any_chunking),
+    ("Parser without length, resync",      test_parser_without_length_and_resync),
+    ("Stream backend decodes on demand",   test_stream_backend_decodes_on_demand),
+]
+
+if __name__ == "__main__":
+    passed, failed = 0, 0
+    failures: list[tuple[str, str]] = []
+
+    print("\n" + "=" * 60)
+    print(" MJPEG Stream Test Suite")
+    print("=" * 60)
+
+    for name, fn in TESTS:
+        print(f"\n[{name}]")
+        try:
+            fn()
+            print(f"  → PASS")
+            passed += 1
+        except AssertionError as exc:
+            print(f"  → FAIL: {exc}")
+            failed += 1
+            failures.append((name, str(exc)))
+        except Exception as exc:
+            print(f"  → ERROR: {type(exc).__name__}: {exc}")
+            failed += 1
+            failures.append((name, f"{type(exc).__name__}: {exc}"))
+
+    print("\n" + "=" * 60)
+    print(f" Results: {passed} passed, {failed} failed  (total {passed + failed})")
+    if failures:
+        print("\n Failed:")
+        for name, msg in failures:
+            print(f"   • {name}: {msg}")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,189 @@
+"""
+Tests for MotionPlanner (pure profile maths) and MotionExecutor (segment
+streaming), the latter against the pty Arduino simulator (POSIX only).
+
+Run:
+    python Tests/test_motion_planner.py
+"""
+
+import sys
+import os
+import time
+
+# Allow importing from the Classes/ directory regardless of cwd.
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from Classes.MotionPlanner import MotionPlanner, Segment, PROFILE_CONSTANT, PROFILE_TRAPEZOID, PROFILE_SCURVE
+from Classes.MotionExecutor import MotionExecutor
+from Classes.MotorsControl import MotorControl
+from Simulator import ArduinoSimulator
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Helpers
+# ─────────────────────────────────────────────────────────────────────────────
+
+def check(condition: bool, message: str) -> None:
+    label = "  OK  " if condition else "  FAIL"
+    print(f"{label}: {message}")
+    if not condition:
+        raise AssertionError(message)
+
+
+def rates(plan) -> list[float]:
+    return [1000.0 / segment.t_ms for segment in plan.segments]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Tests
+# ─────────────────────────────────────────────────────────────────────────────
+
+def test_move_profiles_ramp_and_hit_the_count():
+    """plan_move ramps up to max_speed and back down, with an exact step total."""
+    for profile in (PROFILE_TRAPEZOID, PROFILE_SCURVE):
+        plan = MotionPlanner(max_speed=2000, accel=4000, profile=profile).plan_move(1000)
+        r = rates(plan)
+        peak = r.index(max(r))
+        check(plan.steps == 1000, f"{profile}: 1000 steps in {len(plan.segments)} segments")
+        check(max(r) <= 2000 * 1.05, f"{profile}: peak {max(r):.0f} steps/s within max_speed")
+        check(r[0] < 0.2 * max(r) and r[-1] < 0.2 * max(r), f"{profile}: starts and ends slow")
+        check(all(a <= b * 1.01 for a, b in zip(r[:peak], r[1:peak + 1])), f"{profile}: rate rises to the peak")
+        check(plan.end_rate == 0.0, f"{profile}: ends at rest")
+
+    trapezoid = MotionPlanner(profile=PROFILE_TRAPEZOID).plan_move(1000)
+    scurve = MotionPlanner(profile=PROFILE_SCURVE).plan_move(1000)
+    check(rates(scurve)[0] < rates(trapezoid)[0], "S-curve eases in more gently than the trapezoid")
+
+    legacy = MotionPlanner(max_speed=500, profile=PROFILE_CONSTANT).plan_move(100)
+    check(legacy.segments == [Segment(100, 2.0)], "constant profile is one fixed-rate move")
+
+
+def test_velocity_plan_blends_from_current_rate():
+    """plan_velocity covers the count in the interval, starting at the old rate."""
+    planner = MotionPlanner(accel=4000, profile=PROFILE_TRAPEZOID)
+    plan = planner.plan_velocity(5000, 5.0, start_rate=800)
+    r = rates(plan)
+    check(plan.steps == 5000, "exact step count")
+    check(abs(plan.duration - 5.0) < 1e-6, f"takes the whole interval ({plan.duration:.4f} s)")
+    check(r[0] < 1000 and abs(r[-1] - 1000) < 5, f"800 → ~1000 steps/s ({r[0]:.0f} → {r[-1]:.0f})")
+    check(abs(plan.end_rate - 1000) < 5, f"end_rate reported ({plan.end_rate:.1f})")
+
+    legacy = MotionPlanner(profile=PROFILE_CONSTANT).plan_velocity(100, 5.0, start_rate=800)
+    check(legacy.segments == [Segment(100, 50.0)], "constant profile keeps t = interval / steps")
+
+
+def test_executor_streams_segments_per_axis():
+    """Segments go out one after another per axis; both axes run at once."""
+    planner = MotionPlanner(max_speed=4000, accel=20000, profile=PROFILE_TRAPEZOID, segment_ms=20)
+    with ArduinoSimulator(time_scale=1.0) as simulator:
+        motor = MotorControl(port=simulator.port)
+        motor.start()
+        subscription = motor.subscribe()
+        executor = MotionExecutor(motor)
+        try:
+            alt_plan, az_plan = planner.plan_move(600), planner.plan_move(300)
+            started = time.perf_counter()
+            alt = executor.submit(1, 1, alt_plan)
+            az = executor.submit(0, 0, az_plan)
+            check(executor.pending_seconds(1) > 0, "pending time reported while queued")
+            check(alt.result(timeout=5.0) and az.result(timeout=5.0), "both plans finished")
+            elapsed = time.perf_counter() - started
+            check(elapsed < alt_plan.duration + 0.15,
+                  f"axes overlapped ({elapsed:.2f} s for {alt_plan.duration:.2f} + {az_plan.duration:.2f} s plans)")
+            axes = simulator.state()['axes']
+            check(axes['alt']['position'] == 600 and axes['az']['position'] == -300,
+                  f"positions match the plans ({axes['alt']['position']}, {axes['az']['position']})")
+            replies = [text.decode() for _, text in subscription.get(timeout=0.5)]
+            check(not any(r.startswith("stopped") for r in replies), "no segment cut another short")
+            check(sum(r.startswith("done") for r in replies) == len(alt_plan.segments) + len(az_plan.segments),
+                  "one move-complete per segment")
+
+            long_plan = planner.plan_move(4000)
+            first = executor.submit(1, 1, long_plan)
+            queued = executor.submit(1, 1, long_plan)
+            time.sleep(0.05)
+            replacement = executor.submit(1, 0, planner.plan_move(10), replace=True)
+            check(first.result(timeout=1.0) is False and queued.result(timeout=1.0) is False,
+                  "replace=True drops the running and queued plans")
+            check(replacement.result(timeout=2.0), "replacement runs")
+        finally:
+            executor.stop()
+            motor.stop()
+
+
+def test_executor_waits_for_reports_only_when_configured():
+    """Done-waiting needs a completion pattern; reports for the other axis don't count."""
+    planner = MotionPlanner(max_speed=4000, accel=20000, profile=PROFILE_TRAPEZOID, segment_ms=20)
+    with ArduinoSimulator(time_scale=1.0) as simulator:
+        motor = MotorControl(port=simulator.port)
+        try:
+            MotionExecutor(motor, wait_for_done=True)
+            check(False, "wait_for_done without a pattern is refused")
+        except ValueError:
+            check(True, "wait_for_done without a pattern is refused")
+        motor.stop()
+
+        motor = MotorControl(port=simulator.port, move_complete_pattern=MotorControl.MOVE_COMPLETE_PATTERN)
+        motor.start()
+        executor = MotionExecutor(motor, wait_for_done=True)
+        try:
+            check(executor.done_pattern == MotorControl.MOVE_COMPLETE_PATTERN,
+                  "the controller's pattern is used by default")
+            alt_plan, az_plan = planner.plan_move(400), planner.plan_move(200)
+            started = time.perf_counter()
+            alt = executor.submit(1, 1, alt_plan)
+            az = executor.submit(0, 1, az_plan)
+            check(alt.result(timeout=5.0) and az.result(timeout=5.0), "both plans finished")
+            elapsed = time.perf_counter() - started
+            check(elapsed < alt_plan.duration + 0.3, f"no DONE_SLACK timeouts ({elapsed:.2f} s)")
+            axes = simulator.state()['axes']
+            check(axes['alt']['position'] == 400 and axes['az']['position'] == 200,
+                  f"positions match the plans ({axes['alt']['position']}, {axes['az']['position']})")
+        finally:
+            executor.stop()
+            motor.stop()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Test runner
+# ─────────────────────────────────────────────────────────────────────────────
+
+TESTS = [
+    ("Move profiles ramp and hit the count",   test_move_profiles_ramp_and_hit_the_count),
+    ("Velocity plan blends from current rate", test_velocity_plan_blends_from_current_rate),
+    ("Executor streams segments per axis",     test_executor_streams_segments_per_axis),
+    ("Executor waits only when configured",    test_executor_waits_for_reports_only_when_configured),
+]
+
+if __name__ == "__main__":
+    passed, failed = 0, 0
+    failures: list[tuple[str, str]] = []
+
+    print("\n" + "=" * 60)
+    print(" MotionPlanner Test Suite")
+    print("=" * 60)
+
+    for name, fn in TESTS:
+        print(f"\n[{name}]")
+        try:
+            fn()
+            print(f"  → PASS")
+            passed += 1
+        except AssertionError as exc:
+            print(f"  → FAIL: {exc}")
+            failed += 1
+            failures.append((name, str(exc)))
+        except Exception as exc:
+            print(f"  → ERROR: {type(exc).__name__}: {exc}")
+            failed += 1
+            failures.append((name, f"{type(exc).__name__}: {exc}"))
+
+    print("\n" + "=" * 60)
+    print(f" Results: {passed} passed, {failed} failed  (total {passed + failed})")
+    if failures:
+        print("\n Failed:")
+        for name, msg in failures:
+            print(f"   • {name}: {msg}")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,224 @@
+"""
+Tests for MotorControl's serial reader — a pty stands in for the Arduino,
+so no hardware is required (POSIX only).
+
+Run:
+    python Tests/test_motor_control.py
+"""
+
+import sys
+import os
+import select
+import threading
+import time
+
+# Allow importing from the Classes/ directory regardless of cwd.
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from Classes.MotorsControl import MotorControl
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Helpers
+# ─────────────────────────────────────────────────────────────────────────────
+
+def check(condition: bool, message: str) -> None:
+    label = "  OK  " if condition else "  FAIL"
+    print(f"{label}: {message}")
+    if not condition:
+        raise AssertionError(message)
+
+
+class PtyDevice:
+    """Fake Arduino on the master end of a pty; records what it receives."""
+
+    def __init__(self):
+        self.master, self.slave = os.openpty()
+        self.port = os.ttyname(self.slave)
+        self.received = b""
+
+    def read_available(self, timeout=1.0) -> bytes:
+        ready, _, _ = select.select([self.master], [], [], timeout)
+        data = os.read(self.master, 4096) if ready else b""
+        self.received += data
+        return data
+
+    def reply(self, data: bytes) -> None:
+        os.write(self.master, data)
+
+    def close(self):
+        os.close(self.master)
+        os.close(self.slave)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Tests
+# ─────────────────────────────────────────────────────────────────────────────
+
+def test_event_reader_round_trip():
+    """Commands reach the device; replies are framed into lines without polling delay."""
+    device = PtyDevice()
+    motor = MotorControl(port=device.port)
+    motor.start()
+    subscription = motor.subscribe()
+    try:
+        check(motor.is_connected, "pty opened")
+        check(motor.send_batch(["v=1", "s=10"]), "batch written")
+        check(device.read_available() == b"v=1\ns=10\n", "device received both commands")
+
+        device.reply(b"done v=1")
+        time.sleep(0.05)
+        started = time.perf_counter()
+        device.reply(b"\nok\n")
+        lines = subscription.get(timeout=2.0)
+        while len(lines) < 2:
+            lines += subscription.get(timeout=2.0)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        check([line for _, line in lines] == [b"done v=1\n", b"ok\n"], "split reply framed into lines")
+        check(elapsed_ms < 50, f"reply delivered in {elapsed_ms:.1f} ms")
+        check(motor.read() == "done v=1\nok\n", "read() buffer still receives the bytes")
+    finally:
+        motor.stop()
+        device.close()
+
+
+def test_move_future_resolves_on_reply():
+    """move() resolves with the timestamped move-complete line, skipping other chatter."""
+    device = PtyDevice()
+    motor = MotorControl(port=device.port, move_complete_pattern=MotorControl.MOVE_COMPLETE_PATTERN)
+    motor.start()
+    try:
+        future = motor.move(["v=1", "s=200"], timeout=2.0)
+        check(device.read_available() == b"v=1\ns=200\n", "move written")
+        check(not future.done(), "pending until the Arduino reports")
+        device.reply(b"pos=100\n")
+        time.sleep(0.05)
+        check(not future.done(), "unrelated line does not resolve it")
+        before = time.time()
+        device.reply(b"done\n")
+        line = future.result(timeout=2.0)
+        check(line.text == "done", f"resolved with the reply line ({line.text!r})")
+        check(before <= line.timestamp <= time.time(), "line carries its arrival time")
+
+        custom = motor.request("q", expect=r"^alt=(\d+)", timeout=2.0)
+        device.reply(b"alt=42\n")
+        check(custom.result(timeout=2.0).text == "alt=42", "custom pattern matched")
+
+        try:
+            MotorControl(port=device.port).move("s=1")
+            check(False, "move() needs a move_complete_pattern")
+        except ValueError:
+            check(True, "move() needs a move_complete_pattern")
+    finally:
+        motor.stop()
+        device.close()
+
+
+def test_request_timeout_and_write_failure():
+    """Unanswered requests time out; a closed port fails the future at once."""
+    device = PtyDevice()
+    motor = MotorControl(port=device.port, move_complete_pattern=MotorControl.MOVE_COMPLETE_PATTERN)
+    motor.start()
+    try:
+        started = time.perf_counter()
+        future = motor.move("s=1", timeout=0.2)
+        error = future.exception(timeout=2.0)
+        elapsed = time.perf_counter() - started
+        check(isinstance(error, TimeoutError), f"TimeoutError raised ({error!r})")
+        check(elapsed < 0.2 + MotorControl.READ_TIMEOUT + 0.2, f"expired after {elapsed:.2f}s")
+        motor.stop()
+        error = motor.move("s=1").exception(timeout=1.0)
+        check(isinstance(error, ConnectionError), f"ConnectionError after stop ({error!r})")
+    finally:
+        motor.stop()
+        device.close()
+
+
+def test_rx_buffer_is_bounded():
+    """An undrained read() buffer keeps the newest bytes and counts the rest."""
+    device = PtyDevice()
+    motor = MotorControl(port=device.port, rx_buffer_size=16)
+    motor.start()
+    subscription = motor.subscribe()
+    try:
+        for i in range(10):
+            device.reply(f"pos={i}\n".encode())
+        lines = []
+        while len(lines) < 10:
+            lines += subscription.get(timeout=2.0)
+        stats = motor.rx_buffer_stats()
+        check(stats['buffered'] == 16, f"buffer capped at its size ({stats['buffered']})")
+        check(stats['overflow_bytes'] == 60 - 16, f"dropped bytes counted ({stats['overflow_bytes']})")
+        check(motor.read_bytes() == b"\npos=7\npos=8\npos=9\n"[-16:], "newest bytes kept")
+        check(motor.read() is None, "drained")
+    finally:
+        motor.stop()
+        device.close()
+
+
+def test_stop_joins_reader():
+    """stop() wakes the blocked reader, closes the port and ends subscriptions."""
+    device = PtyDevice()
+    motor = MotorControl(port=device.port)
+    before = set(threading.enumerate())
+    motor.start()
+    reader = (set(threading.enumerate()) - before).pop()
+    subscription = motor.subscribe()
+    try:
+        started = time.perf_counter()
+        motor.stop()
+        elapsed = time.perf_counter() - started
+        check(elapsed < 1.0, f"stop() returned in {elapsed * 1000:.0f} ms")
+        check(not reader.is_alive(), "reader thread exited")
+        check(not motor.is_connected, "port closed")
+        check(subscription.get(timeout=2.0) == [], "subscribers are released")
+        check(not motor.send_command("s=1"), "writes fail after stop()")
+    finally:
+        device.close()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Test runner
+# ─────────────────────────────────────────────────────────────────────────────
+
+TESTS = [
+    ("Event reader round trip",            test_event_reader_round_trip),
+    ("move() future resolves on reply",    test_move_future_resolves_on_reply),
+    ("Request timeout and write failure",  test_request_timeout_and_write_failure),
+    ("RX buffer is bounded",               test_rx_buffer_is_bounded),
+    ("stop() joins reader",                test_stop_joins_reader),
+]
+
+
+if __name__ == "__main__":
+    passed, failed = 0, 0
+    failures: list[tuple[str, str]] = []
+
+    print("\n" + "=" * 60)
+    print(" MotorControl Test Suite")
+    print("=" * 60)
+
+    for name, fn in TESTS:
+        print(f"\n[{name}]")
+        try:
+            fn()
+            print(f"  → PASS")
+            passed += 1
+        except AssertionError as exc:
+            print(f"  → FAIL: {exc}")
+            failed += 1
+            failures.append((name, str(exc)))
+        except Exception as exc:
+            print(f"  → ERROR: {type(exc).__name__}: {exc}")
+            failed += 1
+            failures.append((name, f"{type(exc).__name__}: {exc}"))
+
+    print("\n" + "=" * 60)
+    print(f" Results: {passed} passed, {failed} failed  (total {passed + failed})")
+    if failures:
+        print("\n Failed:")
+        for name, msg in failures:
+            print(f"   • {name}: {msg}")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,210 @@
+"""
+Tests for MotorRegistry: device specs, axis routing across two simulated
+controllers and the ?axis= / ?device= HTTP routes (POSIX only).
+
+Run:
+    python Tests/test_motor_registry.py
+"""
+
+import sys
+import os
+import json
+import threading
+import urllib.error
+import urllib.request
+
+# Allow importing from the Classes/ directory regardless of cwd.
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from Classes.Metrics import REGISTRY
+from Classes.MotorRegistry import MotorRegistry
+from Classes.UnifiedServer import ConcurrentHTTPServer, UnifiedHandler
+from Simulator import ArduinoSimulator
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Helpers
+# ─────────────────────────────────────────────────────────────────────────────
+
+def check(condition: bool, message: str) -> None:
+    label = "  OK  " if condition else "  FAIL"
+    print(f"{label}: {message}")
+    if not condition:
+        raise AssertionError(message)
+
+
+class FakeMotor:
+    """Records batches; enough of MotorControl for the /motor routes."""
+
+    is_connected = True
+
+    def __init__(self):
+        self.batches: list[list[str]] = []
+
+    def send_command(self, cmd: str) -> bool:
+        return self.send_batch([cmd])
+
+    def send_batch(self, cmds, **kwargs) -> bool:
+        self.batches.append([c.strip() for c in cmds])
+        return True
+
+    def read_bytes(self):
+        return b""
+
+
+class QuietHandler(UnifiedHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Tests
+# ─────────────────────────────────────────────────────────────────────────────
+
+def test_parse_device_spec():
+    """NAME=PORT[@BAUD][:AXIS=N,...] round-trips; malformed specs are rejected."""
+    parse = MotorRegistry.parse_device_spec
+    check(parse("focuser=/dev/ttyUSB0@57600:focus=0") == ('focuser', '/dev/ttyUSB0', 57600, {'focus': 0}),
+          "name, port, baud and axis")
+    check(parse("rotator=/dev/ttyUSB1") == ('rotator', '/dev/ttyUSB1', 115200, {}),
+          "baud defaults to 115200, no axes")
+    check(parse("aux=/dev/ttyACM1:a=0,b=1")[3] == {'a': 0, 'b': 1}, "several axes")
+    for bad in ("/dev/ttyUSB0", "x=", "x=/dev/ttyUSB0:focus"):
+        try:
+            parse(bad)
+        except ValueError:
+            continue
+        check(False, f"{bad!r} rejected")
+    check(True, "malformed specs raise ValueError")
+
+    registry = MotorRegistry()
+    registry.attach('mount', FakeMotor(), {'alt': 1, 'az': 0})
+    for call in (lambda: registry.axis('focus'), lambda: registry.device('focuser'),
+                 lambda: registry.axes('alt', 'focus')):
+        try:
+            call()
+        except KeyError:
+            continue
+        check(False, "unknown name raises KeyError")
+    try:
+        registry.add_axis('alt', 'mount', 2)
+        remapped = True
+    except ValueError:
+        remapped = False
+    check(not remapped, "an axis can only be mapped once")
+
+
+def test_axes_route_to_their_device():
+    """Each axis' batches reach its own board, prefixed with its v=, with per-device metrics."""
+    with ArduinoSimulator(time_scale=float('inf')) as mount_sim, \
+         ArduinoSimulator(time_scale=float('inf')) as focus_sim:
+        registry = MotorRegistry.single(mount_sim.port)
+        registry.add_device_spec(f"focuser={focus_sim.port}:focus=0")
+        registry.start()
+        try:
+            focus = registry.axis('focus')
+            line = focus.request(["d=1", "t=1", "s=25"], expect=r"^done", timeout=2.0).result(timeout=2.0)
+            check(line.text == "done v=0 pos=25", f"focuser moved ({line.text!r})")
+            line = registry.axis('alt').request(["d=1", "t=1", "s=7"], expect=r"^done",
+                                                timeout=2.0).result(timeout=2.0)
+            check(line.text == "done v=1 pos=7", f"mount alt moved ({line.text!r})")
+
+            check(list(focus_sim.history) == ["v=0", "d=1", "t=1", "s=25"],
+                  f"focuser saw only its batch ({list(focus_sim.history)})")
+            mount_axes = mount_sim.state()['axes']
+            check(mount_axes['alt']['position'] == 7 and mount_axes['az']['position'] == 0,
+                  "mount az untouched by the focus move")
+
+            status = registry.status()
+            check(status['axes']['focus'] == {'device': 'focuser', 'number': 0}, "status maps axes")
+            check(status['devices']['focuser']['connected'], "focuser connected")
+            rendered = REGISTRY.render()
+            check('motor_serial_tx_bytes_total{device="focuser"}' in rendered
+                  and 'motor_serial_tx_bytes_total{device="mount"}' in rendered,
+                  "serial metrics labelled per device")
+        finally:
+            registry.stop()
+
+
+def test_http_axis_and_device_routes():
+    """?axis= selects the owning controller and its v=; unknown names are 404."""
+    mount, focuser = FakeMotor(), FakeMotor()
+    registry = MotorRegistry()
+    registry.attach('mount', mount, {'alt': 1, 'az': 0})
+    registry.attach('focuser', focuser, {'focus': 0})
+    server = ConcurrentHTTPServer(("127.0.0.1", 0), QuietHandler)
+    server.motor_registry = registry
+    server.motor_control = mount
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    def status(url):
+        try:
+            with urllib.request.urlopen(base + url, timeout=5) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+    try:
+        check(status("/motor/write?cmd=s%3D5&axis=focus")[0] == 200, "write to focus axis")
+        check(focuser.batches == [["v=0", "s=5"]], f"focuser got v=0 s=5 ({focuser.batches})")
+        check(status("/motor/write?cmd=e%3D1&device=focuser")[0] == 200, "write to device")
+        check(focuser.batches[-1] == ["e=1"], "device write has no v= prefix")
+        check(status("/motor/write?cmd=s%3D3")[0] == 200 and mount.batches == [["s=3"]],
+              "no selector goes to the mount")
+
+        code, body = status("/motor/write?cmd=s%3D1&axis=rotator")
+        check(code == 404 and b"rotator" in body, f"unknown axis → 404 ({code})")
+        check(status("/motor/read?device=nope")[0] == 404, "unknown device → 404")
+
+        code, body = status("/motor/devices")
+        devices = json.loads(body)
+        check(code == 200 and devices['axes']['focus'] == {'device': 'focuser', 'number': 0},
+              "/motor/devices lists the axis map")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Test runner
+# ─────────────────────────────────────────────────────────────────────────────
+
+TESTS = [
+    ("Parse device spec",                  test_parse_device_spec),
+    ("Axes route to their device",         test_axes_route_to_their_device),
+    ("HTTP axis and device routes",        test_http_axis_and_device_routes),
+]
+
+if __name__ == "__main__":
+    passed, failed = 0, 0
+    failures: list[tuple[str, str]] = []
+
+    print("\n" + "=" * 60)
+    print(" MotorRegistry Test Suite")
+    print("=" * 60)
+
+    for name, fn in TESTS:
+        print(f"\n[{name}]")
+        try:
+            fn()
+            print(f"  → PASS")
+            passed += 1
+        except AssertionError as exc:
+            print(f"  → FAIL: {exc}")
+            failed += 1
+            failures.append((name, str(exc)))
+        except Exception as exc:
+            print(f"  → ERROR: {type(exc).__name__}: {exc}")
+            failed += 1
+            failures.append((name, f"{type(exc).__name__}: {exc}"))
+
+    print("\n" + "=" * 60)
+    print(f" Results: {passed} passed, {failed} failed  (total {passed + failed})")
+    if failures:
+        print("\n Failed:")
+        for name, msg in failures:
+            print(f"   • {name}: {msg}")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,193 @@
+"""
+Tests for TelemetryHub — pure Python, no serial port required.
+
+Run:
+    python Tests/test_motor_telemetry.py
+"""
+
+import sys
+import os
+import http.client
+import threading
+import time
+from http.server import HTTPServer
+
+# Allow importing from the Classes/ directory regardless of cwd.
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from Classes.MotorTelemetry import TelemetryHub
+from Classes.MotorsServer import SerialBridgeHandler
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Assertion helper
+# ─────────────────────────────────────────────────────────────────────────────
+
+def check(condition: bool, message: str) -> None:
+    label = "  OK  " if condition else "  FAIL"
+    print(f"{label}: {message}")
+    if not condition:
+        raise AssertionError(message)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Tests
+# ─────────────────────────────────────────────────────────────────────────────
+
+def test_every_subscriber_gets_every_line():
+    """Two subscribers each receive all lines; neither steals from the other."""
+    hub = TelemetryHub()
+    a = hub.subscribe()
+    b = hub.subscribe()
+    hub.publish(b"pos=1\npos=2\n")
+    hub.publish(b"pos=3\n")
+    lines_a = [line for _, line in a.get(timeout=0.1)]
+    lines_b = [line for _, line in b.get(timeout=0.1)]
+    expected = [b"pos=1\n", b"pos=2\n", b"pos=3\n"]
+    check(lines_a == expected, f"subscriber A got all lines ({lines_a})")
+    check(lines_b == expected, f"subscriber B got all lines ({lines_b})")
+
+
+def test_partial_line_is_held_until_newline():
+    """Bytes without a newline are not published until the line completes."""
+    hub = TelemetryHub()
+    sub = hub.subscribe()
+    hub.publish(b"pos=")
+    check(sub.get(timeout=0.05) == [], "no line for a partial chunk")
+    hub.publish(b"42\nnext")
+    lines = [line for _, line in sub.get(timeout=0.1)]
+    check(lines == [b"pos=42\n"], f"completed line published ({lines})")
+
+
+def test_new_subscriber_sees_only_new_lines():
+    """A fresh subscriber starts at the live end; from_seq replays retained lines."""
+    hub = TelemetryHub()
+    hub.publish(b"old\n")
+    live = hub.subscribe()
+    replay = hub.subscribe(from_seq=0)
+    hub.publish(b"new\n")
+    check([l for _, l in live.get(timeout=0.1)] == [b"new\n"], "live subscriber skips old lines")
+    check([l for _, l in replay.get(timeout=0.1)] == [b"old\n", b"new\n"],
+          "from_seq=0 replays retained lines")
+
+
+def test_wakeup_latency():
+    """A blocked subscriber wakes promptly when a line is published."""
+    hub = TelemetryHub()
+    sub = hub.subscribe()
+    woke_at = []
+
+    def reader():
+        sub.get(timeout=2.0)
+        woke_at.append(time.perf_counter())
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    time.sleep(0.1)
+    t0 = time.perf_counter()
+    hub.publish(b"ok\n")
+    thread.join()
+    latency_ms = (woke_at[0] - t0) * 1000
+    print(f"    wakeup latency: {latency_ms:.3f} ms")
+    check(latency_ms < 50, f"subscriber woke within 50 ms ({latency_ms:.3f} ms)")
+
+
+def test_idle_get_times_out_empty():
+    """get() with a timeout returns an empty list when nothing arrives."""
+    hub = TelemetryHub()
+    sub = hub.subscribe()
+    t0 = time.perf_counter()
+    check(sub.get(timeout=0.05) == [], "empty result on timeout")
+    check(time.perf_counter() - t0 < 0.5, "returned after the timeout")
+
+
+def test_slow_subscriber_overflow_is_counted():
+    """A subscriber that falls behind the ring skips ahead and counts the drops."""
+    hub = TelemetryHub(capacity=4)
+    sub = hub.subscribe()
+    for i in range(10):
+        hub.publish(f"{i}\n".encode())
+    lines = [line for _, line in sub.get(timeout=0.1)]
+    check(lines == [b"6\n", b"7\n", b"8\n", b"9\n"], f"only the last 4 lines retained ({lines})")
+    check(sub.dropped == 6, f"6 lines reported dropped (got {sub.dropped})")
+
+
+def test_bridge_stream_ends_when_hub_closes():
+    """SerialBridgeHandler's /stream ends once the hub is closed instead of spinning."""
+
+    class FakeMotor:
+        def __init__(self):
+            self.telemetry = TelemetryHub()
+
+        def subscribe(self, from_seq=None):
+            return self.telemetry.subscribe(from_seq)
+
+    server = HTTPServer(("127.0.0.1", 0), SerialBridgeHandler)
+    server.motor_control = FakeMotor()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=3)
+        conn.request("GET", "/stream")
+        resp = conn.getresponse()
+        time.sleep(0.2)   # the handler is now subscribed
+        server.motor_control.telemetry.publish(b"pos=1\n")
+        check(resp.fp.read1(4096) == b"pos=1\n", "stream carries the published line")
+
+        server.motor_control.telemetry.close()
+        started = time.perf_counter()
+        rest = resp.read()
+        elapsed = time.perf_counter() - started
+        conn.close()
+        check(rest == b"" and elapsed < 1.0, f"stream ended when the hub closed ({elapsed:.2f} s)")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Test runner
+# ─────────────────────────────────────────────────────────────────────────────
+
+TESTS = [
+    ("Every subscriber gets every line",   test_every_subscriber_gets_every_line),
+    ("Partial line held until newline",    test_partial_line_is_held_until_newline),
+    ("New subscriber sees only new lines", test_new_subscriber_sees_only_new_lines),
+    ("Wakeup latency",                     test_wakeup_latency),
+    ("Idle get times out empty",           test_idle_get_times_out_empty),
+    ("Slow subscriber overflow counted",   test_slow_subscriber_overflow_is_counted),
+    ("Bridge stream ends on hub close",    test_bridge_stream_ends_when_hub_closes),
+]
+
+
+if __name__ == "__main__":
+    passed, failed = 0, 0
+    failures: list[tuple[str, str]] = []
+
+    print("\n" + "=" * 60)
+    print(" TelemetryHub Test Suite")
+    print("=" * 60)
+
+    for name, fn in TESTS:
+        print(f"\n[{name}]")
+        try:
+            fn()
+            print(f"  → PASS")
+            passed += 1
+        except AssertionError as exc:
+            print(f"  → FAIL: {exc}")
+            failed += 1
+            failures.append((name, str(exc)))
+        except Exception as exc:
+            print(f"  → ERROR: {type(exc).__name__}: {exc}")
+            failed += 1
+            failures.append((name, f"{type(exc).__name__}: {exc}"))
+
+    print("\n" + "=" * 60)
+    print(f" Results: {passed} passed, {failed} failed  (total {passed + failed})")
+    if failures:
+        print("\n Failed:")
+        for name, msg in failures:
+            print(f"   • {name}: {msg}")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
@@ -0,0 +1,168 @@
+"""
+Tests for SerialRecorder / SerialLog: the binary format round trip,
+rotation, and recording a live MotorControl session that replays onto a
+fresh simulator (POSIX only).
+
+Run:
+    python Tests/test_serial_recorder.py
+"""
+
+import sys
+import os
+import tempfile
+import threading
+
+# Allow importing from the Classes/ directory regardless of cwd.
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from Classes.MotorsControl import MotorControl
+from Classes.SerialLog import SerialLog, replay
+from Classes.SerialRecorder import SerialRecorder, RECORD
+from Simulator import ArduinoSimulator
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Helpers
+# ─────────────────────────────────────────────────────────────────────────────
+
+def check(condition: bool, message: str) -> None:
+    label = "  OK  " if condition else "  FAIL"
+    print(f"{label}: {message}")
+    if not condition:
+        raise AssertionError(message)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Tests
+# ─────────────────────────────────────────────────────────────────────────────
+
+def test_round_trip():
+    """Frames come back in order with kind, source and payload; a torn tail is ignored."""
+    with tempfile.TemporaryDirectory() as directory:
+        recorder = SerialRecorder(directory, device='mount')
+        recorder.record_tx(b"v=1\nd=1\n", source='SiderealTrackerThread')
+        recorder.record_rx(b"done v=1 pos=5\n")
+        recorder.record_tx(b"e=1\n", source='StarFollowerKeepAliveThread')
+        recorder.record_tx(b"s=9\n", source='SiderealTrackerThread')
+        recorder.close()
+        check(recorder.stats()['dropped'] == 0, "nothing dropped")
+
+        path = SerialLog.find(directory, 'mount')[0]
+        with SerialLog(path) as log:
+            records = list(log)
+            check(log.device == 'mount', "device name in the header")
+        check([(r.kind, r.source, r.data) for r in records] == [
+            ('tx', 'SiderealTrackerThread', b"v=1\nd=1\n"),
+            ('rx', '', b"done v=1 pos=5\n"),
+            ('tx', 'StarFollowerKeepAliveThread', b"e=1\n"),
+            ('tx', 'SiderealTrackerThread', b"s=9\n"),
+        ], "records, sources and payloads")
+        check(all(a.t <= b.t for a, b in zip(records, records[1:])), "monotonic timestamps")
+        check(abs(records[0].wall_time - os.path.getmtime(path)) < 5, "wall clock recovered")
+        check(os.path.getsize(path) < 256, f"compact ({os.path.getsize(path)} bytes)")
+
+        with open(path, 'ab') as f:
+            f.write(RECORD.pack(0, 0, 0, 100) + b"s=1")     # payload cut short by a crash
+        check(len(list(SerialLog(path))) == 4, "torn final record skipped")
+
+
+def test_rotation_keeps_newest_files():
+    """Files rotate at max_file_bytes, old ones are pruned and each reads standalone."""
+    with tempfile.TemporaryDirectory() as directory:
+        recorder = SerialRecorder(directory, device='mount', max_file_bytes=256, max_files=3)
+        for i in range(40):
+            recorder.record_tx(f"s={i}\n".encode(), source='SiderealTrackerThread')
+            recorder.flush()
+        recorder.close()
+        paths = SerialLog.find(directory)
+        check(len(paths) == 3, f"only the newest 3 files kept ({len(paths)})")
+        for path in paths:
+            sources = {r.source for r in SerialLog(path)}
+            check(sources == {'SiderealTrackerThread'}, f"{os.path.basename(path)} carries its source table")
+        values = [int(r.data[2:]) for r in SerialLog.read_all(directory)]
+        check(values == list(range(values[0], 40)), f"newest records in order (from s={values[0]})")
+
+
+def test_motor_session_records_and_replays():
+    """A MotorControl session is logged with its sources and replays onto a fresh simulator."""
+    with tempfile.TemporaryDirectory() as directory:
+        with ArduinoSimulator(time_scale=float('inf')) as simulator:
+            motor = MotorControl(port=simulator.port, record_dir=directory,
+                                 move_complete_pattern=MotorControl.MOVE_COMPLETE_PATTERN)
+            motor.start()
+            try:
+                def tracker():
+                    motor.move(["v=1", "d=1", "t=1", "s=40"], timeout=2.0).result(timeout=2.0)
+                thread = threading.Thread(target=tracker, name="SiderealTrackerThread")
+                thread.start()
+                thread.join()
+                motor.move(["v=0", "s=15"], timeout=2.0).result(timeout=2.0)
+            finally:
+                motor.stop()
+            original = simulator.state()['axes']
+
+        records = list(SerialLog.read_all(directory, device='mount'))
+        tx = [r for r in records if r.kind == 'tx']
+        rx = b"".join(r.data for r in records if r.kind == 'rx')
+        check([r.source for r in tx] == ['SiderealTrackerThread', 'MainThread'], f"TX sources ({tx})")
+        check(tx[0].data == b"v=1\nd=1\nt=1\ns=40\n", "TX recorded as written")
+        check(b"done v=1 pos=40" in rx and b"done v=0 pos=15" in rx, "RX recorded")
+
+        with ArduinoSimulator(time_scale=float('inf')) as simulator:
+            motor = MotorControl(port=simulator.port, state_shadow=False, name='replay',
+                                 move_complete_pattern=MotorControl.MOVE_COMPLETE_PATTERN)
+            motor.start()
+            try:
+                sent = replay(records, lambda r: motor.send_batch(r.data.decode().splitlines()),
+                              speed=float('inf'))
+                motor.move("v=0", timeout=2.0)          # flush: wait for the writer
+            finally:
+                motor.stop()
+            replayed = simulator.state()['axes']
+        check(sent == 2, "two TX frames replayed")
+        check(all(replayed[a]['position'] == original[a]['position'] for a in ('alt', 'az')),
+              f"replay reproduces the positions ({replayed})")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Test runner
+# ─────────────────────────────────────────────────────────────────────────────
+
+TESTS = [
+    ("Round trip",                         test_round_trip),
+    ("Rotation keeps newest files",        test_rotation_keeps_newest_files),
+    ("Motor session records and replays",  test_motor_session_records_and_replays),
+]
+
+if __name__ == "__main__":
+    passed, failed = 0, 0
+    failures: list[tuple[str, str]] = []
+
+    print("\n" + "=" * 60)
+    print(" SerialRecorder Test Suite")
+    print("=" * 60)
+
+    for name, fn in TESTS:
+        print(f"\n[{name}]")
+        try:
+            fn()
+            print(f"  → PASS")
+            passed += 1
+        except AssertionError as exc:
+            print(f"  → FAIL: {exc}")
+            failed += 1
+            failures.append((name, str(exc)))
+        except Exception as exc:
+            print(f"  → ERROR: {type(exc).__name__}: {exc}")
+            failed += 1
+            failures.append((name, f"{type(exc).__name__}: {exc}"))
+
+    print("\n" + "=" * 60)
+    print(f" Results: {passed} passed, {failed} failed  (total {passed + failed})")
+    if failures:
+        print("\n Failed:")
+        for name, msg in failures:
+            print(f"   • {name}: {msg}")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
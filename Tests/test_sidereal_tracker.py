@@ -28,17 +28,27 @@ from Classes.SiderealTracker import SiderealTracker
 # ─────────────────────────────────────────────────────────────────────────────
 
 class FakeMotor:
-    """Records every command string passed to send_command() and always succeeds."""
+    """Records every command string passed to send_command()/send_batch() and always succeeds."""
 
     def __init__(self):
         self._lock = threading.Lock()
         self.commands: list[str] = []
+        self.batches: list[list[str]] = []
 
-    def send_command(self, cmd: str) -> bool:
+    def send_command(self, cmd: str, priority=0) -> bool:
+        return self.send_batch([cmd], priority)
+
+    def send_batch(self, cmds: list[str], priority=0, wait=True, timeout=2.0) -> bool:
         with self._lock:
-            self.commands.append(cmd.strip())
+            batch = [c.strip() for c in cmds]
+            self.batches.append(batch)
+            self.commands.extend(batch)
         return True
 
+    def get_batches(self) -> list[list[str]]:
+        with self._lock:
+            return [list(b) for b in self.batches]
+
     def get_commands(self) -> list[str]:
         with self._lock:
             return list(self.commands)
@@ -180,7 +190,7 @@ def test_t_ms_formula():
     motor   = FakeMotor()
     tracker = SiderealTracker(motor)
     t_ms_expected = (5.0 * 1000.0) / 100   # 50.0 ms/step
-    tracker._send_move(axis=1, direction=1, steps=100, t_ms=t_ms_expected)
+    tracker._send_move(axis='alt', direction=1, steps=100, t_ms=t_ms_expected)
     cmds  = motor.get_commands()
     t_cmd = next((c for c in cmds if c.startswith("t=")), None)
     check(t_cmd is not None, "t= command is present")
@@ -195,7 +205,7 @@ def test_send_move_command_order():
     """
     motor   = FakeMotor()
     tracker = SiderealTracker(motor)
-    tracker._send_move(axis=0, direction=1, steps=500, t_ms=10.0)
+    tracker._send_move(axis='az', direction=1, steps=500, t_ms=10.0)
     cmds = motor.get_commands()
     print(f"    Commands: {cmds}")
     check(len(cmds) == 4, f"exactly 4 commands sent (got {len(cmds)})")
@@ -205,6 +215,21 @@ def test_send_move_command_order():
     check(cmds[3].startswith("s="), f"cmd[3] is s= (trigger, got '{cmds[3]}')")
 
 
+def test_send_move_is_one_batch():
+    """
+    _send_move must hand all four commands to the motor as a single batch so
+    the keep-alive thread cannot re-select the axis mid-sequence.
+    """
+    motor   = FakeMotor()
+    tracker = SiderealTracker(motor)
+    tracker._send_move(axis='alt', direction=0, steps=250, t_ms=20.0)
+    batches = motor.get_batches()
+    print(f"    Batches: {batches}")
+    check(len(batches) == 1, f"exactly one batch sent (got {len(batches)})")
+    check(batches[0] == ["v=1", "d=0", "t=20.000", "s=250"],
+          f"batch is v→d→t→s (got {batches[0]})")
+
+
 def test_commands_sent_on_tick():
     """
     After one tracking tick a real star (Betelgeuse, above horizon for lat=32°)
@@ -338,7 +363,7 @@ def test_direction_alt_up_for_rising_star():
     motor   = FakeMotor()
     tracker = SiderealTracker(motor)
     t_ms    = (5.0 * 1000.0) / steps
-    tracker._send_move(axis=1, direction=expected_dir, steps=steps, t_ms=t_ms)
+    tracker._send_move(axis='alt', direction=expected_dir, steps=steps, t_ms=t_ms)
 
     cmds = motor.get_commands()
     d_cmd = next((c for c in cmds if c.startswith("d=")), None)
@@ -349,6 +374,61 @@ def test_direction_alt_up_for_rising_star():
           f"{'rising' if d_alt > 0 else 'setting'} star (got d={sent_dir})")
 
 
+def test_stop_during_profiled_tick_plans_nothing():
+    """A stop() landing while a profiled tick is planning must not queue moves or a plan end."""
+    import Classes.SiderealTracker as tracker_module
+
+    motor   = FakeMotor()
+    tracker = SiderealTracker(motor)
+    p = {'ra_hours': 5.5, 'dec_deg': 45.0, 'lat': 32.0, 'lon': 35.0,
+         'update_interval': 5.0, 'profile': 'trapezoid'}
+
+    class StoppingPlanner(tracker_module.MotionPlanner):
+        calls = 0
+
+        def plan_velocity(self, *args, **kwargs):
+            StoppingPlanner.calls += 1
+            if StoppingPlanner.calls == 2:      # planning the last axis
+                tracker.stop()
+            return super().plan_velocity(*args, **kwargs)
+
+    tracker._active_event.set()
+    original = tracker_module.MotionPlanner
+    tracker_module.MotionPlanner = StoppingPlanner
+    try:
+        tracker._profiled_tick(p)
+    finally:
+        tracker_module.MotionPlanner = original
+    time.sleep(0.1)
+    check(StoppingPlanner.calls == 2,       "both axes planned")
+    check(tracker._plan_end is None,        "_plan_end not set after stop()")
+    check(tracker._plan_futures == [],      "no plan futures queued after stop()")
+    check(not any(c.startswith("s=") for c in motor.get_commands()),
+          "no moves sent after stop()")
+
+
+def test_restart_drops_stale_plan_end():
+    """start() after stop() plans from now, not from where the previous run ended."""
+    motor   = FakeMotor()
+    tracker = SiderealTracker(motor)
+    stale   = Time.now() - 3600 * u.second
+    tracker._plan_end = stale
+
+    starts = []
+    drift = tracker._drift
+    def recording_drift(p, t1, t2):
+        starts.append(t1)
+        return drift(p, t1, t2)
+    tracker._drift = recording_drift
+
+    tracker.start(ra_hours=5.5, dec_deg=45.0, lat=32.0, lon=35.0,
+                  update_interval=60.0, profile='trapezoid')
+    time.sleep(0.3)
+    tracker.stop()
+    check(len(starts) >= 1,                 "a profiled tick ran")
+    check(starts[0] > stale + 3000 * u.second, "first tick starts from now, not the stale plan end")
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Test runner
 # ─────────────────────────────────────────────────────────────────────────────
@@ -363,11 +443,14 @@ TESTS = [
     ("Az wrap normalisation (Polaris)",    test_az_wrap_normalisation),
     ("t_ms formula",                       test_t_ms_formula),
     ("_send_move command order v→d→t→s",   test_send_move_command_order),
+    ("_send_move is a single batch",       test_send_move_is_one_batch),
     ("Commands sent on real tick",         test_commands_sent_on_tick),
     ("Tick block order v→d→t→s",           test_tick_command_block_order),
     ("Keep-alive energises both axes",     test_keep_alive_energises_both_axes),
     ("Stop de-energises both axes",        test_stop_deenergises_both_axes),
     ("Direction: up for rising star",      test_direction_alt_up_for_rising_star),
+    ("Stop during profiled tick",          test_stop_during_profiled_tick_plans_nothing),
+    ("Restart drops a stale plan end",     test_restart_drops_stale_plan_end),
 ]
 
 
@@ -0,0 +1,136 @@
+"""
+Tests for the modal StateShadow — pure Python.
+
+Run:
+    python Tests/test_state_shadow.py
+"""
+
+import sys
+import os
+
+# Allow importing from the Classes/ directory regardless of cwd.
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from Classes.StateShadow import StateShadow
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Assertion helper
+# ─────────────────────────────────────────────────────────────────────────────
+
+def check(condition: bool, message: str) -> None:
+    label = "  OK  " if condition else "  FAIL"
+    print(f"{label}: {message}")
+    if not condition:
+        raise AssertionError(message)
+
+
+KEEP_ALIVE = ["v=1", "e=1\n", "v=0", "e=1\n"]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Tests
+# ─────────────────────────────────────────────────────────────────────────────
+
+def test_keep_alive_collapses():
+    """The first keep-alive goes out in full; repeats cost nothing."""
+    shadow = StateShadow()
+    check(shadow.filter(KEEP_ALIVE) == ["v=1", "e=1", "v=0", "e=1"], "first keep-alive written")
+    check(shadow.filter(KEEP_ALIVE) == [], "repeat keep-alive elided entirely")
+    check(shadow.filter(["v=1", "e=0"]) == ["v=1", "e=0"], "a real change is written")
+    snapshot = shadow.snapshot()
+    check(snapshot["known"] == {"v": "1", "axis1": {"e": "0"}, "axis0": {"e": "1"}},
+          f"snapshot reflects the controller ({snapshot['known']})")
+    check(snapshot["bytes_saved"] == 16, f"16 bytes saved (got {snapshot['bytes_saved']})")
+
+
+def test_moves_keep_only_changes():
+    """Unchanged d=/t= are dropped, s= always goes out with its axis selected."""
+    shadow = StateShadow()
+    shadow.filter(["v=1", "d=1", "t=12.500", "s=40"])
+    check(shadow.filter(["v=0", "d=0", "t=8", "s=30"]) == ["v=0", "d=0", "t=8", "s=30"],
+          "other axis written in full")
+    check(shadow.filter(["v=1", "d=1", "t=12.5", "s=41"]) == ["v=1", "s=41"],
+          "same d and t (12.500 == 12.5) elided")
+    check(shadow.filter(["v=1", "d=1", "t=12.6", "s=42"]) == ["t=12.6", "s=42"],
+          "axis already selected, only the new delay")
+
+
+def test_deferred_axis_carries_over():
+    """A v= nobody needed yet is still applied before the next bare command."""
+    shadow = StateShadow()
+    shadow.filter(["v=1", "d=1"])
+    shadow.filter(["v=0", "d=0"])
+    # StarFollower sends the direction ("v=1\nd=1") after the move.
+    check(shadow.filter(["v=1\nd=1"]) == [], "unchanged direction elided, v=1 deferred")
+    check(shadow.filter(["t=2", "s=100"]) == ["v=1", "t=2", "s=100"],
+          "next move still lands on axis 1")
+
+
+def test_unknown_command_and_resync():
+    """Unknown commands invalidate; resync re-sends everything requested."""
+    shadow = StateShadow()
+    shadow.filter(KEEP_ALIVE)
+    check(shadow.filter(["r=1"]) == ["r=1"], "unknown command passed through")
+    check(shadow.filter(KEEP_ALIVE) == ["v=1", "e=1", "v=0", "e=1"], "state re-sent after it")
+
+    shadow.filter(["v=1", "d=0", "t=3"])
+    commands = shadow.resync_commands()
+    check(commands == ["v=0", "e=1", "v=1", "d=0", "t=3", "e=1", "v=1"], f"resync set ({commands})")
+    check(shadow.filter(commands, force=True) == commands, "forced write sends all of it")
+    check(shadow.filter(["v=1", "t=3"]) == [], "state known again afterwards")
+
+
+def test_max_state_age():
+    """With max_state_age, old values are refreshed."""
+    shadow = StateShadow(max_state_age=10)
+    shadow.filter(KEEP_ALIVE, now=0)
+    check(shadow.filter(KEEP_ALIVE, now=5) == [], "fresh state elided")
+    check(shadow.filter(KEEP_ALIVE, now=11) == ["v=1", "e=1", "v=0", "e=1"], "stale state re-sent")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Test runner
+# ─────────────────────────────────────────────────────────────────────────────
+
+TESTS = [
+    ("Keep-alive collapses",               test_keep_alive_collapses),
+    ("Moves keep only changes",            test_moves_keep_only_changes),
+    ("Deferred axis carries over",         test_deferred_axis_carries_over),
+    ("Unknown command and resync",         test_unknown_command_and_resync),
+    ("max_state_age refresh",              test_max_state_age),
+]
+
+
+if __name__ == "__main__":
+    passed, failed = 0, 0
+    failures: list[tuple[str, str]] = []
+
+    print("\n" + "=" * 60)
+    print(" StateShadow Test Suite")
+    print("=" * 60)
+
+    for name, fn in TESTS:
+        print(f"\n[{name}]")
+        try:
+            fn()
+            print(f"  → PASS")
+            passed += 1
+        except AssertionError as exc:
+            print(f"  → FAIL: {exc}")
+            failed += 1
+            failures.append((name, str(exc)))
+        except Exception as exc:
+            print(f"  → ERROR: {type(exc).__name__}: {exc}")
+            failed += 1
+            failures.append((name, f"{type(exc).__name__}: {exc}"))
+
+    print("\n" + "=" * 60)
+    print(f" Results: {passed} passed, {failed} failed  (total {passed + failed})")
+    if failures:
+        print("\n Failed:")
+        for name, msg in failures:
+            print(f"   • {name}: {msg}")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)
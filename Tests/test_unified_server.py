@@ -0,0 +1,541 @@
+"""
+Tests for the UnifiedHandler HTTP server — no real hardware required.
+
+The server is started on an ephemeral localhost port with fake motor,
+camera and solver objects attached, so routing and concurrency can be
+exercised without a serial port, cameras or ASTAP.
+
+Run:
+    python Tests/test_unified_server.py
+"""
+
+import sys
+import os
+import http.client
+import json
+import socket
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.request
+
+# Allow importing from the Classes/ directory regardless of cwd.
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from Classes.JobManager import JobManager
+from Classes.LazySubsystem import LazySubsystem
+from Classes.MotorTelemetry import TelemetryHub
+from Classes.UnifiedServer import ConcurrentHTTPServer, RouteTable, UnifiedHandler
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Fakes
+# ─────────────────────────────────────────────────────────────────────────────
+
+class FakeMotor:
+    """Records every command string passed to send_command() and always succeeds."""
+
+    is_connected = True
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.commands: list[str] = []
+        self.batches: list[list[str]] = []
+        self.telemetry = TelemetryHub()
+
+    def send_command(self, cmd: str) -> bool:
+        return self.send_batch([cmd])
+
+    def send_batch(self, cmds: list[str]) -> bool:
+        with self._lock:
+            self.batches.append([c.strip() for c in cmds])
+            self.commands.extend(c.strip() for c in cmds)
+        return True
+
+    def read(self):
+        return None
+
+    def read_bytes(self):
+        return b""
+
+    def subscribe(self, from_seq=None):
+        return self.telemetry.subscribe(from_seq)
+
+    def resync(self) -> bool:
+        self.resyncs = getattr(self, 'resyncs', 0) + 1
+        return True
+
+    def state_snapshot(self):
+        return {"known": {"v": "1"}, "bytes_saved": 16}
+
+
+class FakeCamera:
+    camera_model = "FakeCam"
+    CONTROLS = b'[{"name": "brightness", "value": 0}]'
+
+    def get_controls_with_etag(self):
+        return 200, self.CONTROLS, '"abc123"'
+
+
+class SlowSolver:
+    """Stands in for PlateSolver; blocks for *delay* seconds like an ASTAP run."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.timeouts: list[float] = []
+
+    def solve(self, camera_device, timeout=30, cancel_event=None, progress_callback=None):
+        self.timeouts.append(timeout)
+        time.sleep(self.delay)
+        return {"success": True, "ra_deg": 0.0, "dec_deg": 0.0}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Helpers
+# ─────────────────────────────────────────────────────────────────────────────
+
+def check(condition: bool, message: str) -> None:
+    label = "  OK  " if condition else "  FAIL"
+    print(f"{label}: {message}")
+    if not condition:
+        raise AssertionError(message)
+
+
+def _start_server(**kwargs):
+    server = ConcurrentHTTPServer(("127.0.0.1", 0), UnifiedHandler, **kwargs)
+    server.motor_control = FakeMotor()
+    server.hd_cam = FakeCamera()
+    server.uc60_cam = FakeCamera()
+    server.job_manager = JobManager()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def _stop_server(server) -> None:
+    server.job_manager.shutdown()
+    server.shutdown()
+    server.server_close()
+
+
+def _get(server, path: str, timeout: float = 5.0, method: str = "GET",
+         data: bytes | None = None) -> tuple[int, bytes]:
+    url = f"http://127.0.0.1:{server.server_address[1]}{path}"
+    request = urllib.request.Request(url, data=data, method=method)
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as resp:
+            return resp.status, resp.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Tests
+# ─────────────────────────────────────────────────────────────────────────────
+
+def test_ping():
+    """/ping answers pong."""
+    server = _start_server()
+    try:
+        code, body = _get(server, "/ping")
+        check(code == 200, f"/ping returns 200 (got {code})")
+        check(body == b"pong", f"/ping body is pong (got {body!r})")
+    finally:
+        _stop_server(server)
+
+
+def test_motor_write_not_blocked_by_solve():
+    """A jog issued while a plate solve is running must answer immediately."""
+    server = _start_server(max_workers=4)
+    server.plate_solver = SlowSolver(delay=1.5)
+    try:
+        solve_thread = threading.Thread(target=_get, args=(server, "/cam/solve?camera=hd"))
+        solve_thread.start()
+        time.sleep(0.2)   # let the solve occupy its worker
+
+        t0 = time.perf_counter()
+        code, body = _get(server, "/motor/write?cmd=v%3D1")
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+        print(f"    jog latency during solve: {elapsed_ms:.1f} ms")
+
+        check(code == 200 and body == b"OK", "jog accepted during solve")
+        check(elapsed_ms < 500, f"jog answered before the solve finished ({elapsed_ms:.1f} ms)")
+        check(server.motor_control.commands == ["v=1"], "jog command reached the motor")
+        solve_thread.join()
+    finally:
+        _stop_server(server)
+
+
+def test_solve_uses_route_timeout():
+    """/cam/solve passes its per-route timeout down to PlateSolver.solve()."""
+    server = _start_server(route_timeouts={"/cam/solve": 12.5})
+    server.plate_solver = SlowSolver(delay=0.0)
+    try:
+        code, _ = _get(server, "/cam/solve?camera=hd")
+        check(code == 200, f"/cam/solve returns 200 (got {code})")
+        check(server.plate_solver.timeouts == [12.5],
+              f"solve() received the route timeout (got {server.plate_solver.timeouts})")
+    finally:
+        _stop_server(server)
+
+
+def test_route_timeout_longest_prefix():
+    """route_timeout() picks the longest matching prefix, else the default."""
+    server = ConcurrentHTTPServer(("127.0.0.1", 0), UnifiedHandler,
+                                  route_timeouts={"/cam": 3.0, "/cam/solve": 30.0},
+                                  default_timeout=7.0)
+    try:
+        check(server.route_timeout("/cam/solve") == 30.0, "/cam/solve → 30 s")
+        check(server.route_timeout("/cam/hd/start") == 3.0, "/cam/hd/start → 3 s")
+        check(server.route_timeout("/ping") == 7.0, "/ping → default 7 s")
+    finally:
+        server.server_close()
+
+
+def test_max_in_flight_rejects_with_503():
+    """Beyond max_in_flight concurrent requests the server answers 503 at once."""
+    server = _start_server(max_workers=1, max_in_flight=1)
+    server.plate_solver = SlowSolver(delay=1.0)
+    try:
+        solve_thread = threading.Thread(target=_get, args=(server, "/cam/solve?camera=hd"))
+        solve_thread.start()
+        time.sleep(0.2)
+
+        code, body = _get(server, "/ping")
+        check(code == 503, f"second request is rejected with 503 (got {code})")
+        solve_thread.join()
+
+        code, _ = _get(server, "/ping")
+        check(code == 200, f"server accepts again once the slot frees (got {code})")
+    finally:
+        _stop_server(server)
+
+
+def test_idle_keep_alive_connections_hold_no_slot():
+    """Idle keep-alive clients don't use up max_in_flight; only the connection cap gets 503."""
+    server = _start_server(max_workers=2, max_connections=4)
+    try:
+        idle = []
+        for _ in range(3):
+            conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=3)
+            conn.request("GET", "/ping")
+            conn.getresponse().read()
+            idle.append(conn)                   # left open, idle
+        code, _ = _get(server, "/ping")
+        check(code == 200, f"a new client is served next to 3 idle ones (got {code})")
+
+        extra = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=3)
+        extra.request("GET", "/ping")
+        extra.getresponse().read()
+        code, _ = _get(server, "/ping")
+        check(code == 503, f"beyond max_connections open connections → 503 (got {code})")
+        for conn in idle + [extra]:
+            conn.close()
+    finally:
+        _stop_server(server)
+
+
+def test_solve_job_lifecycle():
+    """POST /jobs/solve answers at once with a job id; GET /jobs/<id> reports the result."""
+    server = _start_server()
+    server.plate_solver = SlowSolver(delay=0.5)
+    try:
+        t0 = time.perf_counter()
+        code, body = _get(server, "/jobs/solve", method="POST", data=b"camera=hd")
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+        job = json.loads(body)
+        check(code == 202, f"POST /jobs/solve returns 202 (got {code})")
+        check(elapsed_ms < 300, f"POST returns before the solve finishes ({elapsed_ms:.1f} ms)")
+        check(job["state"] in ("queued", "running"), f"job is pending (got {job['state']})")
+
+        deadline = time.monotonic() + 3.0
+        while time.monotonic() < deadline:
+            code, body = _get(server, f"/jobs/{job['id']}")
+            job = json.loads(body)
+            if job["state"] == "done":
+                break
+            time.sleep(0.05)
+        check(job["state"] == "done", f"job completes (got {job['state']})")
+        check(job["result"]["success"] is True, "solve result is returned")
+    finally:
+        _stop_server(server)
+
+
+def test_jobs_unknown_id_and_type():
+    """Unknown job ids and job types answer 404."""
+    server = _start_server()
+    try:
+        code, _ = _get(server, "/jobs/doesnotexist")
+        check(code == 404, f"GET unknown job → 404 (got {code})")
+        code, _ = _get(server, "/jobs/doesnotexist", method="DELETE")
+        check(code == 404, f"DELETE unknown job → 404 (got {code})")
+        code, _ = _get(server, "/jobs/unknown", method="POST", data=b"")
+        check(code == 404, f"POST unknown job type → 404 (got {code})")
+    finally:
+        _stop_server(server)
+
+
+def test_motor_events_fan_out():
+    """Two /motor/events clients both receive every published serial line; closing the hub ends them."""
+    server = _start_server()
+    try:
+        conns = []
+        for _ in range(2):
+            conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=3)
+            conn.request("GET", "/motor/events")
+            resp = conn.getresponse()
+            check(resp.getheader("Content-Type") == "text/event-stream", "SSE content type")
+            conns.append((conn, resp))
+        time.sleep(0.2)   # both handlers are now subscribed
+
+        server.motor_control.telemetry.publish(b"pos=1\npos=2\n")
+        for conn, resp in conns:
+            data = b""
+            while data.count(b"\n\n") < 2:
+                data += resp.fp.read1(4096)
+            check(b"data: pos=1\n\n" in data and b"data: pos=2\n\n" in data,
+                  f"client received both lines ({data!r})")
+
+        # Stopping the motor closes its hub: the streams end instead of spinning.
+        server.motor_control.telemetry.close()
+        started = time.perf_counter()
+        for conn, resp in conns:
+            resp.read()
+            conn.close()
+        elapsed = time.perf_counter() - started
+        check(elapsed < 1.0, f"event streams ended when the hub closed ({elapsed:.2f} s)")
+    finally:
+        _stop_server(server)
+
+
+def test_route_table_matching():
+    """RouteTable matches exact paths and sub-paths, longest prefix first."""
+    table = RouteTable([
+        ("GET", "/motor",       "handle_motor"),
+        ("GET", "/motor/write", "handle_motor_write"),
+        ("GET", "/cam/hd",      "handle_hd_camera"),
+    ])
+    check(table.match("GET", "/motor/write") == ("/motor/write", "handle_motor_write"),
+          "exact match")
+    check(table.match("GET", "/motor/write/") == ("/motor/write", "handle_motor_write"),
+          "trailing slash matches")
+    check(table.match("GET", "/motor/other") == ("/motor", "handle_motor"),
+          "falls back to the parent prefix")
+    check(table.match("GET", "/cam/hd/set_control") == ("/cam/hd", "handle_hd_camera"),
+          "sub-path matches its prefix")
+    check(table.match("GET", "/cam/hdx") is None, "prefix must end on a path boundary")
+    check(table.match("POST", "/motor/write") is None, "method is part of the key")
+
+
+def test_keep_alive_reuses_connection():
+    """Several jogs travel over one HTTP/1.1 connection, each with Content-Length."""
+    server = _start_server()
+    try:
+        conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=3)
+        sockets = set()
+        for i in range(3):
+            conn.request("GET", f"/motor/write?cmd=s%3D{i}")
+            resp = conn.getresponse()
+            body = resp.read()
+            check(resp.version == 11, "response is HTTP/1.1")
+            check(resp.getheader("Content-Length") == str(len(body)), "Content-Length matches body")
+            sockets.add(id(conn.sock))
+        conn.request("GET", "/nope")
+        resp = conn.getresponse()
+        resp.read()
+        check(resp.status == 404, "unknown route → 404 on the same connection")
+        sockets.add(id(conn.sock))
+        conn.close()
+        check(len(sockets) == 1, f"all requests shared one socket ({len(sockets)} used)")
+        check(server.motor_control.commands == ["s=0", "s=1", "s=2"], "all jogs delivered")
+    finally:
+        _stop_server(server)
+
+
+def test_bad_content_length_is_rejected():
+    """A malformed or negative Content-Length gets a 400 and the connection is closed."""
+    server = _start_server()
+    try:
+        for value in ("abc", "-5"):
+            with socket.create_connection(("127.0.0.1", server.server_address[1]), timeout=3) as sock:
+                sock.sendall(b"POST /motor/batch HTTP/1.1\r\nHost: x\r\n"
+                             b"Content-Length: %s\r\n\r\ns=1\n" % value.encode())
+                reply = b""
+                while chunk := sock.recv(4096):
+                    reply += chunk
+            check(reply.startswith(b"HTTP/1.1 400"), f"Content-Length {value} → 400 ({reply[:12]!r})")
+            check(b"Connection: close" in reply, "connection closed after the bad request")
+        check(server.motor_control.commands == [], "nothing reached the motor")
+    finally:
+        _stop_server(server)
+
+
+def test_motor_batch():
+    """POST /motor/batch delivers all commands to send_batch() in one call."""
+    server = _start_server()
+    try:
+        code, body = _get(server, "/motor/batch", method="POST", data=b"v=1\nd=0\nt=2\ns=100\n")
+        check(code == 200 and body == b"OK 4", f"text batch accepted (got {code} {body!r})")
+
+        request = urllib.request.Request(
+            f"http://127.0.0.1:{server.server_address[1]}/motor/batch",
+            data=json.dumps({"commands": ["v=0", "e=1"]}).encode(),
+            headers={"Content-Type": "application/json"}, method="POST")
+        with urllib.request.urlopen(request, timeout=5) as resp:
+            check(resp.status == 200, "JSON batch accepted")
+
+        code, _ = _get(server, "/motor/batch", method="POST", data=b"")
+        check(code == 400, f"empty batch → 400 (got {code})")
+        check(server.motor_control.batches == [["v=1", "d=0", "t=2", "s=100"], ["v=0", "e=1"]],
+              f"each request was one batch ({server.motor_control.batches})")
+    finally:
+        _stop_server(server)
+
+
+def test_metrics_endpoint():
+    """/metrics exports per-route request counts and latency histograms."""
+    server = _start_server()
+    try:
+        _get(server, "/ping")
+        code, body = _get(server, "/metrics")
+        text = body.decode()
+        check(code == 200, f"/metrics returns 200 (got {code})")
+        check('http_requests_total{route="/ping",method="GET",code="200"}' in text,
+              "ping request counted")
+        check('http_request_duration_seconds_count{route="/ping"}' in text,
+              "ping latency histogram exported")
+    finally:
+        _stop_server(server)
+
+
+def test_import_does_not_load_heavy_modules():
+    """Importing UnifiedServer must not pull in cv2, numpy or astropy."""
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    code = ("import sys, Classes.UnifiedServer; "
+            "print(','.join(m for m in ('cv2', 'numpy', 'astropy') if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", code], cwd=root,
+                         capture_output=True, text=True, check=True).stdout.strip()
+    check(out == "", f"no heavy modules imported (got '{out}')")
+
+
+def test_ready_reports_lazy_subsystems():
+    """/ready is 503 until every lazy subsystem has loaded, then 200."""
+    server = _start_server()
+    lazy = LazySubsystem("jobs2", "Classes.JobManager", "JobManager")
+    server.subsystems["jobs2"] = lazy
+    try:
+        code, body = _get(server, "/ready")
+        status = json.loads(body)
+        check(code == 503, f"/ready is 503 before loading (got {code})")
+        check(status["subsystems"]["jobs2"]["state"] == "pending", "subsystem pending")
+        check(status["subsystems"]["http"]["state"] == "ready", "http is ready")
+
+        check(server.loaded_subsystem("jobs2") is None, "loaded_subsystem() does not load")
+        instance = server.jobs2          # attribute access loads it
+        check(isinstance(instance, JobManager), "attribute access returns the instance")
+
+        code, body = _get(server, "/ready")
+        check(code == 200, f"/ready is 200 once loaded (got {code})")
+        check(json.loads(body)["subsystems"]["jobs2"]["state"] == "ready", "subsystem ready")
+        instance.shutdown()
+    finally:
+        _stop_server(server)
+
+
+def test_motor_state_and_resync():
+    """/motor/state reports the shadow; /motor/resync forces the full state."""
+    server = _start_server()
+    try:
+        code, body = _get(server, "/motor/state")
+        check(code == 200 and json.loads(body)["bytes_saved"] == 16, f"state served ({body!r})")
+        code, body = _get(server, "/motor/resync")
+        check(code == 200 and body == b"OK", f"resync OK (got {code} {body!r})")
+        check(server.motor_control.resyncs == 1, "resync() called once")
+    finally:
+        _stop_server(server)
+
+
+def test_camera_controls_etag():
+    """/cam/<name>/controls carries an ETag; a matching If-None-Match gets 304."""
+    server = _start_server()
+    try:
+        conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+        conn.request("GET", "/cam/hd/controls")
+        resp = conn.getresponse()
+        body = resp.read()
+        etag = resp.getheader("ETag")
+        check(resp.status == 200 and body == FakeCamera.CONTROLS, "first request returns the controls")
+        check(etag == '"abc123"', f"ETag header sent (got {etag})")
+
+        conn.request("GET", "/cam/hd/controls", headers={"If-None-Match": etag})
+        resp = conn.getresponse()
+        check(resp.status == 304, f"matching If-None-Match → 304 (got {resp.status})")
+        check(resp.read() == b"", "304 has no body")
+
+        conn.request("GET", "/cam/hd/controls", headers={"If-None-Match": '"stale"'})
+        resp = conn.getresponse()
+        check(resp.status == 200 and resp.read() == FakeCamera.CONTROLS, "stale ETag → 200")
+        conn.close()
+    finally:
+        _stop_server(server)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Test runner
+# ─────────────────────────────────────────────────────────────────────────────
+
+TESTS = [
+    ("Ping",                               test_ping),
+    ("Jog not blocked by solve",           test_motor_write_not_blocked_by_solve),
+    ("Solve uses route timeout",           test_solve_uses_route_timeout),
+    ("Route timeout longest prefix",       test_route_timeout_longest_prefix),
+    ("max_in_flight rejects with 503",     test_max_in_flight_rejects_with_503),
+    ("Idle keep-alive holds no slot",      test_idle_keep_alive_connections_hold_no_slot),
+    ("Solve job lifecycle",                test_solve_job_lifecycle),
+    ("Jobs unknown id and type",           test_jobs_unknown_id_and_type),
+    ("Motor events fan-out",               test_motor_events_fan_out),
+    ("Route table matching",               test_route_table_matching),
+    ("Keep-alive reuses connection",       test_keep_alive_reuses_connection),
+    ("Bad Content-Length rejected",        test_bad_content_length_is_rejected),
+    ("Motor batch",                        test_motor_batch),
+    ("Metrics endpoint",                   test_metrics_endpoint),
+    ("Import skips heavy modules",         test_import_does_not_load_heavy_modules),
+    ("Ready reports lazy subsystems",      test_ready_reports_lazy_subsystems),
+    ("Motor state and resync",             test_motor_state_and_resync),
+    ("Camera controls ETag",               test_camera_controls_etag),
+]
+
+
+if __name__ == "__main__":
+    passed, failed = 0, 0
+    failures: list[tuple[str, str]] = []
+
+    print("\n" + "=" * 60)
+    print(" UnifiedServer Test Suite")
+    print("=" * 60)
+
+    for name, fn in TESTS:
+        print(f"\n[{name}]")
+        try:
+            fn()
+            print(f"  → PASS")
+            passed += 1
+        except AssertionError as exc:
+            print(f"  → FAIL: {exc}")
+            failed += 1
+            failures.append((name, str(exc)))
+        except Exception as exc:
+            print(f"  → ERROR: {type(exc).__name__}: {exc}")
+            failed += 1
+            failures.append((name, f"{type(exc).__name__}: {exc}"))
+
+    print("\n" + "=" * 60)
+    print(f" Results: {passed} passed, {failed} failed  (total {passed + failed})")
+    if failures:
+        print("\n Failed:")
+        for name, msg in failures:
+            print(f"   • {name}: {msg}")
+    print("=" * 60)
+
+    sys.exit(0 if failed == 0 else 1)